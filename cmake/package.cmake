@@ -58,6 +58,11 @@ install(
         DESTINATION ${INSTALL_LIB_DIR}
         COMPONENT mindspore_serving
 )
+install(
+        FILES ${CMAKE_SOURCE_DIR}/mindspore_serving/ccsrc/worker/stage_plugin.h
+        DESTINATION ${INSTALL_BASE_DIR}/include
+        COMPONENT mindspore_serving
+)
 install(
         DIRECTORY
         ${CMAKE_SOURCE_DIR}/mindspore_serving/server
@@ -36,6 +36,16 @@ class GrpcAsyncServiceContextBase {
 
   virtual void NewAndHandleRequest() = 0;
 
+  // handle the event of the tag, return false if the tag should be deleted
+  virtual bool HandleEvent(bool rpc_ok) {
+    if (HasFinish() || !rpc_ok) {  // !rpc_ok: cancel get request when shutting down.
+      return false;
+    }
+    NewAndHandleRequest();
+    SetFinish();  // will delete next time
+    return true;
+  }
+
   bool HasFinish() const { return finished_; }
   void SetFinish() { finished_ = true; }
 
@@ -43,6 +53,26 @@ class GrpcAsyncServiceContextBase {
   bool finished_ = false;
 };
 
+// Tag of the read, write and finish events of a streaming call, which are handled by the context of the call. The
+// tag is a member of the context, and the context deletes itself when the call is finished.
+template <class Context>
+class GrpcAsyncStreamEventTag : public GrpcAsyncServiceContextBase {
+ public:
+  using EventHandler = void (Context::*)(bool rpc_ok);
+  GrpcAsyncStreamEventTag(Context *context, EventHandler handler) : context_(context), handler_(handler) {}
+  ~GrpcAsyncStreamEventTag() = default;
+
+  void NewAndHandleRequest() override {}
+  bool HandleEvent(bool rpc_ok) override {
+    (context_->*handler_)(rpc_ok);
+    return true;
+  }
+
+ private:
+  Context *context_;
+  EventHandler handler_;
+};
+
 template <class ServiceImpl, class AsyncService, class Derived>
 class GrpcAsyncServiceContext : public GrpcAsyncServiceContextBase {
  public:
@@ -184,11 +214,8 @@ class GrpcAsyncServer {
 
   void ProcessRequest(void *tag, bool rpc_ok) {
     auto rq = static_cast<GrpcAsyncServiceContextBase *>(tag);
-    if (rq->HasFinish() || !rpc_ok) {  // !rpc_ok: cancel get request when shutting down.
+    if (!rq->HandleEvent(rpc_ok)) {
       delete rq;
-    } else {
-      rq->NewAndHandleRequest();
-      rq->SetFinish();  // will delete next time
     }
   }
 
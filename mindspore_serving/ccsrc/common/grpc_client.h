@@ -37,6 +37,8 @@
 namespace mindspore {
 namespace serving {
 using PredictOnFinish = std::function<void()>;
+// called with the reply of the instances of a request that have finished, before all the instances finish
+using PredictOnPartialReply = std::function<void(const std::shared_ptr<proto::PredictReply> &reply)>;
 
 using AsyncPredictCallback = std::function<void(Status status)>;
 
@@ -33,7 +33,15 @@ struct Instance {
   std::map<size_t, InstanceData> stage_data_list;  // input: 0, stage: 1-n
 
   uint64_t user_id = 0;
+  uint32_t priority = 0;     // request priority, larger value is processed first
+  uint64_t deadline_us = 0;  // microseconds since epoch, 0: no deadline
   Status error_msg = SUCCESS;
+
+  // When the stages of the method are run in parallel, each stage is processed by a stage instance whose parent is
+  // the instance of the request, and the outputs of stages are saved in the parent.
+  std::shared_ptr<Instance> parent = nullptr;
+  std::map<uint64_t, size_t> stage_wait_count;  // count of unfinished stages each stage depends on
+  bool stage_failed = false;
 };
 
 using InstancePtr = std::shared_ptr<Instance>;
@@ -220,6 +220,8 @@ void GrpcTensorHelper::GetRequestSpec(const proto::PredictRequest &request, Requ
   request_spec->servable_name = request.servable_spec().name();
   request_spec->method_name = request.servable_spec().method_name();
   request_spec->version_number = request.servable_spec().version_number();
+  request_spec->priority = request.servable_spec().priority();
+  request_spec->deadline_us = request.deadline_us();
 }
 
 void GrpcTensorHelper::ConvertProtoWorkerSpec(const proto::RegisterRequest &proto_request, WorkerRegSpec *worker_spec) {
@@ -357,21 +359,21 @@ void GrpcTensorHelper::CreateReplyFromInstances(const proto::PredictRequest &req
   }
 }
 
-Status GrpcTensorHelper::CreateInstanceFromPredictReply(const RequestSpec &request_spec,
-                                                        const proto::PredictReply &reply,
+Status GrpcTensorHelper::CreateInstanceFromPredictReply(const RequestSpec &request_spec, proto::PredictReply *reply,
                                                         std::vector<proto::ErrorMsg> *error,
-                                                        std::vector<const proto::Instance *> *results) {
+                                                        std::vector<proto::Instance *> *results) {
+  MSI_EXCEPTION_IF_NULL(reply);
   MSI_EXCEPTION_IF_NULL(error);
   MSI_EXCEPTION_IF_NULL(results);
   results->clear();
   error->clear();
-  if (reply.instances_size() == 0 && reply.error_msg_size() == 0) {
+  if (reply->instances_size() == 0 && reply->error_msg_size() == 0) {
     return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR)
            << "The instance or error count of reply cannot be 0, servable: " << request_spec.servable_name
            << ", method: " << request_spec.method_name;
   }
-  std::copy(reply.error_msg().begin(), reply.error_msg().end(), std::back_inserter(*error));
-  for (auto &item : reply.instances()) {
+  std::copy(reply->error_msg().begin(), reply->error_msg().end(), std::back_inserter(*error));
+  for (auto &item : *reply->mutable_instances()) {
     // cppcheck-suppress useStlAlgorithm
     results->push_back(&item);
   }
@@ -380,13 +382,14 @@ Status GrpcTensorHelper::CreateInstanceFromPredictReply(const RequestSpec &reque
 
 Status GrpcTensorHelper::CreatePredictReplyFromInstances(const proto::PredictRequest &request,
                                                          const std::vector<proto::ErrorMsg> &errors,
-                                                         const std::vector<const proto::Instance *> &instances,
+                                                         const std::vector<proto::Instance *> &instances,
                                                          proto::PredictReply *reply) {
   MSI_EXCEPTION_IF_NULL(reply);
   for (auto &instance : instances) {
     auto proto_instance = reply->add_instances();
     if (instance) {
-      *proto_instance->mutable_items() = instance->items();
+      // move the output tensors of worker reply into the client reply, tensor data is not copied
+      proto_instance->mutable_items()->swap(*instance->mutable_items());
     }
   }
   bool all_ok = true;
@@ -424,13 +427,27 @@ Status GrpcTensorHelper::CreatePredictRequestFromInstances(const RequestSpec &re
   proto_spec->set_name(request_spec.servable_name);
   proto_spec->set_method_name(request_spec.method_name);
   proto_spec->set_version_number(request_spec.version_number);
+  proto_spec->set_priority(request_spec.priority);
+  // the deadline of master is sent as the remaining time, the worker may be on another host with a skewed clock
+  request->set_timeout_us(common::GetRemainingTimeUs(request_spec.deadline_us));
+  auto proto_instances = request->mutable_instances();
+  proto_instances->Reserve(static_cast<int>(instances.size()));
   for (auto &instance : instances) {
-    auto proto_instance = request->add_instances();
-    *proto_instance = *instance;
+    // The instance is only read when the request is serialized, and it is released from the request without being
+    // freed by ReleasePredictRequestInstances
+    proto_instances->UnsafeArenaAddAllocated(const_cast<proto::Instance *>(instance));
   }
   return SUCCESS;
 }
 
+void GrpcTensorHelper::ReleasePredictRequestInstances(proto::PredictRequest *request) {
+  MSI_EXCEPTION_IF_NULL(request);
+  auto proto_instances = request->mutable_instances();
+  while (!proto_instances->empty()) {
+    (void)proto_instances->UnsafeArenaReleaseLast();
+  }
+}
+
 Status GrpcTensorHelper::CreateReplyFromInstancesInner(const proto::PredictRequest &request,
                                                        const MethodSignature &method,
                                                        const std::vector<InstancePtr> &instances,
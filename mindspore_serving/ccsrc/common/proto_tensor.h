@@ -82,16 +82,20 @@ class MS_API GrpcTensorHelper {
   static void CopyFromAgentSpec(const proto::AgentSpec &request, WorkerAgentSpec *worker_specs);
   static void CopyFromWorkerAgentSpec(const std::vector<WorkerAgentSpec> &worker_specs,
                                       proto::AgentRegisterRequest *request);
+  // The instances are borrowed by the request without copy, ReleasePredictRequestInstances must be called before
+  // the instances are freed or the request is destroyed.
   static Status CreatePredictRequestFromInstances(const RequestSpec &request_spec,
                                                   const std::vector<const proto::Instance *> &instances,
                                                   proto::PredictRequest *request);
+  static void ReleasePredictRequestInstances(proto::PredictRequest *request);
+  // The items of instances are moved into the reply.
   static Status CreatePredictReplyFromInstances(const proto::PredictRequest &request,
                                                 const std::vector<proto::ErrorMsg> &errors,
-                                                const std::vector<const proto::Instance *> &instances,
+                                                const std::vector<proto::Instance *> &instances,
                                                 proto::PredictReply *reply);
-  static Status CreateInstanceFromPredictReply(const RequestSpec &request_spec, const proto::PredictReply &reply,
+  static Status CreateInstanceFromPredictReply(const RequestSpec &request_spec, proto::PredictReply *reply,
                                                std::vector<proto::ErrorMsg> *error,
-                                               std::vector<const proto::Instance *> *results);
+                                               std::vector<proto::Instance *> *results);
 
   static Status CheckRequestInstances(const proto::PredictRequest &request,
                                       const std::vector<std::string> &input_names);
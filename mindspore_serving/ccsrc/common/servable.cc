@@ -15,6 +15,7 @@
  */
 
 #include "common/servable.h"
+#include <algorithm>
 #include <set>
 #include <sstream>
 #include "worker/stage_function.h"
@@ -57,7 +58,7 @@ std::string RequestSpec::Repr() const {
 
 void MethodSignature::AddStageFunction(const std::string &func_name,
                                        const std::vector<std::pair<size_t, uint64_t>> &stage_inputs,
-                                       uint64_t batch_size, const std::string &tag) {
+                                       uint64_t batch_size, const std::string &tag, uint64_t num_parallel) {
   MethodStage stage;
   stage.method_name = method_name;
   stage.stage_index = stage_index;
@@ -70,10 +71,14 @@ void MethodSignature::AddStageFunction(const std::string &func_name,
     if (!func) {
       MSI_LOG_EXCEPTION << "Function '" << func_name << "' is not defined";
     }
+    if (func->GetInputsCount(func_name) == 0 || func->GetOutputsCount(func_name) == 0) {
+      MSI_LOG_EXCEPTION << "Function '" << func_name << "' is invalid, please check its arguments";
+    }
     stage.stage_type = kMethodStageTypeCppFunction;
   }
   stage.stage_inputs = stage_inputs;
   stage.batch_size = batch_size;
+  stage.num_parallel = num_parallel;
   if (tag.empty()) {
     stage.tag = "Function '" + func_name + "'";
   } else {
@@ -110,6 +115,60 @@ void MethodSignature::SetReturn(const std::vector<std::pair<size_t, uint64_t>> &
   stage.stage_type = kMethodStageTypeReturn;
   stage.stage_inputs = return_inputs;
   stage_map[stage_index] = stage;
+  InitStageDepends();
+}
+
+void MethodSignature::InitStageDepends() {
+  for (auto &item : stage_map) {
+    auto &stage = item.second;
+    std::set<uint64_t> depend_stages;
+    for (auto &input : stage.stage_inputs) {
+      if (input.first != 0) {
+        depend_stages.insert(input.first);
+      }
+    }
+    stage.depend_stages.assign(depend_stages.begin(), depend_stages.end());
+    stage.next_stages.clear();
+  }
+  for (auto &item : stage_map) {
+    for (auto depend_stage : item.second.depend_stages) {
+      auto it = stage_map.find(depend_stage);
+      if (it == stage_map.end() || depend_stage >= item.first) {
+        MSI_LOG_EXCEPTION << "Invalid input stage index " << depend_stage << " of stage " << item.first
+                          << ", method " << method_name;
+      }
+      it->second.next_stages.push_back(item.first);
+    }
+  }
+  // the return stage waits for the stages whose outputs are not used, so that all stages have finished when the
+  // method returns
+  auto &return_stage = stage_map[stage_index];
+  start_stages.clear();
+  for (auto &item : stage_map) {
+    auto &stage = item.second;
+    if (item.first == stage_index) {
+      continue;
+    }
+    if (stage.next_stages.empty()) {
+      stage.next_stages.push_back(stage_index);
+      return_stage.depend_stages.push_back(item.first);
+    }
+    if (stage.depend_stages.empty()) {
+      start_stages.push_back(item.first);
+    }
+  }
+  std::sort(return_stage.depend_stages.begin(), return_stage.depend_stages.end());
+  return_stage.depend_stages.erase(std::unique(return_stage.depend_stages.begin(), return_stage.depend_stages.end()),
+                                   return_stage.depend_stages.end());
+  // the stages are run one by one if each stage depends on its previous stage
+  parallel_stages = false;
+  for (size_t index = kStageStartIndex + 1; index <= stage_index; index++) {
+    auto &depend_stages = stage_map[index].depend_stages;
+    if (std::find(depend_stages.begin(), depend_stages.end(), index - 1) == depend_stages.end()) {
+      parallel_stages = true;
+      break;
+    }
+  }
 }
 
 size_t MethodSignature::GetStageMax() const { return stage_index; }
@@ -45,6 +45,11 @@ struct MethodStage {
   std::vector<std::pair<size_t, uint64_t>> stage_inputs;  // first: input- 0, stage- 1~n, second: output index
   // will be updated when model loaded
   uint64_t batch_size = 0;
+  uint64_t weight = 1;        // weight of the method, will be updated when stage queue started
+  uint64_t num_parallel = 1;  // for python function, max tasks of the stage processed concurrently
+  // updated when the return stage is set
+  std::vector<uint64_t> depend_stages;  // the stages whose outputs are the inputs of this stage
+  std::vector<uint64_t> next_stages;    // the stages using the outputs of this stage
 };
 
 static const uint64_t kStageStartIndex = 1;
@@ -53,11 +58,16 @@ struct MS_API MethodSignature {
   std::string method_name;
   std::vector<std::string> inputs;
   std::vector<std::string> outputs;
+  uint64_t weight = 1;  // share of the worker stage queues when this method competes with other methods
 
   std::map<size_t, MethodStage> stage_map;  // stage_index, MethodStage
+  // whether there are stages independent of each other, which are run in parallel, updated when the return stage is
+  // set. Otherwise the stages are run one by one.
+  bool parallel_stages = false;
+  std::vector<uint64_t> start_stages;  // the stages using the method inputs only
 
   void AddStageFunction(const std::string &func_name, const std::vector<std::pair<size_t, uint64_t>> &stage_inputs,
-                        uint64_t batch_size = 0, const std::string &tag = "");
+                        uint64_t batch_size = 0, const std::string &tag = "", uint64_t num_parallel = 1);
   void AddStageModel(const std::string &model_key, const std::vector<std::pair<size_t, uint64_t>> &stage_inputs,
                      uint64_t subgraph = 0, const std::string &tag = "");
   void SetReturn(const std::vector<std::pair<size_t, uint64_t>> &return_inputs);
@@ -67,6 +77,8 @@ struct MS_API MethodSignature {
  private:
   // stage index begin with 1, 0 reserve for input, include function, model, return stage
   size_t stage_index = kStageStartIndex;
+
+  void InitStageDepends();
 };
 
 struct ServableLoadSpec {
@@ -112,6 +124,8 @@ struct RequestSpec {
   std::string servable_name;
   std::string method_name;
   uint64_t version_number = 0;  // not specified
+  uint32_t priority = 0;        // larger value is processed first
+  uint64_t deadline_us = 0;     // microseconds since epoch, 0: no deadline
   std::string Repr() const;
 };
 
@@ -121,6 +135,12 @@ enum ServableType {
   kServableTypeDistributed = 2,
 };
 
+struct BatchingPolicy {
+  uint64_t max_batch_size = 0;      // 0: use the batch size of the model
+  uint64_t max_queue_delay_us = 0;  // 0: dispatch the instances in queue immediately
+  std::vector<uint64_t> preferred_batch_sizes;
+};
+
 struct CommonModelMeta {
   std::string servable_name;
   // used to identify model, for local model: ";".join(model_files), for distributed model: servable name
@@ -129,10 +149,15 @@ struct CommonModelMeta {
   std::vector<int> without_batch_dim_inputs;
   std::map<uint64_t, size_t> inputs_count;
   std::map<uint64_t, size_t> outputs_count;
+  BatchingPolicy batching_policy;
 };
 
 struct MS_API LocalModelMeta {
   std::vector<std::string> model_files;              // file names
+  // file names of the same model compiled with other batch sizes, each variant has the same number of files as
+  // model_files
+  std::vector<std::vector<std::string>> batch_variant_files;
+  uint32_t parallel_instances = 1;  // number of model instances loaded to run predict concurrently
   ModelType model_format = ModelType::kUnknownType;  // OM, MindIR, MindIR_Lite
   ModelContext model_context;
   std::string config_file;
@@ -18,6 +18,7 @@
 #include <sys/stat.h>
 #include <fcntl.h>
 #include <unistd.h>
+#include <algorithm>
 #include "common/shared_memory.h"
 
 namespace mindspore {
@@ -29,10 +30,10 @@ SharedMemoryAllocator &SharedMemoryAllocator::Instance() {
 
 SharedMemoryAllocator::SharedMemoryAllocator() = default;
 SharedMemoryAllocator::~SharedMemoryAllocator() noexcept {
-  std::unique_lock<std::mutex> lock(lock_);
+  std::unique_lock<std::shared_mutex> lock(lock_);
   for (auto &item : memory_map_) {
     auto &group = item.second;
-    for (auto &shm : group.shm_map) {
+    for (auto &shm : group->shm_map) {
       auto ret = munmap(shm.second.address, shm.second.bytes_size);
       if (ret == -1) {
         MSI_LOG_ERROR << "Failed to munmap, memory key: " << shm.second.memory_key;
@@ -47,16 +48,13 @@ SharedMemoryAllocator::~SharedMemoryAllocator() noexcept {
 }
 
 Status SharedMemoryAllocator::AddShmMemoryBuffer(SharedMemoryGroup *shm_group) {
-  auto item_size = shm_group->item_size;
+  auto align_item_size = shm_group->align_item_size;
   auto item_count = shm_group->item_count;
   auto memory_key = shm_group->memory_key_prefix + "_" + std::to_string(shm_group->shm_map.size());
-  // maximum 4GB memory
-  if (item_size == 0 || item_count == 0 || UINT32_MAX / item_size < item_count) {
-    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid item size or item count, item size: " << item_size
+  if (align_item_size == 0 || item_count == 0 || UINT64_MAX / align_item_size < item_count) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid item size or item count, item size: " << shm_group->item_size
                                           << ", item count :" << item_count << ", memory key: " << memory_key;
   }
-  constexpr uint32_t align_size = 8;
-  auto align_item_size = (item_size + align_size - 1) / align_size * align_size;
   auto shm_fd = shm_open(memory_key.c_str(), O_CREAT | O_RDWR, S_IRUSR | S_IWUSR);
   if (shm_fd == -1) {
     return INFER_STATUS_LOG_ERROR(FAILED) << "Failed to shm_open " << memory_key << " , errno: " << errno;
@@ -65,11 +63,15 @@ Status SharedMemoryAllocator::AddShmMemoryBuffer(SharedMemoryGroup *shm_group) {
   uint64_t memory_size = align_item_size * item_count;
   auto ret = ftruncate(shm_fd, static_cast<int64_t>(memory_size));
   if (ret == -1) {
+    (void)close(shm_fd);
+    (void)shm_unlink(memory_key.c_str());
     return INFER_STATUS_LOG_ERROR(FAILED)
            << "Failed to ftruncate " << memory_key << ", errno: " << errno << ", memory size: " << memory_size;
   }
   auto address = mmap(nullptr, memory_size, PROT_READ | PROT_WRITE, MAP_SHARED, shm_fd, 0);
   if (address == MAP_FAILED) {
+    (void)close(shm_fd);
+    (void)shm_unlink(memory_key.c_str());
     return INFER_STATUS_LOG_ERROR(FAILED)
            << "Failed to mmap " << memory_key << ", errno: " << errno << ", memory size: " << memory_size;
   }
@@ -81,12 +83,13 @@ Status SharedMemoryAllocator::AddShmMemoryBuffer(SharedMemoryGroup *shm_group) {
   shm.memory_key = memory_key;
   shm.address = reinterpret_cast<uint8_t *>(address);
   shm.bytes_size = memory_size;
-  uint64_t offset = 0;
+  shm.allocated.assign(item_count, false);
+  // the item with the smallest offset is at the end of the free list and is used first
+  uint64_t offset = memory_size;
   for (uint64_t i = 0; i < item_count; i++) {
-    (void)shm.free_queue.emplace(offset);
-    offset += align_item_size;
+    offset -= align_item_size;
+    shm_group->free_list.emplace_back(&shm, offset);
   }
-  shm_group->free_count += item_count;
 
   MSI_LOG_INFO << "New shared memory success, memory key: " << memory_key << ", bytes size: " << memory_size
                << ", item count: " << item_count;
@@ -95,72 +98,145 @@ Status SharedMemoryAllocator::AddShmMemoryBuffer(SharedMemoryGroup *shm_group) {
 
 Status SharedMemoryAllocator::NewMemoryBuffer(const std::string &memory_key_prefix, uint64_t item_size,
                                               uint64_t item_count) {
-  std::unique_lock<std::mutex> lock(lock_);
+  std::unique_lock<std::shared_mutex> lock(lock_);
   if (memory_map_.find(memory_key_prefix) != memory_map_.end()) {
     return INFER_STATUS_LOG_ERROR(FAILED) << "Shared memory has already been inited";
   }
-  auto &group = memory_map_[memory_key_prefix];
-  group.memory_key_prefix = memory_key_prefix;
-  group.item_size = item_size;
-  group.item_count = item_count;
-  group.free_count = 0;
-  auto status = AddShmMemoryBuffer(&group);
+  constexpr uint64_t align_size = 8;
+  auto group = std::make_unique<SharedMemoryGroup>();
+  group->memory_key_prefix = memory_key_prefix;
+  group->item_size = item_size;
+  if (item_size <= UINT64_MAX - align_size) {
+    group->align_item_size = (item_size + align_size - 1) / align_size * align_size;
+  }
+  group->item_count = item_count;
+  auto status = AddShmMemoryBuffer(group.get());
   if (status != SUCCESS) {
     MSI_LOG_ERROR << "Alloc shared memory failed, memory key prefix: " << memory_key_prefix;
     return status;
   }
+  memory_map_[memory_key_prefix] = std::move(group);
   return SUCCESS;
 }
 
-Status SharedMemoryAllocator::AllocMemoryItem(const std::string &memory_key_prefix, SharedMemoryItem *shm_item) {
-  std::unique_lock<std::mutex> lock(lock_);
+SharedMemoryGroup *SharedMemoryAllocator::GetGroup(const std::string &memory_key_prefix) {
+  std::shared_lock<std::shared_mutex> lock(lock_);
   auto it = memory_map_.find(memory_key_prefix);
   if (it == memory_map_.end()) {
+    return nullptr;
+  }
+  // the groups are only removed when the allocator is destroyed
+  return it->second.get();
+}
+
+Status SharedMemoryAllocator::AllocMemoryItem(const std::string &memory_key_prefix, SharedMemoryItem *shm_item) {
+  MSI_EXCEPTION_IF_NULL(shm_item);
+  auto group = GetGroup(memory_key_prefix);
+  if (group == nullptr) {
     return INFER_STATUS_LOG_ERROR(FAILED) << "Cannot find shared memory " << memory_key_prefix;
   }
-  auto &group = it->second;
-  if (group.free_count == 0) {
-    auto status = AddShmMemoryBuffer(&group);
+  std::unique_lock<std::mutex> lock(group->lock);
+  if (group->free_list.empty()) {
+    auto status = AddShmMemoryBuffer(group);
     if (status != SUCCESS) {
       MSI_LOG_ERROR << "Alloc shared memory failed, memory key prefix: " << memory_key_prefix;
-      return SUCCESS;
+      return status;
     }
   }
-  for (auto &item : group.shm_map) {
-    auto &shm = item.second;
-    if (!shm.free_queue.empty()) {
-      shm_item->memory_key_prefix = memory_key_prefix;
-      shm_item->memory_key = shm.memory_key;
-      shm_item->bytes_size = shm.bytes_size;
-      shm_item->offset = *shm.free_queue.begin();
-      shm_item->offset_address = shm.address + shm_item->offset;
-      shm_item->size = group.item_size;
-      (void)shm.free_queue.erase(shm_item->offset);
-      group.free_count -= 1;
-      return SUCCESS;
-    }
+  auto free_item = group->free_list.back();
+  group->free_list.pop_back();
+  auto &shm = *free_item.first;
+  shm.allocated[free_item.second / group->align_item_size] = true;
+  shm_item->memory_key_prefix = memory_key_prefix;
+  shm_item->memory_key = shm.memory_key;
+  shm_item->bytes_size = shm.bytes_size;
+  shm_item->offset = free_item.second;
+  shm_item->offset_address = shm.address + free_item.second;
+  shm_item->size = group->item_size;
+  return SUCCESS;
+}
+
+SharedMemoryAllocator::ReleaseResult SharedMemoryAllocator::ReleaseMemoryItemInner(const SharedMemoryItem &shm_item) {
+  auto group = GetGroup(shm_item.memory_key_prefix);
+  if (group == nullptr) {
+    return ReleaseResult::kNotFound;
   }
-  MSI_LOG_EXCEPTION << "There is no free shared memory";
+  std::unique_lock<std::mutex> lock(group->lock);
+  auto shm_it = group->shm_map.find(shm_item.memory_key);
+  if (shm_it == group->shm_map.end()) {
+    return ReleaseResult::kNotFound;
+  }
+  auto &shm = shm_it->second;
+  if (shm_item.offset % group->align_item_size != 0 || shm_item.offset >= shm.bytes_size) {
+    return ReleaseResult::kNotAllocated;
+  }
+  auto index = shm_item.offset / group->align_item_size;
+  if (!shm.allocated[index]) {
+    return ReleaseResult::kNotAllocated;
+  }
+  shm.allocated[index] = false;
+  group->free_list.emplace_back(&shm, shm_item.offset);
+  return ReleaseResult::kSuccess;
 }
 
 void SharedMemoryAllocator::ReleaseMemoryItem(const SharedMemoryItem &shm_item) {
-  std::unique_lock<std::mutex> lock(lock_);
-  auto it = memory_map_.find(shm_item.memory_key_prefix);
-  if (it == memory_map_.end()) {
-    MSI_LOG_WARNING << "Cannot find shared memory prefix " << shm_item.memory_key_prefix;
-    return;
-  }
-  auto shm_it = it->second.shm_map.find(shm_item.memory_key);
-  if (shm_it == it->second.shm_map.end()) {
+  auto result = ReleaseMemoryItemInner(shm_item);
+  if (result == ReleaseResult::kNotFound) {
     MSI_LOG_WARNING << "Cannot find shared memory " << shm_item.memory_key;
-    return;
-  }
-  if (shm_it->second.free_queue.count(shm_item.offset) > 0) {
+  } else if (result == ReleaseResult::kNotAllocated) {
     MSI_LOG_EXCEPTION << "Shared memory " << shm_item.memory_key
                       << " has already been in free set, offset: " << shm_item.offset;
   }
-  (void)shm_it->second.free_queue.emplace(shm_item.offset);
-  it->second.free_count += 1;
+}
+
+bool SharedMemoryAllocator::TryReleaseMemoryItem(const SharedMemoryItem &shm_item) {
+  return ReleaseMemoryItemInner(shm_item) == ReleaseResult::kSuccess;
+}
+
+namespace {
+constexpr uint64_t kShmPoolMinItemSize = kShmTransportMinDataSize;
+constexpr uint64_t kShmPoolMaxItemSize = 1ULL << 40;
+// the items of one size class are created in chunks of about 16MB
+constexpr uint64_t kShmPoolChunkSize = 16 * 1024 * 1024;
+}  // namespace
+
+SharedMemoryPool::SharedMemoryPool(const std::string &memory_key_prefix) : memory_key_prefix_(memory_key_prefix) {}
+
+// The shared memory is unlinked by SharedMemoryAllocator when the process exits
+SharedMemoryPool::~SharedMemoryPool() noexcept = default;
+
+Status SharedMemoryPool::Alloc(uint64_t data_size, SharedMemoryItem *shm_item) {
+  MSI_EXCEPTION_IF_NULL(shm_item);
+  uint64_t item_size = kShmPoolMinItemSize;
+  while (item_size < data_size) {
+    if (item_size > kShmPoolMaxItemSize / 2) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "The data size " << data_size << " is too large for shared memory";
+    }
+    item_size <<= 1;
+  }
+  auto group_prefix = memory_key_prefix_ + "_" + std::to_string(item_size);
+  auto &allocator = SharedMemoryAllocator::Instance();
+  bool group_created;
+  {
+    std::shared_lock<std::shared_mutex> lock(lock_);
+    group_created = item_sizes_.count(item_size) > 0;
+  }
+  if (!group_created) {
+    std::unique_lock<std::shared_mutex> lock(lock_);
+    if (item_sizes_.count(item_size) == 0) {
+      auto item_count = std::max<uint64_t>(kShmPoolChunkSize / item_size, 1);
+      auto status = allocator.NewMemoryBuffer(group_prefix, item_size, item_count);
+      if (status != SUCCESS) {
+        return status;
+      }
+      (void)item_sizes_.emplace(item_size);
+    }
+  }
+  return allocator.AllocMemoryItem(group_prefix, shm_item);
+}
+
+void SharedMemoryPool::Release(const SharedMemoryItem &shm_item) {
+  SharedMemoryAllocator::Instance().ReleaseMemoryItem(shm_item);
 }
 
 ShmTensor::ShmTensor(DataType type, const std::vector<int64_t> &shape, const SharedMemoryItem &shm_item)
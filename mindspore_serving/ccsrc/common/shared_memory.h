@@ -24,6 +24,9 @@
 #include <queue>
 #include <set>
 #include <mutex>
+#include <shared_mutex>
+#include <unordered_map>
+#include <utility>
 #include "common/serving_common.h"
 #include "common/buffer_tensor.h"
 
@@ -42,17 +45,23 @@ struct SharedMemory {
   std::string memory_key;
   uint64_t bytes_size = 0;
   uint8_t *address = nullptr;
-  std::set<uint64_t> free_queue;
+  std::vector<bool> allocated;  // indexed by offset / align item size
 };
 
 struct SharedMemoryGroup {
-  std::map<std::string, SharedMemory> shm_map;
+  // the elements of unordered_map are not moved when it grows, free_list can point to them
+  std::unordered_map<std::string, SharedMemory> shm_map;
+  // free items: <shared memory, offset>, the last released item is reused first
+  std::vector<std::pair<SharedMemory *, uint64_t>> free_list;
   std::string memory_key_prefix;
   uint64_t item_size = 0;
+  uint64_t align_item_size = 0;
   uint64_t item_count = 0;
-  uint64_t free_count = 0;
+  std::mutex lock;
 };
 
+// Allocation and release of different groups do not block each other, the global lock is only held exclusively when
+// a new group is added. Alloc and release of one group is O(1) except when the shared memory of the group grows.
 class SharedMemoryAllocator {
  public:
   static SharedMemoryAllocator &Instance();
@@ -61,11 +70,35 @@ class SharedMemoryAllocator {
   Status NewMemoryBuffer(const std::string &memory_key_prefix, uint64_t item_size, uint64_t init_item_count);
   Status AllocMemoryItem(const std::string &memory_key_prefix, SharedMemoryItem *shm_item);
   void ReleaseMemoryItem(const SharedMemoryItem &shm_item);
+  // return false when the item is not allocated rather than raising exception
+  bool TryReleaseMemoryItem(const SharedMemoryItem &shm_item);
 
  private:
-  std::map<std::string, SharedMemoryGroup> memory_map_;
-  std::mutex lock_;
-  Status AddShmMemoryBuffer(SharedMemoryGroup *shm_group);
+  std::map<std::string, std::unique_ptr<SharedMemoryGroup>> memory_map_;
+  std::shared_mutex lock_;
+  static Status AddShmMemoryBuffer(SharedMemoryGroup *shm_group);
+  SharedMemoryGroup *GetGroup(const std::string &memory_key_prefix);
+  enum class ReleaseResult { kSuccess, kNotFound, kNotAllocated };
+  ReleaseResult ReleaseMemoryItemInner(const SharedMemoryItem &shm_item);
+};
+
+// The tensors whose data size is less than this are transported inline, shared memory does not pay off for them
+constexpr uint64_t kShmTransportMinDataSize = 4096;
+
+// Shared memory items of power-of-two size classes, used to transport tensors of any size between the processes on
+// the same host. The shared memory of one size class is created when it is first used, and the items are reused after
+// they are released.
+class SharedMemoryPool {
+ public:
+  explicit SharedMemoryPool(const std::string &memory_key_prefix);
+  ~SharedMemoryPool() noexcept;
+  Status Alloc(uint64_t data_size, SharedMemoryItem *shm_item);
+  void Release(const SharedMemoryItem &shm_item);
+
+ private:
+  std::string memory_key_prefix_;
+  std::set<uint64_t> item_sizes_;
+  std::shared_mutex lock_;
 };
 
 class ShmTensor : public BufferTensor {
@@ -31,6 +31,7 @@ enum StatusCode {
   SYSTEM_ERROR,
   WORKER_UNAVAILABLE,
   SERVABLE_UNAVAILABLE,
+  DEADLINE_EXCEEDED,
 };
 
 class Status {
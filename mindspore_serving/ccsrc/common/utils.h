@@ -18,6 +18,7 @@
 #define MINDSPORE_SERVING_COMMON_UTILS_H
 
 #include <string>
+#include <chrono>
 #include "common/status.h"
 
 namespace mindspore::serving::common {
@@ -34,6 +35,32 @@ Status CheckAddress(const std::string &address, const std::string &server_tag, s
 
 bool DirOrFileExist(const std::string &file_path);
 
+// microseconds since epoch, the deadline of request is in the clock of the process handling it
+static inline uint64_t GetCurrentTimeUs() {
+  auto now = std::chrono::system_clock::now().time_since_epoch();
+  return static_cast<uint64_t>(std::chrono::duration_cast<std::chrono::microseconds>(now).count());
+}
+
+// deadline_us 0 means no deadline
+static inline bool IsDeadlineExpired(uint64_t deadline_us) {
+  return deadline_us != 0 && GetCurrentTimeUs() >= deadline_us;
+}
+
+// The remaining time of the deadline sent to another process, which may be on another host with a skewed clock.
+// 0 means no deadline, and the expired deadline is 1us so that it is not taken as no deadline.
+static inline uint64_t GetRemainingTimeUs(uint64_t deadline_us) {
+  if (deadline_us == 0) {
+    return 0;
+  }
+  auto now_us = GetCurrentTimeUs();
+  return deadline_us > now_us ? deadline_us - now_us : 1;
+}
+
+// The deadline in the clock of this process converted from the timeout received from another process
+static inline uint64_t GetDeadlineFromTimeout(uint64_t timeout_us) {
+  return timeout_us == 0 ? 0 : GetCurrentTimeUs() + timeout_us;
+}
+
 }  // namespace mindspore::serving::common
 
 #endif  // MINDSPORE_SERVING_COMMON_UTILS_H
@@ -18,6 +18,7 @@
 
 #include <utility>
 #include "common/proto_tensor.h"
+#include "common/utils.h"
 #include "master/master_context.h"
 #include "master/notify_worker/grpc_notify.h"
 
@@ -58,7 +59,7 @@ Status Dispatcher::JudgeInferNum() {
 }
 
 void Dispatcher::DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                               const PredictOnFinish &on_finish) {
+                               const PredictOnFinish &on_finish, const PredictOnPartialReply &on_partial_reply) {
   MSI_EXCEPTION_IF_NULL(reply);
   (*reply->mutable_servable_spec()) = request.servable_spec();
   Status status = JudgeInferNum();
@@ -73,7 +74,7 @@ void Dispatcher::DispatchAsync(const proto::PredictRequest &request, proto::Pred
       this->enqueued_requests_--;
     };
     enqueued_requests_++;
-    status = DispatchAsyncInner(request, reply, callback);
+    status = DispatchAsyncInner(request, reply, callback, on_partial_reply);
   } catch (const std::bad_alloc &ex) {
     MSI_LOG(ERROR) << "Serving Error: malloc memory failed";
   } catch (const std::runtime_error &ex) {
@@ -91,11 +92,15 @@ void Dispatcher::DispatchAsync(const proto::PredictRequest &request, proto::Pred
 }
 
 Status Dispatcher::DispatchAsyncInner(const proto::PredictRequest &request, proto::PredictReply *reply,
-                                      const PredictOnFinish &on_finish) {
+                                      const PredictOnFinish &on_finish,
+                                      const PredictOnPartialReply &on_partial_reply) {
   MSI_EXCEPTION_IF_NULL(reply);
   std::shared_lock<std::shared_mutex> lock(servable_shared_lock_);
   RequestSpec request_spec;
   GrpcTensorHelper::GetRequestSpec(request, &request_spec);
+  if (common::IsDeadlineExpired(request_spec.deadline_us)) {
+    return INFER_STATUS_LOG_WARNING(DEADLINE_EXCEEDED) << "Request " << request_spec.Repr() << ", deadline exceeded";
+  }
   auto endpoint = GetWorkerEndpoint(request_spec);
   if (endpoint == nullptr) {
     return INFER_STATUS_LOG_ERROR(INVALID_INPUTS) << "Request " << request_spec.Repr() << ", servable is not available";
@@ -107,7 +112,7 @@ Status Dispatcher::DispatchAsyncInner(const proto::PredictRequest &request, prot
   if (!find_method) {
     return INFER_STATUS_LOG_ERROR(INVALID_INPUTS) << "Request " << request_spec.Repr() << ", method is not available";
   }
-  return endpoint->DispatchAsync(request, reply, on_finish);
+  return endpoint->DispatchAsync(request, reply, on_finish, on_partial_reply);
 }
 
 Status Dispatcher::UnregisterServableCommon(const std::string &worker_address) {
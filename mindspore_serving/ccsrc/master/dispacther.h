@@ -36,8 +36,10 @@ class Dispatcher {
  public:
   Dispatcher();
   ~Dispatcher();
+  // on_partial_reply is called with the replies of the finished instances, and the instances are not in the reply of
+  // on_finish then
   void DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                     const PredictOnFinish &on_finish);
+                     const PredictOnFinish &on_finish, const PredictOnPartialReply &on_partial_reply = nullptr);
 
   Status RegisterServable(const proto::RegisterRequest &request, proto::RegisterReply *reply);
   Status NotifyWorkerExit(const proto::ExitRequest &request, proto::ExitReply *reply);
@@ -65,7 +67,7 @@ class Dispatcher {
   Status RegisterServableCommon(const WorkerRegSpec &worker_spec, CreateNotifyWorkerFunc func);
   Status UnregisterServableCommon(const std::string &worker_address);
   Status DispatchAsyncInner(const proto::PredictRequest &request, proto::PredictReply *reply,
-                            const PredictOnFinish &on_finish);
+                            const PredictOnFinish &on_finish, const PredictOnPartialReply &on_partial_reply);
   Status RegisterWorkerContext(std::shared_ptr<WorkerContext> worker_context);
 
   void UnregisterWorkerContext(WorkerContext *worker_context);
@@ -41,6 +41,12 @@ void MSServiceImpl::PredictAsync(const proto::PredictRequest *request, proto::Pr
   dispatcher_->DispatchAsync(*request, reply, on_finish);
 }
 
+void MSServiceImpl::PredictPartialAsync(const proto::PredictRequest *request, proto::PredictReply *reply,
+                                        const PredictOnFinish &on_finish,
+                                        const PredictOnPartialReply &on_partial_reply) {
+  dispatcher_->DispatchAsync(*request, reply, on_finish, on_partial_reply);
+}
+
 grpc::Status MSMasterImpl::Register(const proto::RegisterRequest *request, proto::RegisterReply *reply) {
   MSI_EXCEPTION_IF_NULL(request);
   MSI_EXCEPTION_IF_NULL(reply);
@@ -41,6 +41,9 @@ class MSServiceImpl {
   ~MSServiceImpl() = default;
 
   void PredictAsync(const proto::PredictRequest *request, proto::PredictReply *reply, PredictOnFinish on_finish);
+  // the finished instances are replied by on_partial_reply, and reply only has the error of the whole request
+  void PredictPartialAsync(const proto::PredictRequest *request, proto::PredictReply *reply,
+                           const PredictOnFinish &on_finish, const PredictOnPartialReply &on_partial_reply);
 
  private:
   std::shared_ptr<Dispatcher> dispatcher_;
@@ -20,6 +20,9 @@
 #include <string>
 #include <vector>
 #include <memory>
+#include <chrono>
+#include <deque>
+#include <mutex>
 #include "common/serving_common.h"
 #include "proto/ms_worker.pb.h"
 #include "proto/ms_worker.grpc.pb.h"
@@ -38,6 +41,25 @@ class ServiceGrpcContext : public GrpcAsyncServiceContext<MSServiceImpl, proto::
 
   virtual void StartEnqueueRequest() = 0;
   virtual void HandleRequest() = 0;
+
+ protected:
+  // The deadline in the clock of master, the earlier of the timeout in request and the gRPC deadline of the call.
+  // Both are relative to the time the call is received, so the clock of client does not matter.
+  void SetDeadlineFromContext(proto::PredictRequest *request) {
+    uint64_t request_deadline_us = 0;
+    if (request->timeout_us() > 0) {
+      request_deadline_us = common::GetCurrentTimeUs() + request->timeout_us();
+    }
+    auto deadline = this->ctx_.deadline();
+    if (deadline != std::chrono::system_clock::time_point::max()) {
+      auto deadline_us = std::chrono::duration_cast<std::chrono::microseconds>(deadline.time_since_epoch()).count();
+      auto grpc_deadline_us = static_cast<uint64_t>(deadline_us);
+      if (deadline_us > 0 && (request_deadline_us == 0 || grpc_deadline_us < request_deadline_us)) {
+        request_deadline_us = grpc_deadline_us;
+      }
+    }
+    request->set_deadline_us(request_deadline_us);
+  }
 };
 
 class ServicePredictContext : public ServiceGrpcContext<ServicePredictContext> {
@@ -52,6 +74,7 @@ class ServicePredictContext : public ServiceGrpcContext<ServicePredictContext> {
 
   void HandleRequest() override {
     MSI_TIME_STAMP_START(RequestHandle)
+    SetDeadlineFromContext(&request_);
     auto instance_size = request_.instances_size();
     PredictOnFinish on_finish = [this, time_start_RequestHandle, instance_size]() {
       responder_.Finish(response_, grpc::Status::OK, this);
@@ -66,13 +89,230 @@ class ServicePredictContext : public ServiceGrpcContext<ServicePredictContext> {
   proto::PredictReply response_;
 };
 
+// The requests read from the stream are dispatched at once, and the reply of every request is written to the stream
+// when all of its instances finish. At most kMaxStreamInflightRequests requests of one stream are running or waiting
+// for their replies to be written, the next request is not read until one of them is replied, so that gRPC flow
+// control slows down the client rather than the master buffering the requests and replies. The stream is finished
+// when the client has closed its side of the stream and all the replies have been written.
+class ServicePredictStreamContext : public ServiceGrpcContext<ServicePredictStreamContext> {
+ public:
+  ServicePredictStreamContext(MSServiceImpl *service_impl, proto::MSService::AsyncService *async_service,
+                              grpc::ServerCompletionQueue *cq)
+      : ServiceGrpcContext<ServicePredictStreamContext>(service_impl, async_service, cq),
+        stream_(&ctx_),
+        read_tag_(this, &ServicePredictStreamContext::OnReadDone),
+        write_tag_(this, &ServicePredictStreamContext::OnWriteDone),
+        finish_tag_(this, &ServicePredictStreamContext::OnFinishDone) {}
+
+  ~ServicePredictStreamContext() = default;
+
+  void StartEnqueueRequest() override { async_service_->RequestPredictStream(&ctx_, &stream_, cq_, cq_, this); }
+
+  void HandleRequest() override {
+    std::unique_lock<std::mutex> lock(lock_);
+    StartRead();
+  }
+
+ private:
+  struct StreamCall {
+    proto::PredictRequest request;
+    proto::PredictReply reply;
+  };
+  grpc::ServerAsyncReaderWriter<proto::PredictReply, proto::PredictRequest> stream_;
+  GrpcAsyncStreamEventTag<ServicePredictStreamContext> read_tag_;
+  GrpcAsyncStreamEventTag<ServicePredictStreamContext> write_tag_;
+  GrpcAsyncStreamEventTag<ServicePredictStreamContext> finish_tag_;
+
+  static constexpr uint64_t kMaxStreamInflightRequests = 64;
+
+  std::mutex lock_;
+  std::shared_ptr<StreamCall> reading_call_;
+  std::deque<std::shared_ptr<StreamCall>> write_queue_;  // the reply of the front call is being written
+  uint64_t running_count_ = 0;
+  bool reading_ = false;
+  bool read_done_ = false;
+  bool write_failed_ = false;
+  bool finishing_ = false;
+
+  // invoked with lock_ held
+  void StartRead() {
+    reading_ = true;
+    reading_call_ = std::make_shared<StreamCall>();
+    stream_.Read(&reading_call_->request, &read_tag_);
+  }
+
+  // invoked with lock_ held, read the next request unless the inflight requests of the stream reach the limit
+  void TryStartRead() {
+    if (reading_ || read_done_ || running_count_ + write_queue_.size() >= kMaxStreamInflightRequests) {
+      return;
+    }
+    if (write_failed_) {  // the stream is broken, stop reading
+      read_done_ = true;
+      return;
+    }
+    StartRead();
+  }
+
+  void OnReadDone(bool rpc_ok) {
+    std::unique_lock<std::mutex> lock(lock_);
+    reading_ = false;
+    if (!rpc_ok) {  // the client has closed its side of the stream, or the call has been cancelled
+      read_done_ = true;
+      TryFinish(&lock);
+      return;
+    }
+    auto call = reading_call_;
+    running_count_++;
+    TryStartRead();
+    lock.unlock();
+    SetDeadlineFromContext(&call->request);
+    PredictOnFinish on_finish = [this, call]() { OnPredictFinish(call); };
+    service_impl_->PredictAsync(&call->request, &call->reply, on_finish);
+  }
+
+  void OnPredictFinish(const std::shared_ptr<StreamCall> &call) {
+    call->reply.set_request_id(call->request.request_id());
+    std::unique_lock<std::mutex> lock(lock_);
+    running_count_--;
+    if (write_failed_) {  // the stream is broken, drop the reply
+      TryStartRead();
+      TryFinish(&lock);
+      return;
+    }
+    write_queue_.push_back(call);
+    if (write_queue_.size() == 1) {
+      stream_.Write(call->reply, &write_tag_);
+    }
+  }
+
+  void OnWriteDone(bool rpc_ok) {
+    std::unique_lock<std::mutex> lock(lock_);
+    write_queue_.pop_front();
+    if (!rpc_ok) {
+      write_failed_ = true;
+      write_queue_.clear();
+    }
+    // one request has been replied, resume reading if it has been paused by the limit of inflight requests
+    TryStartRead();
+    if (!write_queue_.empty()) {
+      stream_.Write(write_queue_.front()->reply, &write_tag_);
+      return;
+    }
+    TryFinish(&lock);
+  }
+
+  // finish the stream when no read, write or request is in progress, the context is deleted when the finish is done
+  void TryFinish(std::unique_lock<std::mutex> *lock) {
+    if (finishing_ || !read_done_ || running_count_ > 0 || !write_queue_.empty()) {
+      return;
+    }
+    finishing_ = true;
+    lock->unlock();
+    stream_.Finish(grpc::Status::OK, &finish_tag_);
+  }
+
+  void OnFinishDone(bool) { delete this; }
+};
+
+// The instances of the request are replied by batches when they finish, and the error of the whole request is
+// replied at last. The stream is finished when all the instances have been replied and all the replies have been
+// written.
+class ServicePredictPartialContext : public ServiceGrpcContext<ServicePredictPartialContext> {
+ public:
+  ServicePredictPartialContext(MSServiceImpl *service_impl, proto::MSService::AsyncService *async_service,
+                               grpc::ServerCompletionQueue *cq)
+      : ServiceGrpcContext<ServicePredictPartialContext>(service_impl, async_service, cq),
+        writer_(&ctx_),
+        response_(std::make_shared<proto::PredictReply>()),
+        write_tag_(this, &ServicePredictPartialContext::OnWriteDone),
+        finish_tag_(this, &ServicePredictPartialContext::OnFinishDone) {}
+
+  ~ServicePredictPartialContext() = default;
+
+  void StartEnqueueRequest() override {
+    async_service_->RequestPredictPartial(&ctx_, &request_, &writer_, cq_, cq_, this);
+  }
+
+  void HandleRequest() override {
+    SetDeadlineFromContext(&request_);
+    PredictOnPartialReply on_partial_reply = [this](const std::shared_ptr<proto::PredictReply> &reply) {
+      std::unique_lock<std::mutex> lock(lock_);
+      WriteReply(reply);
+    };
+    PredictOnFinish on_finish = [this]() {
+      std::unique_lock<std::mutex> lock(lock_);
+      predict_done_ = true;
+      if (response_->error_msg_size() > 0) {  // error of the whole request
+        WriteReply(response_);
+      }
+      TryFinish(&lock);
+    };
+    service_impl_->PredictPartialAsync(&request_, response_.get(), on_finish, on_partial_reply);
+  }
+
+ private:
+  grpc::ServerAsyncWriter<proto::PredictReply> writer_;
+  proto::PredictRequest request_;
+  std::shared_ptr<proto::PredictReply> response_;
+  GrpcAsyncStreamEventTag<ServicePredictPartialContext> write_tag_;
+  GrpcAsyncStreamEventTag<ServicePredictPartialContext> finish_tag_;
+
+  std::mutex lock_;
+  std::deque<std::shared_ptr<proto::PredictReply>> write_queue_;  // the front reply is being written
+  bool predict_done_ = false;
+  bool write_failed_ = false;
+  bool finishing_ = false;
+
+  // lock_ should be held
+  void WriteReply(const std::shared_ptr<proto::PredictReply> &reply) {
+    if (write_failed_) {  // the stream is broken, drop the reply
+      return;
+    }
+    write_queue_.push_back(reply);
+    if (write_queue_.size() == 1) {
+      writer_.Write(*reply, &write_tag_);
+    }
+  }
+
+  void OnWriteDone(bool rpc_ok) {
+    std::unique_lock<std::mutex> lock(lock_);
+    write_queue_.pop_front();
+    if (!rpc_ok) {
+      write_failed_ = true;
+      write_queue_.clear();
+    }
+    if (!write_queue_.empty()) {
+      writer_.Write(*write_queue_.front(), &write_tag_);
+      return;
+    }
+    TryFinish(&lock);
+  }
+
+  // finish the stream when the request is done and no write is in progress, the context is deleted when the finish
+  // is done
+  void TryFinish(std::unique_lock<std::mutex> *lock) {
+    if (finishing_ || !predict_done_ || !write_queue_.empty()) {
+      return;
+    }
+    finishing_ = true;
+    lock->unlock();
+    writer_.Finish(grpc::Status::OK, &finish_tag_);
+  }
+
+  void OnFinishDone(bool) { delete this; }
+};
+
 class ServiceGrpcServer : public GrpcAsyncServer<proto::MSService::AsyncService> {
  public:
   explicit ServiceGrpcServer(std::shared_ptr<Dispatcher> dispatcher)
       : GrpcAsyncServer<proto::MSService::AsyncService>(), service_impl_(MSServiceImpl(dispatcher)) {}
   ~ServiceGrpcServer() {}
 
-  void EnqueueRequests() override { ServicePredictContext::EnqueueRequest(&service_impl_, &svc_, cq_.get()); }
+  void EnqueueRequests() override {
+    ServicePredictContext::EnqueueRequest(&service_impl_, &svc_, cq_.get());
+    ServicePredictStreamContext::EnqueueRequest(&service_impl_, &svc_, cq_.get());
+    ServicePredictPartialContext::EnqueueRequest(&service_impl_, &svc_, cq_.get());
+  }
 
  protected:
   MSServiceImpl service_impl_;
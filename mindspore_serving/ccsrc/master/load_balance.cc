@@ -0,0 +1,128 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "master/load_balance.h"
+#include <algorithm>
+#include <vector>
+#include <utility>
+
+namespace mindspore::serving {
+namespace {
+constexpr double kEwmaAlpha = 0.2;
+// min latency drifts up slowly so that the window can follow a worker which becomes slower permanently
+constexpr double kMinLatencyDrift = 0.001;
+constexpr double kMinGradient = 0.5;
+constexpr double kMaxWindowScale = 4;
+}  // namespace
+
+WorkerLoadInfo::WorkerLoadInfo(uint64_t init_window) {
+  window_ = static_cast<double>(std::max<uint64_t>(init_window, 1));
+  max_window_ = window_ * kMaxWindowScale;
+}
+
+void WorkerLoadInfo::OnSend(uint64_t instance_count) {
+  outstanding_requests_++;
+  outstanding_instances_ += instance_count;
+}
+
+void WorkerLoadInfo::OnFinish(uint64_t instance_count, uint64_t latency_us) {
+  outstanding_requests_ = outstanding_requests_ > 0 ? outstanding_requests_ - 1 : 0;
+  outstanding_instances_ = outstanding_instances_ > instance_count ? outstanding_instances_ - instance_count : 0;
+  auto latency = static_cast<double>(std::max<uint64_t>(latency_us, 1));
+  if (ewma_latency_us_ == 0) {
+    ewma_latency_us_ = latency;
+    min_latency_us_ = latency;
+    return;
+  }
+  ewma_latency_us_ = ewma_latency_us_ * (1 - kEwmaAlpha) + latency * kEwmaAlpha;
+  min_latency_us_ = std::min(latency, min_latency_us_ * (1 + kMinLatencyDrift));
+  // The latency grows above the min latency when requests queue up in the worker: shrink the window by the
+  // gradient, otherwise probe one more request in flight.
+  auto gradient = std::clamp(min_latency_us_ / ewma_latency_us_, kMinGradient, 1.0);
+  window_ = std::clamp(window_ * gradient + 1, min_window_, max_window_);
+}
+
+template <class CostFunc>
+uint64_t LoadBalancePolicy::SelectLeastCost(const std::map<uint64_t, WorkerLoadInfo> &workers, CostFunc cost_func) {
+  uint64_t cur_pid = 0;
+  double min_cost = 0;
+  for (auto &item : workers) {
+    if (!item.second.HasFreeSlot()) {
+      continue;
+    }
+    auto cost = cost_func(item.second);
+    if (cur_pid == 0 || cost < min_cost ||
+        (cost == min_cost && cur_pid <= last_worker_pid_ && item.first > last_worker_pid_)) {
+      min_cost = cost;
+      cur_pid = item.first;
+    }
+  }
+  if (cur_pid != 0) {
+    last_worker_pid_ = cur_pid;
+  }
+  return cur_pid;
+}
+
+uint64_t LeastOutstandingPolicy::SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) {
+  return SelectLeastCost(workers,
+                         [](const WorkerLoadInfo &info) { return static_cast<double>(info.OutstandingInstances()); });
+}
+
+uint64_t EwmaLatencyPolicy::SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) {
+  // the worker without latency sample has cost 0, so that it will be measured first
+  return SelectLeastCost(workers, [](const WorkerLoadInfo &info) {
+    return info.EwmaLatencyUs() * static_cast<double>(info.OutstandingRequests() + 1);
+  });
+}
+
+uint64_t PowerOfTwoPolicy::SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) {
+  std::vector<std::pair<uint64_t, const WorkerLoadInfo *>> candidates;
+  for (auto &item : workers) {
+    if (item.second.HasFreeSlot()) {
+      candidates.emplace_back(item.first, &item.second);
+    }
+  }
+  if (candidates.empty()) {
+    return 0;
+  }
+  if (candidates.size() == 1) {
+    return candidates[0].first;
+  }
+  std::uniform_int_distribution<size_t> distribution(0, candidates.size() - 1);
+  auto first = distribution(random_engine_);
+  auto second = distribution(random_engine_);
+  if (first == second) {
+    second = (first + 1) % candidates.size();
+  }
+  auto &left = candidates[first];
+  auto &right = candidates[second];
+  return left.second->OutstandingInstances() <= right.second->OutstandingInstances() ? left.first : right.first;
+}
+
+std::shared_ptr<LoadBalancePolicy> CreateLoadBalancePolicy(const std::string &policy_name) {
+  if (policy_name == kLoadBalanceEwmaLatency) {
+    return std::make_shared<EwmaLatencyPolicy>();
+  }
+  if (policy_name == kLoadBalancePowerOfTwo) {
+    return std::make_shared<PowerOfTwoPolicy>();
+  }
+  if (policy_name != kLoadBalanceLeastOutstanding) {
+    MSI_LOG_WARNING << "Unsupported load balance policy '" << policy_name << "', use '" << kLoadBalanceLeastOutstanding
+                    << "' instead";
+  }
+  return std::make_shared<LeastOutstandingPolicy>();
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,94 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_MASTER_LOAD_BALANCE_H
+#define MINDSPORE_SERVING_MASTER_LOAD_BALANCE_H
+
+#include <map>
+#include <memory>
+#include <random>
+#include <string>
+#include "common/serving_common.h"
+
+namespace mindspore::serving {
+constexpr auto kLoadBalanceLeastOutstanding = "least_outstanding";
+constexpr auto kLoadBalanceEwmaLatency = "ewma_latency";
+constexpr auto kLoadBalancePowerOfTwo = "power_of_two";
+
+// Load of one worker seen by the master, updated when requests are sent to and replied by the worker
+class WorkerLoadInfo {
+ public:
+  explicit WorkerLoadInfo(uint64_t init_window);
+
+  // whether one more request can be sent to the worker in the current in-flight window
+  bool HasFreeSlot() const { return outstanding_requests_ < static_cast<uint64_t>(window_); }
+  void OnSend(uint64_t instance_count);
+  void OnFinish(uint64_t instance_count, uint64_t latency_us);
+
+  uint64_t OutstandingRequests() const { return outstanding_requests_; }
+  uint64_t OutstandingInstances() const { return outstanding_instances_; }
+  double EwmaLatencyUs() const { return ewma_latency_us_; }
+  double Window() const { return window_; }
+
+ private:
+  uint64_t outstanding_requests_ = 0;
+  uint64_t outstanding_instances_ = 0;
+  double ewma_latency_us_ = 0;
+  double min_latency_us_ = 0;
+  // max in-flight requests, adapted by the gradient of min latency and ewma latency
+  double window_ = 1;
+  double min_window_ = 1;
+  double max_window_ = 1;
+};
+
+class LoadBalancePolicy {
+ public:
+  virtual ~LoadBalancePolicy() = default;
+  // return 0 when no worker has free slot
+  virtual uint64_t SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) = 0;
+
+ protected:
+  uint64_t last_worker_pid_ = 0;
+  // the first worker with the least cost, and the workers after the last selected worker are preferred in ties
+  template <class CostFunc>
+  uint64_t SelectLeastCost(const std::map<uint64_t, WorkerLoadInfo> &workers, CostFunc cost_func);
+};
+
+// the worker with the least instances in flight
+class LeastOutstandingPolicy : public LoadBalancePolicy {
+ public:
+  uint64_t SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) override;
+};
+
+// the worker with the least expected completion time: ewma latency * (requests in flight + 1)
+class EwmaLatencyPolicy : public LoadBalancePolicy {
+ public:
+  uint64_t SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) override;
+};
+
+// the less loaded one of two random workers with free slots
+class PowerOfTwoPolicy : public LoadBalancePolicy {
+ public:
+  uint64_t SelectWorker(const std::map<uint64_t, WorkerLoadInfo> &workers) override;
+
+ private:
+  std::mt19937 random_engine_{std::random_device{}()};
+};
+
+std::shared_ptr<LoadBalancePolicy> CreateLoadBalancePolicy(const std::string &policy_name);
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_MASTER_LOAD_BALANCE_H
@@ -30,4 +30,10 @@ void MasterContext::SetMaxEnqueuedRequests(uint32_t max_enqueued_requests) {
 }
 
 uint32_t MasterContext::GetMaxEnqueuedRequests() const { return max_enqueued_requests_; }
+
+void MasterContext::SetLoadBalancePolicy(const std::string &load_balance_policy) {
+  load_balance_policy_ = load_balance_policy;
+}
+
+std::string MasterContext::GetLoadBalancePolicy() const { return load_balance_policy_; }
 }  // namespace mindspore::serving
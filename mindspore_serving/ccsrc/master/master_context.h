@@ -29,9 +29,13 @@ class MS_API MasterContext {
 
   void SetMaxEnqueuedRequests(uint32_t max_enqueued_requests);
   uint32_t GetMaxEnqueuedRequests() const;
+  void SetLoadBalancePolicy(const std::string &load_balance_policy);
+  std::string GetLoadBalancePolicy() const;
 
  private:
   uint32_t max_enqueued_requests_ = 10000;  // default 10000
+  // policy to balance the requests between the workers of one servable
+  std::string load_balance_policy_ = "least_outstanding";
 };
 
 }  // namespace mindspore::serving
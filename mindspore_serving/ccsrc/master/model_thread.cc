@@ -15,7 +15,10 @@
  */
 
 #include "master/model_thread.h"
+#include <algorithm>
 #include "common/proto_tensor.h"
+#include "common/utils.h"
+#include "master/master_context.h"
 
 namespace mindspore::serving {
 ModelThread::ModelThread(const std::string &servable_name, const std::string &method_name, uint64_t version_number,
@@ -25,6 +28,7 @@ ModelThread::ModelThread(const std::string &servable_name, const std::string &me
   spec_.version_number = version_number;
   method_info_ = method_info;
   batch_size_ = batch_size;
+  load_balance_policy_ = CreateLoadBalancePolicy(MasterContext::Instance()->GetLoadBalancePolicy());
 }
 
 void ModelThread::Clear() {
@@ -33,54 +37,86 @@ void ModelThread::Clear() {
 }
 
 void ModelThread::InnerClear() {
-  for (auto &job_item : job_) {
-    auto reply = job_item.second.reply;
-    bool has_reply = false;
-    bool has_error = false;
-    proto::ErrorMsg detect_error;
+  for (auto job_it = job_.begin(); job_it != job_.end();) {
+    auto &job_item = *job_it;
+    if (job_item.second.reply_built) {  // waiting for the sending of tasks, reply has been built
+      ++job_it;
+      continue;
+    }
     proto::ErrorMsg exit_error;
     RequestSpec request_spec;
     GrpcTensorHelper::GetRequestSpec(*job_item.second.request, &request_spec);
     auto status = INFER_STATUS(INVALID_INPUTS) << "Request " << request_spec.Repr() << ", servable is not available";
     exit_error.set_error_code(status.StatusCode());
     exit_error.set_error_msg(status.StatusMessage());
-    for (auto &task_item : job_item.second.task) {
-      auto instance = reply->add_instances();
-      auto error = reply->add_error_msg();
-      if (task_item.error.error_code() != 0) {
-        *error = task_item.error;
-        if (!has_error) {
-          has_error = true;
-          detect_error = task_item.error;
+    if (job_item.second.partial_callback) {
+      // reply the tasks that have not been replied, the reply of callback is empty
+      std::vector<uint64_t> task_ids;
+      for (size_t i = 0; i < job_item.second.task.size(); i++) {
+        auto &task_item = job_item.second.task[i];
+        if (task_item.replied) {
+          continue;
         }
-      } else if (task_item.output != nullptr) {
-        *instance = *task_item.output;
-        has_reply = true;
-      } else {
-        *error = exit_error;
+        if (task_item.error.error_code() == 0 && task_item.output == nullptr) {
+          task_item.error = exit_error;
+        }
+        task_ids.push_back(i);
+      }
+      if (!task_ids.empty()) {
+        ReplyPartial(&job_item.second, task_ids);
+      }
+    } else {
+      auto reply = job_item.second.reply;
+      bool has_reply = false;
+      bool has_error = false;
+      proto::ErrorMsg detect_error;
+      for (auto &task_item : job_item.second.task) {
+        auto instance = reply->add_instances();
+        auto error = reply->add_error_msg();
+        if (task_item.error.error_code() != 0) {
+          *error = task_item.error;
+          if (!has_error) {
+            has_error = true;
+            detect_error = task_item.error;
+          }
+        } else if (task_item.output != nullptr) {
+          instance->mutable_items()->swap(*task_item.output->mutable_items());
+          has_reply = true;
+        } else {
+          *error = exit_error;
+        }
+      }
+      if (!has_error && !has_reply) {
+        job_item.second.reply->clear_instances();
+        job_item.second.reply->clear_error_msg();
+        auto error_msg = job_item.second.reply->add_error_msg();
+        *error_msg = exit_error;
+      } else if (!has_reply) {
+        job_item.second.reply->clear_instances();
+        job_item.second.reply->clear_error_msg();
+        auto error_msg = job_item.second.reply->add_error_msg();
+        *error_msg = detect_error;
       }
     }
-    if (!has_error && !has_reply) {
-      job_item.second.reply->clear_instances();
-      job_item.second.reply->clear_error_msg();
-      auto error_msg = job_item.second.reply->add_error_msg();
-      *error_msg = exit_error;
-    } else if (!has_reply) {
-      job_item.second.reply->clear_instances();
-      job_item.second.reply->clear_error_msg();
-      auto error_msg = job_item.second.reply->add_error_msg();
-      *error_msg = detect_error;
+    job_item.second.reply_built = true;
+    if (job_item.second.sending_count > 0) {
+      // the client request must be alive until its instances are serialized, reply in OnTasksSent
+      job_item.second.reply_pending = true;
+      ++job_it;
+      continue;
     }
     job_item.second.callback();
+    job_it = job_.erase(job_it);
   }
-  job_.clear();
   pid_process_.clear();
-  task_wait_queue_ = std::queue<std::pair<uint64_t, uint64_t>>();
-  worker_wait_map_.clear();
+  task_wait_queue_.clear();
+  worker_load_map_.clear();
 }
 
 ModelThread::~ModelThread() { Clear(); }
 
+PredictContext::~PredictContext() { GrpcTensorHelper::ReleasePredictRequestInstances(&request); }
+
 Status ModelThread::AddWorker(uint64_t pid, const std::shared_ptr<WorkerContext> &notify) {
   {
     std::unique_lock<std::mutex> lock(lock_);
@@ -90,11 +126,8 @@ Status ModelThread::AddWorker(uint64_t pid, const std::shared_ptr<WorkerContext>
       return FAILED;
     }
     pid_process_.insert(std::make_pair(pid, notify));
-    if (single_batch_dispatch_) {
-      worker_wait_map_[pid] = static_cast<int64_t>(round_ * batch_size_);
-    } else {
-      worker_wait_map_[pid] = static_cast<int64_t>(round_);
-    }
+    auto init_window = single_batch_dispatch_ ? round_ * batch_size_ : round_;
+    (void)worker_load_map_.emplace(pid, WorkerLoadInfo(init_window));
   }
   SendTasks();
   return SUCCESS;
@@ -109,19 +142,22 @@ Status ModelThread::DelWorker(uint64_t pid) {
       return FAILED;
     }
     (void)pid_process_.erase(it);
-    auto worker_it = worker_wait_map_.find(pid);
-    if (worker_it == worker_wait_map_.end()) {
-      MSI_LOG(INFO) << "pid not existed in worker wait map: " << pid;
+    auto worker_it = worker_load_map_.find(pid);
+    if (worker_it == worker_load_map_.end()) {
+      MSI_LOG(INFO) << "pid not existed in worker load map: " << pid;
       return FAILED;
     }
-    (void)worker_wait_map_.erase(worker_it);
+    (void)worker_load_map_.erase(worker_it);
     for (auto &job_item : job_) {
+      if (job_item.second.reply_built) {
+        continue;
+      }
       auto job_id = job_item.first;
       auto &task_list = job_item.second.task;
       for (size_t i = 0; i < task_list.size(); ++i) {
         if (task_list[i].pid == pid) {
           auto task_id = i;
-          task_wait_queue_.push(std::make_pair(job_id, task_id));
+          PushWaitTask(job_id, task_id);
         }
       }
     }
@@ -133,30 +169,43 @@ Status ModelThread::DelWorker(uint64_t pid) {
   return SUCCESS;
 }
 
-Status ModelThread::FindProcessQueue(uint64_t *pid) {
-  int64_t max_free_slot = 0;
-  uint64_t cur_pid = 0;
-  for (auto &item : worker_wait_map_) {
-    auto slot = item.second;
-    if (slot <= 0 || slot < max_free_slot) {
+void ModelThread::PushWaitTask(uint64_t job_id, uint64_t task_id) {
+  auto priority = job_[job_id].request->servable_spec().priority();
+  task_wait_queue_[priority].push(std::make_pair(job_id, task_id));
+}
+
+bool ModelThread::PopWaitTask(std::pair<uint64_t, uint64_t> *ids) {
+  while (!task_wait_queue_.empty()) {
+    auto it = task_wait_queue_.begin();
+    auto &que = it->second;
+    auto task_ids = que.front();
+    que.pop();
+    if (que.empty()) {
+      (void)task_wait_queue_.erase(it);
+    }
+    auto job_it = job_.find(task_ids.first);
+    if (job_it == job_.end()) {
+      MSI_LOG_ERROR << "job_id not exist: " << task_ids.first;
       continue;
     }
-    if (slot > max_free_slot || (cur_pid <= last_worker_pid_ && item.first > last_worker_pid_)) {
-      max_free_slot = slot;
-      cur_pid = item.first;
+    // drop the task whose client has given up before it is sent to worker
+    auto deadline_us = job_it->second.request->deadline_us();
+    if (common::IsDeadlineExpired(deadline_us)) {
+      auto &task_item = job_it->second.task[task_ids.second];
+      task_item.pid = 0;
+      task_item.error.set_error_code(DEADLINE_EXCEEDED);
+      task_item.error.set_error_msg("Request deadline exceeded before the instance is dispatched to worker");
+      OnTasksOfJobFinished(job_it, {task_ids.second});
+      continue;
     }
+    *ids = task_ids;
+    return true;
   }
-  if (cur_pid != 0) {
-    worker_wait_map_[cur_pid]--;
-    last_worker_pid_ = cur_pid;
-    *pid = cur_pid;
-    return SUCCESS;
-  }
-  return FAILED;
+  return false;
 }
 
 Status ModelThread::PushTasks(const proto::PredictRequest &request, proto::PredictReply *reply,
-                              const PredictOnFinish &callback) {
+                              const PredictOnFinish &callback, const PredictOnPartialReply &partial_callback) {
   auto status = GrpcTensorHelper::CheckRequestInstances(request, method_info_.input_names);
   if (status != SUCCESS) {
     MSI_LOG_ERROR << "Check request failed";
@@ -178,6 +227,7 @@ Status ModelThread::PushTasks(const proto::PredictRequest &request, proto::Predi
   Job job;
   job.wait_task_num = instance_size;
   job.callback = callback;
+  job.partial_callback = partial_callback;
   job.request = &request;
   job.reply = reply;
   job.task.resize(instance_size);
@@ -185,16 +235,18 @@ Status ModelThread::PushTasks(const proto::PredictRequest &request, proto::Predi
     Task &task = job.task[i];
     task.input = &request.instances(i);
     task.pid = 0;
-    task_wait_queue_.push(std::make_pair(job_id_, i));
   }
   job_.insert(std::make_pair(job_id_, job));
+  for (int i = 0; i < instance_size; i++) {
+    PushWaitTask(job_id_, i);
+  }
   job_id_++;
   return SUCCESS;
 }
 
 Status ModelThread::DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                                  const PredictOnFinish &callback) {
-  auto status = PushTasks(request, reply, callback);
+                                  const PredictOnFinish &callback, const PredictOnPartialReply &partial_callback) {
+  auto status = PushTasks(request, reply, callback, partial_callback);
   if (status != SUCCESS) {
     MSI_LOG_ERROR << "Push tasks into queue failed";
     return status;
@@ -206,14 +258,29 @@ Status ModelThread::DispatchAsync(const proto::PredictRequest &request, proto::P
 Status ModelThread::Combine(const std::vector<std::pair<uint64_t, uint64_t>> &ids, uint64_t pid,
                             proto::PredictRequest *msg) {
   std::vector<const proto::Instance *> inputs;
+  RequestSpec request_spec = spec_;
+  bool has_deadline = true;
   // ids->inputs
   for (auto it = begin(ids); it != end(ids); it++) {
     uint64_t job_id = it->first;
     uint64_t task_id = it->second;
-    job_[job_id].task[task_id].pid = pid;
-    inputs.push_back(job_[job_id].task[task_id].input);
+    auto &job = job_[job_id];
+    job.task[task_id].pid = pid;
+    job.sending_count++;
+    inputs.push_back(job.task[task_id].input);
+    // the combined request is processed in the highest priority of its instances
+    request_spec.priority = std::max(request_spec.priority, job.request->servable_spec().priority());
+    // and expires when all of its instances expire
+    auto deadline_us = job.request->deadline_us();
+    if (deadline_us == 0) {
+      has_deadline = false;
+    }
+    request_spec.deadline_us = std::max(request_spec.deadline_us, deadline_us);
   }
-  return GrpcTensorHelper::CreatePredictRequestFromInstances(spec_, inputs, msg);
+  if (!has_deadline) {
+    request_spec.deadline_us = 0;
+  }
+  return GrpcTensorHelper::CreatePredictRequestFromInstances(request_spec, inputs, msg);
 }
 
 void ModelThread::SendTasks() {
@@ -225,26 +292,26 @@ void ModelThread::SendTasks() {
       if (task_wait_queue_.empty()) {
         return;
       }
-      uint64_t pid;
-      auto status = FindProcessQueue(&pid);
-      if (status != SUCCESS) {
+      auto pid = load_balance_policy_->SelectWorker(worker_load_map_);
+      if (pid == 0) {  // no worker has free slot
         return;
       }
       context = std::make_shared<PredictContext>();
       std::vector<std::pair<uint64_t, uint64_t>> &inputs = context->inputs;
-      if (single_batch_dispatch_) {
-        inputs.push_back(task_wait_queue_.front());
-        task_wait_queue_.pop();
-      } else {
-        for (uint64_t i = 0; i < batch_size_; i++) {
-          if (task_wait_queue_.empty()) {
-            break;
-          }
-          inputs.push_back(task_wait_queue_.front());
-          task_wait_queue_.pop();
+      uint64_t max_count = single_batch_dispatch_ ? 1 : batch_size_;
+      std::pair<uint64_t, uint64_t> ids;
+      for (uint64_t i = 0; i < max_count; i++) {
+        if (!PopWaitTask(&ids)) {
+          break;
         }
+        inputs.push_back(ids);
+      }
+      if (inputs.empty()) {  // all the waiting tasks have expired
+        return;
       }
+      worker_load_map_.at(pid).OnSend(inputs.size());
       context->pid = pid;
+      context->send_time = std::chrono::steady_clock::now();
       Combine(inputs, pid, &context->request);  // inputs string->InstanceData,task pid status
       worker = pid_process_[pid];
     }
@@ -264,6 +331,7 @@ void ModelThread::SendTasks() {
       }
     };
     auto status = worker->DispatchAsync(context->request, &context->reply, callback);
+    OnTasksSent(context);
     if (status != SUCCESS) {
       auto error_msg = context->reply.add_error_msg();
       error_msg->set_error_code(WORKER_UNAVAILABLE);
@@ -273,16 +341,36 @@ void ModelThread::SendTasks() {
   }
 }
 
+void ModelThread::OnTasksSent(const std::shared_ptr<PredictContext> &context) {
+  // The request has been serialized when the async call is started, the borrowed instances can be released
+  GrpcTensorHelper::ReleasePredictRequestInstances(&context->request);
+  std::unique_lock<std::mutex> lock(lock_);
+  for (auto &ids : context->inputs) {
+    auto job_it = job_.find(ids.first);
+    if (job_it == job_.end()) {
+      continue;
+    }
+    auto &job_item = job_it->second;
+    job_item.sending_count--;
+    if (job_item.sending_count == 0 && job_item.reply_pending) {
+      ReplyJob(job_it);
+    }
+  }
+}
+
 void ModelThread::OnTasksFinished(const std::shared_ptr<PredictContext> &context) {
   std::unique_lock<std::mutex> lock(lock_);
   const auto pid = context->pid;
   const auto &inputs = context->inputs;
-  if (pid_process_.find(pid) != pid_process_.end()) {
-    worker_wait_map_[pid]++;
+  auto worker_it = worker_load_map_.find(pid);
+  if (worker_it != worker_load_map_.end()) {
+    auto latency = std::chrono::steady_clock::now() - context->send_time;
+    auto latency_us = std::chrono::duration_cast<std::chrono::microseconds>(latency).count();
+    worker_it->second.OnFinish(inputs.size(), static_cast<uint64_t>(latency_us));
   }
   std::vector<proto::ErrorMsg> error;
-  std::vector<const proto::Instance *> output;
-  auto status = GrpcTensorHelper::CreateInstanceFromPredictReply(spec_, context->reply, &error, &output);
+  std::vector<proto::Instance *> output;
+  auto status = GrpcTensorHelper::CreateInstanceFromPredictReply(spec_, &context->reply, &error, &output);
   if (status != SUCCESS) {
     status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR)
              << "Get reply failed, servable name: " << spec_.servable_name << ", method name: " << spec_.method_name
@@ -301,6 +389,8 @@ void ModelThread::OnTasksFinished(const std::shared_ptr<PredictContext> &context
     error_msg.set_error_msg(status.StatusMessage());
     error.push_back(error_msg);
   }
+  // job id: finished task ids of the job
+  std::map<uint64_t, std::vector<uint64_t>> job_task_ids;
   for (unsigned int i = 0; i < inputs.size(); i++) {
     uint64_t task_id = inputs[i].second;
     uint64_t job_id = inputs[i].first;
@@ -323,21 +413,69 @@ void ModelThread::OnTasksFinished(const std::shared_ptr<PredictContext> &context
     } else {
       task_item.error = error[i];
     }
-    job_item.wait_task_num--;
-    job_item.reply_context_list.push_back(context);
-    if (job_item.wait_task_num == 0) {
-      // reply job
-      std::vector<const proto::Instance *> out;
-      std::vector<proto::ErrorMsg> error_reply;
-      for (auto &item : job_item.task) {
-        out.push_back(item.output);
-        error_reply.push_back(item.error);
-      }
-      GrpcTensorHelper::CreatePredictReplyFromInstances(*job_item.request, error_reply, out, job_item.reply);
-      job_item.callback();
-      (void)job_.erase(iter2);
+    auto &task_ids = job_task_ids[job_id];
+    if (task_ids.empty()) {
+      job_item.reply_context_list.push_back(context);
+    }
+    task_ids.push_back(task_id);
+  }
+  // the tasks of one job in the batch are replied together, the job may be erased after its tasks are finished
+  for (auto &item : job_task_ids) {
+    OnTasksOfJobFinished(job_.find(item.first), item.second);
+  }
+}
+
+void ModelThread::OnTasksOfJobFinished(std::map<uint64_t, Job>::iterator job_it,
+                                       const std::vector<uint64_t> &task_ids) {
+  auto &job_item = job_it->second;
+  if (job_item.reply_built) {  // has been replied with error when all workers exited
+    return;
+  }
+  if (job_item.partial_callback) {
+    ReplyPartial(&job_item, task_ids);
+  }
+  job_item.wait_task_num -= task_ids.size();
+  if (job_item.wait_task_num == 0) {
+    if (job_item.sending_count > 0) {
+      // the instances of the request are still being serialized for a worker which has exited
+      job_item.reply_pending = true;
+      return;
+    }
+    ReplyJob(job_it);
+  }
+}
+
+void ModelThread::ReplyPartial(Job *job, const std::vector<uint64_t> &task_ids) {
+  auto reply = std::make_shared<proto::PredictReply>();
+  *reply->mutable_servable_spec() = job->request->servable_spec();
+  std::vector<proto::Instance *> out;
+  std::vector<proto::ErrorMsg> error_reply;
+  for (auto task_id : task_ids) {
+    auto &task_item = job->task[task_id];
+    out.push_back(task_item.output);
+    error_reply.push_back(task_item.error);
+    reply->add_instance_indices(task_id);
+    task_item.replied = true;
+  }
+  GrpcTensorHelper::CreatePredictReplyFromInstances(*job->request, error_reply, out, reply.get());
+  job->partial_callback(reply);
+}
+
+void ModelThread::ReplyJob(std::map<uint64_t, Job>::iterator job_it) {
+  auto &job_item = job_it->second;
+  // the instances of partial replies have been replied by partial_callback
+  if (!job_item.reply_built && !job_item.partial_callback) {
+    std::vector<proto::Instance *> out;
+    std::vector<proto::ErrorMsg> error_reply;
+    for (auto &item : job_item.task) {
+      out.push_back(item.output);
+      error_reply.push_back(item.error);
     }
+    GrpcTensorHelper::CreatePredictReplyFromInstances(*job_item.request, error_reply, out, job_item.reply);
+    job_item.reply_built = true;
   }
+  job_item.callback();
+  (void)job_.erase(job_it);
 }
 
 void ModelThread::Commit(const std::shared_ptr<PredictContext> &context) {
@@ -24,34 +24,46 @@
 #include <mutex>
 #include <map>
 #include <queue>
+#include <functional>
+#include <chrono>
 #include "common/serving_common.h"
 #include "common/instance.h"
 #include "master/notify_worker/base_notify.h"
 #include "proto/ms_service.pb.h"
 #include "proto/ms_service.grpc.pb.h"
 #include "master/worker_context.h"
+#include "master/load_balance.h"
 
 namespace mindspore::serving {
 struct Task {
   const proto::Instance *input = nullptr;
-  const proto::Instance *output = nullptr;
+  proto::Instance *output = nullptr;  // in the worker reply, moved into the client reply
   proto::ErrorMsg error;
   uint64_t pid = 0;  // 0:not execute or have executed.others: executing
+  bool replied = false;  // replied by the partial reply of job
 };
 
 struct PredictContext {
-  proto::PredictRequest request;
+  ~PredictContext();
+  proto::PredictRequest request;  // borrows the instances of client requests
   proto::PredictReply reply;
   uint64_t pid;
   std::vector<std::pair<uint64_t, uint64_t>> inputs;
+  std::chrono::steady_clock::time_point send_time;
 };
 
 struct Job {
   std::vector<Task> task;
   uint64_t wait_task_num = 0;
   PredictOnFinish callback;
+  // replies the finished tasks at once, and the reply of callback only has the error of the whole request
+  PredictOnPartialReply partial_callback;
   const proto::PredictRequest *request = nullptr;
   proto::PredictReply *reply = nullptr;
+  // tasks being serialized into worker requests, the client request must be alive until they are serialized
+  uint64_t sending_count = 0;
+  bool reply_pending = false;
+  bool reply_built = false;
   std::vector<std::shared_ptr<PredictContext>> reply_context_list;
 };
 
@@ -63,16 +75,17 @@ class ModelThread {
   Status DelWorker(uint64_t pid);
   Status AddWorker(uint64_t pid, const std::shared_ptr<WorkerContext> &notify);
   Status DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                       const PredictOnFinish &callback);
+                       const PredictOnFinish &callback, const PredictOnPartialReply &partial_callback = nullptr);
 
  private:
   std::map<uint64_t, std::shared_ptr<WorkerContext>> pid_process_;
-  uint64_t last_worker_pid_ = 0;
-  std::map<uint64_t, int64_t> worker_wait_map_;
-  std::queue<std::pair<uint64_t, uint64_t>> task_wait_queue_;
+  std::map<uint64_t, WorkerLoadInfo> worker_load_map_;
+  std::shared_ptr<LoadBalancePolicy> load_balance_policy_;
+  // request priority: <job id, task id>, tasks with larger request priority are dispatched first
+  std::map<uint32_t, std::queue<std::pair<uint64_t, uint64_t>>, std::greater<>> task_wait_queue_;
   std::map<uint64_t, Job> job_;
   uint64_t job_id_ = 0;
-  uint64_t round_ = 3;
+  uint64_t round_ = 3;  // initial in-flight batches of one worker
   std::mutex lock_;
   RequestSpec spec_;
   ServableMethodInfo method_info_;
@@ -81,8 +94,14 @@ class ModelThread {
 
   void Clear();
   void InnerClear();
-  Status FindProcessQueue(uint64_t *pid);
-  Status PushTasks(const proto::PredictRequest &request, proto::PredictReply *reply, const PredictOnFinish &callback);
+  void PushWaitTask(uint64_t job_id, uint64_t task_id);
+  bool PopWaitTask(std::pair<uint64_t, uint64_t> *ids);
+  void OnTasksOfJobFinished(std::map<uint64_t, Job>::iterator job_it, const std::vector<uint64_t> &task_ids);
+  void ReplyPartial(Job *job, const std::vector<uint64_t> &task_ids);
+  void ReplyJob(std::map<uint64_t, Job>::iterator job_it);
+  void OnTasksSent(const std::shared_ptr<PredictContext> &context);
+  Status PushTasks(const proto::PredictRequest &request, proto::PredictReply *reply, const PredictOnFinish &callback,
+                   const PredictOnPartialReply &partial_callback);
   Status Combine(const std::vector<std::pair<uint64_t, uint64_t>> &ids, uint64_t pid, proto::PredictRequest *msg);
   void OnTasksFinished(const std::shared_ptr<PredictContext> &context);
   void SendTasks();
@@ -16,6 +16,8 @@
 #include "master/notify_worker/grpc_notify.h"
 #include <grpcpp/grpcpp.h>
 #include <grpcpp/health_check_service_interface.h>
+#include <unistd.h>
+#include <algorithm>
 #include <thread>
 #include "common/exit_handle.h"
 #include "common/grpc_server.h"
@@ -23,10 +25,24 @@
 
 namespace mindspore {
 namespace serving {
+namespace {
+SharedMemoryPool &RequestMemoryPool() {
+  static SharedMemoryPool pool("serving_master_request_pid" + std::to_string(getpid()));
+  return pool;
+}
+
+bool IsShmTransportTensor(const proto::Tensor &tensor) {
+  return tensor.tensor_data_case() == proto::Tensor::TensorDataCase::kData &&
+         tensor.data().size() >= kShmTransportMinDataSize;
+}
+}  // namespace
+
 GrpcNotifyWorker::GrpcNotifyWorker(const std::string &worker_address) {
   worker_address_ = worker_address;
   std::shared_ptr<grpc::Channel> channel = GrpcServer::CreateChannel(worker_address);
   stub_ = proto::MSWorker::NewStub(channel);
+  const std::string unix_prefix = "unix:";
+  use_shm_ = worker_address.compare(0, unix_prefix.size(), unix_prefix) == 0;
 }
 
 GrpcNotifyWorker::~GrpcNotifyWorker() = default;
@@ -42,6 +58,9 @@ Status GrpcNotifyWorker::DispatchAsync(const proto::PredictRequest &request, pro
     client_ = std::make_unique<MSPredictClient>();
     client_->Start();
   }
+  if (use_shm_) {
+    return DispatchShmAsync(request, reply, on_finish);
+  }
   AsyncPredictCallback callback = [reply, on_finish](Status status) {
     GrpcTensorHelper::CreateReplyFromErrorMsg(status, reply);
     on_finish();
@@ -49,5 +68,96 @@ Status GrpcNotifyWorker::DispatchAsync(const proto::PredictRequest &request, pro
   client_->PredictAsync(request, reply, stub_.get(), callback, worker_address_);
   return SUCCESS;
 }
+
+Status GrpcNotifyWorker::DispatchShmAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
+                                          const PredictOnFinish &on_finish) {
+  proto::PredictRequest shm_request;
+  std::vector<bool> borrowed;
+  auto alloc_items = std::make_shared<std::vector<SharedMemoryItem>>();
+  auto status = CreateShmRequest(request, &shm_request, &borrowed, alloc_items.get());
+  if (status != SUCCESS) {
+    ReleaseShmRequest(borrowed, &shm_request);
+    for (auto &item : *alloc_items) {
+      RequestMemoryPool().Release(item);
+    }
+    return status;
+  }
+  // only the inputs are transported by shared memory. The outputs are replied inline, because the reply to client is
+  // serialized from the proto, and reading the outputs from the shared memory of worker would copy them anyway
+  AsyncPredictCallback callback = [reply, on_finish, alloc_items](Status status) {
+    // the inputs have been consumed by the worker when it replies
+    for (auto &item : *alloc_items) {
+      RequestMemoryPool().Release(item);
+    }
+    GrpcTensorHelper::CreateReplyFromErrorMsg(status, reply);
+    on_finish();
+  };
+  client_->PredictAsync(shm_request, reply, stub_.get(), callback, worker_address_);
+  // the request has been serialized
+  ReleaseShmRequest(borrowed, &shm_request);
+  return SUCCESS;
+}
+
+Status GrpcNotifyWorker::CreateShmRequest(const proto::PredictRequest &request, proto::PredictRequest *shm_request,
+                                          std::vector<bool> *borrowed, std::vector<SharedMemoryItem> *alloc_items) {
+  *shm_request->mutable_servable_spec() = request.servable_spec();
+  shm_request->set_timeout_us(request.timeout_us());
+  auto &pool = RequestMemoryPool();
+  for (auto &instance : request.instances()) {
+    auto use_shm = std::any_of(instance.items().begin(), instance.items().end(),
+                               [](const auto &item) { return IsShmTransportTensor(item.second); });
+    if (!use_shm) {
+      // the instance is borrowed without copy, and released after the request is serialized
+      shm_request->mutable_instances()->UnsafeArenaAddAllocated(const_cast<proto::Instance *>(&instance));
+      borrowed->push_back(true);
+      continue;
+    }
+    auto shm_instance = shm_request->add_instances();
+    borrowed->push_back(false);
+    *shm_instance->mutable_output_buffers() = instance.output_buffers();
+    auto &shm_items = *shm_instance->mutable_items();
+    for (auto &item : instance.items()) {
+      auto &tensor = item.second;
+      auto &shm_tensor = shm_items[item.first];
+      if (!IsShmTransportTensor(tensor)) {
+        shm_tensor = tensor;
+        continue;
+      }
+      auto &data = tensor.data();
+      SharedMemoryItem memory_item;
+      auto status = pool.Alloc(data.size(), &memory_item);
+      if (status != SUCCESS) {
+        MSI_LOG_WARNING << "Alloc shared memory failed, the tensor is transported inline, data size: " << data.size();
+        shm_tensor = tensor;
+        continue;
+      }
+      alloc_items->push_back(memory_item);
+      auto ret = memcpy_s(memory_item.offset_address, memory_item.size, data.data(), data.size());
+      if (ret != EOK) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << "Copy tensor to shared memory failed, dst size: " << memory_item.size
+                                              << ", src size: " << data.size();
+      }
+      *shm_tensor.mutable_shape() = tensor.shape();
+      shm_tensor.set_dtype(tensor.dtype());
+      auto shm_data = shm_tensor.mutable_shm_data();
+      shm_data->set_memory_key(memory_item.memory_key);
+      shm_data->set_bytes_size(memory_item.bytes_size);
+      shm_data->set_data_offset(memory_item.offset);
+      shm_data->set_data_size(data.size());
+    }
+  }
+  return SUCCESS;
+}
+
+void GrpcNotifyWorker::ReleaseShmRequest(const std::vector<bool> &borrowed, proto::PredictRequest *shm_request) {
+  auto instances = shm_request->mutable_instances();
+  for (auto it = borrowed.rbegin(); it != borrowed.rend(); ++it) {
+    if (*it) {
+      (void)instances->UnsafeArenaReleaseLast();
+    } else {
+      instances->RemoveLast();
+    }
+  }
+}
 }  // namespace serving
 }  // namespace mindspore
@@ -23,6 +23,7 @@
 #include "master/notify_worker/base_notify.h"
 #include "proto/ms_worker.pb.h"
 #include "proto/ms_worker.grpc.pb.h"
+#include "common/shared_memory.h"
 
 namespace mindspore {
 namespace serving {
@@ -37,6 +38,14 @@ class MS_API GrpcNotifyWorker : public BaseNotifyWorker {
  private:
   std::string worker_address_;
   std::shared_ptr<proto::MSWorker::Stub> stub_ = nullptr;
+  // the worker is on the same host, and the input tensors are transported by shared memory
+  bool use_shm_ = false;
+
+  Status DispatchShmAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
+                          const PredictOnFinish &on_finish);
+  static Status CreateShmRequest(const proto::PredictRequest &request, proto::PredictRequest *shm_request,
+                                 std::vector<bool> *borrowed, std::vector<SharedMemoryItem> *alloc_items);
+  static void ReleaseShmRequest(const std::vector<bool> &borrowed, proto::PredictRequest *shm_request);
 };
 
 }  // namespace serving
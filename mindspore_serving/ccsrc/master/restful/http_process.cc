@@ -25,6 +25,7 @@
 #include "master/restful/http_handle.h"
 #include "common/float16.h"
 #include "master/server.h"
+#include "common/utils.h"
 
 using mindspore::serving::proto::Instance;
 using mindspore::serving::proto::PredictReply;
@@ -740,8 +741,24 @@ Status RestfulService::ParseRequest(const std::shared_ptr<RestfulRequest> &restf
     default:
       return INFER_STATUS_LOG_ERROR(FAILED) << "restful request only support instances mode";
   }
+  if (status != SUCCESS) {
+    return status;
+  }
+  return ParsePriorityMsg(js_msg, request);
+}
 
-  return status;
+// optional, Eg:{"instances":[{}, {}], "priority": 1}
+Status RestfulService::ParsePriorityMsg(const json &js_msg, PredictRequest *const request) {
+  auto priority = js_msg.find(kPriorityRequest);
+  if (priority == js_msg.end()) {
+    return SUCCESS;
+  }
+  if (!priority->is_number_unsigned() || priority->get<uint64_t>() > UINT32_MAX) {
+    return INFER_STATUS_LOG_ERROR(INVALID_INPUTS)
+           << "json object, key 'priority' expects to be an unsigned int32 number, actually: " << priority->dump();
+  }
+  request->mutable_servable_spec()->set_priority(priority->get<uint32_t>());
+  return SUCCESS;
 }
 
 Status RestfulService::ParseReqCommonMsg(const std::shared_ptr<RestfulRequest> &restful_request,
@@ -754,6 +771,9 @@ Status RestfulService::ParseReqCommonMsg(const std::shared_ptr<RestfulRequest> &
   request->mutable_servable_spec()->set_name(request_ptr->model_name_);
   request->mutable_servable_spec()->set_version_number(request_ptr->version_);
   request->mutable_servable_spec()->set_method_name(request_ptr->service_method_);
+  if (request_ptr->timeout_ms_ > 0) {
+    request->set_deadline_us(common::GetCurrentTimeUs() + request_ptr->timeout_ms_ * 1000);
+  }
   return status;
 }
 
@@ -32,6 +32,7 @@ using std::string;
 namespace mindspore {
 namespace serving {
 constexpr auto kInstancesRequest = "instances";
+constexpr auto kPriorityRequest = "priority";
 constexpr auto kInstancesReply = "instances";
 constexpr auto kErrorMsg = "error_msg";
 constexpr auto kType = "type";
@@ -76,6 +77,7 @@ class RestfulService {
                            proto::PredictRequest *const request);
 
   Status ParseInstancesMsg(const json &js_msg, proto::PredictRequest *const request);
+  Status ParsePriorityMsg(const json &js_msg, proto::PredictRequest *const request);
   Status GetInstancesType(const json &instances);
   Status ParseKeyInstances(const json &instances, proto::PredictRequest *const request);
   Status PaserKeyOneInstance(const json &instance_msg, proto::PredictRequest *const request);
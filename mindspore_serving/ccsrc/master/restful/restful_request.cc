@@ -26,6 +26,7 @@ const char kUrlKeyModel[] = "model";
 const char kUrlKeyVersion[] = "version";
 const char kUrlSplit[] = "/";
 const char kUrlKeyEnd[] = ":";
+const char kHeaderTimeout[] = "Request-Timeout-Ms";
 }  // namespace
 
 namespace mindspore {
@@ -99,6 +100,38 @@ Status DecomposeEvRequest::CheckRequestMethodValid() {
   return SUCCESS;
 }
 
+Status DecomposeEvRequest::GetRequestTimeout() {
+  auto headers = evhttp_request_get_input_headers(event_request_);
+  if (headers == nullptr) {
+    return SUCCESS;
+  }
+  auto timeout = evhttp_find_header(headers, kHeaderTimeout);
+  if (timeout == nullptr) {
+    return SUCCESS;
+  }
+  std::string timeout_str = timeout;
+  try {
+    size_t pos = 0;
+    auto timeout_ms = std::stoull(timeout_str, &pos);
+    if (pos != timeout_str.size() || timeout_str[0] == '-') {
+      return INFER_STATUS_LOG_ERROR(INVALID_INPUTS)
+             << "please check header " << kHeaderTimeout << ", value invalid, request timeout " << timeout_str;
+    }
+    if (timeout_ms > UINT32_MAX) {
+      return INFER_STATUS_LOG_ERROR(INVALID_INPUTS)
+             << "please check header " << kHeaderTimeout << ", value out of range, request timeout " << timeout_str;
+    }
+    timeout_ms_ = timeout_ms;
+  } catch (const std::invalid_argument &) {
+    return INFER_STATUS_LOG_ERROR(INVALID_INPUTS)
+           << "please check header " << kHeaderTimeout << ", value invalid, request timeout " << timeout_str;
+  } catch (const std::out_of_range &) {
+    return INFER_STATUS_LOG_ERROR(INVALID_INPUTS)
+           << "please check header " << kHeaderTimeout << ", value out of range, request timeout " << timeout_str;
+  }
+  return SUCCESS;
+}
+
 Status DecomposeEvRequest::Decompose() {
   Status status(SUCCESS);
   status = CheckRequestMethodValid();
@@ -111,6 +144,11 @@ Status DecomposeEvRequest::Decompose() {
     return status;
   }
 
+  status = GetRequestTimeout();
+  if (status != SUCCESS) {
+    return status;
+  }
+
   // eg: /model/resnet/version/1:predict
   url_ = evhttp_request_get_uri(event_request_);
   if (url_.empty()) {
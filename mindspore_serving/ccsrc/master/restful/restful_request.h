@@ -32,6 +32,7 @@ class DecomposeEvRequest {
   ~DecomposeEvRequest() = default;
   std::string UrlQuery(const std::string &url, const std::string &key) const;
   Status CheckRequestMethodValid();
+  Status GetRequestTimeout();
   Status Decompose();
   Status GetPostMessageToJson();
 
@@ -41,6 +42,7 @@ class DecomposeEvRequest {
   std::string url_;
   std::string service_method_;
   uint32_t version_{};
+  uint64_t timeout_ms_{};  // 0: no timeout
   uint32_t max_msg_size_{};
   nlohmann::json request_message_;
 };
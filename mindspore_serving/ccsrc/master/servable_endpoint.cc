@@ -24,13 +24,14 @@ ServableEndPoint::ServableEndPoint(const ServableReprInfo &repr) : worker_repr_(
 ServableEndPoint::~ServableEndPoint() { Clear(); }
 
 Status ServableEndPoint::DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                                       const PredictOnFinish &on_finish) {
+                                       const PredictOnFinish &on_finish,
+                                       const PredictOnPartialReply &on_partial_reply) {
   auto method_name = request.servable_spec().method_name();
   auto it = model_thread_list_.find(method_name);
   if (it == model_thread_list_.end()) {
     return INFER_STATUS_LOG_ERROR(FAILED) << "Cannot find model thread of method " << method_name;
   }
-  auto status = it->second->DispatchAsync(request, reply, on_finish);
+  auto status = it->second->DispatchAsync(request, reply, on_finish, on_partial_reply);
   return status;
 }
 
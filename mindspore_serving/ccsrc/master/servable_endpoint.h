@@ -34,7 +34,7 @@ class ServableEndPoint {
   explicit ServableEndPoint(const ServableReprInfo &repr);
   ~ServableEndPoint();
   Status DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
-                       const PredictOnFinish &on_finish);
+                       const PredictOnFinish &on_finish, const PredictOnPartialReply &on_partial_reply = nullptr);
 
   Status RegisterWorker(const ServableRegSpec &servable_spec, std::shared_ptr<WorkerContext> worker);
   Status UnregisterWorker(const std::string &worker_address);
@@ -40,7 +40,8 @@ void PyRegServable(pybind11::module *m_ptr) {
     .def(py::init<>())
     .def_static("get_instance", &PyStageFunctionStorage::Instance)
     .def("register", &PyStageFunctionStorage::Register)
-    .def("get_pycpp_function_info", &PyStageFunctionStorage::GetPyCppFunctionInfo);
+    .def("get_pycpp_function_info", &PyStageFunctionStorage::GetPyCppFunctionInfo)
+    .def("load_stage_plugin", &PyStageFunctionStorage::LoadStagePlugin);
 
   py::class_<MethodSignature>(m, "MethodSignature_")
     .def(py::init<>())
@@ -48,6 +49,7 @@ void PyRegServable(pybind11::module *m_ptr) {
     .def_readwrite("method_name", &MethodSignature::method_name)
     .def_readwrite("inputs", &MethodSignature::inputs)
     .def_readwrite("outputs", &MethodSignature::outputs)
+    .def_readwrite("weight", &MethodSignature::weight)
     .def("add_stage_function", &MethodSignature::AddStageFunction)
     .def("add_stage_model", &MethodSignature::AddStageModel)
     .def("set_return", &MethodSignature::SetReturn);
@@ -56,7 +58,14 @@ void PyRegServable(pybind11::module *m_ptr) {
     .def(py::init<>())
     .def_readwrite("servable_name", &RequestSpec::servable_name)
     .def_readwrite("version_number", &RequestSpec::version_number)
-    .def_readwrite("method_name", &RequestSpec::method_name);
+    .def_readwrite("method_name", &RequestSpec::method_name)
+    .def_readwrite("priority", &RequestSpec::priority);
+
+  py::class_<BatchingPolicy>(m, "BatchingPolicy_")
+    .def(py::init<>())
+    .def_readwrite("max_batch_size", &BatchingPolicy::max_batch_size)
+    .def_readwrite("max_queue_delay_us", &BatchingPolicy::max_queue_delay_us)
+    .def_readwrite("preferred_batch_sizes", &BatchingPolicy::preferred_batch_sizes);
 
   py::class_<CommonModelMeta>(m, "CommonModelMeta_")
     .def(py::init<>())
@@ -65,11 +74,14 @@ void PyRegServable(pybind11::module *m_ptr) {
     .def_readwrite("inputs_count", &CommonModelMeta::inputs_count)
     .def_readwrite("outputs_count", &CommonModelMeta::outputs_count)
     .def_readwrite("with_batch_dim", &CommonModelMeta::with_batch_dim)
-    .def_readwrite("without_batch_dim_inputs", &CommonModelMeta::without_batch_dim_inputs);
+    .def_readwrite("without_batch_dim_inputs", &CommonModelMeta::without_batch_dim_inputs)
+    .def_readwrite("batching_policy", &CommonModelMeta::batching_policy);
 
   py::class_<LocalModelMeta>(m, "LocalModelMeta_")
     .def(py::init<>())
     .def_readwrite("model_file", &LocalModelMeta::model_files)
+    .def_readwrite("batch_variant_files", &LocalModelMeta::batch_variant_files)
+    .def_readwrite("parallel_instances", &LocalModelMeta::parallel_instances)
     .def_readwrite("config_file", &LocalModelMeta::config_file)
     .def_readwrite("model_context", &LocalModelMeta::model_context)
     .def("set_model_format", &LocalModelMeta::SetModelFormat);
@@ -157,6 +169,7 @@ void PyRegWorker(pybind11::module *m_ptr) {
   py::class_<TaskItem>(m, "TaskItem_")
     .def(py::init<>())
     .def_readonly("has_stopped", &TaskItem::has_stopped)
+    .def_readonly("task_id", &TaskItem::task_id)
     .def_property_readonly("method_name", [](const TaskItem &item) { return item.task_info.group_name; })
     .def_property_readonly("stage_index", [](const TaskItem &item) { return item.task_info.priority; })
     .def_property_readonly("task_name", [](const TaskItem &item) { return item.task_info.task_name; })
@@ -178,7 +191,10 @@ void PyRegWorker(pybind11::module *m_ptr) {
     .def_static("stop_and_clear", PyWorker::StopAndClear)
     .def_static("enable_pytask_que", PyWorker::EnablePyTaskQueue)
     .def_static("get_py_task", &PyWorker::GetPyTask, py::call_guard<py::gil_scoped_release>())
+    .def_static("get_py_task_parallel_num", &PyWorker::GetPyTaskParallelNum)
     .def_static("push_pytask_result", &PyWorker::PushPyTaskResult)
+    .def_static("push_pytask_results", &PyWorker::PushPyTaskResults)
+    .def_static("push_pytask_stacked_result", &PyWorker::PushPyTaskStackedResult)
     .def_static("push_pytask_failed", &PyWorker::PushPyTaskFailed)
     .def_static("push_pytask_system_failed", &PyWorker::PushPyTaskSystemFailed)
     .def_static("get_device_type", &PyWorker::GetDeviceType)
@@ -196,12 +212,14 @@ void PyRegWorker(pybind11::module *m_ptr) {
            }
          })
     .def("set_device_id", &ServableContext::SetDeviceId)
-    .def("set_enable_lite", &ServableContext::SetEnableLite);
+    .def("set_enable_lite", &ServableContext::SetEnableLite)
+    .def("set_num_cpp_stage_threads", &ServableContext::SetNumCppStageThreads);
 
   py::class_<MasterContext, std::shared_ptr<MasterContext>>(m, "MasterContext_")
     .def(py::init<>())
     .def_static("get_instance", &MasterContext::Instance)
-    .def("set_max_enqueued_requests", &MasterContext::SetMaxEnqueuedRequests);
+    .def("set_max_enqueued_requests", &MasterContext::SetMaxEnqueuedRequests)
+    .def("set_load_balance_policy", &MasterContext::SetLoadBalancePolicy);
 }
 
 void PyRegWorkerAgent(pybind11::module *m_ptr) {
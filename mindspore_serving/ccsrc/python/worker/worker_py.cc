@@ -20,6 +20,7 @@
 #include <memory>
 #include <map>
 #include "common/exit_handle.h"
+#include "common/buffer_tensor.h"
 #include "worker/notfiy_master/grpc_notify.h"
 #include "worker/local_servable/local_model_loader.h"
 #include "worker/distributed_worker/distributed_model_loader.h"
@@ -64,21 +65,99 @@ Status PyWorker::LoadLocalModels(const std::string &servable_directory, const st
   Status status;
   for (auto &model_meta : signature.model_metas) {
     auto &model_key = model_meta.common_meta.model_key;
-    auto local_models_loader = std::make_shared<LocalModelLoader>();
-    status =
-      local_models_loader->LoadModel(servable_directory, servable_name, version_number, model_meta, dec_key, dec_mode);
+    auto parallel_instances = model_meta.local_meta.parallel_instances;
+    if (parallel_instances > 1 && !InferenceLoader::Instance().SupportMultiThreads()) {
+      MSI_LOG_WARNING << "The inference backend does not support concurrent predict, parallel_instances "
+                      << parallel_instances << " is ignored, model info: " << model_key;
+      parallel_instances = 1;
+    }
+    if (parallel_instances <= 1) {
+      std::shared_ptr<ModelLoaderBase> model_loader;
+      status = LoadLocalModel(servable_directory, servable_name, version_number, dec_key, dec_mode, model_meta,
+                              &model_loader);
+      if (status != SUCCESS) {
+        return status;
+      }
+      (void)models_loader->emplace(model_key, model_loader);
+      continue;
+    }
+    auto instances_loader = std::make_shared<ModelInstancesLoader>(model_key);
+    for (uint32_t i = 0; i < parallel_instances; i++) {
+      std::shared_ptr<ModelLoaderBase> model_loader;
+      status = LoadLocalModel(servable_directory, servable_name, version_number, dec_key, dec_mode, model_meta,
+                              &model_loader);
+      if (status != SUCCESS) {
+        instances_loader->Clear();
+        return status;
+      }
+      instances_loader->AddInstance(model_loader);
+    }
+    status = instances_loader->AfterLoadModel();
     if (status != SUCCESS) {
-      local_models_loader->Clear();
+      instances_loader->Clear();
       return status;
     }
-    status = local_models_loader->AfterLoadModel();
+    (void)models_loader->emplace(model_key, instances_loader);
+  }
+  return SUCCESS;
+}
+
+Status PyWorker::LoadLocalModel(const std::string &servable_directory, const std::string &servable_name,
+                                uint32_t version_number, const std::string &dec_key, const std::string &dec_mode,
+                                const ModelMeta &model_meta, std::shared_ptr<ModelLoaderBase> *model_loader) {
+  auto &model_key = model_meta.common_meta.model_key;
+  auto local_models_loader = std::make_shared<LocalModelLoader>();
+  auto status =
+    local_models_loader->LoadModel(servable_directory, servable_name, version_number, model_meta, dec_key, dec_mode);
+  if (status != SUCCESS) {
+    local_models_loader->Clear();
+    return status;
+  }
+  status = local_models_loader->AfterLoadModel();
+  if (status != SUCCESS) {
+    local_models_loader->Clear();
+    return status;
+  }
+  if (model_meta.local_meta.batch_variant_files.empty()) {
+    *model_loader = local_models_loader;
+    return SUCCESS;
+  }
+  auto variants_loader = std::make_shared<ModelVariantsLoader>(model_key);
+  variants_loader->AddVariant(local_models_loader);
+  status = LoadModelVariants(servable_directory, servable_name, version_number, dec_key, dec_mode, model_meta,
+                             variants_loader);
+  if (status != SUCCESS) {
+    variants_loader->Clear();
+    return status;
+  }
+  *model_loader = variants_loader;
+  return SUCCESS;
+}
+
+Status PyWorker::LoadModelVariants(const std::string &servable_directory, const std::string &servable_name,
+                                   uint32_t version_number, const std::string &dec_key, const std::string &dec_mode,
+                                   const ModelMeta &model_meta,
+                                   const std::shared_ptr<ModelVariantsLoader> &variants_loader) {
+  Status status;
+  for (auto &variant_files : model_meta.local_meta.batch_variant_files) {
+    auto variant_meta = model_meta;
+    variant_meta.local_meta.model_files = variant_files;
+    variant_meta.local_meta.batch_variant_files.clear();
+    auto variant_loader = std::make_shared<LocalModelLoader>();
+    status = variant_loader->LoadModel(servable_directory, servable_name, version_number, variant_meta, dec_key,
+                                       dec_mode);
+    if (status != SUCCESS) {
+      variant_loader->Clear();
+      return status;
+    }
+    status = variant_loader->AfterLoadModel();
     if (status != SUCCESS) {
-      local_models_loader->Clear();
+      variant_loader->Clear();
       return status;
     }
-    (void)models_loader->emplace(model_key, local_models_loader);
+    variants_loader->AddVariant(variant_loader);
   }
-  return SUCCESS;
+  return variants_loader->AfterLoadModel();
 }
 
 void PyWorker::StartDistributedServable(const std::string &servable_directory, const std::string &servable_name,
@@ -182,19 +261,70 @@ TaskItem PyWorker::GetPyTask() {
   return item;
 }
 
-void PyWorker::PushPyTaskResult(const py::tuple &instance_outputs) {
+uint64_t PyWorker::GetPyTaskParallelNum() {
+  return Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().GetParallelNum();
+}
+
+void PyWorker::PushPyTaskResult(uint64_t task_id, const py::tuple &instance_outputs) {
   MSI_TIME_STAMP_START(PushPyTaskResult)
   std::vector<ResultInstance> outputs;
   ResultInstance instance;
   instance.data = PyTensor::AsInstanceData(instance_outputs);
   outputs.push_back(instance);
-  Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().PyPushTaskResult(outputs);
+  Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().PyPushTaskResult(task_id, outputs);
   MSI_TIME_STAMP_END(PushPyTaskResult)
 }
 
-void PyWorker::PushPyTaskFailed(int count, const std::string &error_msg) {
+void PyWorker::PushPyTaskResults(uint64_t task_id, const py::list &instances_outputs) {
+  MSI_TIME_STAMP_START(PushPyTaskResults)
+  std::vector<ResultInstance> outputs(instances_outputs.size());
+  for (size_t i = 0; i < instances_outputs.size(); i++) {
+    outputs[i].data = PyTensor::AsInstanceData(py::cast<py::tuple>(instances_outputs[i]));
+  }
+  Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().PyPushTaskResult(task_id, outputs);
+  MSI_TIME_STAMP_END(PushPyTaskResults)
+}
+
+void PyWorker::PushPyTaskStackedResult(uint64_t task_id, const py::tuple &stacked_outputs, uint64_t instances_count) {
+  MSI_TIME_STAMP_START(PushPyTaskStackedResult)
+  std::vector<ResultInstance> outputs(instances_count);
+  for (auto &item : stacked_outputs) {
+    if (py::isinstance<py::list>(item) || py::isinstance<py::tuple>(item)) {
+      auto values = py::cast<py::sequence>(item);
+      if (values.size() != instances_count) {
+        MSI_LOG_EXCEPTION << "The length " << values.size() << " of output is not equal to the instances count "
+                          << instances_count;
+      }
+      for (size_t i = 0; i < instances_count; i++) {
+        auto instance_data = PyTensor::AsInstanceData(py::make_tuple(values[i]));
+        outputs[i].data.push_back(instance_data[0]);
+      }
+      continue;
+    }
+    // split the stacked array into instances without copy, the tensors of instances hold the array
+    auto stacked_tensor = PyTensor::MakeTensorNoCopy(py::cast<py::array>(item));
+    auto shape = stacked_tensor->shape();
+    if (shape.empty() || shape[0] != static_cast<int64_t>(instances_count)) {
+      MSI_LOG_EXCEPTION << "The first dimension of output shape " << shape << " is not equal to the instances count "
+                        << instances_count;
+    }
+    std::vector<int64_t> instance_shape(shape.begin() + 1, shape.end());
+    auto instance_data_size = stacked_tensor->data_size() / instances_count;
+    auto data = const_cast<uint8_t *>(stacked_tensor->data());
+    for (size_t i = 0; i < instances_count; i++) {
+      auto tensor = std::make_shared<BufferTensorWithOwner>(stacked_tensor, stacked_tensor->data_type(),
+                                                            instance_shape, data + i * instance_data_size,
+                                                            instance_data_size, true);
+      outputs[i].data.push_back(tensor);
+    }
+  }
+  Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().PyPushTaskResult(task_id, outputs);
+  MSI_TIME_STAMP_END(PushPyTaskStackedResult)
+}
+
+void PyWorker::PushPyTaskFailed(uint64_t task_id, int count, const std::string &error_msg) {
   auto &task_que = Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue();
-  auto task_info = task_que.GetHandledTaskInfo();
+  auto task_info = task_que.GetHandledTaskInfo(task_id);
   auto status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR)
                 << "Call " << task_info.tag << " Failed, method: '" << task_info.group_name
                 << "', stage index(begin with 1): " << task_info.priority << ", error msg: " << error_msg;
@@ -204,11 +334,11 @@ void PyWorker::PushPyTaskFailed(int count, const std::string &error_msg) {
     result_instance.error_msg = status;
     results.push_back(result_instance);
   }
-  task_que.PyPushTaskResult(results);
+  task_que.PyPushTaskResult(task_id, results);
 }
 
-void PyWorker::PushPyTaskSystemFailed(const std::string &error_msg) {
-  auto task_info = Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().GetHandledTaskInfo();
+void PyWorker::PushPyTaskSystemFailed(uint64_t task_id, const std::string &error_msg) {
+  auto task_info = Worker::GetInstance().GetWorkExecutor().GetPyTaskQueue().GetHandledTaskInfo(task_id);
   auto status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR)
                 << "Call " << task_info.tag << " Failed, method: '" << task_info.group_name
                 << "', stage index(begin with 1): " << task_info.priority << ", error msg: " << error_msg;
@@ -25,6 +25,8 @@
 #include "worker/worker.h"
 #include "worker/task_queue.h"
 #include "python/tensor_py.h"
+#include "worker/local_servable/model_variants_loader.h"
+#include "worker/local_servable/model_instances_loader.h"
 
 namespace mindspore::serving {
 class MS_API PyWorker {
@@ -49,10 +51,15 @@ class MS_API PyWorker {
   static void StopAndClear();
   static bool EnablePyTaskQueue();
   static TaskItem GetPyTask();
+  static uint64_t GetPyTaskParallelNum();
 
-  static void PushPyTaskResult(const py::tuple &instance_outputs);
-  static void PushPyTaskFailed(int count, const std::string &error_msg);
-  static void PushPyTaskSystemFailed(const std::string &error_msg);
+  static void PushPyTaskResult(uint64_t task_id, const py::tuple &instance_outputs);
+  // push outputs of multiple instances in order, each item of the list is a tuple of outputs of one instance
+  static void PushPyTaskResults(uint64_t task_id, const py::list &instances_outputs);
+  // each output is numpy array with the first dimension equal to instances count, or list with one value per instance
+  static void PushPyTaskStackedResult(uint64_t task_id, const py::tuple &stacked_outputs, uint64_t instances_count);
+  static void PushPyTaskFailed(uint64_t task_id, int count, const std::string &error_msg);
+  static void PushPyTaskSystemFailed(uint64_t task_id, const std::string &error_msg);
   static std::string GetDeviceType(const std::string &target_device_type, bool enable_lite);
   static bool SupportReuseDevice();
   // for grpc notify failed of worker
@@ -63,6 +70,13 @@ class MS_API PyWorker {
                                 uint32_t version_number, const std::string &dec_key, const std::string &dec_mode,
                                 const ServableSignature &signature,
                                 std::map<std::string, std::shared_ptr<ModelLoaderBase>> *models_loader);
+  static Status LoadLocalModel(const std::string &servable_directory, const std::string &servable_name,
+                               uint32_t version_number, const std::string &dec_key, const std::string &dec_mode,
+                               const ModelMeta &model_meta, std::shared_ptr<ModelLoaderBase> *model_loader);
+  static Status LoadModelVariants(const std::string &servable_directory, const std::string &servable_name,
+                                  uint32_t version_number, const std::string &dec_key, const std::string &dec_mode,
+                                  const ModelMeta &model_meta,
+                                  const std::shared_ptr<ModelVariantsLoader> &variants_loader);
 };
 
 }  // namespace mindspore::serving
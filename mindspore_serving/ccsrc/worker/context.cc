@@ -61,4 +61,8 @@ Status ServableContext::SetDeviceTypeStr(const std::string &device_type) {
 void ServableContext::SetEnableLite(bool enable_lite) { enable_lite_ = enable_lite; }
 
 bool ServableContext::EnableLite() const { return enable_lite_; }
+
+void ServableContext::SetNumCppStageThreads(uint32_t num_threads) { num_cpp_stage_threads_ = num_threads; }
+
+uint32_t ServableContext::GetNumCppStageThreads() const { return num_cpp_stage_threads_; }
 }  // namespace mindspore::serving
@@ -37,11 +37,15 @@ class MS_API ServableContext {
 
   void SetEnableLite(bool enable_lite);
   bool EnableLite() const;
+  // the number of threads running C++ stages, 0 means the default number
+  void SetNumCppStageThreads(uint32_t num_threads);
+  uint32_t GetNumCppStageThreads() const;
 
  private:
   DeviceType device_type_ = kDeviceTypeNotSpecified;
   uint32_t device_id_ = 0;
   bool enable_lite_ = false;
+  uint32_t num_cpp_stage_threads_ = 0;
 };
 
 }  // namespace mindspore::serving
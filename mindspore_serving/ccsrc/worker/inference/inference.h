@@ -140,6 +140,7 @@ class InferenceBase {
 
   virtual uint64_t GetSubGraphNum() const = 0;
   virtual bool SupportReuseDevice() const = 0;
+  virtual bool SupportMultiThreads() const = 0;
 };
 
 class MS_API InferenceLoader {
@@ -150,6 +151,7 @@ class MS_API InferenceLoader {
   std::shared_ptr<InferenceBase> CreateMindSporeInfer();
   DeviceType GetSupportDeviceType(DeviceType device_type, ModelType model_type);
   bool SupportReuseDevice();
+  bool SupportMultiThreads();
   bool GetEnableLite() const;
 
  private:
@@ -76,7 +76,7 @@ class MindSporeModelWrap : public InferenceBase {
 
   uint64_t GetSubGraphNum() const override;
   bool SupportReuseDevice() const override;
-  bool SupportMultiThreads() const;
+  bool SupportMultiThreads() const override;
 
  private:
   ApiCommonModelInfo common_model_info_;
@@ -0,0 +1,111 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "worker/local_servable/model_instances_loader.h"
+
+namespace mindspore::serving {
+ModelInstancesLoader::~ModelInstancesLoader() noexcept { Clear(); }
+
+void ModelInstancesLoader::AddInstance(const std::shared_ptr<ModelLoaderBase> &model_loader) {
+  MSI_EXCEPTION_IF_NULL(model_loader);
+  instances_.push_back(model_loader);
+}
+
+std::vector<TensorInfo> ModelInstancesLoader::GetInputInfos(uint64_t subgraph) const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return instances_[0]->GetInputInfos(subgraph);
+}
+
+std::vector<TensorInfo> ModelInstancesLoader::GetOutputInfos(uint64_t subgraph) const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return instances_[0]->GetOutputInfos(subgraph);
+}
+
+uint64_t ModelInstancesLoader::GetBatchSize() const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return instances_[0]->GetBatchSize();
+}
+
+uint64_t ModelInstancesLoader::GetGraphNum() const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return instances_[0]->GetGraphNum();
+}
+
+void ModelInstancesLoader::Clear() {
+  for (auto &instance : instances_) {
+    instance->Clear();
+  }
+  instances_.clear();
+  std::unique_lock<std::mutex> lock{idle_lock_};
+  idle_instances_.clear();
+  model_loaded_ = false;
+}
+
+size_t ModelInstancesLoader::AcquireInstance() {
+  std::unique_lock<std::mutex> lock{idle_lock_};
+  idle_cond_var_.wait(lock, [this] { return !idle_instances_.empty(); });
+  auto index = idle_instances_.back();
+  idle_instances_.pop_back();
+  return index;
+}
+
+void ModelInstancesLoader::ReleaseInstance(size_t index) {
+  {
+    std::unique_lock<std::mutex> lock{idle_lock_};
+    idle_instances_.push_back(index);
+  }
+  idle_cond_var_.notify_one();
+}
+
+Status ModelInstancesLoader::Predict(const std::vector<InstanceData> &inputs, std::vector<ResultInstance> *outputs,
+                                     uint64_t subgraph) {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  auto index = AcquireInstance();
+  Status status;
+  try {
+    status = instances_[index]->Predict(inputs, outputs, subgraph);
+  } catch (...) {
+    ReleaseInstance(index);
+    throw;
+  }
+  ReleaseInstance(index);
+  return status;
+}
+
+Status ModelInstancesLoader::AfterLoadModel() {
+  if (instances_.empty()) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "There is no model instance loaded, model info: " << model_key_;
+  }
+  std::unique_lock<std::mutex> lock{idle_lock_};
+  idle_instances_.clear();
+  for (size_t i = 0; i < instances_.size(); i++) {
+    idle_instances_.push_back(i);
+  }
+  model_loaded_ = true;
+  MSI_LOG_INFO << "Load " << instances_.size() << " instances of model " << model_key_;
+  return SUCCESS;
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,64 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_WORKER_MODEL_INSTANCES_LOADER_H
+#define MINDSPORE_SERVING_WORKER_MODEL_INSTANCES_LOADER_H
+
+#include <memory>
+#include <vector>
+#include <string>
+#include <mutex>
+#include <condition_variable>
+
+#include "common/serving_common.h"
+#include "worker/model_loader_base.h"
+
+namespace mindspore::serving {
+// Several instances of one model, each instance has its own model session and input buffers, so that predicts
+// can run concurrently on different instances.
+class MS_API ModelInstancesLoader final : public ModelLoaderBase {
+ public:
+  explicit ModelInstancesLoader(const std::string &model_key) : model_key_(model_key) {}
+  ~ModelInstancesLoader() noexcept override;
+
+  void AddInstance(const std::shared_ptr<ModelLoaderBase> &model_loader);
+
+  std::vector<TensorInfo> GetInputInfos(uint64_t subgraph) const override;
+  std::vector<TensorInfo> GetOutputInfos(uint64_t subgraph) const override;
+  uint64_t GetBatchSize() const override;
+  uint64_t GetGraphNum() const override;
+  void Clear() override;
+
+  Status Predict(const std::vector<InstanceData> &inputs, std::vector<ResultInstance> *outputs,
+                 uint64_t subgraph) override;
+  Status AfterLoadModel() override;
+  bool OwnDevice() const override { return true; }
+  uint64_t GetParallelNum() const override { return instances_.size(); }
+
+ private:
+  std::string model_key_;
+  std::vector<std::shared_ptr<ModelLoaderBase>> instances_;
+  std::vector<size_t> idle_instances_;  // index of instances not running predict
+  std::mutex idle_lock_;
+  std::condition_variable idle_cond_var_;
+  bool model_loaded_ = false;
+
+  size_t AcquireInstance();
+  void ReleaseInstance(size_t index);
+};
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_WORKER_MODEL_INSTANCES_LOADER_H
@@ -0,0 +1,145 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "worker/local_servable/model_variants_loader.h"
+#include <algorithm>
+
+namespace mindspore::serving {
+ModelVariantsLoader::~ModelVariantsLoader() noexcept { Clear(); }
+
+void ModelVariantsLoader::AddVariant(const std::shared_ptr<ModelLoaderBase> &model_loader) {
+  MSI_EXCEPTION_IF_NULL(model_loader);
+  variants_.push_back(model_loader);
+}
+
+std::vector<TensorInfo> ModelVariantsLoader::GetInputInfos(uint64_t subgraph) const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return variants_.back()->GetInputInfos(subgraph);
+}
+
+std::vector<TensorInfo> ModelVariantsLoader::GetOutputInfos(uint64_t subgraph) const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return variants_.back()->GetOutputInfos(subgraph);
+}
+
+uint64_t ModelVariantsLoader::GetBatchSize() const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return variants_.back()->GetBatchSize();
+}
+
+uint64_t ModelVariantsLoader::GetGraphNum() const {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  return variants_.back()->GetGraphNum();
+}
+
+void ModelVariantsLoader::Clear() {
+  for (auto &variant : variants_) {
+    variant->Clear();
+  }
+  variants_.clear();
+  model_loaded_ = false;
+}
+
+Status ModelVariantsLoader::Predict(const std::vector<InstanceData> &inputs, std::vector<ResultInstance> *outputs,
+                                    uint64_t subgraph) {
+  if (!model_loaded_) {
+    MSI_LOG_EXCEPTION << "Model '" << model_key_ << "' has not been loaded";
+  }
+  for (auto &variant : variants_) {
+    if (variant->GetBatchSize() >= inputs.size()) {
+      return variant->Predict(inputs, outputs, subgraph);
+    }
+  }
+  return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Invalid input batch size " << inputs.size()
+                                              << ", max model batch size " << variants_.back()->GetBatchSize()
+                                              << ", model info: " << model_key_;
+}
+
+Status ModelVariantsLoader::CheckTensorInfos(const std::vector<TensorInfo> &infos, uint64_t batch_size,
+                                             const std::vector<TensorInfo> &base_infos, uint64_t base_batch_size,
+                                             const std::string &tensor_type) const {
+  if (infos.size() != base_infos.size()) {
+    return INFER_STATUS_LOG_ERROR(FAILED)
+           << "The " << tensor_type << "s count " << infos.size() << " of model variant with batch size "
+           << batch_size << " is not equal to the count " << base_infos.size() << " of model variant with batch size "
+           << base_batch_size << ", model info: " << model_key_;
+  }
+  for (size_t i = 0; i < infos.size(); i++) {
+    auto &info = infos[i];
+    auto &base_info = base_infos[i];
+    auto size_one_batch = info.is_no_batch_dim ? info.size : info.size / batch_size;
+    auto base_size_one_batch = base_info.is_no_batch_dim ? base_info.size : base_info.size / base_batch_size;
+    if (info.data_type != base_info.data_type || info.is_no_batch_dim != base_info.is_no_batch_dim ||
+        size_one_batch != base_size_one_batch) {
+      return INFER_STATUS_LOG_ERROR(FAILED)
+             << "The " << tensor_type << " " << i << " of model variant with batch size " << batch_size
+             << " does not match the one of model variant with batch size " << base_batch_size
+             << ", data type: " << info.data_type << " vs " << base_info.data_type << ", shape: " << info.shape
+             << " vs " << base_info.shape << ", model info: " << model_key_;
+    }
+  }
+  return SUCCESS;
+}
+
+Status ModelVariantsLoader::AfterLoadModel() {
+  if (variants_.empty()) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "There is no model variant loaded, model info: " << model_key_;
+  }
+  std::stable_sort(variants_.begin(), variants_.end(),
+                   [](const std::shared_ptr<ModelLoaderBase> &left, const std::shared_ptr<ModelLoaderBase> &right) {
+                     return left->GetBatchSize() < right->GetBatchSize();
+                   });
+  auto &base_variant = variants_.back();
+  auto base_batch_size = base_variant->GetBatchSize();
+  auto graph_num = base_variant->GetGraphNum();
+  for (size_t i = 0; i + 1 < variants_.size(); i++) {
+    auto &variant = variants_[i];
+    auto batch_size = variant->GetBatchSize();
+    if (batch_size == 0 || batch_size == variants_[i + 1]->GetBatchSize()) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "The batch size " << batch_size << " of model variants is invalid or "
+                                            << "repeated, model info: " << model_key_;
+    }
+    if (variant->GetGraphNum() != graph_num) {
+      return INFER_STATUS_LOG_ERROR(FAILED)
+             << "The subgraph number " << variant->GetGraphNum() << " of model variant with batch size "
+             << batch_size << " is not equal to the number " << graph_num << " of model variant with batch size "
+             << base_batch_size << ", model info: " << model_key_;
+    }
+    for (uint64_t subgraph = 0; subgraph < graph_num; subgraph++) {
+      auto status = CheckTensorInfos(variant->GetInputInfos(subgraph), batch_size,
+                                     base_variant->GetInputInfos(subgraph), base_batch_size, "input");
+      if (status != SUCCESS) {
+        return status;
+      }
+      status = CheckTensorInfos(variant->GetOutputInfos(subgraph), batch_size,
+                                base_variant->GetOutputInfos(subgraph), base_batch_size, "output");
+      if (status != SUCCESS) {
+        return status;
+      }
+    }
+  }
+  model_loaded_ = true;
+  return SUCCESS;
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,59 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_WORKER_MODEL_VARIANTS_LOADER_H
+#define MINDSPORE_SERVING_WORKER_MODEL_VARIANTS_LOADER_H
+
+#include <memory>
+#include <vector>
+#include <string>
+
+#include "common/serving_common.h"
+#include "worker/model_loader_base.h"
+
+namespace mindspore::serving {
+// One logical model with several variants compiled with different batch sizes, each predict is dispatched to the
+// variant with the smallest batch size that can hold all the instances.
+class MS_API ModelVariantsLoader final : public ModelLoaderBase {
+ public:
+  explicit ModelVariantsLoader(const std::string &model_key) : model_key_(model_key) {}
+  ~ModelVariantsLoader() noexcept override;
+
+  void AddVariant(const std::shared_ptr<ModelLoaderBase> &model_loader);
+
+  std::vector<TensorInfo> GetInputInfos(uint64_t subgraph) const override;
+  std::vector<TensorInfo> GetOutputInfos(uint64_t subgraph) const override;
+  uint64_t GetBatchSize() const override;
+  uint64_t GetGraphNum() const override;
+  void Clear() override;
+
+  Status Predict(const std::vector<InstanceData> &inputs, std::vector<ResultInstance> *outputs,
+                 uint64_t subgraph) override;
+  Status AfterLoadModel() override;
+  bool OwnDevice() const override { return true; }
+
+ private:
+  std::string model_key_;
+  std::vector<std::shared_ptr<ModelLoaderBase>> variants_;  // sorted by batch size in ascending order
+  bool model_loaded_ = false;
+
+  Status CheckTensorInfos(const std::vector<TensorInfo> &infos, uint64_t batch_size,
+                          const std::vector<TensorInfo> &base_infos, uint64_t base_batch_size,
+                          const std::string &tensor_type) const;
+};
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_WORKER_MODEL_VARIANTS_LOADER_H
@@ -15,6 +15,7 @@
  */
 
 #include "worker/model_loader_base.h"
+#include <algorithm>
 #include "common/buffer_tensor.h"
 
 namespace mindspore::serving {
@@ -29,7 +30,7 @@ Status DirectModelLoaderBase::Predict(const std::vector<InstanceData> &inputs, s
   Status status;
   std::vector<TensorBasePtr> predict_outputs;
   auto &subgraph_info = model_info_.sub_graph_infos[subgraph];
-  status = PrePredict(subgraph_info, model_info_.batch_size, inputs);
+  status = PrePredict(&subgraph_info, model_info_.batch_size, inputs);
   if (status != SUCCESS) {
     MSI_LOG_ERROR << "Call Pre Predict failed, model info " << model_key_;
     return status;
@@ -47,15 +48,20 @@ Status DirectModelLoaderBase::Predict(const std::vector<InstanceData> &inputs, s
   return SUCCESS;
 }
 
-Status DirectModelLoaderBase::PrePredict(const ModelExecutorSubgraphInfo &subgraph_info, uint64_t model_batch_size,
+Status DirectModelLoaderBase::PrePredict(ModelExecutorSubgraphInfo *subgraph_info, uint64_t model_batch_size,
                                          const std::vector<InstanceData> &instances) {
+  MSI_EXCEPTION_IF_NULL(subgraph_info);
   auto input_batch_size = instances.size();
   if (input_batch_size == 0 || input_batch_size > model_batch_size) {
     return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR)
            << "Invalid input batch size " << input_batch_size << ", model batch size " << model_batch_size;
   }
-  auto &input_infos = subgraph_info.input_infos;
-  auto &input_buffers = subgraph_info.input_buffers;
+  auto &input_infos = subgraph_info->input_infos;
+  auto &input_buffers = subgraph_info->input_buffers;
+  // The pad rows of input buffers are zero-filled once, only the rows written by the last predict need to be cleared
+  auto filled_batch_size = std::min<uint64_t>(subgraph_info->filled_batch_size, model_batch_size);
+  // these rows may have been written even if failed below
+  subgraph_info->filled_batch_size = std::max<uint64_t>(filled_batch_size, input_batch_size);
 
   for (size_t i = 0; i < input_infos.size(); i++) {
     auto &tensor = input_buffers[i];
@@ -81,10 +87,13 @@ Status DirectModelLoaderBase::PrePredict(const ModelExecutorSubgraphInfo &subgra
       }
       (void)memcpy_s(dst_buffer + k * item_size, data_size - k * item_size, instances[k][i]->data(), item_size);
     }
-    for (size_t k = input_batch_size; k < model_batch_size; k++) {
-      (void)memcpy_s(dst_buffer + k * item_size, data_size - k * item_size, instances[0][i]->data(), item_size);
+    if (filled_batch_size > input_batch_size) {
+      auto pad_offset = input_batch_size * item_size;
+      (void)memset_s(dst_buffer + pad_offset, data_size - pad_offset, 0,
+                     (filled_batch_size - input_batch_size) * item_size);
     }
   }
+  subgraph_info->filled_batch_size = input_batch_size;
   return SUCCESS;
 }
 
@@ -43,12 +43,16 @@ class ModelLoaderBase {
                          uint64_t subgraph) = 0;
   virtual Status AfterLoadModel() = 0;
   virtual bool OwnDevice() const = 0;
+  // number of predict can be run concurrently
+  virtual uint64_t GetParallelNum() const { return 1; }
 };
 
 struct ModelExecutorSubgraphInfo {
   std::vector<TensorInfo> input_infos;
   std::vector<TensorInfoOutput> output_infos;
   std::vector<TensorBasePtr> input_buffers;
+  // the rows after filled_batch_size of input buffers are zero, and are reused as pad region of partial batch
+  uint64_t filled_batch_size = 0;
 };
 
 struct ModelExecutorInfo {
@@ -72,7 +76,7 @@ class MS_API DirectModelLoaderBase : public ModelLoaderBase {
   ModelExecutorInfo model_info_;
 
   void InitModelExecuteInfo();
-  Status PrePredict(const ModelExecutorSubgraphInfo &subgraph_info, uint64_t model_batch_size,
+  Status PrePredict(ModelExecutorSubgraphInfo *subgraph_info, uint64_t model_batch_size,
                     const std::vector<InstanceData> &instances);
   Status PostPredict(const ModelExecutorSubgraphInfo &subgraph_info, uint64_t model_batch_size,
                      const std::vector<InstanceData> &instances, const std::vector<TensorBasePtr> &predict_result,
@@ -54,12 +54,31 @@ void PredictThread::Predict() {
       MSI_LOG_INFO << "Predict task has stopped, exit predict thread";
       break;
     }
+    UpdateBatchFillRatio(task_item.instance_list.size());
     MSI_TIME_STAMP_START(InvokePredict)
     PredictHandle(task_item.task_info, task_item.instance_list);
     MSI_TIME_STAMP_END_EXTRA(InvokePredict, task_item.task_info.tag)
   }
 }
 
+void PredictThread::UpdateBatchFillRatio(uint64_t instance_count) {
+  constexpr uint64_t kLogInterval = 1000;
+  auto batch_count = ++predict_batch_count_;
+  predict_instance_count_ += instance_count;
+  if (batch_count % kLogInterval == 0) {
+    MSI_LOG_INFO << "Model " << model_meta_.common_meta.model_key << " batch fill ratio: " << GetBatchFillRatio()
+                 << ", predict count: " << batch_count;
+  }
+}
+
+double PredictThread::GetBatchFillRatio() const {
+  uint64_t batch_count = predict_batch_count_;
+  if (batch_count == 0 || executor_info_.batch_size == 0) {
+    return 0.0;
+  }
+  return static_cast<double>(predict_instance_count_) / static_cast<double>(batch_count * executor_info_.batch_size);
+}
+
 void PredictThread::Stop() {
   task_que_.Stop();
   for (auto &predict_thread : predict_threads_) {
@@ -71,6 +90,12 @@ void PredictThread::Stop() {
       }
     }
   }
+  if (predict_batch_count_ > 0) {
+    MSI_LOG_INFO << "Model " << model_meta_.common_meta.model_key << " batch fill ratio: " << GetBatchFillRatio()
+                 << ", predict count: " << predict_batch_count_.load();
+    predict_batch_count_ = 0;
+    predict_instance_count_ = 0;
+  }
 }
 
 std::string PredictThread::AsGroupName(const std::string &model_key, uint64_t subgraph) const {
@@ -96,6 +121,11 @@ void PredictThread::Start(const std::string &que_name, const std::shared_ptr<Mod
     subgraph_info.input_infos = input_infos;
   }
   // init task infos
+  auto &batching_policy = model_meta.common_meta.batching_policy;
+  auto task_batch_size = batch_size;
+  if (batching_policy.max_batch_size > 0 && batching_policy.max_batch_size < batch_size) {
+    task_batch_size = batching_policy.max_batch_size;
+  }
   std::vector<TaskInfo> task_infos;
   for (uint64_t i = 0; i < graph_num; i++) {
     TaskInfo info;
@@ -103,14 +133,20 @@ void PredictThread::Start(const std::string &que_name, const std::shared_ptr<Mod
     info.subgraph = i;
     info.task_name = info.group_name;
     info.priority = 0;
-    info.batch_size = batch_size;
+    info.batch_size = task_batch_size;
+    info.max_queue_delay_us = batching_policy.max_queue_delay_us;
+    info.preferred_batch_sizes = batching_policy.preferred_batch_sizes;
     info.tag = "Model " + model_key + (graph_num > 1 ? " subgraph " + std::to_string(i) : "");
     task_infos.push_back(info);
   }
   task_que_.Start(que_name, task_infos, task_callback);  // start before predict_thread_ start
   bool support_pipeline_infer = model_meta.distributed_meta.enable_pipeline_infer &&
                                 (std::dynamic_pointer_cast<DistributedModelLoader>(model_loader) != nullptr);
-  size_t thread_num = support_pipeline_infer ? model_meta.distributed_meta.stage_size : 1;
+  // run concurrent predicts when pipeline inference is enabled or multiple model instances are loaded
+  size_t thread_num = support_pipeline_infer ? model_meta.distributed_meta.stage_size : model_loader->GetParallelNum();
+  if (thread_num == 0) {
+    thread_num = 1;
+  }
   for (size_t i = 0; i < thread_num; i++) {
     predict_threads_.emplace_back(ThreadFunc, this);
   }
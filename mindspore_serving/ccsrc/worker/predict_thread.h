@@ -51,6 +51,8 @@ class PredictThread {
   void Stop();
 
   uint64_t GetBatchSize() const { return executor_info_.batch_size; }
+  // average ratio of the instances count of one predict to the batch size of model
+  double GetBatchFillRatio() const;
 
  private:
   TaskQueue task_que_;
@@ -58,6 +60,8 @@ class PredictThread {
   ModelMeta model_meta_;
   std::shared_ptr<ModelLoaderBase> model_loader_ = nullptr;
   PredictModelInfo executor_info_;
+  std::atomic<uint64_t> predict_batch_count_ = 0;
+  std::atomic<uint64_t> predict_instance_count_ = 0;
 
   static void ThreadFunc(PredictThread *queue);
   void Predict();
@@ -67,6 +71,7 @@ class PredictThread {
                       std::vector<ResultInstance> *instance_result);
   Status CheckPredictInput(uint64_t subgraph, const InstancePtr &instance);
   std::string AsGroupName(const std::string &model_key, uint64_t subgraph) const;
+  void UpdateBatchFillRatio(uint64_t instance_count);
 };
 
 }  // namespace mindspore::serving
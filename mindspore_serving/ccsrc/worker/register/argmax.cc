@@ -14,74 +14,155 @@
  * limitations under the License.
  */
 
-#include "worker/stage_function.h"
-#include "mindspore_serving/ccsrc/common/tensor.h"
+#include <map>
+#include <memory>
+#include <string>
+#include <vector>
+#include "worker/register/stage_function_utils.h"
 
 namespace mindspore::serving {
-class ArgmaxStageFunc : public CppStageFunctionBase {
+// "argmax_cpp" returns the index of the max value of the flattened input, and "argmax_cpp(-1)" returns the indices
+// of the max values over the last axis
+class ArgmaxStageFunc : public ParallelStageFunctionBase {
  public:
-  template <typename DT>
-  void ArgmaxImp(const void *input, size_t *output, size_t data_size, size_t elemsize) {
-    auto count = data_size / elemsize;
-    auto data = reinterpret_cast<const DT *>(input);
-    *output = 0;
-    for (size_t i = 1; i < count; i++) {
-      if (data[i] > data[*output]) {
-        *output = i;
+  ArgmaxStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+  // the instances of one task are grouped by data type, and each group is processed by the kernel of its data type,
+  // which is dispatched once for the group rather than for every instance
+  void CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances,
+                 std::vector<ResultInstance> *results) override {
+    MSI_EXCEPTION_IF_NULL(results);
+    results->resize(instances.size());
+    bool last_axis = false;
+    auto status = ParseArgs(func_name, &last_axis);
+    if (status != SUCCESS) {
+      for (auto &result : *results) {
+        result.error_msg = status;
+      }
+      return;
+    }
+    std::map<DataType, std::vector<size_t>> type_indexes;
+    for (size_t i = 0; i < instances.size(); i++) {
+      auto &input = instances[i]->data;
+      if (input.size() != 1 || input[0] == nullptr) {
+        (*results)[i].error_msg = INFER_STATUS(FAILED) << "Argmax requires 1 input, but got " << input.size();
+        continue;
+      }
+      type_indexes[input[0]->data_type()].push_back(i);
+    }
+    for (auto &item : type_indexes) {
+      auto &indexes = item.second;
+      auto supported = DispatchNumericType(item.first, [&instances, &indexes, last_axis, results](auto value) {
+        ArgmaxBatch<decltype(value)>(instances, indexes, last_axis, results);
+      });
+      if (!supported) {
+        status = INFER_STATUS(FAILED) << "Argmax not support data type " << item.first;
+        for (auto index : indexes) {
+          (*results)[index].error_msg = status;
+        }
       }
     }
   }
 
-  Status Call(const std::string &, const InstanceData &input, InstanceData *output) override {
-    MSI_EXCEPTION_IF_NULL(output);
-    auto input_x = input[0];
-    auto x_data = input_x->data();
-    auto out_tensor = std::make_shared<Tensor>();
-    out_tensor->set_data_type(serving::kMSI_Int64);
-    (void)out_tensor->resize_data(sizeof(size_t));
-    out_tensor->set_shape({});
-    output->push_back(out_tensor);
-    auto y_data = reinterpret_cast<size_t *>(out_tensor->mutable_data());
-    switch (input_x->data_type()) {
-      case kMSI_Float32:
-        ArgmaxImp<float>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Float64:
-        ArgmaxImp<double>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Int8:
-        ArgmaxImp<int8_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Uint8:
-        ArgmaxImp<uint8_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Int16:
-        ArgmaxImp<int16_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Uint16:
-        ArgmaxImp<uint16_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Int32:
-        ArgmaxImp<int32_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Uint32:
-        ArgmaxImp<uint32_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Int64:
-        ArgmaxImp<int64_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      case kMSI_Uint64:
-        ArgmaxImp<uint64_t>(x_data, y_data, input_x->data_size(), input_x->itemsize());
-        break;
-      default:
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    bool last_axis = false;
+    auto status = ParseArgs(func_name, args, &last_axis);
+    if (status != SUCCESS) {
+      return status;
+    }
+    *func = [last_axis](const InstanceData &input, InstanceData *output) -> Status {
+      auto &input_x = input[0];
+      Status argmax_status;
+      auto supported =
+        DispatchNumericType(input_x->data_type(), [&input_x, last_axis, output, &argmax_status](auto value) {
+          argmax_status = Argmax<decltype(value)>(input_x, last_axis, output);
+        });
+      if (!supported) {
         return INFER_STATUS(FAILED) << "Argmax not support data type " << input_x->data_type();
+      }
+      return argmax_status;
+    };
+    return SUCCESS;
+  }
+
+ private:
+  static Status ParseArgs(const std::string &func_name, const std::vector<std::string> &args, bool *last_axis) {
+    if (!args.empty() && (args.size() != 1 || args[0] != "-1")) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', usage: argmax_cpp or argmax_cpp(-1)";
     }
+    *last_axis = !args.empty();
     return SUCCESS;
   }
 
-  size_t GetInputsCount(const std::string &) const override { return 1; }
+  static Status ParseArgs(const std::string &func_name, bool *last_axis) {
+    std::string base_name;
+    std::vector<std::string> args;
+    if (!CppStageFunctionStorage::ParseFunctionName(func_name, &base_name, &args)) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function name '" << func_name
+                                            << "', the arguments should be in the format of 'name(arg1, arg2, ...)'";
+    }
+    return ParseArgs(func_name, args, last_axis);
+  }
 
-  size_t GetOutputsCount(const std::string &) const override { return 1; }
+  // find the max value by a branchless reduction which can be vectorized by compiler, then find its first index
+  template <typename DT>
+  static int64_t ArgmaxImp(const DT *data, size_t count) {
+    if (count == 0) {
+      return 0;
+    }
+    DT max_value = data[0];
+    for (size_t i = 1; i < count; i++) {
+      max_value = data[i] > max_value ? data[i] : max_value;
+    }
+    for (size_t i = 0; i < count; i++) {
+      if (data[i] == max_value) {
+        return static_cast<int64_t>(i);
+      }
+    }
+    return 0;  // the first value is NaN
+  }
+
+  template <typename DT>
+  static Status Argmax(const TensorBasePtr &input_x, bool last_axis, InstanceData *output) {
+    auto data = reinterpret_cast<const DT *>(input_x->data());
+    auto count = input_x->data_size() / sizeof(DT);
+    if (!last_axis) {
+      auto y = ArgmaxImp(data, count);
+      output->push_back(std::make_shared<Tensor>(kMSI_Int64, std::vector<int64_t>(), &y, sizeof(y)));
+      return SUCCESS;
+    }
+    auto shape = input_x->shape();
+    if (shape.empty() || shape.back() <= 0 || count % static_cast<size_t>(shape.back()) != 0) {
+      return INFER_STATUS(FAILED) << "Argmax over the last axis not support input shape " << shape;
+    }
+    auto cols = static_cast<size_t>(shape.back());
+    shape.pop_back();
+    auto result = CreateOutputTensor(kMSI_Int64, shape);
+    auto dst = reinterpret_cast<int64_t *>(result->mutable_data());
+    for (size_t row = 0; row < count / cols; row++) {
+      dst[row] = ArgmaxImp(data + row * cols, cols);
+    }
+    output->push_back(result);
+    return SUCCESS;
+  }
+
+  template <typename DT>
+  static void ArgmaxBatch(const std::vector<InstancePtr> &instances, const std::vector<size_t> &indexes,
+                          bool last_axis, std::vector<ResultInstance> *results) {
+    for (auto index : indexes) {
+      auto &result = (*results)[index];
+      auto status = CallInstanceNoThrow([&instances, index, last_axis, &result]() {
+        return Argmax<DT>(instances[index]->data[0], last_axis, &result.data);
+      });
+      if (status != SUCCESS) {
+        result.data.clear();
+        result.error_msg = status;
+      }
+    }
+  }
 };
 
 REGISTER_STAGE_FUNCTION(ArgmaxStageFunc, "argmax_cpp")
@@ -0,0 +1,206 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "worker/register/image_decoder.h"
+#include <dlfcn.h>
+#include <vector>
+#include "worker/register/stage_function_utils.h"
+
+namespace mindspore::serving {
+namespace {
+constexpr auto kJpegLibName = "libturbojpeg.so.0";
+constexpr auto kPngLibName = "libpng16.so.16";
+constexpr int kTjPixelFormatRGB = 0;
+constexpr uint32_t kPngImageVersion = 1;
+constexpr uint32_t kPngFormatRGB = 2;
+constexpr size_t kPngMessageSize = 64;
+constexpr int64_t kRGBChannels = 3;
+
+// the same layout as png_image of the simplified API of libpng 1.6
+struct PngImage {
+  void *opaque;
+  uint32_t version;
+  uint32_t width;
+  uint32_t height;
+  uint32_t format;
+  uint32_t flags;
+  uint32_t colormap_entries;
+  uint32_t warning_or_error;
+  char message[kPngMessageSize];
+};
+
+std::string GetDlError() {
+  auto error = dlerror();
+  if (error == nullptr) {
+    return std::string();
+  }
+  return error;
+}
+
+bool IsJpeg(const uint8_t *data, size_t data_size) {
+  return data_size >= 3 && data[0] == 0xFF && data[1] == 0xD8 && data[2] == 0xFF;
+}
+
+bool IsPng(const uint8_t *data, size_t data_size) {
+  const uint8_t png_signature[] = {0x89, 'P', 'N', 'G', '\r', '\n', 0x1A, '\n'};
+  if (data_size < sizeof(png_signature)) {
+    return false;
+  }
+  for (size_t i = 0; i < sizeof(png_signature); i++) {
+    if (data[i] != png_signature[i]) {
+      return false;
+    }
+  }
+  return true;
+}
+
+template <class FuncType>
+Status LoadSymbol(void *handle, const std::string &lib_name, const std::string &symbol, FuncType *func) {
+  *func = reinterpret_cast<FuncType>(dlsym(handle, symbol.c_str()));
+  if (*func == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "dlsym " << symbol << " failed, lib name: " << lib_name
+                                          << ", dlopen error: " << GetDlError();
+  }
+  return SUCCESS;
+}
+
+Status CheckImagePixels(const std::string &format, int64_t height, int64_t width, int64_t max_pixels) {
+  if (height * width > max_pixels) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "The " << format << " image of height " << height << " and width "
+                                          << width << " has more pixels than the limit " << max_pixels;
+  }
+  return SUCCESS;
+}
+}  // namespace
+
+ImageDecoder &ImageDecoder::Instance() {
+  static ImageDecoder instance;
+  return instance;
+}
+
+Status ImageDecoder::Decode(const uint8_t *data, size_t data_size, int64_t max_pixels, TensorBasePtr *output) {
+  MSI_EXCEPTION_IF_NULL(output);
+  if (data == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "The image data is empty";
+  }
+  if (IsJpeg(data, data_size)) {
+    std::call_once(jpeg_once_flag_, [this]() { jpeg_load_status_ = LoadJpegLib(); });
+    if (jpeg_load_status_ != SUCCESS) {
+      return jpeg_load_status_;
+    }
+    return DecodeJpeg(data, data_size, max_pixels, output);
+  }
+  if (IsPng(data, data_size)) {
+    std::call_once(png_once_flag_, [this]() { png_load_status_ = LoadPngLib(); });
+    if (png_load_status_ != SUCCESS) {
+      return png_load_status_;
+    }
+    return DecodePng(data, data_size, max_pixels, output);
+  }
+  return INFER_STATUS_LOG_ERROR(FAILED) << "Unsupported image format, only JPEG and PNG are supported";
+}
+
+Status ImageDecoder::LoadJpegLib() {
+  // the library is not closed, since it is used until the process exits
+  auto handle = dlopen(kJpegLibName, RTLD_NOW | RTLD_LOCAL);
+  if (handle == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "dlopen " << kJpegLibName
+                                          << " failed, please install libjpeg-turbo to decode JPEG images, "
+                                          << "dlopen error: " << GetDlError();
+  }
+  Status status;
+  if ((status = LoadSymbol(handle, kJpegLibName, "tjInitDecompress", &tj_init_decompress_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kJpegLibName, "tjDecompressHeader3", &tj_decompress_header3_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kJpegLibName, "tjDecompress2", &tj_decompress2_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kJpegLibName, "tjDestroy", &tj_destroy_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kJpegLibName, "tjGetErrorStr2", &tj_get_error_str2_)) != SUCCESS) {
+    return status;
+  }
+  MSI_LOG_INFO << "Load " << kJpegLibName << " successful";
+  return SUCCESS;
+}
+
+Status ImageDecoder::LoadPngLib() {
+  auto handle = dlopen(kPngLibName, RTLD_NOW | RTLD_LOCAL);
+  if (handle == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "dlopen " << kPngLibName
+                                          << " failed, please install libpng 1.6 to decode PNG images, "
+                                          << "dlopen error: " << GetDlError();
+  }
+  Status status;
+  if ((status = LoadSymbol(handle, kPngLibName, "png_image_begin_read_from_memory",
+                           &png_image_begin_read_from_memory_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kPngLibName, "png_image_finish_read", &png_image_finish_read_)) != SUCCESS ||
+      (status = LoadSymbol(handle, kPngLibName, "png_image_free", &png_image_free_)) != SUCCESS) {
+    return status;
+  }
+  MSI_LOG_INFO << "Load " << kPngLibName << " successful";
+  return SUCCESS;
+}
+
+Status ImageDecoder::DecodeJpeg(const uint8_t *data, size_t data_size, int64_t max_pixels,
+                                TensorBasePtr *output) {
+  // the error of tjInitDecompress is got by tjGetErrorStr2 with a null handle
+  auto handle = tj_init_decompress_();
+  if (handle == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Decode JPEG image failed: " << tj_get_error_str2_(nullptr);
+  }
+  int width = 0;
+  int height = 0;
+  int subsamp = 0;
+  int colorspace = 0;
+  Status status;
+  if (tj_decompress_header3_(handle, data, data_size, &width, &height, &subsamp, &colorspace) != 0 || width <= 0 ||
+      height <= 0) {
+    status = INFER_STATUS_LOG_ERROR(FAILED) << "Decode JPEG image header failed: " << tj_get_error_str2_(handle);
+  } else if ((status = CheckImagePixels("JPEG", height, width, max_pixels)) == SUCCESS) {
+    auto tensor = CreateOutputTensor(kMSI_Uint8, {height, width, kRGBChannels});
+    if (tj_decompress2_(handle, data, data_size, tensor->mutable_data(), width, 0, height, kTjPixelFormatRGB, 0) !=
+        0) {
+      status = INFER_STATUS_LOG_ERROR(FAILED) << "Decode JPEG image failed: " << tj_get_error_str2_(handle);
+    } else {
+      *output = tensor;
+    }
+  }
+  (void)tj_destroy_(handle);
+  return status;
+}
+
+Status ImageDecoder::DecodePng(const uint8_t *data, size_t data_size, int64_t max_pixels, TensorBasePtr *output) {
+  PngImage image{};
+  image.version = kPngImageVersion;
+  if (png_image_begin_read_from_memory_(&image, data, data_size) == 0) {
+    png_image_free_(&image);
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Decode PNG image header failed: " << image.message;
+  }
+  auto status = CheckImagePixels("PNG", image.height, image.width, max_pixels);
+  if (status != SUCCESS) {
+    png_image_free_(&image);
+    return status;
+  }
+  // convert to 8 bits RGB, the alpha channel is removed by composing on black background
+  image.format = kPngFormatRGB;
+  auto tensor = CreateOutputTensor(
+    kMSI_Uint8, {static_cast<int64_t>(image.height), static_cast<int64_t>(image.width), kRGBChannels});
+  if (png_image_finish_read_(&image, nullptr, tensor->mutable_data(), 0, nullptr) == 0) {
+    png_image_free_(&image);
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Decode PNG image failed: " << image.message;
+  }
+  png_image_free_(&image);
+  *output = tensor;
+  return SUCCESS;
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,72 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_WORKER_REGISTER_IMAGE_DECODER_H
+#define MINDSPORE_SERVING_WORKER_REGISTER_IMAGE_DECODER_H
+
+#include <mutex>
+#include <string>
+#include "common/serving_common.h"
+
+namespace mindspore::serving {
+// the default maximum pixels count of one decoded image, 8192 * 8192 pixels take 192MB in uint8 RGB
+constexpr int64_t kDefaultMaxImagePixels = 8192 * 8192;
+
+// Decode JPEG and PNG images to uint8 RGB images in HWC layout. libturbojpeg and libpng16 are loaded by dlopen when
+// they are used the first time, so that they are optional dependencies of the image decode stage only.
+class ImageDecoder {
+ public:
+  static ImageDecoder &Instance();
+
+  // images whose width * height is greater than max_pixels are rejected before the output is allocated
+  Status Decode(const uint8_t *data, size_t data_size, int64_t max_pixels, TensorBasePtr *output);
+
+ private:
+  using TjInitDecompressFunc = void *(*)();
+  using TjDecompressHeader3Func = int (*)(void *handle, const uint8_t *jpeg_buf, unsigned long jpeg_size,  // NOLINT
+                                          int *width, int *height, int *jpeg_subsamp, int *jpeg_colorspace);
+  using TjDecompress2Func = int (*)(void *handle, const uint8_t *jpeg_buf, unsigned long jpeg_size,  // NOLINT
+                                    uint8_t *dst_buf, int width, int pitch, int height, int pixel_format, int flags);
+  using TjDestroyFunc = int (*)(void *handle);
+  using TjGetErrorStr2Func = char *(*)(void *handle);
+
+  using PngImageBeginReadFromMemoryFunc = int (*)(void *image, const void *memory, size_t size);
+  using PngImageFinishReadFunc = int (*)(void *image, const void *background, void *buffer, int32_t row_stride,
+                                         void *colormap);
+  using PngImageFreeFunc = void (*)(void *image);
+
+  std::once_flag jpeg_once_flag_;
+  Status jpeg_load_status_;
+  TjInitDecompressFunc tj_init_decompress_ = nullptr;
+  TjDecompressHeader3Func tj_decompress_header3_ = nullptr;
+  TjDecompress2Func tj_decompress2_ = nullptr;
+  TjDestroyFunc tj_destroy_ = nullptr;
+  TjGetErrorStr2Func tj_get_error_str2_ = nullptr;
+
+  std::once_flag png_once_flag_;
+  Status png_load_status_;
+  PngImageBeginReadFromMemoryFunc png_image_begin_read_from_memory_ = nullptr;
+  PngImageFinishReadFunc png_image_finish_read_ = nullptr;
+  PngImageFreeFunc png_image_free_ = nullptr;
+
+  Status LoadJpegLib();
+  Status LoadPngLib();
+  Status DecodeJpeg(const uint8_t *data, size_t data_size, int64_t max_pixels, TensorBasePtr *output);
+  Status DecodePng(const uint8_t *data, size_t data_size, int64_t max_pixels, TensorBasePtr *output);
+};
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_WORKER_REGISTER_IMAGE_DECODER_H
@@ -0,0 +1,437 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <vector>
+#include "worker/register/stage_function_utils.h"
+#include "worker/register/image_decoder.h"
+
+namespace mindspore::serving {
+namespace {
+constexpr size_t kHWCRank = 3;
+constexpr size_t kHWRank = 2;
+constexpr size_t kHeightIndex = 0;
+constexpr size_t kWidthIndex = 1;
+constexpr size_t kChannelIndex = 2;
+
+// the image should be in layout HWC or HW
+Status CheckImage(const std::string &func_name, const TensorBasePtr &image, int64_t *height, int64_t *width,
+                  int64_t *channels) {
+  auto shape = image->shape();
+  if (image->is_bytes_val_data() || (shape.size() != kHWCRank && shape.size() != kHWRank)) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be an image in layout HWC or HW, now shape "
+                                          << shape << " data type " << image->data_type();
+  }
+  *height = shape[kHeightIndex];
+  *width = shape[kWidthIndex];
+  *channels = shape.size() == kHWCRank ? shape[kChannelIndex] : 1;
+  if (*height <= 0 || *width <= 0 || *channels <= 0 ||
+      image->data_size() != static_cast<size_t>(*height * *width * *channels) * image->itemsize()) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input image is invalid, shape " << shape << " data size "
+                                          << image->data_size();
+  }
+  return SUCCESS;
+}
+
+std::vector<int64_t> ImageShape(const std::vector<int64_t> &src_shape, int64_t height, int64_t width) {
+  auto shape = src_shape;
+  shape[kHeightIndex] = height;
+  shape[kWidthIndex] = width;
+  return shape;
+}
+}  // namespace
+
+// decode JPEG or PNG image to uint8 RGB image in layout HWC, images with more pixels than max_pixels are rejected
+class DecodeImageStageFunc : public ParallelStageFunctionBase {
+ public:
+  DecodeImageStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<int64_t> values;
+    if (args.size() > 1 || !ParseIntArgs(args, &values) || (!values.empty() && values[0] <= 0)) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', usage: decode_image_cpp or decode_image_cpp(max_pixels), "
+                                            << "max_pixels should be a positive integer";
+    }
+    auto max_pixels = values.empty() ? kDefaultMaxImagePixels : values[0];
+    *func = [func_name, max_pixels](const InstanceData &input, InstanceData *output) -> Status {
+      auto &image = input[0];
+      if (!image->is_bytes_val_data() || image->bytes_data_size() != 1) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be bytes of one image";
+      }
+      const uint8_t *data = nullptr;
+      size_t data_size = 0;
+      image->get_bytes_data(0, &data, &data_size);
+      TensorBasePtr decoded;
+      auto status = ImageDecoder::Instance().Decode(data, data_size, max_pixels, &decoded);
+      if (status != SUCCESS) {
+        return status;
+      }
+      output->push_back(decoded);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// resize uint8 or float32 image in layout HWC or HW by bilinear interpolation with half pixel centers
+class ResizeStageFunc : public ParallelStageFunctionBase {
+ public:
+  ResizeStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<int64_t> size;
+    if (CheckArgsCount(func_name, args, 2, "resize_cpp(height, width)") != SUCCESS || !ParseIntArgs(args, &size) ||
+        size[0] <= 0 || size[1] <= 0) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', the height and width should be positive integers";
+    }
+    auto dst_height = size[0];
+    auto dst_width = size[1];
+    *func = [func_name, dst_height, dst_width](const InstanceData &input, InstanceData *output) -> Status {
+      auto &image = input[0];
+      int64_t height = 0;
+      int64_t width = 0;
+      int64_t channels = 0;
+      auto status = CheckImage(func_name, image, &height, &width, &channels);
+      if (status != SUCCESS) {
+        return status;
+      }
+      auto result = CreateOutputTensor(image->data_type(), ImageShape(image->shape(), dst_height, dst_width));
+      if (image->data_type() == kMSI_Uint8) {
+        Resize<uint8_t>(image->data(), height, width, channels, result->mutable_data(), dst_height, dst_width);
+      } else if (image->data_type() == kMSI_Float32) {
+        Resize<float>(image->data(), height, width, channels, result->mutable_data(), dst_height, dst_width);
+      } else {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " only support uint8 and float32 image, now "
+                                              << image->data_type();
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+
+ private:
+  static void LinearCoeffs(int64_t src_size, int64_t dst_size, std::vector<int64_t> *index0,
+                           std::vector<int64_t> *index1, std::vector<float> *weight) {
+    index0->resize(dst_size);
+    index1->resize(dst_size);
+    weight->resize(dst_size);
+    auto scale = static_cast<float>(src_size) / static_cast<float>(dst_size);
+    for (int64_t i = 0; i < dst_size; i++) {
+      auto src = std::max((static_cast<float>(i) + 0.5f) * scale - 0.5f, 0.0f);
+      auto left = std::min(static_cast<int64_t>(src), src_size - 1);
+      (*index0)[i] = left;
+      (*index1)[i] = std::min(left + 1, src_size - 1);
+      (*weight)[i] = src - static_cast<float>(left);
+    }
+  }
+
+  template <class T>
+  static T CastPixel(float value) {
+    if constexpr (std::is_same_v<T, uint8_t>) {
+      return static_cast<uint8_t>(std::clamp(value + 0.5f, 0.0f, 255.0f));
+    } else {
+      return static_cast<T>(value);
+    }
+  }
+
+  template <class T>
+  static void Resize(const void *src_data, int64_t height, int64_t width, int64_t channels, void *dst_data,
+                     int64_t dst_height, int64_t dst_width) {
+    auto src = static_cast<const T *>(src_data);
+    auto dst = static_cast<T *>(dst_data);
+    std::vector<int64_t> x0, x1, y0, y1;
+    std::vector<float> wx, wy;
+    LinearCoeffs(width, dst_width, &x0, &x1, &wx);
+    LinearCoeffs(height, dst_height, &y0, &y1, &wy);
+    auto src_row_size = width * channels;
+    for (int64_t y = 0; y < dst_height; y++) {
+      auto row0 = src + y0[y] * src_row_size;
+      auto row1 = src + y1[y] * src_row_size;
+      auto dst_row = dst + y * dst_width * channels;
+      for (int64_t x = 0; x < dst_width; x++) {
+        auto left = x0[x] * channels;
+        auto right = x1[x] * channels;
+        for (int64_t c = 0; c < channels; c++) {
+          auto top = static_cast<float>(row0[left + c]) +
+                     (static_cast<float>(row0[right + c]) - static_cast<float>(row0[left + c])) * wx[x];
+          auto bottom = static_cast<float>(row1[left + c]) +
+                        (static_cast<float>(row1[right + c]) - static_cast<float>(row1[left + c])) * wx[x];
+          dst_row[x * channels + c] = CastPixel<T>(top + (bottom - top) * wy[y]);
+        }
+      }
+    }
+  }
+};
+
+// crop image in layout HWC or HW
+Status CropImage(const std::string &func_name, const TensorBasePtr &image, int64_t top, int64_t left,
+                 int64_t crop_height, int64_t crop_width, InstanceData *output) {
+  int64_t height = 0;
+  int64_t width = 0;
+  int64_t channels = 0;
+  auto status = CheckImage(func_name, image, &height, &width, &channels);
+  if (status != SUCCESS) {
+    return status;
+  }
+  if (top < 0 || left < 0 || top + crop_height > height || left + crop_width > width) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " crop region is out of the image, image height " << height
+                                          << " width " << width;
+  }
+  auto result = CreateOutputTensor(image->data_type(), ImageShape(image->shape(), crop_height, crop_width));
+  auto pixel_size = static_cast<size_t>(channels) * image->itemsize();
+  auto src_row_size = static_cast<size_t>(width) * pixel_size;
+  auto dst_row_size = static_cast<size_t>(crop_width) * pixel_size;
+  auto src = image->data() + static_cast<size_t>(top) * src_row_size + static_cast<size_t>(left) * pixel_size;
+  auto dst = result->mutable_data();
+  for (int64_t y = 0; y < crop_height; y++) {
+    (void)memcpy(dst + static_cast<size_t>(y) * dst_row_size, src + static_cast<size_t>(y) * src_row_size,
+                 dst_row_size);
+  }
+  output->push_back(result);
+  return SUCCESS;
+}
+
+class CropStageFunc : public ParallelStageFunctionBase {
+ public:
+  CropStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<int64_t> region;
+    if (CheckArgsCount(func_name, args, 4, "crop_cpp(top, left, height, width)") != SUCCESS ||
+        !ParseIntArgs(args, &region) || region[0] < 0 || region[1] < 0 || region[2] <= 0 || region[3] <= 0) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', the top and left should be non-negative integers, and the height "
+                                               "and width should be positive integers";
+    }
+    *func = [func_name, region](const InstanceData &input, InstanceData *output) -> Status {
+      return CropImage(func_name, input[0], region[0], region[1], region[2], region[3], output);
+    };
+    return SUCCESS;
+  }
+};
+
+class CenterCropStageFunc : public ParallelStageFunctionBase {
+ public:
+  CenterCropStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<int64_t> size;
+    if (CheckArgsCount(func_name, args, 2, "center_crop_cpp(height, width)") != SUCCESS ||
+        !ParseIntArgs(args, &size) || size[0] <= 0 || size[1] <= 0) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', the height and width should be positive integers";
+    }
+    *func = [func_name, size](const InstanceData &input, InstanceData *output) -> Status {
+      auto shape = input[0]->shape();
+      if (shape.size() < kHWRank) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be an image in layout HWC or HW";
+      }
+      auto top = (shape[kHeightIndex] - size[0]) / 2;
+      auto left = (shape[kWidthIndex] - size[1]) / 2;
+      return CropImage(func_name, input[0], top, left, size[0], size[1], output);
+    };
+    return SUCCESS;
+  }
+};
+
+// (image - mean) / std for each channel of image in layout HWC or HW, the output is float32
+class NormalizeStageFunc : public ParallelStageFunctionBase {
+ public:
+  NormalizeStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<float> values;
+    if (args.empty() || args.size() % 2 != 0 || !ParseFloatArgs(args, &values)) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', usage: normalize_cpp(mean0, mean1, ..., std0, std1, ...)";
+    }
+    auto channels = values.size() / 2;
+    std::vector<float> mean(values.begin(), values.begin() + static_cast<ptrdiff_t>(channels));
+    std::vector<float> scale;
+    for (size_t i = channels; i < values.size(); i++) {
+      if (values[i] == 0) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name << "', the std cannot be 0";
+      }
+      scale.push_back(1.0f / values[i]);
+    }
+    *func = [func_name, mean, scale](const InstanceData &input, InstanceData *output) -> Status {
+      auto &image = input[0];
+      int64_t height = 0;
+      int64_t width = 0;
+      int64_t channels = 0;
+      auto status = CheckImage(func_name, image, &height, &width, &channels);
+      if (status != SUCCESS) {
+        return status;
+      }
+      if (static_cast<size_t>(channels) != mean.size()) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " image channels " << channels
+                                              << " not equal to the count of mean " << mean.size();
+      }
+      auto result = CreateOutputTensor(kMSI_Float32, image->shape());
+      auto dst = reinterpret_cast<float *>(result->mutable_data());
+      auto pixel_count = height * width;
+      auto normalize = [&](auto type) {
+        using T = decltype(type);
+        auto src = reinterpret_cast<const T *>(image->data());
+        for (int64_t i = 0; i < pixel_count; i++) {
+          for (int64_t c = 0; c < channels; c++) {
+            dst[i * channels + c] = (static_cast<float>(src[i * channels + c]) - mean[c]) * scale[c];
+          }
+        }
+      };
+      if (!DispatchNumericType(image->data_type(), normalize)) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " not support data type " << image->data_type();
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// transpose image from layout HWC to CHW
+class HWC2CHWStageFunc : public ParallelStageFunctionBase {
+ public:
+  HWC2CHWStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    auto status = CheckArgsCount(func_name, args, 0, "hwc2chw_cpp");
+    if (status != SUCCESS) {
+      return status;
+    }
+    *func = [func_name](const InstanceData &input, InstanceData *output) -> Status {
+      auto &image = input[0];
+      int64_t height = 0;
+      int64_t width = 0;
+      int64_t channels = 0;
+      auto status = CheckImage(func_name, image, &height, &width, &channels);
+      if (status != SUCCESS) {
+        return status;
+      }
+      if (image->shape().size() != kHWCRank) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be an image in layout HWC";
+      }
+      auto result = CreateOutputTensor(image->data_type(), {channels, height, width});
+      switch (image->itemsize()) {
+        case sizeof(uint8_t):
+          Transpose<uint8_t>(image->data(), height * width, channels, result->mutable_data());
+          break;
+        case sizeof(uint16_t):
+          Transpose<uint16_t>(image->data(), height * width, channels, result->mutable_data());
+          break;
+        case sizeof(uint32_t):
+          Transpose<uint32_t>(image->data(), height * width, channels, result->mutable_data());
+          break;
+        case sizeof(uint64_t):
+          Transpose<uint64_t>(image->data(), height * width, channels, result->mutable_data());
+          break;
+        default:
+          return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " not support data type " << image->data_type();
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+
+ private:
+  template <class T>
+  static void Transpose(const void *src_data, int64_t pixel_count, int64_t channels, void *dst_data) {
+    auto src = static_cast<const T *>(src_data);
+    auto dst = static_cast<T *>(dst_data);
+    for (int64_t c = 0; c < channels; c++) {
+      auto dst_plane = dst + c * pixel_count;
+      for (int64_t i = 0; i < pixel_count; i++) {
+        dst_plane[i] = src[i * channels + c];
+      }
+    }
+  }
+};
+
+// cast tensor to the data type, such as cast_cpp(float32)
+class CastStageFunc : public ParallelStageFunctionBase {
+ public:
+  CastStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    auto dst_type = args.size() == 1 ? ParseDataType(args[0]) : kMSI_Unknown;
+    if (dst_type == kMSI_Unknown || dst_type == kMSI_Float16) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', usage: cast_cpp(data_type), data_type can be bool, int8, int16, "
+                                               "int32, int64, uint8, uint16, uint32, uint64, float32 or float64";
+    }
+    *func = [func_name, dst_type](const InstanceData &input, InstanceData *output) -> Status {
+      auto &tensor = input[0];
+      if (tensor->data_type() == dst_type) {
+        output->push_back(tensor);
+        return SUCCESS;
+      }
+      auto result = CreateOutputTensor(dst_type, tensor->shape());
+      auto element_cnt = result->data_size() / result->itemsize();
+      if (tensor->is_bytes_val_data() || tensor->data_size() != element_cnt * tensor->itemsize()) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input is invalid, shape " << tensor->shape()
+                                              << " data type " << tensor->data_type();
+      }
+      bool src_supported = false;
+      auto cast = [&](auto src_type) {
+        using SrcT = decltype(src_type);
+        src_supported = true;
+        auto src = reinterpret_cast<const SrcT *>(tensor->data());
+        (void)DispatchNumericType(dst_type, [&](auto dst_type_value) {
+          using DstT = decltype(dst_type_value);
+          auto dst = reinterpret_cast<DstT *>(result->mutable_data());
+          for (size_t i = 0; i < element_cnt; i++) {
+            dst[i] = static_cast<DstT>(src[i]);
+          }
+        });
+      };
+      if (!DispatchNumericType(tensor->data_type(), cast) || !src_supported) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " not support data type " << tensor->data_type();
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+REGISTER_STAGE_FUNCTION(DecodeImageStageFunc, "decode_image_cpp")
+REGISTER_STAGE_FUNCTION(ResizeStageFunc, "resize_cpp")
+REGISTER_STAGE_FUNCTION(CropStageFunc, "crop_cpp")
+REGISTER_STAGE_FUNCTION(CenterCropStageFunc, "center_crop_cpp")
+REGISTER_STAGE_FUNCTION(NormalizeStageFunc, "normalize_cpp")
+REGISTER_STAGE_FUNCTION(HWC2CHWStageFunc, "hwc2chw_cpp")
+REGISTER_STAGE_FUNCTION(CastStageFunc, "cast_cpp")
+}  // namespace mindspore::serving
@@ -0,0 +1,473 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+
+#include <algorithm>
+#include <cmath>
+#include <numeric>
+#include <type_traits>
+#include <vector>
+#include "worker/register/stage_function_utils.h"
+
+namespace mindspore::serving {
+namespace {
+constexpr size_t kBoxSize = 4;
+
+// the input should be a numeric tensor whose last axis is not empty, it is viewed as 'rows' rows of 'cols' values
+Status CheckLastAxis(const std::string &func_name, const TensorBasePtr &tensor, int64_t *rows, int64_t *cols) {
+  auto shape = tensor->shape();
+  if (tensor->is_bytes_val_data() || tensor->data_type() == kMSI_Float16 || shape.empty() || shape.back() <= 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be a numeric tensor whose rank >= 1 and "
+                                          << "last dim > 0, now shape " << shape << " data type "
+                                          << tensor->data_type();
+  }
+  int64_t element_cnt = 1;
+  for (auto dim : shape) {
+    element_cnt *= dim;
+  }
+  if (element_cnt < 0 || tensor->data_size() != static_cast<size_t>(element_cnt) * tensor->itemsize()) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input is invalid, shape " << shape << " data size "
+                                          << tensor->data_size();
+  }
+  *cols = shape.back();
+  *rows = element_cnt / *cols;
+  return SUCCESS;
+}
+
+// NaN is less than any other values, so that it is never selected before valid values
+template <class T>
+bool ValueGreater(T left, T right) {
+  if constexpr (std::is_floating_point_v<T>) {
+    if (std::isnan(left)) {
+      return false;
+    }
+    if (std::isnan(right)) {
+      return true;
+    }
+  }
+  return left > right;
+}
+
+// sort the indices of the first k max values of one row in descending order, the smaller index is the first in ties
+template <class T>
+void TopkIndices(const T *data, int64_t cols, int64_t k, std::vector<int64_t> *indices) {
+  indices->resize(static_cast<size_t>(cols));
+  std::iota(indices->begin(), indices->end(), 0);
+  std::partial_sort(indices->begin(), indices->begin() + k, indices->end(), [data](int64_t left, int64_t right) {
+    return ValueGreater(data[left], data[right]) || (!ValueGreater(data[right], data[left]) && left < right);
+  });
+}
+
+Status ParseTopk(const std::string &func_name, const std::string &arg, const std::string &usage, int64_t *k) {
+  std::vector<int64_t> values;
+  if (!ParseIntArgs({arg}, &values) || values[0] <= 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name << "', usage: " << usage
+                                          << ", k should be a positive integer";
+  }
+  *k = values[0];
+  return SUCCESS;
+}
+
+Status ToFloatVector(const std::string &func_name, const TensorBasePtr &tensor, std::vector<float> *values) {
+  if (tensor->is_bytes_val_data()) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be a numeric tensor, now data type "
+                                          << tensor->data_type();
+  }
+  auto count = tensor->data_size() / tensor->itemsize();
+  auto converted = DispatchNumericType(tensor->data_type(), [&tensor, values, count](auto type) {
+    auto data = reinterpret_cast<const decltype(type) *>(tensor->data());
+    values->assign(data, data + count);
+  });
+  if (!converted) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " not support data type " << tensor->data_type();
+  }
+  return SUCCESS;
+}
+
+template <class ActivationFunc>
+Status Activation(const std::string &func_name, const TensorBasePtr &input, ActivationFunc activation,
+                  TensorBasePtr *output) {
+  int64_t rows = 0;
+  int64_t cols = 0;
+  auto status = CheckLastAxis(func_name, input, &rows, &cols);
+  if (status != SUCCESS) {
+    return status;
+  }
+  auto result = CreateOutputTensor(kMSI_Float32, input->shape());
+  auto dst = reinterpret_cast<float *>(result->mutable_data());
+  (void)DispatchNumericType(input->data_type(), [&input, dst, rows, cols, activation](auto type) {
+    auto src = reinterpret_cast<const decltype(type) *>(input->data());
+    for (int64_t row = 0; row < rows; row++) {
+      activation(src + row * cols, cols, dst + row * cols);
+    }
+  });
+  *output = result;
+  return SUCCESS;
+}
+
+template <class T>
+void SoftmaxRow(const T *src, int64_t cols, float *dst) {
+  auto max_value = static_cast<float>(src[0]);
+  for (int64_t i = 1; i < cols; i++) {
+    max_value = std::max(max_value, static_cast<float>(src[i]));
+  }
+  float sum = 0;
+  for (int64_t i = 0; i < cols; i++) {
+    dst[i] = std::exp(static_cast<float>(src[i]) - max_value);
+    sum += dst[i];
+  }
+  for (int64_t i = 0; i < cols; i++) {
+    dst[i] /= sum;
+  }
+}
+
+template <class T>
+void SigmoidRow(const T *src, int64_t cols, float *dst) {
+  for (int64_t i = 0; i < cols; i++) {
+    dst[i] = 1.0f / (1.0f + std::exp(-static_cast<float>(src[i])));
+  }
+}
+
+const auto kSoftmaxFunc = [](auto src, int64_t cols, float *dst) { SoftmaxRow(src, cols, dst); };
+const auto kSigmoidFunc = [](auto src, int64_t cols, float *dst) { SigmoidRow(src, cols, dst); };
+}  // namespace
+
+// softmax over the last axis, the output is float32
+class SoftmaxStageFunc : public ParallelStageFunctionBase {
+ public:
+  SoftmaxStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    auto status = CheckArgsCount(func_name, args, 0, "softmax_cpp");
+    if (status != SUCCESS) {
+      return status;
+    }
+    *func = [func_name](const InstanceData &input, InstanceData *output) -> Status {
+      TensorBasePtr result;
+      auto status = Activation(func_name, input[0], kSoftmaxFunc, &result);
+      if (status != SUCCESS) {
+        return status;
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// element-wise sigmoid, the output is float32
+class SigmoidStageFunc : public ParallelStageFunctionBase {
+ public:
+  SigmoidStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    auto status = CheckArgsCount(func_name, args, 0, "sigmoid_cpp");
+    if (status != SUCCESS) {
+      return status;
+    }
+    *func = [func_name](const InstanceData &input, InstanceData *output) -> Status {
+      TensorBasePtr result;
+      auto status = Activation(func_name, input[0], kSigmoidFunc, &result);
+      if (status != SUCCESS) {
+        return status;
+      }
+      output->push_back(result);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// element-wise sigmoid and the bool mask of the probabilities >= threshold, for multi-label classification
+class SigmoidThresholdStageFunc : public ParallelStageFunctionBase {
+ public:
+  SigmoidThresholdStageFunc() : ParallelStageFunctionBase(1, 2) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<float> values;
+    if (CheckArgsCount(func_name, args, 1, "sigmoid_threshold_cpp(threshold)") != SUCCESS ||
+        !ParseFloatArgs(args, &values) || !(values[0] >= 0 && values[0] <= 1)) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', the threshold should be a float in range [0, 1]";
+    }
+    auto threshold = values[0];
+    *func = [func_name, threshold](const InstanceData &input, InstanceData *output) -> Status {
+      TensorBasePtr probs;
+      auto status = Activation(func_name, input[0], kSigmoidFunc, &probs);
+      if (status != SUCCESS) {
+        return status;
+      }
+      auto mask = CreateOutputTensor(kMSI_Bool, probs->shape());
+      auto count = probs->data_size() / sizeof(float);
+      auto src = reinterpret_cast<const float *>(probs->data());
+      auto dst = reinterpret_cast<bool *>(mask->mutable_data());
+      for (size_t i = 0; i < count; i++) {
+        dst[i] = src[i] >= threshold;
+      }
+      output->push_back(probs);
+      output->push_back(mask);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// the k max values and their indices over the last axis in descending order, the values keep the input data type
+class TopkStageFunc : public ParallelStageFunctionBase {
+ public:
+  TopkStageFunc() : ParallelStageFunctionBase(1, 2) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    const std::string usage = "topk_cpp(k)";
+    auto status = CheckArgsCount(func_name, args, 1, usage);
+    if (status != SUCCESS) {
+      return status;
+    }
+    int64_t k = 0;
+    status = ParseTopk(func_name, args[0], usage, &k);
+    if (status != SUCCESS) {
+      return status;
+    }
+    *func = [func_name, k](const InstanceData &input, InstanceData *output) -> Status {
+      auto &x = input[0];
+      int64_t rows = 0;
+      int64_t cols = 0;
+      auto status = CheckLastAxis(func_name, x, &rows, &cols);
+      if (status != SUCCESS) {
+        return status;
+      }
+      if (k > cols) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " k " << k << " is larger than the last dim " << cols;
+      }
+      auto shape = x->shape();
+      shape.back() = k;
+      auto values = CreateOutputTensor(x->data_type(), shape);
+      auto indices = CreateOutputTensor(kMSI_Int64, shape);
+      auto dst_indices = reinterpret_cast<int64_t *>(indices->mutable_data());
+      (void)DispatchNumericType(x->data_type(), [&x, &values, dst_indices, rows, cols, k](auto type) {
+        using T = decltype(type);
+        auto src = reinterpret_cast<const T *>(x->data());
+        auto dst_values = reinterpret_cast<T *>(values->mutable_data());
+        std::vector<int64_t> row_indices;
+        for (int64_t row = 0; row < rows; row++) {
+          auto row_src = src + row * cols;
+          TopkIndices(row_src, cols, k, &row_indices);
+          for (int64_t i = 0; i < k; i++) {
+            dst_indices[row * k + i] = row_indices[i];
+            dst_values[row * k + i] = row_src[row_indices[i]];
+          }
+        }
+      });
+      output->push_back(values);
+      output->push_back(indices);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// the labels and float32 scores of the k max scores of one instance in descending order, the input should be
+// the scores of the labels in shape [N] or [1, N]. The output labels is a str tensor in shape [k], which can be
+// the output of the method but cannot be the input of python stages
+class TopkLabelStageFunc : public ParallelStageFunctionBase {
+ public:
+  TopkLabelStageFunc() : ParallelStageFunctionBase(1, 2) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    const std::string usage = "topk_label_cpp(k, label1, label2, ...)";
+    if (args.size() < 2) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name << "', usage: " << usage;
+    }
+    int64_t k = 0;
+    auto status = ParseTopk(func_name, args[0], usage, &k);
+    if (status != SUCCESS) {
+      return status;
+    }
+    auto labels = std::make_shared<std::vector<std::string>>(args.begin() + 1, args.end());
+    if (k > static_cast<int64_t>(labels->size())) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name << "', k " << k
+                                            << " is larger than the labels count " << labels->size();
+    }
+    *func = [func_name, k, labels](const InstanceData &input, InstanceData *output) -> Status {
+      auto &x = input[0];
+      int64_t rows = 0;
+      int64_t cols = 0;
+      auto status = CheckLastAxis(func_name, x, &rows, &cols);
+      if (status != SUCCESS) {
+        return status;
+      }
+      if (rows != 1 || cols != static_cast<int64_t>(labels->size())) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " input should be the scores of " << labels->size()
+                                              << " labels in shape [N] or [1, N], now shape " << x->shape();
+      }
+      auto label_tensor = std::make_shared<Tensor>();
+      label_tensor->set_data_type(kMSI_String);
+      label_tensor->set_shape({k});
+      auto scores = CreateOutputTensor(kMSI_Float32, {k});
+      auto dst_scores = reinterpret_cast<float *>(scores->mutable_data());
+      (void)DispatchNumericType(x->data_type(), [&x, &labels, &label_tensor, dst_scores, cols, k](auto type) {
+        auto src = reinterpret_cast<const decltype(type) *>(x->data());
+        std::vector<int64_t> indices;
+        TopkIndices(src, cols, k, &indices);
+        for (int64_t i = 0; i < k; i++) {
+          auto &label = (*labels)[indices[i]];
+          label_tensor->add_bytes_data(reinterpret_cast<const uint8_t *>(label.data()), label.size());
+          dst_scores[i] = static_cast<float>(src[indices[i]]);
+        }
+      });
+      output->push_back(label_tensor);
+      output->push_back(scores);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+};
+
+// Greedy non-maximum suppression of the boxes of one instance. The inputs are boxes in shape [N, 4] with
+// (x1, y1, x2, y2) and scores in shape [N], the boxes whose scores <= score_threshold are dropped first. The outputs
+// are the kept float32 boxes [M, 4], float32 scores [M] and int64 indices [M] in descending order of the scores.
+class NMSStageFunc : public ParallelStageFunctionBase {
+ public:
+  NMSStageFunc() : ParallelStageFunctionBase(2, 3) {}
+
+ protected:
+  Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                 InstanceFunc *func) const override {
+    std::vector<float> values;
+    if (CheckArgsCount(func_name, args, 3, "nms_cpp(iou_threshold, score_threshold, max_outputs)") != SUCCESS ||
+        !ParseFloatArgs({args[0], args[1]}, &values) || !(values[0] >= 0 && values[0] <= 1)) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', usage: nms_cpp(iou_threshold, score_threshold, max_outputs), "
+                                            << "the iou_threshold should be a float in range [0, 1]";
+    }
+    std::vector<int64_t> max_outputs;
+    if (!ParseIntArgs({args[2]}, &max_outputs) || max_outputs[0] <= 0) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name
+                                            << "', the max_outputs should be a positive integer";
+    }
+    auto iou_threshold = values[0];
+    auto score_threshold = values[1];
+    auto max_output = max_outputs[0];
+    *func = [func_name, iou_threshold, score_threshold, max_output](const InstanceData &input,
+                                                                    InstanceData *output) -> Status {
+      std::vector<float> boxes;
+      std::vector<float> scores;
+      auto status = ToFloatVector(func_name, input[0], &boxes);
+      if (status != SUCCESS) {
+        return status;
+      }
+      status = ToFloatVector(func_name, input[1], &scores);
+      if (status != SUCCESS) {
+        return status;
+      }
+      auto box_shape = input[0]->shape();
+      if (box_shape.empty() || box_shape.back() != static_cast<int64_t>(kBoxSize) ||
+          boxes.size() != scores.size() * kBoxSize) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << func_name << " inputs should be boxes in shape [N, 4] and scores "
+                                              << "in shape [N], now shapes " << box_shape << " and "
+                                              << input[1]->shape();
+      }
+      std::vector<int64_t> keep;
+      NMS(boxes, scores, iou_threshold, score_threshold, max_output, &keep);
+      auto keep_count = static_cast<int64_t>(keep.size());
+      auto keep_boxes = CreateOutputTensor(kMSI_Float32, {keep_count, static_cast<int64_t>(kBoxSize)});
+      auto keep_scores = CreateOutputTensor(kMSI_Float32, {keep_count});
+      auto keep_indices = CreateOutputTensor(kMSI_Int64, {keep_count});
+      auto dst_boxes = reinterpret_cast<float *>(keep_boxes->mutable_data());
+      auto dst_scores = reinterpret_cast<float *>(keep_scores->mutable_data());
+      auto dst_indices = reinterpret_cast<int64_t *>(keep_indices->mutable_data());
+      for (size_t i = 0; i < keep.size(); i++) {
+        auto index = static_cast<size_t>(keep[i]);
+        std::copy_n(boxes.begin() + index * kBoxSize, kBoxSize, dst_boxes + i * kBoxSize);
+        dst_scores[i] = scores[index];
+        dst_indices[i] = keep[i];
+      }
+      output->push_back(keep_boxes);
+      output->push_back(keep_scores);
+      output->push_back(keep_indices);
+      return SUCCESS;
+    };
+    return SUCCESS;
+  }
+
+ private:
+  static void NMS(const std::vector<float> &boxes, const std::vector<float> &scores, float iou_threshold,
+                  float score_threshold, int64_t max_output, std::vector<int64_t> *keep) {
+    std::vector<int64_t> candidates;
+    for (size_t i = 0; i < scores.size(); i++) {
+      if (scores[i] > score_threshold) {
+        candidates.push_back(static_cast<int64_t>(i));
+      }
+    }
+    std::stable_sort(candidates.begin(), candidates.end(),
+                     [&scores](int64_t left, int64_t right) { return scores[left] > scores[right]; });
+    // the coordinates of the corners may be in any order
+    auto corners = [&boxes](int64_t index, float *x1, float *y1, float *x2, float *y2) {
+      auto box = boxes.data() + index * kBoxSize;
+      *x1 = std::min(box[0], box[2]);
+      *y1 = std::min(box[1], box[3]);
+      *x2 = std::max(box[0], box[2]);
+      *y2 = std::max(box[1], box[3]);
+    };
+    std::vector<float> areas(scores.size(), 0);
+    for (auto index : candidates) {
+      float x1, y1, x2, y2;
+      corners(index, &x1, &y1, &x2, &y2);
+      areas[index] = (x2 - x1) * (y2 - y1);
+    }
+    for (auto index : candidates) {
+      if (static_cast<int64_t>(keep->size()) >= max_output) {
+        break;
+      }
+      float x1, y1, x2, y2;
+      corners(index, &x1, &y1, &x2, &y2);
+      bool suppressed = false;
+      for (auto kept : *keep) {
+        float kx1, ky1, kx2, ky2;
+        corners(kept, &kx1, &ky1, &kx2, &ky2);
+        auto inter_width = std::max(0.0f, std::min(x2, kx2) - std::max(x1, kx1));
+        auto inter_height = std::max(0.0f, std::min(y2, ky2) - std::max(y1, ky1));
+        auto inter = inter_width * inter_height;
+        auto union_area = areas[index] + areas[kept] - inter;
+        if (union_area > 0 && inter / union_area > iou_threshold) {
+          suppressed = true;
+          break;
+        }
+      }
+      if (!suppressed) {
+        keep->push_back(index);
+      }
+    }
+  }
+};
+
+REGISTER_STAGE_FUNCTION(SoftmaxStageFunc, "softmax_cpp")
+REGISTER_STAGE_FUNCTION(SigmoidStageFunc, "sigmoid_cpp")
+REGISTER_STAGE_FUNCTION(SigmoidThresholdStageFunc, "sigmoid_threshold_cpp")
+REGISTER_STAGE_FUNCTION(TopkStageFunc, "topk_cpp")
+REGISTER_STAGE_FUNCTION(TopkLabelStageFunc, "topk_label_cpp")
+REGISTER_STAGE_FUNCTION(NMSStageFunc, "nms_cpp")
+}  // namespace mindspore::serving
@@ -0,0 +1,219 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "worker/register/stage_function_utils.h"
+#include <algorithm>
+#include <exception>
+#include <future>
+#include <map>
+#include <thread>
+#include "common/thread_pool.h"
+
+namespace mindspore::serving {
+namespace {
+constexpr uint32_t kMaxParallelThreadNum = 16;
+
+ThreadPool &GetParallelThreadPool(uint32_t *thread_num) {
+  static uint32_t pool_thread_num = std::clamp<uint32_t>(std::thread::hardware_concurrency(), 1, kMaxParallelThreadNum);
+  static ThreadPool thread_pool(pool_thread_num);
+  *thread_num = pool_thread_num;
+  return thread_pool;
+}
+
+void CallInstances(const std::vector<InstancePtr> &instances, std::vector<ResultInstance> *results,
+                   const InstanceFunc &func, size_t begin, size_t end) {
+  for (size_t i = begin; i < end; i++) {
+    auto &result = (*results)[i];
+    auto status = CppStageFunctionBase::CallInstanceNoThrow(
+      [&func, &instances, i, &result]() { return func(instances[i]->data, &result.data); });
+    if (status != SUCCESS) {
+      result.data.clear();
+      result.error_msg = status;
+    }
+  }
+}
+}  // namespace
+
+void ParallelCallInstances(const std::vector<InstancePtr> &instances, std::vector<ResultInstance> *results,
+                           const InstanceFunc &func) {
+  MSI_EXCEPTION_IF_NULL(results);
+  results->resize(instances.size());
+  if (instances.size() <= 1) {
+    CallInstances(instances, results, func, 0, instances.size());
+    return;
+  }
+  uint32_t thread_num = 0;
+  auto &thread_pool = GetParallelThreadPool(&thread_num);
+  auto chunk_num = std::min<size_t>(instances.size(), thread_num);
+  auto chunk_size = instances.size() / chunk_num;
+  auto chunk_remainder = instances.size() % chunk_num;
+  std::vector<std::pair<size_t, size_t>> chunks;
+  size_t begin = 0;
+  for (size_t i = 0; i < chunk_num; i++) {
+    auto end = begin + chunk_size + (i < chunk_remainder ? 1 : 0);
+    chunks.emplace_back(begin, end);
+    begin = end;
+  }
+  // the first chunk is processed by the current thread
+  std::vector<std::future<void>> futures;
+  for (size_t i = 1; i < chunks.size(); i++) {
+    auto future = thread_pool.commit(CallInstances, std::cref(instances), results, std::cref(func), chunks[i].first,
+                                     chunks[i].second);
+    if (!future.valid()) {
+      CallInstances(instances, results, func, chunks[i].first, chunks[i].second);
+      continue;
+    }
+    futures.push_back(std::move(future));
+  }
+  std::exception_ptr exception = nullptr;
+  try {
+    CallInstances(instances, results, func, chunks[0].first, chunks[0].second);
+  } catch (...) {
+    exception = std::current_exception();
+  }
+  // wait all chunks before rethrowing exception, since they reference the instances and results
+  for (auto &future : futures) {
+    try {
+      future.get();
+    } catch (...) {
+      if (exception == nullptr) {
+        exception = std::current_exception();
+      }
+    }
+  }
+  if (exception != nullptr) {
+    std::rethrow_exception(exception);
+  }
+}
+
+Status CheckArgsCount(const std::string &func_name, const std::vector<std::string> &args, size_t count,
+                      const std::string &usage) {
+  if (args.size() != count) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function '" << func_name << "', usage: " << usage;
+  }
+  return SUCCESS;
+}
+
+bool ParseIntArgs(const std::vector<std::string> &args, std::vector<int64_t> *values) {
+  MSI_EXCEPTION_IF_NULL(values);
+  values->clear();
+  for (auto &arg : args) {
+    size_t pos = 0;
+    try {
+      values->push_back(std::stoll(arg, &pos));
+    } catch (const std::exception &) {
+      return false;
+    }
+    if (pos != arg.size()) {
+      return false;
+    }
+  }
+  return true;
+}
+
+bool ParseFloatArgs(const std::vector<std::string> &args, std::vector<float> *values) {
+  MSI_EXCEPTION_IF_NULL(values);
+  values->clear();
+  for (auto &arg : args) {
+    size_t pos = 0;
+    try {
+      values->push_back(std::stof(arg, &pos));
+    } catch (const std::exception &) {
+      return false;
+    }
+    if (pos != arg.size()) {
+      return false;
+    }
+  }
+  return true;
+}
+
+DataType ParseDataType(const std::string &type_str) {
+  const std::map<std::string, DataType> type_map{
+    {"bool", kMSI_Bool},       {"int8", kMSI_Int8},       {"int16", kMSI_Int16},     {"int32", kMSI_Int32},
+    {"int64", kMSI_Int64},     {"uint8", kMSI_Uint8},     {"uint16", kMSI_Uint16},   {"uint32", kMSI_Uint32},
+    {"uint64", kMSI_Uint64},   {"float16", kMSI_Float16}, {"float32", kMSI_Float32}, {"float64", kMSI_Float64},
+  };
+  auto it = type_map.find(type_str);
+  if (it == type_map.end()) {
+    return kMSI_Unknown;
+  }
+  return it->second;
+}
+
+TensorBasePtr CreateOutputTensor(DataType data_type, const std::vector<int64_t> &shape) {
+  auto tensor = std::make_shared<Tensor>();
+  tensor->set_data_type(data_type);
+  tensor->set_shape(shape);
+  size_t element_cnt = 1;
+  for (auto dim : shape) {
+    element_cnt *= static_cast<size_t>(dim);
+  }
+  (void)tensor->resize_data(element_cnt * TensorBase::GetTypeSize(data_type));
+  return tensor;
+}
+
+Status ParallelStageFunctionBase::PrepareInner(const std::string &func_name, InstanceFunc *func) const {
+  std::string base_name;
+  std::vector<std::string> args;
+  if (!CppStageFunctionStorage::ParseFunctionName(func_name, &base_name, &args)) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid function name '" << func_name
+                                          << "', the arguments should be in the format of 'name(arg1, arg2, ...)'";
+  }
+  return Prepare(func_name, args, func);
+}
+
+Status ParallelStageFunctionBase::Call(const std::string &func_name, const InstanceData &input, InstanceData *output) {
+  MSI_EXCEPTION_IF_NULL(output);
+  InstanceFunc func;
+  auto status = PrepareInner(func_name, &func);
+  if (status != SUCCESS) {
+    return status;
+  }
+  return func(input, output);
+}
+
+void ParallelStageFunctionBase::CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances,
+                                          std::vector<ResultInstance> *results) {
+  MSI_EXCEPTION_IF_NULL(results);
+  InstanceFunc func;
+  auto status = PrepareInner(func_name, &func);
+  if (status != SUCCESS) {
+    results->resize(instances.size());
+    for (auto &result : *results) {
+      result.error_msg = status;
+    }
+    return;
+  }
+  ParallelCallInstances(instances, results, func);
+}
+
+size_t ParallelStageFunctionBase::GetInputsCount(const std::string &func_name) const {
+  InstanceFunc func;
+  if (PrepareInner(func_name, &func) != SUCCESS) {
+    return 0;
+  }
+  return inputs_count_;
+}
+
+size_t ParallelStageFunctionBase::GetOutputsCount(const std::string &func_name) const {
+  InstanceFunc func;
+  if (PrepareInner(func_name, &func) != SUCCESS) {
+    return 0;
+  }
+  return outputs_count_;
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,117 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_WORKER_REGISTER_STAGE_FUNCTION_UTILS_H
+#define MINDSPORE_SERVING_WORKER_REGISTER_STAGE_FUNCTION_UTILS_H
+
+#include <functional>
+#include <memory>
+#include <string>
+#include <vector>
+#include "common/serving_common.h"
+#include "common/instance.h"
+#include "common/tensor.h"
+#include "worker/stage_function.h"
+
+namespace mindspore::serving {
+using InstanceFunc = std::function<Status(const InstanceData &input, InstanceData *output)>;
+
+// call func for each instance, the instances are split into chunks which are processed by a thread pool shared by
+// all C++ stages in parallel
+void ParallelCallInstances(const std::vector<InstancePtr> &instances, std::vector<ResultInstance> *results,
+                           const InstanceFunc &func);
+
+// return failure with the usage if the count of arguments is not equal to 'count'
+Status CheckArgsCount(const std::string &func_name, const std::vector<std::string> &args, size_t count,
+                      const std::string &usage);
+bool ParseIntArgs(const std::vector<std::string> &args, std::vector<int64_t> *values);
+bool ParseFloatArgs(const std::vector<std::string> &args, std::vector<float> *values);
+// parse data type such as "float32", return kMSI_Unknown if failed
+DataType ParseDataType(const std::string &type_str);
+
+TensorBasePtr CreateOutputTensor(DataType data_type, const std::vector<int64_t> &shape);
+
+// call func with a value of the C++ type of the data type, return false if the data type is float16 or not numeric
+template <class Func>
+bool DispatchNumericType(DataType data_type, Func &&func) {
+  switch (data_type) {
+    case kMSI_Bool:
+      func(bool());
+      return true;
+    case kMSI_Int8:
+      func(int8_t());
+      return true;
+    case kMSI_Int16:
+      func(int16_t());
+      return true;
+    case kMSI_Int32:
+      func(int32_t());
+      return true;
+    case kMSI_Int64:
+      func(int64_t());
+      return true;
+    case kMSI_Uint8:
+      func(uint8_t());
+      return true;
+    case kMSI_Uint16:
+      func(uint16_t());
+      return true;
+    case kMSI_Uint32:
+      func(uint32_t());
+      return true;
+    case kMSI_Uint64:
+      func(uint64_t());
+      return true;
+    case kMSI_Float32:
+      func(float());
+      return true;
+    case kMSI_Float64:
+      func(double());
+      return true;
+    default:
+      return false;
+  }
+}
+
+// Base class of the C++ stage functions processing the instances of one task in parallel, whose arguments are
+// parsed from the function name, such as "resize_cpp(224,224)"
+class ParallelStageFunctionBase : public CppStageFunctionBase {
+ public:
+  ParallelStageFunctionBase(size_t inputs_count, size_t outputs_count)
+      : inputs_count_(inputs_count), outputs_count_(outputs_count) {}
+  ~ParallelStageFunctionBase() override = default;
+
+  Status Call(const std::string &func_name, const InstanceData &input, InstanceData *output) override;
+  void CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances,
+                 std::vector<ResultInstance> *results) override;
+  // 0 is returned if the arguments in the function name are invalid
+  size_t GetInputsCount(const std::string &func_name) const override;
+  size_t GetOutputsCount(const std::string &func_name) const override;
+
+ protected:
+  // parse the arguments and return the function processing one instance
+  virtual Status Prepare(const std::string &func_name, const std::vector<std::string> &args,
+                         InstanceFunc *func) const = 0;
+
+ private:
+  size_t inputs_count_;
+  size_t outputs_count_;
+
+  Status PrepareInner(const std::string &func_name, InstanceFunc *func) const;
+};
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_WORKER_REGISTER_STAGE_FUNCTION_UTILS_H
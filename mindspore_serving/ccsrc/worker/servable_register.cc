@@ -57,6 +57,11 @@ Status ServableRegister::DeclareModel(ModelMeta model) {
     for (auto &file_item : model_item.local_meta.model_files) {
       (void)cur_model_files.emplace(file_item);
     }
+    for (auto &variant_files : model_item.local_meta.batch_variant_files) {
+      for (auto &file_item : variant_files) {
+        (void)cur_model_files.emplace(file_item);
+      }
+    }
   }
   for (auto &file : local_meta.model_files) {
     if (file.empty()) {
@@ -67,6 +72,34 @@ Status ServableRegister::DeclareModel(ModelMeta model) {
       return INFER_STATUS_LOG_ERROR(FAILED) << "Declare model " << local_meta.model_files << " failed, model file '"
                                             << file << "' has already been used";
     }
+    (void)cur_model_files.emplace(file);
+  }
+  if (!local_meta.batch_variant_files.empty() && !common_meta.with_batch_dim) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Declare model " << local_meta.model_files
+                                          << " failed, batch_variant_files can only be set when with_batch_dim is true";
+  }
+  for (auto &variant_files : local_meta.batch_variant_files) {
+    if (variant_files.size() != local_meta.model_files.size()) {
+      return INFER_STATUS_LOG_ERROR(FAILED)
+             << "Declare model " << local_meta.model_files << " failed, the number " << variant_files.size()
+             << " of files of batch variant " << variant_files << " is not equal to the number "
+             << local_meta.model_files.size() << " of model files";
+    }
+    for (auto &file : variant_files) {
+      if (file.empty()) {
+        return INFER_STATUS_LOG_ERROR(FAILED)
+               << "Declare model " << local_meta.model_files << " failed, batch variant file cannot be empty";
+      }
+      if (cur_model_files.count(file) > 0) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << "Declare model " << local_meta.model_files
+                                              << " failed, batch variant file '" << file << "' has already been used";
+      }
+      (void)cur_model_files.emplace(file);
+    }
+  }
+  if (local_meta.parallel_instances == 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED)
+           << "Declare model " << local_meta.model_files << " failed, parallel_instances cannot be 0";
   }
   if (local_meta.model_format == ModelType::kUnknownType) {
     return INFER_STATUS_LOG_ERROR(FAILED)
@@ -210,6 +243,20 @@ Status ServableRegister::CheckModels(const std::map<std::string, std::shared_ptr
     if (batch_size == 0) {
       return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid batch size 0, model info: " << model_key;
     }
+    auto &batching_policy = model_meta.common_meta.batching_policy;
+    if (batching_policy.max_batch_size > batch_size) {
+      return INFER_STATUS_LOG_ERROR(FAILED)
+             << "The max_batch_size " << batching_policy.max_batch_size << " of batching policy cannot be greater "
+             << "than the batch size " << batch_size << " of model, model info: " << model_key;
+    }
+    auto max_batch_size = batching_policy.max_batch_size > 0 ? batching_policy.max_batch_size : batch_size;
+    for (auto preferred_size : batching_policy.preferred_batch_sizes) {
+      if (preferred_size == 0 || preferred_size > max_batch_size) {
+        return INFER_STATUS_LOG_ERROR(FAILED)
+               << "The preferred batch size " << preferred_size << " of batching policy should be in range [1, "
+               << max_batch_size << "], model info: " << model_key;
+      }
+    }
     auto graph_num = model_loader->GetGraphNum();
     if (graph_num == 0) {
       return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid subgraph number 0, model info: " << model_key;
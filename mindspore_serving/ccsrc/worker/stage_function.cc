@@ -16,8 +16,39 @@
 
 #include "worker/stage_function.h"
 #include <utility>
+#include "worker/stage_plugin_loader.h"
 
 namespace mindspore::serving {
+void CppStageFunctionBase::CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances,
+                                     std::vector<ResultInstance> *results) {
+  MSI_EXCEPTION_IF_NULL(results);
+  results->resize(instances.size());
+  for (size_t i = 0; i < instances.size(); i++) {
+    auto &result = (*results)[i];
+    auto status = CallInstanceNoThrow([this, &func_name, &instances, i, &result]() {
+      return Call(func_name, instances[i]->data, &result.data);
+    });
+    if (status != SUCCESS) {
+      result.data.clear();
+      result.error_msg = status;
+    }
+  }
+}
+
+Status CppStageFunctionBase::CallInstanceNoThrow(const std::function<Status()> &call) {
+  try {
+    return call();
+  } catch (const std::bad_alloc &ex) {
+    return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: malloc memory failed";
+  } catch (const std::runtime_error &ex) {
+    return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: runtime error occurred: " << ex.what();
+  } catch (const std::exception &ex) {
+    return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred: " << ex.what();
+  } catch (...) {
+    return INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred";
+  }
+}
+
 bool CppStageFunctionStorage::Register(const std::string &function_name,
                                        std::shared_ptr<CppStageFunctionBase> function) {
   if (function_map_.find(function_name) != function_map_.end()) {
@@ -46,9 +77,54 @@ std::shared_ptr<CppStageFunctionBase> CppStageFunctionStorage::GetFunction(const
   if (it != function_map_.end()) {
     return it->second;
   }
+  auto pos = func_name.find('(');
+  if (pos == std::string::npos) {
+    return nullptr;
+  }
+  it = function_map_.find(func_name.substr(0, pos));
+  if (it != function_map_.end()) {
+    return it->second;
+  }
   return nullptr;
 }
 
+bool CppStageFunctionStorage::ParseFunctionName(const std::string &func_name, std::string *base_name,
+                                                std::vector<std::string> *args) {
+  MSI_EXCEPTION_IF_NULL(base_name);
+  MSI_EXCEPTION_IF_NULL(args);
+  args->clear();
+  auto pos = func_name.find('(');
+  if (pos == std::string::npos) {
+    *base_name = func_name;
+    return true;
+  }
+  if (func_name.back() != ')') {
+    return false;
+  }
+  *base_name = func_name.substr(0, pos);
+  auto args_str = func_name.substr(pos + 1, func_name.size() - pos - 2);
+  const std::string spaces = " \t";
+  size_t begin = 0;
+  while (begin <= args_str.size()) {
+    auto end = args_str.find(',', begin);
+    if (end == std::string::npos) {
+      end = args_str.size();
+    }
+    auto arg = args_str.substr(begin, end - begin);
+    auto left = arg.find_first_not_of(spaces);
+    if (left == std::string::npos) {
+      // "name()" has no arguments, while "name(1,)" is invalid
+      if (args_str.find_first_not_of(spaces) != std::string::npos) {
+        return false;
+      }
+      break;
+    }
+    args->push_back(arg.substr(left, arg.find_last_not_of(spaces) - left + 1));
+    begin = end + 1;
+  }
+  return true;
+}
+
 CppRegStageFunction::CppRegStageFunction(const std::string &function_name,
                                          std::shared_ptr<CppStageFunctionBase> function) {
   func_name_ = function_name;
@@ -116,4 +192,12 @@ std::vector<size_t> PyStageFunctionStorage::GetPyCppFunctionInfo(const std::stri
   }
   return {inputs_count, outputs_count};
 }
+
+void PyStageFunctionStorage::LoadStagePlugin(const std::string &stage_name, const std::string &lib_path,
+                                             const std::string &func_name) {
+  auto status = StagePluginLoader::Instance().LoadStageFunction(stage_name, lib_path, func_name);
+  if (status != SUCCESS) {
+    MSI_LOG_EXCEPTION << status.StatusMessage();
+  }
+}
 }  // namespace mindspore::serving
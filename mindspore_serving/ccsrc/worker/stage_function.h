@@ -17,6 +17,7 @@
 #ifndef MINDSPORE_SERVING_WORKER_STAGE_FUNCTION_PY_H
 #define MINDSPORE_SERVING_WORKER_STAGE_FUNCTION_PY_H
 
+#include <functional>
 #include <memory>
 #include <unordered_map>
 #include <vector>
@@ -32,8 +33,16 @@ class CppStageFunctionBase : public std::enable_shared_from_this<CppStageFunctio
   virtual ~CppStageFunctionBase() = default;
 
   virtual Status Call(const std::string &func_name, const InstanceData &input, InstanceData *output) = 0;
+  // process the instances of one task at a time, so that the computation can be vectorized across instances,
+  // the default implementation calls Call for each instance
+  virtual void CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances,
+                         std::vector<ResultInstance> *results);
   virtual size_t GetInputsCount(const std::string &func_name) const = 0;
   virtual size_t GetOutputsCount(const std::string &func_name) const = 0;
+
+  // call the function processing one instance, the exception thrown is converted to the failure status, so that only
+  // the instance fails rather than all instances of the task
+  static Status CallInstanceNoThrow(const std::function<Status()> &call);
 };
 
 class CppStageFunctionStorage {
@@ -41,7 +50,11 @@ class CppStageFunctionStorage {
   bool Register(const std::string &func_name, std::shared_ptr<CppStageFunctionBase> function);
   void Unregister(const std::string &func_name);
 
+  // function name with arguments, such as "resize_cpp(224,224)", gets the function registered as "resize_cpp", and
+  // the function parses the arguments from the function name passed to its interfaces
   std::shared_ptr<CppStageFunctionBase> GetFunction(const std::string &func_name) const;
+  // split "name(arg1, arg2)" into name and args, return false if the format is invalid
+  static bool ParseFunctionName(const std::string &func_name, std::string *base_name, std::vector<std::string> *args);
 
   static CppStageFunctionStorage &Instance();
 
@@ -72,6 +85,8 @@ class MS_API PyStageFunctionStorage {
   bool GetPyFunctionInfo(const std::string &func_name, size_t *inputs_count, size_t *outputs_count);
 
   std::vector<size_t> GetPyCppFunctionInfo(const std::string &func_name) const;
+  // load function 'func_name' of the plugin library as C++ stage function 'stage_name'
+  void LoadStagePlugin(const std::string &stage_name, const std::string &lib_path, const std::string &func_name);
 
   PyStageFunctionStorage();
   ~PyStageFunctionStorage();
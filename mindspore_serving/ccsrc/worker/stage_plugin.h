@@ -0,0 +1,102 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*
+ * C ABI of stage function plugins. A plugin is a shared library exporting the function named
+ * MS_SERVING_STAGE_PLUGIN_ENTRY, and its stage functions are used in servable_config.py by
+ * add_stage("libxxx.so:function_name", ...). This header depends on the C standard library only, so that plugins
+ * can be built without the sources of MindSpore Serving.
+ */
+#ifndef MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_H
+#define MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#define MS_SERVING_STAGE_PLUGIN_ABI_VERSION 1
+#define MS_SERVING_STAGE_PLUGIN_ENTRY "MSServingGetStageFunctions"
+
+/* the same values as mindspore::serving::DataType */
+typedef enum MSServingDataType {
+  MS_SERVING_DT_UNKNOWN = 0,
+  MS_SERVING_DT_BOOL = 1,
+  MS_SERVING_DT_INT8 = 2,
+  MS_SERVING_DT_INT16 = 3,
+  MS_SERVING_DT_INT32 = 4,
+  MS_SERVING_DT_INT64 = 5,
+  MS_SERVING_DT_UINT8 = 6,
+  MS_SERVING_DT_UINT16 = 7,
+  MS_SERVING_DT_UINT32 = 8,
+  MS_SERVING_DT_UINT64 = 9,
+  MS_SERVING_DT_FLOAT16 = 10,
+  MS_SERVING_DT_FLOAT32 = 11,
+  MS_SERVING_DT_FLOAT64 = 12,
+  MS_SERVING_DT_STRING = 13,
+  MS_SERVING_DT_BYTES = 14,
+} MSServingDataType;
+
+/*
+ * Read-only tensor of one instance. The data of string and bytes tensors, which must be scalars, is the content of the
+ * str or bytes without terminating null character.
+ */
+typedef struct MSServingTensor {
+  int32_t data_type;
+  const int64_t *shape;
+  size_t shape_size;
+  const void *data;
+  size_t data_size;
+} MSServingTensor;
+
+/*
+ * Allocate the output 'output_index' of the stage function, and return the buffer of 'data_size' bytes to be filled
+ * by the stage function. NULL is returned when the index has been allocated or is out of range, or the data size
+ * does not match the data type and shape. String and bytes outputs must be scalars, shape_size is 0.
+ */
+typedef void *(*MSServingAllocOutput)(void *context, size_t output_index, int32_t data_type, const int64_t *shape,
+                                      size_t shape_size, size_t data_size);
+
+/*
+ * Process one instance, every output should be allocated by alloc_output with the context. Return 0 if success,
+ * otherwise write a null-terminated message no longer than error_msg_size into error_msg and return non-zero.
+ * The function is called by multiple threads concurrently, and it should be thread-safe.
+ */
+typedef int32_t (*MSServingStageCall)(const MSServingTensor *inputs, size_t inputs_count,
+                                      MSServingAllocOutput alloc_output, void *context, char *error_msg,
+                                      size_t error_msg_size);
+
+typedef struct MSServingStageFunction {
+  const char *name;
+  size_t inputs_count;
+  size_t outputs_count;
+  MSServingStageCall call;
+} MSServingStageFunction;
+
+/*
+ * Signature of MS_SERVING_STAGE_PLUGIN_ENTRY. Return the stage functions of the plugin, which should be valid until
+ * the process exits. Return 0 if success, or non-zero if the plugin does not support the ABI version.
+ */
+typedef int32_t (*MSServingGetStageFunctionsFunc)(uint32_t abi_version, const MSServingStageFunction **functions,
+                                                  size_t *functions_count);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif  // MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_H
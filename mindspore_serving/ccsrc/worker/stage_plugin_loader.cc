@@ -0,0 +1,212 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "worker/stage_plugin_loader.h"
+#include <dlfcn.h>
+#include <memory>
+#include <vector>
+#include "common/tensor.h"
+
+namespace mindspore::serving {
+namespace {
+constexpr size_t kMaxErrorMsgSize = 1024;
+
+struct PluginOutputContext {
+  InstanceData *outputs = nullptr;
+  // the content of string and bytes outputs, which is added to the tensors after the function returns
+  std::vector<std::vector<uint8_t>> bytes_buffers;
+};
+
+void *AllocPluginOutput(void *context, size_t output_index, int32_t data_type, const int64_t *shape,
+                        size_t shape_size, size_t data_size) {
+  static uint8_t empty_buffer = 0;
+  auto output_context = static_cast<PluginOutputContext *>(context);
+  if (output_context == nullptr || output_index >= output_context->outputs->size() ||
+      (*output_context->outputs)[output_index] != nullptr) {
+    return nullptr;
+  }
+  if (data_type <= kMSI_Unknown || data_type > kMSI_Bytes || (shape == nullptr && shape_size != 0)) {
+    return nullptr;
+  }
+  auto tensor = std::make_shared<Tensor>();
+  auto type = static_cast<DataType>(data_type);
+  tensor->set_data_type(type);
+  void *buffer = nullptr;
+  if (tensor->is_bytes_val_data()) {
+    if (shape_size != 0) {
+      return nullptr;
+    }
+    auto &bytes_buffer = output_context->bytes_buffers[output_index];
+    bytes_buffer.resize(data_size);
+    buffer = bytes_buffer.data();
+  } else {
+    std::vector<int64_t> tensor_shape(shape, shape + shape_size);
+    size_t element_cnt = 1;
+    for (auto dim : tensor_shape) {
+      if (dim < 0) {
+        return nullptr;
+      }
+      element_cnt *= static_cast<size_t>(dim);
+    }
+    if (element_cnt * TensorBase::GetTypeSize(type) != data_size || !tensor->resize_data(data_size)) {
+      return nullptr;
+    }
+    tensor->set_shape(tensor_shape);
+    buffer = tensor->mutable_data();
+  }
+  (*output_context->outputs)[output_index] = tensor;
+  return data_size == 0 ? &empty_buffer : buffer;
+}
+
+std::string GetDlError() {
+  auto error = dlerror();
+  if (error == nullptr) {
+    return std::string();
+  }
+  return error;
+}
+}  // namespace
+
+Status PluginStageFunction::Call(const std::string &func_name, const InstanceData &input, InstanceData *output) {
+  MSI_EXCEPTION_IF_NULL(output);
+  if (input.size() != function_.inputs_count) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Stage function '" << func_name << "' inputs count " << input.size()
+                                          << " not equal to " << function_.inputs_count;
+  }
+  std::vector<std::vector<int64_t>> shapes(input.size());
+  std::vector<MSServingTensor> inputs(input.size());
+  for (size_t i = 0; i < input.size(); i++) {
+    auto &tensor = input[i];
+    auto &plugin_tensor = inputs[i];
+    plugin_tensor.data_type = static_cast<int32_t>(tensor->data_type());
+    if (tensor->is_bytes_val_data()) {
+      if (tensor->bytes_data_size() != 1) {
+        return INFER_STATUS_LOG_ERROR(FAILED) << "Stage function '" << func_name << "' input " << i
+                                              << " of string or bytes type should be a scalar";
+      }
+      const uint8_t *data = nullptr;
+      size_t data_size = 0;
+      tensor->get_bytes_data(0, &data, &data_size);
+      plugin_tensor.data = data;
+      plugin_tensor.data_size = data_size;
+    } else {
+      shapes[i] = tensor->shape();
+      plugin_tensor.shape = shapes[i].data();
+      plugin_tensor.shape_size = shapes[i].size();
+      plugin_tensor.data = tensor->data();
+      plugin_tensor.data_size = tensor->data_size();
+    }
+  }
+  InstanceData outputs(function_.outputs_count);
+  PluginOutputContext context;
+  context.outputs = &outputs;
+  context.bytes_buffers.resize(function_.outputs_count);
+  char error_msg[kMaxErrorMsgSize] = {0};
+  auto ret = function_.call(inputs.data(), inputs.size(), AllocPluginOutput, &context, error_msg, kMaxErrorMsgSize);
+  error_msg[kMaxErrorMsgSize - 1] = '\0';
+  if (ret != 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Call stage function '" << func_name << "' failed: " << error_msg;
+  }
+  for (size_t i = 0; i < outputs.size(); i++) {
+    auto &tensor = outputs[i];
+    if (tensor == nullptr) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "Stage function '" << func_name << "' output " << i
+                                            << " is not allocated";
+    }
+    if (tensor->is_bytes_val_data()) {
+      auto &bytes_buffer = context.bytes_buffers[i];
+      tensor->add_bytes_data(bytes_buffer.data(), bytes_buffer.size());
+    }
+  }
+  *output = std::move(outputs);
+  return SUCCESS;
+}
+
+StagePluginLoader &StagePluginLoader::Instance() {
+  static StagePluginLoader instance;
+  return instance;
+}
+
+Status StagePluginLoader::LoadStageFunction(const std::string &stage_name, const std::string &lib_path,
+                                            const std::string &func_name) {
+  std::unique_lock<std::mutex> lock(lock_);
+  void *handle = nullptr;
+  auto it = lib_handles_.find(lib_path);
+  if (it != lib_handles_.end()) {
+    handle = it->second;
+  } else {
+    handle = dlopen(lib_path.c_str(), RTLD_NOW | RTLD_LOCAL);
+    if (handle == nullptr) {
+      return INFER_STATUS_LOG_ERROR(FAILED) << "dlopen stage function plugin failed, lib path: " << lib_path
+                                            << ", dlopen error: " << GetDlError();
+    }
+    MSI_LOG_INFO << "Load stage function plugin " << lib_path << " successful";
+    lib_handles_[lib_path] = handle;
+  }
+  auto entry = reinterpret_cast<MSServingGetStageFunctionsFunc>(dlsym(handle, MS_SERVING_STAGE_PLUGIN_ENTRY));
+  if (entry == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "dlsym " << MS_SERVING_STAGE_PLUGIN_ENTRY
+                                          << " failed, lib path: " << lib_path << ", dlopen error: " << GetDlError();
+  }
+  return RegisterStageFunctionInner(stage_name, entry, func_name);
+}
+
+Status StagePluginLoader::RegisterStageFunction(const std::string &stage_name, MSServingGetStageFunctionsFunc entry,
+                                                const std::string &func_name) {
+  std::unique_lock<std::mutex> lock(lock_);
+  return RegisterStageFunctionInner(stage_name, entry, func_name);
+}
+
+Status StagePluginLoader::RegisterStageFunctionInner(const std::string &stage_name,
+                                                     MSServingGetStageFunctionsFunc entry,
+                                                     const std::string &func_name) {
+  MSI_EXCEPTION_IF_NULL(entry);
+  auto registered_function = CppStageFunctionStorage::Instance().GetFunction(stage_name);
+  if (registered_function != nullptr) {
+    // servable_config.py may be imported more than once in one process
+    if (std::dynamic_pointer_cast<PluginStageFunction>(registered_function) != nullptr) {
+      return SUCCESS;
+    }
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Stage function '" << stage_name
+                                          << "' has been registered by MindSpore Serving";
+  }
+  const MSServingStageFunction *functions = nullptr;
+  size_t functions_count = 0;
+  if (entry(MS_SERVING_STAGE_PLUGIN_ABI_VERSION, &functions, &functions_count) != 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Stage function plugin of '" << stage_name
+                                          << "' does not support ABI version " << MS_SERVING_STAGE_PLUGIN_ABI_VERSION;
+  }
+  const MSServingStageFunction *function = nullptr;
+  for (size_t i = 0; functions != nullptr && i < functions_count; i++) {
+    if (functions[i].name != nullptr && func_name == functions[i].name) {
+      function = &functions[i];
+      break;
+    }
+  }
+  if (function == nullptr) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Cannot find function '" << func_name
+                                          << "' in the stage function plugin of '" << stage_name << "'";
+  }
+  if (function->call == nullptr || function->inputs_count == 0 || function->outputs_count == 0) {
+    return INFER_STATUS_LOG_ERROR(FAILED) << "Invalid stage function '" << stage_name
+                                          << "', the call cannot be null and the inputs and outputs count cannot be 0";
+  }
+  (void)CppStageFunctionStorage::Instance().Register(stage_name, std::make_shared<PluginStageFunction>(*function));
+  MSI_LOG_INFO << "Register plugin stage function " << stage_name << " inputs count " << function->inputs_count
+               << " outputs count " << function->outputs_count;
+  return SUCCESS;
+}
+}  // namespace mindspore::serving
@@ -0,0 +1,62 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_LOADER_H
+#define MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_LOADER_H
+
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include "common/serving_common.h"
+#include "worker/stage_function.h"
+#include "worker/stage_plugin.h"
+
+namespace mindspore::serving {
+// C++ stage function implemented by a function of the plugin
+class PluginStageFunction : public CppStageFunctionBase {
+ public:
+  explicit PluginStageFunction(const MSServingStageFunction &function) : function_(function) {}
+  ~PluginStageFunction() override = default;
+
+  Status Call(const std::string &func_name, const InstanceData &input, InstanceData *output) override;
+  size_t GetInputsCount(const std::string &) const override { return function_.inputs_count; }
+  size_t GetOutputsCount(const std::string &) const override { return function_.outputs_count; }
+
+ private:
+  MSServingStageFunction function_;
+};
+
+class MS_API StagePluginLoader {
+ public:
+  static StagePluginLoader &Instance();
+
+  // dlopen the library and register its function 'func_name' as C++ stage function 'stage_name'
+  Status LoadStageFunction(const std::string &stage_name, const std::string &lib_path, const std::string &func_name);
+  // register function 'func_name' returned by the entry of one plugin as C++ stage function 'stage_name'
+  Status RegisterStageFunction(const std::string &stage_name, MSServingGetStageFunctionsFunc entry,
+                               const std::string &func_name);
+
+ private:
+  std::mutex lock_;
+  // the libraries are not closed, since their functions may be called until the process exits
+  std::unordered_map<std::string, void *> lib_handles_;
+
+  Status RegisterStageFunctionInner(const std::string &stage_name, MSServingGetStageFunctionsFunc entry,
+                                    const std::string &func_name);
+};
+}  // namespace mindspore::serving
+
+#endif  // MINDSPORE_SERVING_WORKER_STAGE_PLUGIN_LOADER_H
@@ -16,8 +16,11 @@
 
 #include "worker/task_queue.h"
 #include <utility>
+#include <algorithm>
 #include <unordered_map>
+#include <chrono>
 #include "worker/stage_function.h"
+#include "common/utils.h"
 
 namespace mindspore::serving {
 TaskQueue::TaskQueue() {}
@@ -32,11 +35,13 @@ void TaskQueue::Start(const std::string &que_name, const std::vector<TaskInfo> &
   task_callback_ = callback;
   methods_queue_.group_que_map.clear();
   methods_queue_.groups_que_instances_count = 0;
+  methods_queue_.virtual_time = 0;
   for (auto &info : task_infos) {
     if (info.batch_size == 0) {
       MSI_LOG_EXCEPTION << "Invalid batch size 0, queue name: " << que_name;
     }
     auto &method_queue = methods_queue_.group_que_map[info.group_name];
+    method_queue.weight = info.weight > 0 ? info.weight : 1;
     auto &stage_queue = method_queue.priority_que_map[info.priority];
     stage_queue.task_info = info;
   }
@@ -75,8 +80,21 @@ void TaskQueue::PushTask(const std::string &group_name, size_t priority, const s
                         << ", queue name: " << que_name_;
     }
     auto &que = stage_it->second;
+    auto now = std::chrono::steady_clock::now();
+    auto &instance_list = que.instance_list;
+    auto &time_list = que.enqueue_time_list;
     for (auto &instance : instances) {
-      que.instance_list.push_back(instance);
+      // the instances are sorted by request priority in descending order, and FIFO in the same priority
+      auto pos = instance_list.size();
+      while (pos > 0 && instance_list[pos - 1]->priority < instance->priority) {
+        pos--;
+      }
+      (void)instance_list.insert(instance_list.begin() + static_cast<ptrdiff_t>(pos), instance);
+      (void)time_list.insert(time_list.begin() + static_cast<ptrdiff_t>(pos), now);
+    }
+    if (stage_queue.priority_que_instances_count == 0) {
+      // an idle method cannot accumulate credits of the time it has no instance
+      stage_queue.virtual_time = std::max(stage_queue.virtual_time, methods_queue_.virtual_time);
     }
     stage_queue.priority_que_instances_count += instances.size();
     methods_queue_.groups_que_instances_count += instances.size();
@@ -84,34 +102,141 @@ void TaskQueue::PushTask(const std::string &group_name, size_t priority, const s
   cond_var_.notify_all();
 }
 
-bool TaskQueue::FindProcessTaskQueue(std::string *method_name) {
-  auto next_que = methods_queue_.next_exe_que;
-  auto &que_map = methods_queue_.group_que_map;
-  size_t index = 0;
-  std::string name;
-  for (auto &item : que_map) {
-    if (item.second.priority_que_instances_count > 0 && (name.empty() || index >= next_que)) {
-      name = item.first;
-      if (index >= next_que) {
-        break;
+void TaskQueue::GetProcessTaskQueues(std::vector<std::pair<std::string, TaskItem *>> *task_ques) {
+  // one candidate stage of each method that has instances to be processed
+  std::vector<std::pair<std::string, TaskItem *>> candidates;
+  for (auto &item : methods_queue_.group_que_map) {
+    if (item.second.priority_que_instances_count > 0) {
+      auto task_handle = FindProcessStageQueue(item.first);
+      if (task_handle != nullptr) {
+        candidates.emplace_back(item.first, task_handle);
       }
     }
-    index++;
   }
-  if (name.empty()) {
-    return false;
+  // The method with higher request priority is preferred, and the methods with the same request priority are
+  // scheduled by weighted fair queuing: the one with the smallest virtual time is preferred
+  auto &que_map = methods_queue_.group_que_map;
+  std::stable_sort(candidates.begin(), candidates.end(),
+                   [&que_map](const std::pair<std::string, TaskItem *> &left,
+                              const std::pair<std::string, TaskItem *> &right) {
+                     auto left_priority = left.second->instance_list.front()->priority;
+                     auto right_priority = right.second->instance_list.front()->priority;
+                     if (left_priority != right_priority) {
+                       return left_priority > right_priority;
+                     }
+                     return que_map[left.first].virtual_time < que_map[right.first].virtual_time;
+                   });
+  *task_ques = std::move(candidates);
+}
+
+TaskItem *TaskQueue::FindProcessStageQueue(const std::string &method_name) {
+  auto &method_que = methods_queue_.group_que_map[method_name];
+  auto &stage_que_map = method_que.priority_que_map;
+  // the stage with higher request priority is preferred, and then the later stage is preferred
+  TaskItem *task_handle = nullptr;
+  for (auto stage_it = stage_que_map.rbegin(); stage_it != stage_que_map.rend(); ++stage_it) {
+    auto &instance_list = stage_it->second.instance_list;
+    if (instance_list.empty()) {
+      continue;
+    }
+    auto max_parallel = stage_it->second.task_info.max_parallel;
+    if (max_parallel > 0 && stage_it->second.processing_count >= max_parallel) {
+      continue;
+    }
+    if (task_handle == nullptr || instance_list.front()->priority > task_handle->instance_list.front()->priority) {
+      task_handle = &stage_it->second;
+    }
+  }
+  // nullptr when all stages with instances are processing max parallel tasks
+  return task_handle;
+}
+
+uint64_t TaskQueue::GetReadyInstancesCount(const TaskItem &task_handle, const TaskTimePoint &now,
+                                           TaskTimePoint *wake_time) {
+  auto &task_info = task_handle.task_info;
+  uint64_t count = task_handle.instance_list.size();
+  if (count >= task_info.batch_size) {
+    return task_info.batch_size;
   }
-  if (index + 1 >= que_map.size()) {
-    methods_queue_.next_exe_que = 0;
-  } else {
-    methods_queue_.next_exe_que = index + 1;
+  if (task_info.max_queue_delay_us == 0) {
+    return count;
+  }
+  // the instances are ordered by request priority, the oldest one is not always at the front
+  auto &time_list = task_handle.enqueue_time_list;
+  auto oldest_time = *std::min_element(time_list.begin(), time_list.end());
+  auto deadline = oldest_time + std::chrono::microseconds(task_info.max_queue_delay_us);
+  if (now >= deadline) {
+    return count;
+  }
+  uint64_t preferred_size = 0;
+  for (auto size : task_info.preferred_batch_sizes) {
+    if (size <= count && size > preferred_size) {
+      preferred_size = size;
+    }
+  }
+  if (preferred_size > 0) {
+    return preferred_size;
   }
-  *method_name = name;
-  return true;
+  if (deadline < *wake_time) {
+    *wake_time = deadline;
+  }
+  return 0;
 }
 
 void TaskQueue::PopTask(TaskItem *task_item) {
   MSI_EXCEPTION_IF_NULL(task_item);
+  while (true) {
+    PopTaskInner(task_item);
+    if (task_item->has_stopped) {
+      return;
+    }
+    // fail the instances whose deadline has been exceeded before they consume the stage time
+    std::vector<InstancePtr> expired_instances;
+    auto &instance_list = task_item->instance_list;
+    auto now_us = common::GetCurrentTimeUs();
+    auto expired = [now_us](const InstancePtr &instance) {
+      return instance->deadline_us != 0 && now_us >= instance->deadline_us;
+    };
+    for (auto &instance : instance_list) {
+      if (expired(instance)) {
+        expired_instances.push_back(instance);
+      }
+    }
+    if (expired_instances.empty()) {
+      return;
+    }
+    (void)instance_list.erase(std::remove_if(instance_list.begin(), instance_list.end(), expired), instance_list.end());
+    MSI_LOG_INFO << que_name_ << " Drop " << expired_instances.size() << " instances whose deadline exceeded";
+    auto error_msg = "Request deadline exceeded before the instance is processed by '" +
+                     task_item->task_info.task_name + "'";
+    PushTaskResult(expired_instances, Status(DEADLINE_EXCEEDED, error_msg));
+    if (!instance_list.empty()) {
+      return;
+    }
+    FinishTask(task_item->task_info);
+  }
+}
+
+void TaskQueue::FinishTask(const TaskInfo &task_info) {
+  if (task_info.max_parallel == 0) {
+    return;
+  }
+  {
+    std::unique_lock<std::mutex> lock{que_lock_};
+    auto method_it = methods_queue_.group_que_map.find(task_info.group_name);
+    if (method_it == methods_queue_.group_que_map.end()) {  // stopped
+      return;
+    }
+    auto stage_it = method_it->second.priority_que_map.find(task_info.priority);
+    if (stage_it == method_it->second.priority_que_map.end() || stage_it->second.processing_count == 0) {
+      return;
+    }
+    stage_it->second.processing_count--;
+  }
+  cond_var_.notify_all();
+}
+
+void TaskQueue::PopTaskInner(TaskItem *task_item) {
   std::unique_lock<std::mutex> lock{que_lock_};
   if (!is_running) {  // before start, or after stop
     MSI_LOG_INFO << "Detect task queue is not running, maybe the Serving server is stopped.";
@@ -127,42 +252,61 @@ void TaskQueue::PopTask(TaskItem *task_item) {
         return;
       }
     }
+    // Visit the methods in scheduling order, and pick the first one whose instances are ready to be dispatched
+    auto now = std::chrono::steady_clock::now();
+    auto wake_time = TaskTimePoint::max();
+    std::vector<std::pair<std::string, TaskItem *>> task_ques;
+    GetProcessTaskQueues(&task_ques);
     std::string method_name;
-    if (!FindProcessTaskQueue(&method_name)) {
-      MSI_LOG_EXCEPTION << "Cannot find task when the number " << methods_queue_.groups_que_instances_count
-                        << " of instances in task queue is not 0";
-    }
-    auto &method_que = methods_queue_.group_que_map[method_name];
-    auto &stage_que_map = method_que.priority_que_map;
-    auto stage_it = stage_que_map.rbegin();
-    for (; stage_it != stage_que_map.rend(); ++stage_it) {
-      if (!stage_it->second.instance_list.empty()) {
+    TaskItem *task_handle = nullptr;
+    uint64_t pop_count = 0;
+    for (auto &item : task_ques) {
+      method_name = item.first;
+      task_handle = item.second;
+      pop_count = GetReadyInstancesCount(*task_handle, now, &wake_time);
+      if (pop_count > 0) {
         break;
       }
     }
-    if (stage_it == stage_que_map.rend()) {
-      MSI_LOG_EXCEPTION << "Cannot find task when the number " << method_que.priority_que_instances_count
-                        << " of instances in method task queue is not 0";
+    if (pop_count == 0) {
+      // Wait for more instances until the max queue delay of the oldest instance expires
+      (void)cond_var_.wait_until(lock, wake_time);
+      if (!is_running) {
+        MSI_LOG_INFO << "Detect task queue '" << que_name_ << "' is not running, maybe the Serving server is stopped.";
+        task_item->has_stopped = true;
+        return;
+      }
+      continue;
     }
-    auto &task_handle = stage_it->second;
-    auto batch_size = task_handle.task_info.batch_size;
+    auto batch_size = task_handle->task_info.batch_size;
     // Pop a maximum of batch_size instances
-    if (task_handle.instance_list.size() <= batch_size) {
-      *task_item = task_handle;
-      task_handle.instance_list.clear();
+    if (task_handle->instance_list.size() <= pop_count) {
+      *task_item = *task_handle;
+      task_handle->instance_list.clear();
+      task_handle->enqueue_time_list.clear();
     } else {
-      *task_item = task_handle;
+      *task_item = *task_handle;
       auto &instances_ret = task_item->instance_list;
-      (void)instances_ret.erase(instances_ret.begin() + static_cast<ptrdiff_t>(batch_size), instances_ret.end());
-      auto &instances_reserved = task_handle.instance_list;
+      (void)instances_ret.erase(instances_ret.begin() + static_cast<ptrdiff_t>(pop_count), instances_ret.end());
+      auto &instances_reserved = task_handle->instance_list;
       (void)instances_reserved.erase(instances_reserved.begin(),
-                                     instances_reserved.begin() + static_cast<ptrdiff_t>(batch_size));
+                                     instances_reserved.begin() + static_cast<ptrdiff_t>(pop_count));
+      auto &time_reserved = task_handle->enqueue_time_list;
+      (void)time_reserved.erase(time_reserved.begin(), time_reserved.begin() + static_cast<ptrdiff_t>(pop_count));
     }
+    task_item->enqueue_time_list.clear();
     MSI_LOG_DEBUG << que_name_ << " Pop instances count " << task_item->instance_list.size()
                   << ", batch size: " << batch_size;
 
+    auto &method_que = methods_queue_.group_que_map[method_name];
+    // advance the virtual time of the method by the cost of the instances popped, scaled by the method weight
+    methods_queue_.virtual_time = method_que.virtual_time;
+    method_que.virtual_time += task_item->instance_list.size() * kVirtualTimeScale / method_que.weight;
     method_que.priority_que_instances_count -= task_item->instance_list.size();
     methods_queue_.groups_que_instances_count -= task_item->instance_list.size();
+    if (task_handle->task_info.max_parallel > 0) {
+      task_handle->processing_count++;
+    }
     break;
   }
 }
@@ -197,6 +341,7 @@ void TaskQueue::PushTaskResult(const std::vector<InstancePtr> &inputs, const Sta
 void PyTaskQueue::Start(const std::string &que_name, const std::vector<MethodStage> &stage_infos,
                         const TaskCallBack &callback) {
   std::vector<TaskInfo> task_infos;
+  parallel_num_ = 1;
   for (auto &item : stage_infos) {
     TaskInfo info;
     info.batch_size = item.batch_size;
@@ -204,10 +349,17 @@ void PyTaskQueue::Start(const std::string &que_name, const std::vector<MethodSta
     info.group_name = item.method_name;
     info.task_name = item.stage_key;
     info.tag = item.tag;
+    info.weight = item.weight;
+    info.max_parallel = std::max<uint64_t>(item.num_parallel, 1);
     task_infos.push_back(info);
+    // one thread for stages processed serially, and extra threads for the stages processed in parallel
+    parallel_num_ += info.max_parallel - 1;
+  }
+  {
+    std::unique_lock<std::mutex> lock{lock_};
+    py_task_items_processing_.clear();
   }
   task_queue_.Start(que_name, task_infos, callback);
-  py_task_item_processing_ = TaskItem();
 }
 
 void PyTaskQueue::Stop() { task_queue_.Stop(); }
@@ -221,28 +373,56 @@ void PyTaskQueue::PyPopTask(TaskItem *task_item) {
   MSI_EXCEPTION_IF_NULL(task_item);
   task_queue_.PopTask(task_item);
   if (!task_item->has_stopped) {
-    py_task_item_processing_ = *task_item;
+    std::unique_lock<std::mutex> lock{lock_};
+    task_item->task_id = next_task_id_++;
+    py_task_items_processing_[task_item->task_id] = *task_item;
   }
 }
 
-void PyTaskQueue::PyPushTaskResult(const std::vector<ResultInstance> &outputs) {
+TaskInfo PyTaskQueue::GetHandledTaskInfo(uint64_t task_id) {
+  std::unique_lock<std::mutex> lock{lock_};
+  auto it = py_task_items_processing_.find(task_id);
+  if (it == py_task_items_processing_.end()) {
+    MSI_LOG_EXCEPTION << "Cannot find processing task " << task_id;
+  }
+  return it->second.task_info;
+}
+
+void PyTaskQueue::PyPushTaskResult(uint64_t task_id, const std::vector<ResultInstance> &outputs) {
   if (!task_queue_.IsRunning()) {
     MSI_LOG_INFO << "Task queue has exited";
     return;
   }
-  auto &instance_list = py_task_item_processing_.instance_list;
-  if (outputs.empty() || instance_list.size() < outputs.size()) {
-    MSI_LOG_EXCEPTION << "processing task not match result, processing size " << instance_list.size()
-                      << ", result size " << outputs.size();
-  }
   std::vector<InstancePtr> instances;
   std::vector<ResultInstance> results;
-  for (size_t i = 0; i < outputs.size(); i++) {
-    instances.push_back(instance_list[i]);
-    results.push_back(outputs[i]);
+  TaskInfo finished_task_info;
+  bool finished = false;
+  {
+    std::unique_lock<std::mutex> lock{lock_};
+    auto it = py_task_items_processing_.find(task_id);
+    if (it == py_task_items_processing_.end()) {
+      MSI_LOG_EXCEPTION << "Cannot find processing task " << task_id;
+    }
+    auto &instance_list = it->second.instance_list;
+    if (outputs.empty() || instance_list.size() < outputs.size()) {
+      MSI_LOG_EXCEPTION << "processing task not match result, processing size " << instance_list.size()
+                        << ", result size " << outputs.size();
+    }
+    for (size_t i = 0; i < outputs.size(); i++) {
+      instances.push_back(instance_list[i]);
+      results.push_back(outputs[i]);
+    }
+    (void)instance_list.erase(instance_list.begin(), instance_list.begin() + static_cast<ptrdiff_t>(outputs.size()));
+    if (instance_list.empty()) {
+      finished = true;
+      finished_task_info = it->second.task_info;
+      (void)py_task_items_processing_.erase(it);
+    }
   }
   task_queue_.PushTaskResult(instances, results);
-  (void)instance_list.erase(instance_list.begin(), instance_list.begin() + static_cast<ptrdiff_t>(outputs.size()));
+  if (finished) {
+    task_queue_.FinishTask(finished_task_info);
+  }
 }
 
 CppTaskQueueThreadPool::CppTaskQueueThreadPool() = default;
@@ -278,6 +458,7 @@ void CppTaskQueueThreadPool::Start(const std::string &que_name, const std::vecto
     info.group_name = item.method_name;
     info.task_name = item.stage_key;
     info.tag = item.tag;
+    info.weight = item.weight;
     task_infos.push_back(info);
   }
   task_queue_.Start(que_name, task_infos, callback);  // start before ThreadFunc thread pool start
@@ -314,23 +495,28 @@ Status CppTaskQueueThreadPool::HandleTask(const TaskItem &task_item) {
     status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "System error, get preprocess " << task_name << " failed";
     return status;
   }
-  for (const auto &instance : task_item.instance_list) {
-    ResultInstance result;
-    try {
-      status = preprocess->Call(task_name, instance->data, &result.data);
-    } catch (const std::bad_alloc &ex) {
-      status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: malloc memory failed";
-    } catch (const std::runtime_error &ex) {
-      status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: runtime error occurred: " << ex.what();
-    } catch (const std::exception &ex) {
-      status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred: " << ex.what();
-    } catch (...) {
-      status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred";
-    }
-    if (status != SUCCESS) {
-      result.error_msg = status;
-    }
-    task_queue_.PushTaskResult(instance, result);
+  std::vector<ResultInstance> results;
+  // the exceptions of instances are caught in CallBatch, the exception here fails all instances of the task
+  try {
+    preprocess->CallBatch(task_name, task_item.instance_list, &results);
+  } catch (const std::bad_alloc &ex) {
+    status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: malloc memory failed";
+  } catch (const std::runtime_error &ex) {
+    status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: runtime error occurred: " << ex.what();
+  } catch (const std::exception &ex) {
+    status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred: " << ex.what();
+  } catch (...) {
+    status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: exception occurred";
+  }
+  if (status == SUCCESS && results.size() != task_item.instance_list.size()) {
+    status = INFER_STATUS_LOG_ERROR(SYSTEM_ERROR) << "Serving Error: the results count " << results.size()
+                                                  << " of " << task_name << " not equal to the instances count "
+                                                  << task_item.instance_list.size();
+  }
+  if (status != SUCCESS) {
+    task_queue_.PushTaskResult(task_item.instance_list, status);
+  } else {
+    task_queue_.PushTaskResult(task_item.instance_list, results);
   }
   return SUCCESS;
 }
@@ -28,6 +28,8 @@
 #include <set>
 #include <thread>
 #include <map>
+#include <chrono>
+#include <utility>
 #include "common/instance.h"
 
 namespace mindspore::serving {
@@ -38,12 +40,22 @@ struct TaskInfo {
   uint64_t batch_size = 0;
   uint64_t subgraph = 0;  // for model
   std::string tag;
+  // dynamic batching: max time the oldest instance can wait for a full batch, 0: dispatch immediately
+  uint64_t max_queue_delay_us = 0;
+  std::vector<uint64_t> preferred_batch_sizes;  // dispatch without waiting when reaching one of these sizes
+  uint64_t weight = 1;                          // weight of the method in weighted fair scheduling
+  uint64_t max_parallel = 0;                    // max tasks of the stage processed concurrently, 0: no limit
 };
 
+using TaskTimePoint = std::chrono::steady_clock::time_point;
+
 struct TaskItem {
   bool has_stopped = false;  // whether system is stopped
+  uint64_t task_id = 0;      // id of the task popped, used to match the results pushed
   TaskInfo task_info;
   std::vector<InstancePtr> instance_list;
+  std::vector<TaskTimePoint> enqueue_time_list;  // enqueue time of each instance in instance_list
+  uint64_t processing_count = 0;                 // for stage queue, the number of tasks popped and not finished
 };
 
 using TaskCallBack =
@@ -52,11 +64,13 @@ using TaskCallBack =
 struct TaskQueuePriority {
   std::map<uint64_t, TaskItem> priority_que_map;  // priority: stage index, task list
   uint64_t priority_que_instances_count = 0;
+  uint64_t weight = 1;        // method weight, share of the queue when methods compete
+  uint64_t virtual_time = 0;  // weighted fair scheduling, advanced by kVirtualTimeScale / weight per instance
 };
 
 struct TaskQueueGroups {
   std::map<std::string, TaskQueuePriority> group_que_map;  // group name: method name, task que
-  size_t next_exe_que = 0;                                 // next method index
+  uint64_t virtual_time = 0;  // virtual time of the method processed last
   uint64_t groups_que_instances_count = 0;
 };
 
@@ -67,6 +81,8 @@ class TaskQueue {
   void Stop();
   void PushTask(const std::string &group_name, size_t priority, const std::vector<InstancePtr> &instances);
   void PopTask(TaskItem *task_item);
+  // notify that all instances of the task popped have been handled, only for the stage with max_parallel
+  void FinishTask(const TaskInfo &task_info);
 
   void PushTaskResult(const InstancePtr &input, const ResultInstance &output);
   void PushTaskResult(const std::vector<InstancePtr> &inputs, const std::vector<ResultInstance> &outputs);
@@ -83,7 +99,14 @@ class TaskQueue {
   std::condition_variable cond_var_;
   bool is_running = false;
 
-  bool FindProcessTaskQueue(std::string *method_name);
+  static constexpr uint64_t kVirtualTimeScale = 1000000;
+
+  void PopTaskInner(TaskItem *task_item);
+
+  void GetProcessTaskQueues(std::vector<std::pair<std::string, TaskItem *>> *task_ques);
+  TaskItem *FindProcessStageQueue(const std::string &method_name);
+  static uint64_t GetReadyInstancesCount(const TaskItem &task_handle, const TaskTimePoint &now,
+                                         TaskTimePoint *wake_time);
 };
 
 class MS_API PyTaskQueue {
@@ -96,14 +119,19 @@ class MS_API PyTaskQueue {
   void PushTask(const std::string &method_name, size_t stage_index, const std::vector<InstancePtr> &instances);
   // for python task
   void PyPopTask(TaskItem *task_item);
-  void PyPushTaskResult(const std::vector<ResultInstance> &outputs);
-  TaskInfo GetHandledTaskInfo() const { return py_task_item_processing_.task_info; }
+  void PyPushTaskResult(uint64_t task_id, const std::vector<ResultInstance> &outputs);
+  TaskInfo GetHandledTaskInfo(uint64_t task_id);
+  // the number of python threads needed to process the tasks of all stages with their max parallel number
+  uint64_t GetParallelNum() const { return parallel_num_; }
 
   bool IsRunning() const { return task_queue_.IsRunning(); }
 
  private:
   TaskQueue task_queue_;
-  TaskItem py_task_item_processing_;
+  std::mutex lock_;
+  uint64_t next_task_id_ = 1;
+  std::map<uint64_t, TaskItem> py_task_items_processing_;  // task id, task popped and not finished
+  uint64_t parallel_num_ = 1;
 };
 
 class CppTaskQueueThreadPool {
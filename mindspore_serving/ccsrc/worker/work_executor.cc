@@ -20,11 +20,17 @@
 #include <thread>
 #include <chrono>
 #include <map>
+#include <algorithm>
 #include "worker/stage_function.h"
 #include "common/tensor.h"
 #include "worker/servable_register.h"
+#include "worker/context.h"
 
 namespace mindspore::serving {
+namespace {
+constexpr uint32_t kDefaultCppStageThreadNum = 3;
+}  // namespace
+
 WorkExecutor::WorkExecutor() = default;
 
 WorkExecutor::~WorkExecutor() noexcept { Stop(); }
@@ -54,28 +60,116 @@ void WorkExecutor::StageCallback(const std::vector<InstancePtr> &instances,
     MSI_LOG_ERROR << "Invalid inputs size " << instances.size() << ", result size " << outputs.size();
     return;
   }
-  // <method name, <stage index, instances>>
-  std::map<std::string, std::map<uint64_t, std::vector<InstancePtr>>> outputs_real;
+  // The instances of one callback come from one task of a stage queue in most cases, so the instances are grouped
+  // by method and stage through linear search, and pushed to the next stage in one batch of each group
+  struct StageInstances {
+    const MethodSignature *method_def = nullptr;
+    uint64_t stage_index = 0;
+    std::vector<InstancePtr> instances;
+  };
+  std::vector<StageInstances> outputs_real;
+  // instances of the stages run in parallel, whose inputs have been created
+  std::vector<StageInstances> ready_stages;
+  std::vector<InstancePtr> ready_instances;
   for (size_t i = 0; i < instances.size(); i++) {
     auto &instance = instances[i];
     auto &output = outputs[i];
+    if (instance->parent != nullptr) {
+      ready_instances.clear();
+      OnParallelStageDone(instance, output, &ready_instances);
+      for (auto &ready_instance : ready_instances) {
+        auto it = std::find_if(ready_stages.begin(), ready_stages.end(), [&ready_instance](const StageInstances &item) {
+          return item.method_def == ready_instance->method_def && item.stage_index == ready_instance->stage_index;
+        });
+        if (it == ready_stages.end()) {
+          it = ready_stages.insert(ready_stages.end(),
+                                   StageInstances{ready_instance->method_def, ready_instance->stage_index, {}});
+        }
+        it->instances.push_back(ready_instance);
+      }
+      continue;
+    }
     if (output.error_msg != SUCCESS) {
       (void)ReplyError(instance, output.error_msg);
       continue;
     }
     CreateResultInstance(instance, output);
-    outputs_real[instance->method_def->method_name][instance->stage_index].push_back(instance);
-  }
-  for (auto &method_instances_it : outputs_real) {
-    for (auto &stage_instances_it : method_instances_it.second) {
-      auto &stage_instances = stage_instances_it.second;
-      if (!stage_instances.empty()) {
-        auto &method_def = *stage_instances[0]->method_def;
-        auto stage_index = stage_instances_it.first;
-        OnReceiveStageInputs(method_def, stage_index + 1, stage_instances);
+    auto it = std::find_if(outputs_real.begin(), outputs_real.end(), [&instance](const StageInstances &item) {
+      return item.method_def == instance->method_def && item.stage_index == instance->stage_index;
+    });
+    if (it == outputs_real.end()) {
+      it = outputs_real.insert(outputs_real.end(), StageInstances{instance->method_def, instance->stage_index, {}});
+      it->instances.reserve(instances.size() - i);
+    }
+    it->instances.push_back(instance);
+  }
+  for (auto &stage_instances : outputs_real) {
+    OnReceiveStageInputs(*stage_instances.method_def, stage_instances.stage_index + 1, stage_instances.instances);
+  }
+  for (auto &stage_instances : ready_stages) {
+    PushStageTask(*stage_instances.method_def, stage_instances.stage_index, stage_instances.instances);
+  }
+}
+
+void WorkExecutor::OnParallelStageDone(const InstancePtr &instance, const ResultInstance &output,
+                                       std::vector<InstancePtr> *ready_instances) {
+  auto &parent = instance->parent;
+  auto &method_def = *instance->method_def;
+  auto stage_max = method_def.GetStageMax();
+  bool reply = false;
+  {
+    std::unique_lock<std::mutex> lock(parallel_stage_mutex_);
+    if (parent->stage_failed) {
+      return;  // the request instance has been replied with the error of another stage
+    }
+    if (output.error_msg != SUCCESS) {
+      parent->stage_failed = true;
+    } else {
+      parent->stage_data_list[instance->stage_index] = output.data;
+      auto &stage = method_def.stage_map.at(instance->stage_index);
+      for (auto next_stage : stage.next_stages) {
+        auto &wait_count = parent->stage_wait_count[next_stage];
+        if (wait_count == 0 || --wait_count > 0) {
+          continue;
+        }
+        auto &next = method_def.stage_map.at(next_stage);
+        if (next_stage >= stage_max) {
+          // the return stage depends on all the other stages, no stage of the instance is running
+          CreateInputInstance(next, parent);
+          reply = true;
+        } else {
+          ready_instances->push_back(CreateStageInstance(next, parent));
+        }
       }
     }
   }
+  if (output.error_msg != SUCCESS) {
+    (void)ReplyError(parent, output.error_msg);
+  } else if (reply) {
+    (void)ReplyRequest(parent);
+  }
+}
+
+void WorkExecutor::StartParallelStages(const MethodSignature &method_def, const std::vector<InstancePtr> &instances) {
+  for (auto &instance : instances) {
+    for (auto &item : method_def.stage_map) {
+      instance->stage_wait_count[item.first] = item.second.depend_stages.size();
+    }
+  }
+  // create the instances of all the start stages before any of them is pushed, since the outputs of the pushed stages
+  // may be saved to the request instances concurrently
+  std::vector<std::vector<InstancePtr>> stage_instances_list;
+  for (auto stage_index : method_def.start_stages) {
+    auto &stage = method_def.stage_map.at(stage_index);
+    std::vector<InstancePtr> stage_instances;
+    for (auto &instance : instances) {
+      stage_instances.push_back(CreateStageInstance(stage, instance));
+    }
+    stage_instances_list.push_back(std::move(stage_instances));
+  }
+  for (size_t i = 0; i < method_def.start_stages.size(); i++) {
+    PushStageTask(method_def, method_def.start_stages[i], stage_instances_list[i]);
+  }
 }
 
 void WorkExecutor::InitStageFunctionQueue() {
@@ -88,11 +182,17 @@ void WorkExecutor::InitStageFunctionQueue() {
   std::vector<MethodStage> py_stage_infos;
   std::vector<MethodStage> cpp_stage_infos;
   for (auto &method : signature.methods) {
+    if (method.parallel_stages) {
+      MSI_LOG_INFO << "The independent stages of method " << method.method_name
+                   << " are run in parallel, start stages: " << method.start_stages;
+    }
     for (auto &stage_it : method.stage_map) {
-      auto &stage = stage_it.second;
+      auto stage = stage_it.second;
+      stage.weight = method.weight;
       if (stage.stage_type == kMethodStageTypePyFunction) {
         MSI_LOG_INFO << "PyFunction stage " << stage.stage_key << ", method name: " << stage.method_name
-                     << ", stage index: " << stage.stage_index << ", batch size: " << stage.batch_size;
+                     << ", stage index: " << stage.stage_index << ", batch size: " << stage.batch_size
+                     << ", parallel number: " << stage.num_parallel;
         py_stage_infos.push_back(stage);
       } else if (stage.stage_type == kMethodStageTypeCppFunction) {
         MSI_LOG_INFO << "CppFunction stage " << stage.stage_key << ", method name: " << stage.method_name
@@ -105,7 +205,12 @@ void WorkExecutor::InitStageFunctionQueue() {
     py_task_queue_.Start("PyTask", py_stage_infos, stage_callback);
   }
   if (!cpp_stage_infos.empty()) {
-    cpp_task_queue_pool_.Start("CppTask", cpp_stage_infos, stage_callback, 3);  // 3 thread
+    auto thread_num = ServableContext::Instance()->GetNumCppStageThreads();
+    if (thread_num == 0) {
+      thread_num = kDefaultCppStageThreadNum;
+    }
+    MSI_LOG_INFO << "Start " << thread_num << " threads for C++ stages";
+    cpp_task_queue_pool_.Start("CppTask", cpp_stage_infos, stage_callback, thread_num);
   }
 }
 
@@ -166,13 +271,19 @@ Status WorkExecutor::Work(const RequestSpec &request_spec, const std::vector<Ins
     instance->stage_data_list[0] = instances_data[i];  // stage 0 data: input
     instance->stage_max = method_def->GetStageMax();
     instance->user_id = user_id;
+    instance->priority = request_spec.priority;
+    instance->deadline_us = request_spec.deadline_us;
   }
   infer_session.instances = instances;
   {
     std::unique_lock<std::mutex> lock(infer_session_map_mutex_);
     infer_session_map_[user_id] = infer_session;
   }
-  OnReceiveStageInputs(*method_def, kStageStartIndex, instances);  // stage 1 is the first stage
+  if (method_def->parallel_stages) {
+    StartParallelStages(*method_def, instances);
+  } else {
+    OnReceiveStageInputs(*method_def, kStageStartIndex, instances);  // stage 1 is the first stage
+  }
   return SUCCESS;
 }
 
@@ -191,6 +302,12 @@ void WorkExecutor::OnReceiveStageInputs(const MethodSignature &method_def, uint6
     (void)ReplyRequest(instances);
     return;
   }
+  PushStageTask(method_def, stage_index, instances);
+}
+
+void WorkExecutor::PushStageTask(const MethodSignature &method_def, uint64_t stage_index,
+                                 const std::vector<InstancePtr> &instances) {
+  auto &stage = method_def.stage_map.at(stage_index);
   if (stage.stage_type == kMethodStageTypePyFunction) {
     py_task_queue_.PushTask(method_def.method_name, stage_index, instances);
   } else if (stage.stage_type == kMethodStageTypeCppFunction) {
@@ -252,15 +369,21 @@ void WorkExecutor::CreateInputInstance(const MethodStage &stage, const std::vect
 }
 
 void WorkExecutor::CreateInputInstance(const MethodStage &stage, const InstancePtr &instance) {
+  CreateInputInstance(stage, instance->stage_data_list, instance);
+}
+
+void WorkExecutor::CreateInputInstance(const MethodStage &stage, const std::map<size_t, InstanceData> &stage_data_list,
+                                       const InstancePtr &instance) {
   instance->data.clear();
   const auto &inputs = stage.stage_inputs;
   instance->stage_index = stage.stage_index;
   for (auto &item : inputs) {
-    if (item.first >= instance->stage_data_list.size()) {
+    auto data_it = stage_data_list.find(item.first);
+    if (data_it == stage_data_list.end()) {
       MSI_LOG_EXCEPTION << "Invalid input stage index " << item.first << ", data stage count "
-                        << instance->stage_data_list.size();
+                        << stage_data_list.size();
     }
-    auto &data = instance->stage_data_list[item.first];
+    auto &data = data_it->second;
     if (data.size() <= item.second) {
       MSI_LOG_EXCEPTION << "Invalid output index " << item.second << ", output count " << data.size()
                         << ", input stage index " << item.first << ", stage index " << stage.stage_index << ", method "
@@ -270,6 +393,18 @@ void WorkExecutor::CreateInputInstance(const MethodStage &stage, const InstanceP
   }
 }
 
+InstancePtr WorkExecutor::CreateStageInstance(const MethodStage &stage, const InstancePtr &parent) {
+  auto instance = std::make_shared<Instance>();
+  instance->method_def = parent->method_def;
+  instance->stage_max = parent->stage_max;
+  instance->user_id = parent->user_id;
+  instance->priority = parent->priority;
+  instance->deadline_us = parent->deadline_us;
+  instance->parent = parent;
+  CreateInputInstance(stage, parent->stage_data_list, instance);
+  return instance;
+}
+
 void WorkExecutor::CreateResultInstance(const InstancePtr &instance, const ResultInstance &result) {
   instance->data.clear();
   auto stage_index = instance->stage_index;
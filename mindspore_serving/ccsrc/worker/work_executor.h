@@ -66,6 +66,8 @@ class WorkExecutor : public std::enable_shared_from_this<WorkExecutor> {
 
   std::map<uint64_t, InferSession> infer_session_map_;
   std::mutex infer_session_map_mutex_;
+  // guard the outputs and stage states of the request instances whose stages are run in parallel
+  std::mutex parallel_stage_mutex_;
 
   bool ReplyCallback(const InstancePtr &instance);
   bool ReplyError(const InstancePtr &context, const Status &error_msg);
@@ -74,8 +76,18 @@ class WorkExecutor : public std::enable_shared_from_this<WorkExecutor> {
 
   void OnReceiveStageInputs(const MethodSignature &method_def, uint64_t stage_index,
                             const std::vector<InstancePtr> &instances);
+  void PushStageTask(const MethodSignature &method_def, uint64_t stage_index,
+                     const std::vector<InstancePtr> &instances);
+  void StartParallelStages(const MethodSignature &method_def, const std::vector<InstancePtr> &instances);
+  // save the outputs of one stage to the request instance and get the instances of the following stages whose inputs
+  // are ready, the request instance is replied when the stage failed or the return stage is ready
+  void OnParallelStageDone(const InstancePtr &instance, const ResultInstance &output,
+                           std::vector<InstancePtr> *ready_instances);
 
   static void CreateInputInstance(const MethodStage &stage, const InstancePtr &instance);
+  static void CreateInputInstance(const MethodStage &stage, const std::map<size_t, InstanceData> &stage_data_list,
+                                  const InstancePtr &instance);
+  static InstancePtr CreateStageInstance(const MethodStage &stage, const InstancePtr &parent);
   static void CreateInputInstance(const MethodStage &stage, const std::vector<InstancePtr> &instances);
   static void CreateResultInstance(const InstancePtr &instance, const ResultInstance &result);
 
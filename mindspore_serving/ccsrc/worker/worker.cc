@@ -51,6 +51,8 @@ Status Worker::RunAsync(const proto::PredictRequest &request, proto::PredictRepl
   Status status;
   RequestSpec request_spec;
   GrpcTensorHelper::GetRequestSpec(request, &request_spec);
+  // master sends the remaining time of the deadline, which is converted to the deadline in the clock of worker
+  request_spec.deadline_us = common::GetDeadlineFromTimeout(request.timeout_us());
 
   auto servable_name = request_spec.servable_name;
   auto method_name = request_spec.method_name;
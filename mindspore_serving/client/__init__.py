@@ -15,10 +15,14 @@
 """MindSpore Serving Client API, which can be used to access the Serving Server through gRPC"""
 
 from .python.client import Client
+from .python.client import AsyncClient
+from .python.client import BatchingClient
 from .python.client import SSLConfig
 
 __all__ = []
 __all__.extend([
     "Client",
+    "AsyncClient",
+    "BatchingClient",
     "SSLConfig"
 ])
@@ -14,39 +14,47 @@
 # ============================================================================
 """MindSpore Serving Client"""
 
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
 import grpc
+from grpc import aio
 import numpy as np
 import mindspore_serving.proto.ms_service_pb2 as ms_service_pb2
 import mindspore_serving.proto.ms_service_pb2_grpc as ms_service_pb2_grpc
 
 
+# numpy dtype to tensor data type, looked up by the dtype of numpy array
+_np_to_proto_dtype = {
+    np.dtype(np.bool_): ms_service_pb2.MS_BOOL,
+    np.dtype(np.int8): ms_service_pb2.MS_INT8,
+    np.dtype(np.uint8): ms_service_pb2.MS_UINT8,
+    np.dtype(np.int16): ms_service_pb2.MS_INT16,
+    np.dtype(np.uint16): ms_service_pb2.MS_UINT16,
+    np.dtype(np.int32): ms_service_pb2.MS_INT32,
+    np.dtype(np.uint32): ms_service_pb2.MS_UINT32,
+
+    np.dtype(np.int64): ms_service_pb2.MS_INT64,
+    np.dtype(np.uint64): ms_service_pb2.MS_UINT64,
+    np.dtype(np.float16): ms_service_pb2.MS_FLOAT16,
+    np.dtype(np.float32): ms_service_pb2.MS_FLOAT32,
+    np.dtype(np.float64): ms_service_pb2.MS_FLOAT64,
+}
+_proto_to_np_dtype = {value: key for key, value in _np_to_proto_dtype.items()}
+
+
 def _create_tensor(data, tensor=None):
     """Create tensor from numpy data"""
     if tensor is None:
         tensor = ms_service_pb2.Tensor()
 
-    tensor.shape.dims.extend(data.shape)
-    dtype_map = {
-        np.bool: ms_service_pb2.MS_BOOL,
-        np.int8: ms_service_pb2.MS_INT8,
-        np.uint8: ms_service_pb2.MS_UINT8,
-        np.int16: ms_service_pb2.MS_INT16,
-        np.uint16: ms_service_pb2.MS_UINT16,
-        np.int32: ms_service_pb2.MS_INT32,
-        np.uint32: ms_service_pb2.MS_UINT32,
-
-        np.int64: ms_service_pb2.MS_INT64,
-        np.uint64: ms_service_pb2.MS_UINT64,
-        np.float16: ms_service_pb2.MS_FLOAT16,
-        np.float32: ms_service_pb2.MS_FLOAT32,
-        np.float64: ms_service_pb2.MS_FLOAT64,
-    }
-    for k, v in dtype_map.items():
-        if k == data.dtype:
-            tensor.dtype = v
-            break
-    if tensor.dtype == ms_service_pb2.MS_UNKNOWN:
+    dtype = _np_to_proto_dtype.get(data.dtype)
+    if dtype is None:
         raise RuntimeError("Unknown data type " + str(data.dtype))
+    tensor.shape.dims.extend(data.shape)
+    tensor.dtype = dtype
+    # protobuf accepts bytes only, tobytes is the only copy of the data of a C-contiguous array
     tensor.data = data.tobytes()
     return tensor
 
@@ -87,35 +95,18 @@ def _create_str_tensor(str_vals, tensor=None):
 
 
 def _create_numpy_from_tensor(tensor):
-    """Create numpy from protobuf tensor"""
-    dtype_map = {
-        ms_service_pb2.MS_BOOL: np.bool,
-        ms_service_pb2.MS_INT8: np.int8,
-        ms_service_pb2.MS_UINT8: np.uint8,
-        ms_service_pb2.MS_INT16: np.int16,
-        ms_service_pb2.MS_UINT16: np.uint16,
-        ms_service_pb2.MS_INT32: np.int32,
-        ms_service_pb2.MS_UINT32: np.uint32,
-
-        ms_service_pb2.MS_INT64: np.int64,
-        ms_service_pb2.MS_UINT64: np.uint64,
-        ms_service_pb2.MS_FLOAT16: np.float16,
-        ms_service_pb2.MS_FLOAT32: np.float32,
-        ms_service_pb2.MS_FLOAT64: np.float64,
-    }
-    if tensor.dtype == ms_service_pb2.MS_STRING or tensor.dtype == ms_service_pb2.MS_BYTES:
-        result = []
-        for item in tensor.bytes_val:
-            if tensor.dtype == ms_service_pb2.MS_STRING:
-                result.append(bytes.decode(item))
-            else:
-                result.append(item)
+    """Create numpy from protobuf tensor, the numpy array is read-only and shares the bytes of tensor data"""
+    dtype = tensor.dtype
+    if dtype in (ms_service_pb2.MS_STRING, ms_service_pb2.MS_BYTES):
+        if dtype == ms_service_pb2.MS_STRING:
+            result = [bytes.decode(item) for item in tensor.bytes_val]
+        else:
+            result = list(tensor.bytes_val)
         if len(result) == 1:
             return result[0]
         return result
 
-    result = np.frombuffer(tensor.data, dtype_map[tensor.dtype]).reshape(tensor.shape.dims)
-    return result
+    return np.frombuffer(tensor.data, _proto_to_np_dtype[dtype]).reshape(tuple(tensor.shape.dims))
 
 
 def _check_str(arg_name, str_val):
@@ -170,6 +161,160 @@ class SSLConfig:
         self.custom_ca = custom_ca
 
 
+def _create_channel(grpc_module, address, ssl_config):
+    """Create channel by grpc_module, which is grpc for the blocking channel or grpc.aio for the asyncio channel"""
+    msg_bytes_size = 512 * 1024 * 1024  # 512MB
+    options = [
+        ('grpc.max_send_message_length', msg_bytes_size),
+        ('grpc.max_receive_message_length', msg_bytes_size),
+    ]
+    if ssl_config is None:
+        return grpc_module.insecure_channel(address, options=options)
+    if not isinstance(ssl_config, SSLConfig):
+        raise RuntimeError("The type of ssl_config should be type of SSLConfig")
+    rc_bytes = pk_bytes = c_bytes = None
+    if ssl_config.certificate is not None:
+        with open(ssl_config.certificate, 'rb') as c_fs:
+            c_bytes = c_fs.read()
+    if ssl_config.private_key is not None:
+        with open(ssl_config.private_key, 'rb') as pk_fs:
+            pk_bytes = pk_fs.read()
+    if ssl_config.custom_ca is not None:
+        with open(ssl_config.custom_ca, 'rb') as rc_fs:
+            rc_bytes = rc_fs.read()
+    if (c_bytes is None and pk_bytes is not None) or (c_bytes is not None and pk_bytes is None):
+        raise RuntimeError("The certificate and private_key should be passed at the same time")
+    creds = grpc.ssl_channel_credentials(root_certificates=rc_bytes,
+                                         private_key=pk_bytes,
+                                         certificate_chain=c_bytes)
+    return grpc_module.secure_channel(address, creds, options=options)
+
+
+def _check_request_args(priority, timeout):
+    """Check the priority and timeout of request"""
+    _check_int("priority", priority, 0, 2**32 - 1)
+    if timeout is not None:
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+            raise RuntimeError(f"Parameter 'timeout' should be int or float, but actually {type(timeout)}")
+        if timeout <= 0:
+            raise RuntimeError(f"Parameter 'timeout' should be > 0, but actually {timeout}")
+
+
+def _create_instances(instances, proto_instances):
+    """Create gRPC instances from instance or tuple of instances in place of the repeated field proto_instances, so
+    that the tensor data is not copied again when the instances are added to request"""
+    if not isinstance(instances, (tuple, list)):
+        instances = (instances,)
+    for item in instances:
+        if isinstance(item, dict):
+            Client._create_instance(item, proto_instances.add())
+        else:
+            raise RuntimeError("instance should be a map")
+    return proto_instances
+
+
+def _set_request_timeout(request, timeout, start_time=None):
+    """Set the relative timeout of request, the deadline is computed by the serving server in its own clock. The time
+    elapsed since start_time is deducted from the timeout"""
+    if start_time is not None:
+        timeout -= time.time() - start_time
+    request.timeout_us = max(int(timeout * 1000000), 1)
+
+
+def _create_request_spec(client, priority, timeout):
+    """Create request of the servable and method of the client without instances"""
+    request = ms_service_pb2.PredictRequest()
+    request.servable_spec.name = client.servable_name
+    request.servable_spec.method_name = client.method_name
+    request.servable_spec.version_number = client.version_number
+    request.servable_spec.priority = priority
+    if timeout is not None:
+        _set_request_timeout(request, timeout)
+    return request
+
+
+def _create_request(client, instances, priority=0, timeout=None):
+    """Create request of the servable and method of the client"""
+    _check_request_args(priority, timeout)
+    request = _create_request_spec(client, priority, timeout)
+    _create_instances(instances, request.instances)
+    return request
+
+
+class _StreamRequests:
+    """Requests of PredictStream, the request_id of every request is its index in requests. The error of creating
+    request is kept, so that it can be raised instead of the gRPC error of the cancelled stream"""
+
+    def __init__(self, client, requests, priority, timeout):
+        _check_request_args(priority, timeout)
+        self.client = client
+        self.requests = requests
+        self.priority = priority
+        self.timeout = timeout
+        self.error = None
+
+    def __iter__(self):
+        for index, instances in enumerate(self.requests):
+            yield self._create_request(index, instances)
+
+    async def aiter(self):
+        """Async iterator of requests created from the async iterable requests"""
+        index = 0
+        async for instances in self.requests:
+            yield self._create_request(index, instances)
+            index += 1
+
+    def request_iterator(self):
+        """Iterator of requests for the asyncio channel"""
+        if hasattr(self.requests, "__aiter__"):
+            return self.aiter()
+        return iter(self)
+
+    def raise_error(self, rpc_error):
+        """Raise the error of creating request or the gRPC error"""
+        if self.error is not None:
+            raise self.error
+        raise RuntimeError(f"Grpc Error, {rpc_error.code().value}, {rpc_error.details()}")
+
+    def _create_request(self, index, instances):
+        try:
+            request = _create_request(self.client, instances, self.priority, self.timeout)
+        except RuntimeError as e:
+            self.error = e
+            raise
+        request.request_id = index
+        return request
+
+
+class _PartialResults:
+    """Split the replies of PredictPartial into the results of instances. The reply without instance_indices is for
+    all the instances that have not been replied, such as the error of the whole request"""
+
+    def __init__(self, instances_count):
+        self.pending = set(range(instances_count))
+
+    def split(self, reply):
+        """Yield (instance index, result) of the reply"""
+        # pylint: disable=protected-access
+        result = Client._paser_result(reply)
+        indices = list(reply.instance_indices) if reply.instance_indices else sorted(self.pending)
+        if isinstance(result, list) and len(result) != len(indices):
+            raise RuntimeError(f"The instance count {len(result)} of reply is not equal to the count {len(indices)} "
+                               f"of instance indices")
+        for i, index in enumerate(indices):
+            if index not in self.pending:
+                continue
+            self.pending.remove(index)
+            yield index, result if isinstance(result, dict) else result[i]
+
+    def split_error(self, rpc_error):
+        """Yield (instance index, error) of the instances that have not been replied when the gRPC call failed"""
+        error = {"error": f"Grpc Error, {rpc_error.code().value}, {rpc_error.details()}"}
+        for index in sorted(self.pending):
+            yield index, error
+        self.pending.clear()
+
+
 class Client:
     """
     The Client encapsulates the serving gRPC API, which can be used to create requests,
@@ -214,36 +359,10 @@ class Client:
         self.method_name = method_name
         self.version_number = version_number
 
-        msg_bytes_size = 512 * 1024 * 1024  # 512MB
-        options = [
-            ('grpc.max_send_message_length', msg_bytes_size),
-            ('grpc.max_receive_message_length', msg_bytes_size),
-        ]
-        if ssl_config is not None:
-            if not isinstance(ssl_config, SSLConfig):
-                raise RuntimeError("The type of ssl_config should be type of SSLConfig")
-            rc_bytes = pk_bytes = c_bytes = None
-            if ssl_config.certificate is not None:
-                with open(ssl_config.certificate, 'rb') as c_fs:
-                    c_bytes = c_fs.read()
-            if ssl_config.private_key is not None:
-                with open(ssl_config.private_key, 'rb') as pk_fs:
-                    pk_bytes = pk_fs.read()
-            if ssl_config.custom_ca is not None:
-                with open(ssl_config.custom_ca, 'rb') as rc_fs:
-                    rc_bytes = rc_fs.read()
-            if (c_bytes is None and pk_bytes is not None) or (c_bytes is not None and pk_bytes is None):
-                raise RuntimeError("The certificate and private_key should be passed at the same time")
-            creds = grpc.ssl_channel_credentials(root_certificates=rc_bytes,
-                                                 private_key=pk_bytes,
-                                                 certificate_chain=c_bytes)
-            self.channel = grpc.secure_channel(address, creds, options=options)
-        else:
-            self.channel = grpc.insecure_channel(address, options=options)
-
+        self.channel = _create_channel(grpc, address, ssl_config)
         self.stub = ms_service_pb2_grpc.MSServiceStub(self.channel)
 
-    def infer(self, instances):
+    def infer(self, instances, priority=0, timeout=None):
         """
         Used to create requests, access serving service, and parse and return results.
 
@@ -252,6 +371,12 @@ class Client:
                 every instance item is the inputs dict. The key is the input name,
                 and the value is the input value, the type of value can be python int,
                 float, bool, str, bytes, numpy number, or numpy array object.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error, and will not consume the time of models any more. ``None`` means no timeout.
+                Default: ``None``.
 
         Raises:
             RuntimeError: The type or value of the parameters is invalid, or other errors happened.
@@ -267,7 +392,7 @@ class Client:
             >>> result = client.infer(instances)
             >>> print(result)
         """
-        request = self._create_request(instances)
+        request = _create_request(self, instances, priority, timeout)
         try:
             result = self.stub.Predict(request)
             return self._paser_result(result)
@@ -279,7 +404,7 @@ class Client:
             print(status_code.value)
             return {"error": f"Grpc Error, {status_code.value}, {e.details()}"}
 
-    def infer_async(self, instances):
+    def infer_async(self, instances, priority=0, timeout=None):
         """
         Used to create requests, async access serving.
 
@@ -288,6 +413,12 @@ class Client:
                 is the inputs dict. The key is the input name, and the value is the input value, the
                 type of value can be python int, float, bool, str, bytes, numpy number,
                 or numpy array object.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error, and will not consume the time of models any more. ``None`` means no timeout.
+                Default: ``None``.
 
         Raises:
             RuntimeError: The type or value of the parameters is invalid, or other errors happened.
@@ -304,7 +435,7 @@ class Client:
             >>> result = result_future.result()
             >>> print(result)
         """
-        request = self._create_request(instances)
+        request = _create_request(self, instances, priority, timeout)
         try:
             result_future = self.stub.Predict.future(request)
             return ClientGrpcAsyncResult(result_future)
@@ -316,28 +447,108 @@ class Client:
             print(status_code.value)
             return ClientGrpcAsyncError({"error": f"Grpc Error, {status_code.value}, {e.details()}"})
 
-    def _create_request(self, instances):
-        """Used to create request spec."""
-        if not isinstance(instances, (tuple, list)):
-            instances = (instances,)
+    def infer_stream(self, requests, priority=0, timeout=None):
+        """
+        Used to send requests on one long-lived gRPC stream, and yield the result of every request as soon as all of
+        its instances are processed by the serving server. The requests are sent as they are taken from `requests`
+        without waiting for the results of the previous requests, so the results may be out of the order of requests.
 
-        request = ms_service_pb2.PredictRequest()
-        request.servable_spec.name = self.servable_name
-        request.servable_spec.method_name = self.method_name
-        request.servable_spec.version_number = self.version_number
+        Args:
+            requests (Iterable[Union[dict, tuple[dict]]]): Iterable of requests, every request is an instance or
+                tuple of instances as the `instances` of `infer`.
+            priority (int, optional): The priority of the requests, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of every request in seconds, starting when the request
+                is taken from `requests`. The instances that have not been processed by the serving server before the
+                timeout expires will be failed with a deadline exceeded error. ``None`` means no timeout.
+                Default: ``None``.
 
-        for item in instances:
-            if isinstance(item, dict):
-                request.instances.append(self._create_instance(**item))
-            else:
-                raise RuntimeError("instance should be a map")
-        return request
+        Returns:
+            Iterator of tuple (index, result), the index is the index of the request in `requests`, and the result is
+            the same as the return value of `infer`. The stream is cancelled when the iterator is closed.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, the request is invalid, or the gRPC stream
+                failed.
+
+        Examples:
+            >>> from mindspore_serving.client import Client
+            >>> import numpy as np
+            >>> client = Client("localhost:5500", "add", "add_cast")
+            >>> x1 = np.ones((2, 2), np.int32)
+            >>> x2 = np.ones((2, 2), np.int32)
+            >>> requests = ({"x1": x1 * i, "x2": x2} for i in range(100))
+            >>> for index, result in client.infer_stream(requests):
+            ...     print(index, result)
+        """
+        stream_requests = _StreamRequests(self, requests, priority, timeout)
+        return self._iter_stream_results(stream_requests)
+
+    def _iter_stream_results(self, stream_requests):
+        """Yield (request index, result) of the replies of PredictStream"""
+        replies = self.stub.PredictStream(iter(stream_requests))
+        try:
+            for reply in replies:
+                yield reply.request_id, self._paser_result(reply)
+        except grpc.RpcError as e:
+            stream_requests.raise_error(e)
+        finally:
+            replies.cancel()
+
+    def infer_partial(self, instances, priority=0, timeout=None):
+        """
+        Used to create a request of multiple instances, and yield the result of every instance as soon as the batch
+        it belongs to is processed by the serving server, without waiting for the other instances of the request.
+        The results may be out of the order of instances.
+
+        Args:
+            instances (Union[dict, tuple[dict]]): Instance or tuple of instances, the same as the `instances` of
+                `infer`.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error. ``None`` means no timeout. Default: ``None``.
+
+        Returns:
+            Iterator of tuple (index, result), the index is the index of the instance in `instances`, and the result
+            is the outputs dict of the instance, or a dict with key "error" if the instance failed. The gRPC call is
+            cancelled when the iterator is closed.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, or other errors happened.
+
+        Examples:
+            >>> from mindspore_serving.client import Client
+            >>> import numpy as np
+            >>> client = Client("localhost:5500", "add", "add_cast")
+            >>> x1 = np.ones((2, 2), np.int32)
+            >>> x2 = np.ones((2, 2), np.int32)
+            >>> instances = [{"x1": x1 * i, "x2": x2} for i in range(100)]
+            >>> for index, result in client.infer_partial(instances):
+            ...     print(index, result)
+        """
+        request = _create_request(self, instances, priority, timeout)
+        return self._iter_partial_results(request)
+
+    def _iter_partial_results(self, request):
+        """Yield (instance index, result) of the replies of PredictPartial"""
+        partial_results = _PartialResults(len(request.instances))
+        replies = self.stub.PredictPartial(request)
+        try:
+            for reply in replies:
+                yield from partial_results.split(reply)
+        except grpc.RpcError as e:
+            yield from partial_results.split_error(e)
+        finally:
+            replies.cancel()
 
     @staticmethod
-    def _create_instance(**kwargs):
+    def _create_instance(inputs, instance=None):
         """Used to create gRPC instance."""
-        instance = ms_service_pb2.Instance()
-        for k, w in kwargs.items():
+        if instance is None:
+            instance = ms_service_pb2.Instance()
+        for k, w in inputs.items():
             tensor = instance.items[k]
             if isinstance(w, (np.ndarray, np.number)):
                 _create_tensor(w, tensor)
@@ -416,3 +627,452 @@ class ClientGrpcAsyncError:
         """Get gRPC error message.
         """
         return self.result_error
+
+
+class AsyncClient:
+    """
+    The AsyncClient encapsulates the serving gRPC API based on asyncio, the inference requests are awaited in the event
+    loop without a thread per request, so that one event loop can drive a large number of concurrent requests.
+
+    Note:
+        The AsyncClient should be created and used in the same event loop. When the coroutine awaiting `infer` is
+        cancelled, the gRPC call is cancelled too.
+
+    Args:
+        address (str): Serving address.
+        servable_name (str): The name of servable supplied by Serving.
+        method_name (str): The name of method supplied by servable.
+        version_number (int, optional): The version number of servable, ``0`` means the maximum version number in all
+            running versions. Default: ``0``.
+        ssl_config (mindspore_serving.client.SSLConfig, optional): The server's ssl_config, if ``None``, disabled ssl.
+            Default: ``None``.
+        max_concurrency (int, optional): The maximum number of requests in flight, the following calls of `infer`
+            wait until one of the requests in flight completes. Default: ``1024``.
+
+    Raises:
+        RuntimeError: The type or value of the parameters are invalid, or other errors happened.
+
+    Examples:
+        >>> import asyncio
+        >>> from mindspore_serving.client import AsyncClient
+        >>> import numpy as np
+        >>> async def run():
+        ...     async with AsyncClient("localhost:5500", "add", "add_cast") as client:
+        ...         x1 = np.ones((2, 2), np.int32)
+        ...         x2 = np.ones((2, 2), np.int32)
+        ...         results = await asyncio.gather(*[client.infer({"x1": x1, "x2": x2}) for _ in range(100)])
+        ...         print(results)
+        >>> asyncio.run(run())
+    """
+
+    def __init__(self, address, servable_name, method_name, version_number=0, ssl_config=None, max_concurrency=1024):
+        _check_str("address", address)
+        _check_str("servable_name", servable_name)
+        _check_str("method_name", method_name)
+        _check_int("version_number", version_number, 0)
+        _check_int("max_concurrency", max_concurrency, 1)
+
+        self.address = address
+        self.servable_name = servable_name
+        self.method_name = method_name
+        self.version_number = version_number
+        self.max_concurrency = max_concurrency
+
+        self.channel = _create_channel(aio, address, ssl_config)
+        self.stub = ms_service_pb2_grpc.MSServiceStub(self.channel)
+        # created in the running event loop
+        self._semaphore = None
+
+    async def infer(self, instances, priority=0, timeout=None):
+        """
+        Used to create requests, access serving service asynchronously, and parse and return results.
+
+        Args:
+            instances (Union[dict, tuple[dict]]): Instance or tuple of instances,
+                every instance item is the inputs dict. The key is the input name,
+                and the value is the input value, the type of value can be python int,
+                float, bool, str, bytes, numpy number, or numpy array object.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error, and will not consume the time of models any more. ``None`` means no timeout.
+                Default: ``None``.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, or other errors happened.
+            asyncio.CancelledError: The coroutine is cancelled, and the gRPC call is cancelled.
+
+        Examples:
+            >>> import asyncio
+            >>> from mindspore_serving.client import AsyncClient
+            >>> import numpy as np
+            >>> async def run():
+            ...     client = AsyncClient("localhost:5500", "add", "add_cast")
+            ...     x1 = np.ones((2, 2), np.int32)
+            ...     x2 = np.ones((2, 2), np.int32)
+            ...     result = await client.infer({"x1": x1, "x2": x2})
+            ...     print(result)
+            ...     await client.close()
+            >>> asyncio.run(run())
+        """
+        request = _create_request(self, instances, priority, timeout)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            try:
+                # awaiting the call cancels it when the coroutine is cancelled
+                result = await self.stub.Predict(request)
+            except aio.AioRpcError as e:
+                status_code = e.code()
+                return {"error": f"Grpc Error, {status_code.value}, {e.details()}"}
+        # pylint: disable=protected-access
+        return Client._paser_result(result)
+
+    def infer_stream(self, requests, priority=0, timeout=None):
+        """
+        Used to send requests on one long-lived gRPC stream, and yield the result of every request as soon as all of
+        its instances are processed by the serving server. The results may be out of the order of requests.
+
+        Args:
+            requests (Union[Iterable, AsyncIterable]): Iterable or async iterable of requests, every request is an
+                instance or tuple of instances as the `instances` of `infer`.
+            priority (int, optional): The priority of the requests, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of every request in seconds, starting when the request
+                is taken from `requests`. The instances that have not been processed by the serving server before the
+                timeout expires will be failed with a deadline exceeded error. ``None`` means no timeout.
+                Default: ``None``.
+
+        Returns:
+            Async iterator of tuple (index, result), the index is the index of the request in `requests`, and the
+            result is the same as the return value of `infer`. The stream is cancelled when the iterator is closed.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, the request is invalid, or the gRPC stream
+                failed.
+
+        Examples:
+            >>> import asyncio
+            >>> from mindspore_serving.client import AsyncClient
+            >>> import numpy as np
+            >>> async def run():
+            ...     async with AsyncClient("localhost:5500", "add", "add_cast") as client:
+            ...         x1 = np.ones((2, 2), np.int32)
+            ...         x2 = np.ones((2, 2), np.int32)
+            ...         requests = ({"x1": x1 * i, "x2": x2} for i in range(100))
+            ...         async for index, result in client.infer_stream(requests):
+            ...             print(index, result)
+            >>> asyncio.run(run())
+        """
+        stream_requests = _StreamRequests(self, requests, priority, timeout)
+        return self._iter_stream_results(stream_requests)
+
+    async def _iter_stream_results(self, stream_requests):
+        """Yield (request index, result) of the replies of PredictStream"""
+        call = self.stub.PredictStream(stream_requests.request_iterator())
+        try:
+            async for reply in call:
+                # pylint: disable=protected-access
+                yield reply.request_id, Client._paser_result(reply)
+        except aio.AioRpcError as e:
+            stream_requests.raise_error(e)
+        except asyncio.CancelledError:
+            # the call is cancelled when creating request failed
+            if stream_requests.error is not None:
+                raise stream_requests.error
+            raise
+        finally:
+            call.cancel()
+
+    def infer_partial(self, instances, priority=0, timeout=None):
+        """
+        Used to create a request of multiple instances, and yield the result of every instance as soon as the batch
+        it belongs to is processed by the serving server. The results may be out of the order of instances.
+
+        Args:
+            instances (Union[dict, tuple[dict]]): Instance or tuple of instances, the same as the `instances` of
+                `infer`.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error. ``None`` means no timeout. Default: ``None``.
+
+        Returns:
+            Async iterator of tuple (index, result), the index is the index of the instance in `instances`, and the
+            result is the outputs dict of the instance, or a dict with key "error" if the instance failed. The gRPC
+            call is cancelled when the iterator is closed.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, or other errors happened.
+
+        Examples:
+            >>> import asyncio
+            >>> from mindspore_serving.client import AsyncClient
+            >>> import numpy as np
+            >>> async def run():
+            ...     async with AsyncClient("localhost:5500", "add", "add_cast") as client:
+            ...         x1 = np.ones((2, 2), np.int32)
+            ...         x2 = np.ones((2, 2), np.int32)
+            ...         instances = [{"x1": x1 * i, "x2": x2} for i in range(100)]
+            ...         async for index, result in client.infer_partial(instances):
+            ...             print(index, result)
+            >>> asyncio.run(run())
+        """
+        request = _create_request(self, instances, priority, timeout)
+        return self._iter_partial_results(request)
+
+    async def _iter_partial_results(self, request):
+        """Yield (instance index, result) of the replies of PredictPartial"""
+        partial_results = _PartialResults(len(request.instances))
+        call = self.stub.PredictPartial(request)
+        try:
+            async for reply in call:
+                for item in partial_results.split(reply):
+                    yield item
+        except aio.AioRpcError as e:
+            for item in partial_results.split_error(e):
+                yield item
+        finally:
+            call.cancel()
+
+    async def close(self):
+        """Close the channel, the requests in flight are cancelled."""
+        await self.channel.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class _PendingBatch:
+    """Calls of BatchingClient to be merged into one request, the instances of the calls are added to the request when
+    the calls are enqueued"""
+
+    def __init__(self, client, priority, timeout):
+        self.request = _create_request_spec(client, priority, None)
+        self.timeout = timeout
+        self.start_time = time.time()
+        self.instances_count = 0
+        # (future, instances count, start time) of every call
+        self.calls = []
+
+
+class BatchingClient:
+    """
+    The BatchingClient merges the concurrent calls of `infer` and `infer_async` from different threads within a small
+    time window into one request with all of their instances, and fans the results of the request back out to the
+    callers. This reduces the per-request overhead of the gRPC framing and the dispatching in the serving server when
+    every caller sends only a few instances.
+
+    Note:
+        Only the calls with the same `priority` and `timeout` are merged. The timeout of the merged request is the
+        remaining time of its latest call, so that no call gets less time than its `timeout`, and the instances of
+        the earlier calls may be processed at most `max_delay_ms` after their timeout expires. The instances of the
+        merged calls are processed together, an error of the whole request, such as a missing input, is returned to
+        every merged call.
+
+    Args:
+        address (str): Serving address.
+        servable_name (str): The name of servable supplied by Serving.
+        method_name (str): The name of method supplied by servable.
+        version_number (int, optional): The version number of servable, ``0`` means the maximum version number in all
+            running versions. Default: ``0``.
+        ssl_config (mindspore_serving.client.SSLConfig, optional): The server's ssl_config, if ``None``, disabled ssl.
+            Default: ``None``.
+        max_batch_size (int, optional): The maximum number of instances merged into one request, a call with more
+            instances is sent in a request alone. Default: ``64``.
+        max_delay_ms (Union[int, float], optional): The maximum time in milliseconds that the first call of a request
+            waits for the following calls. Default: ``2``.
+
+    Raises:
+        RuntimeError: The type or value of the parameters are invalid, or other errors happened.
+
+    Examples:
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from mindspore_serving.client import BatchingClient
+        >>> import numpy as np
+        >>> client = BatchingClient("localhost:5500", "add", "add_cast", max_batch_size=32, max_delay_ms=2)
+        >>> x1 = np.ones((2, 2), np.int32)
+        >>> x2 = np.ones((2, 2), np.int32)
+        >>> with ThreadPoolExecutor(max_workers=16) as executor:
+        ...     results = list(executor.map(lambda _: client.infer({"x1": x1, "x2": x2}), range(100)))
+        >>> print(results)
+        >>> client.close()
+    """
+
+    def __init__(self, address, servable_name, method_name, version_number=0, ssl_config=None, max_batch_size=64,
+                 max_delay_ms=2):
+        _check_int("max_batch_size", max_batch_size, 1)
+        if isinstance(max_delay_ms, bool) or not isinstance(max_delay_ms, (int, float)):
+            raise RuntimeError(f"Parameter 'max_delay_ms' should be int or float, but actually {type(max_delay_ms)}")
+        if max_delay_ms < 0:
+            raise RuntimeError(f"Parameter 'max_delay_ms' should be >= 0, but actually {max_delay_ms}")
+        self.client = Client(address, servable_name, method_name, version_number, ssl_config)
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+
+        self._cond = threading.Condition()
+        # the batches being filled, key is (priority, timeout)
+        self._pending_batches = {}
+        # the batches to be sent
+        self._ready_batches = []
+        # the number of batches that have been sent and whose results have not been set
+        self._inflight_batches = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._thread.start()
+
+    def infer(self, instances, priority=0, timeout=None):
+        """
+        Used to create requests, access serving service, and parse and return results. The instances may be merged
+        with the instances of other concurrent calls into one request.
+
+        Args:
+            instances (Union[dict, tuple[dict]]): Instance or tuple of instances,
+                every instance item is the inputs dict. The key is the input name,
+                and the value is the input value, the type of value can be python int,
+                float, bool, str, bytes, numpy number, or numpy array object.
+            priority (int, optional): The priority of the request, the instances of the request with larger
+                priority will be processed first by the serving server. Default: 0.
+            timeout (Union[int, float], optional): The timeout of the request in seconds. The instances that have not
+                been processed by the serving server before the timeout expires will be failed with a deadline
+                exceeded error, and will not consume the time of models any more. ``None`` means no timeout.
+                Default: ``None``.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, or other errors happened.
+        """
+        return self.infer_async(instances, priority, timeout).result()
+
+    def infer_async(self, instances, priority=0, timeout=None):
+        """
+        Used to create requests, async access serving. The parameters are the same as `infer`.
+
+        Returns:
+            concurrent.futures.Future, whose result is the same as the return value of `infer`. It can be awaited in an
+            event loop by asyncio.wrap_future.
+
+        Raises:
+            RuntimeError: The type or value of the parameters is invalid, or other errors happened.
+        """
+        _check_request_args(priority, timeout)
+        if not isinstance(instances, (tuple, list)):
+            instances = (instances,)
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The BatchingClient has been closed")
+            key = (priority, timeout)
+            batch = self._pending_batches.get(key)
+            if batch is not None and batch.instances_count + len(instances) > self.max_batch_size:
+                self._ready_batches.append(self._pending_batches.pop(key))
+                batch = None
+            if batch is None:
+                batch = _PendingBatch(self.client, priority, timeout)
+                self._pending_batches[key] = batch
+            # the instances are encoded into the request of batch in place, so that they are not copied again when the
+            # batch is sent, the encoding holds the GIL and would not run in parallel out of the lock either
+            try:
+                _create_instances(instances, batch.request.instances)
+            except Exception:
+                del batch.request.instances[batch.instances_count:]
+                if not batch.calls:
+                    del self._pending_batches[key]
+                raise
+            batch.instances_count += len(instances)
+            batch.calls.append((future, len(instances), time.time()))
+            if batch.instances_count >= self.max_batch_size:
+                self._ready_batches.append(self._pending_batches.pop(key))
+            self._cond.notify_all()
+        return future
+
+    def close(self):
+        """Send the pending calls and wait for their results, then stop merging calls and close the channel. The calls
+        after closing raise RuntimeError."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._cond:
+            self._cond.wait_for(lambda: self._inflight_batches == 0)
+        self.client.channel.close()
+
+    def _send_loop(self):
+        """Send the batch when it is full or its first call has waited for max_delay_ms"""
+        max_delay = self.max_delay_ms / 1000
+        while True:
+            with self._cond:
+                while True:
+                    if self._ready_batches:
+                        batch = self._ready_batches.pop(0)
+                        break
+                    if not self._pending_batches:
+                        if self._closed:
+                            return
+                        self._cond.wait()
+                        continue
+                    key, batch = min(self._pending_batches.items(), key=lambda item: item[1].start_time)
+                    wait_time = batch.start_time + max_delay - time.time()
+                    if wait_time <= 0 or self._closed:
+                        del self._pending_batches[key]
+                        break
+                    self._cond.wait(wait_time)
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        """Send the instances of batch in one request, the result is split by the instances count of the calls"""
+        request = batch.request
+        # the request is released once sent
+        batch.request = None
+        if batch.timeout is not None:
+            _set_request_timeout(request, batch.timeout, max(start_time for _, _, start_time in batch.calls))
+        with self._cond:
+            self._inflight_batches += 1
+        try:
+            result_future = self.client.stub.Predict.future(request)
+        # pylint: disable=broad-except
+        except Exception as e:
+            self._on_batch_done(batch, None, e)
+            return
+        result_future.add_done_callback(lambda f: self._on_batch_done(batch, f))
+
+    def _on_batch_done(self, batch, result_future, send_error=None):
+        """Parse the result of batch and set results of the calls, every exception is turned into an error result, so
+        that the callers never hang"""
+        try:
+            if send_error is not None:
+                raise send_error
+            # pylint: disable=protected-access
+            result = Client._paser_result(result_future.result())
+        except grpc.RpcError as e:
+            result = {"error": f"Grpc Error, {e.code().value}, {e.details()}"}
+        except RuntimeError as e:
+            result = {"error": str(e)}
+        # such as grpc.FutureCancelledError when the channel is closed
+        # pylint: disable=broad-except
+        except Exception as e:
+            result = {"error": f"Request failed, {type(e).__name__}: {e}"}
+        if isinstance(result, list) and len(result) != batch.instances_count:
+            result = {"error": f"The instances count {len(result)} of result is not equal to the instances count "
+                               f"{batch.instances_count} of request"}
+        try:
+            BatchingClient._set_batch_result(batch, result)
+        finally:
+            with self._cond:
+                self._inflight_batches -= 1
+                self._cond.notify_all()
+
+    @staticmethod
+    def _set_batch_result(batch, result):
+        """Set result of the calls, error of the whole request is set to every call"""
+        begin = 0
+        for future, count, _ in batch.calls:
+            if isinstance(result, dict):
+                future.set_result(result)
+            else:
+                future.set_result(result[begin:begin + count])
+            begin += count
@@ -94,13 +94,22 @@ class ServableStartConfig:
         dec_key (bytes, optional): Byte type key used for decryption. The valid length is 16, 24, or 32. Default: None.
         dec_mode (str, optional): Specifies the decryption mode, take effect when dec_key is set.
             Option: 'AES-GCM' or 'AES-CBC'. Default: 'AES-GCM'.
+        num_stage_processes (int, optional): The number of processes that run the python preprocess and postprocess
+            of each worker. When it is greater than 0, the instances of one python stage are split and run in these
+            processes in parallel, and the numpy inputs and outputs are transported by shared memory. The stage
+            functions are loaded again in these processes, and they cannot invoke models through `Model.call`.
+            0 means running the python stages in the worker process. The value should be in range [0,64]. Default: 0.
+        num_cpp_stage_threads (int, optional): The number of threads that run the C++ stages of each worker, such as
+            ``"argmax_cpp"`` and the stage functions of plugins. 0 means the default number 3. The value should be in
+            range [0,64]. Default: 0.
 
     Raises:
         RuntimeError: The type or value of the parameters are invalid.
     """
 
     def __init__(self, servable_directory, servable_name, device_ids=None, version_number=0, device_type=None,
-                 num_parallel_workers=0, dec_key=None, dec_mode='AES-GCM'):
+                 num_parallel_workers=0, dec_key=None, dec_mode='AES-GCM', num_stage_processes=0,
+                 num_cpp_stage_threads=0):
         super(ServableStartConfig, self).__init__()
         check_type.check_str("servable_directory", servable_directory)
         logger.info(f"input servable directory: {servable_directory}")
@@ -110,6 +119,10 @@ class ServableStartConfig:
         check_type.check_str("servable_name", servable_name)
         check_type.check_int("version_number", version_number, 0)
         check_type.check_int("num_parallel_workers", num_parallel_workers, 0, 64)
+        check_type.check_int("num_stage_processes", num_stage_processes, 0, 64)
+        if num_stage_processes and sys.version_info < (3, 8):
+            raise RuntimeError("Parameter 'num_stage_processes' requires Python 3.8 or later")
+        check_type.check_int("num_cpp_stage_threads", num_cpp_stage_threads, 0, 64)
         if dec_key is not None:
             if not isinstance(dec_key, bytes):
                 raise RuntimeError(f"Parameter 'dec_key' should be bytes, but actually {type(dec_key)}")
@@ -150,6 +163,8 @@ class ServableStartConfig:
         self.device_type_ = device_type.lower()
         self.dec_key_ = dec_key
         self.dec_mode_ = dec_mode
+        self.num_stage_processes_ = num_stage_processes
+        self.num_cpp_stage_threads_ = num_cpp_stage_threads
 
     @property
     def servable_directory(self):
@@ -183,6 +198,14 @@ class ServableStartConfig:
     def num_parallel_workers(self):
         return self.num_parallel_workers_
 
+    @property
+    def num_stage_processes(self):
+        return self.num_stage_processes_
+
+    @property
+    def num_cpp_stage_threads(self):
+        return self.num_cpp_stage_threads_
+
     def _check_device_type(self, enable_lite):
         """Check whether the device type is valid"""
         device_type = self.device_type_
@@ -205,12 +228,15 @@ class ServableStartConfig:
 class DeployConfig:
     """Deployment configuration of one version for the servable"""
 
-    def __init__(self, version_number, device_ids, num_parallel_workers=0, dec_key=None, dec_mode='AES-GCM'):
+    def __init__(self, version_number, device_ids, num_parallel_workers=0, dec_key=None, dec_mode='AES-GCM',
+                 num_stage_processes=0, num_cpp_stage_threads=0):
         check_type.check_int("version_number", version_number)
         if device_ids is None:
             device_ids = []
         device_ids = check_type.check_and_as_int_tuple_list("device_ids", device_ids, 0)
         check_type.check_int("num_parallel_workers", num_parallel_workers, 0)
+        check_type.check_int("num_stage_processes", num_stage_processes, 0)
+        check_type.check_int("num_cpp_stage_threads", num_cpp_stage_threads, 0)
 
         if dec_key is not None:
             if not isinstance(dec_key, bytes):
@@ -231,6 +257,8 @@ class DeployConfig:
             self.num_parallel_workers = num_parallel_workers
         self.dec_key = dec_key
         self.dec_mode = dec_mode
+        self.num_stage_processes = num_stage_processes
+        self.num_cpp_stage_threads = num_cpp_stage_threads
 
 
 class ServableStartConfigGroup:
@@ -289,6 +317,10 @@ class ServableStartConfigGroup:
                                    f"multiple configurations.")
             if deploy_config.num_parallel_workers > last_config.num_parallel_workers:
                 last_config.num_parallel_workers = deploy_config.num_parallel_workers
+            if deploy_config.num_stage_processes > last_config.num_stage_processes:
+                last_config.num_stage_processes = deploy_config.num_stage_processes
+            if deploy_config.num_cpp_stage_threads > last_config.num_cpp_stage_threads:
+                last_config.num_cpp_stage_threads = deploy_config.num_cpp_stage_threads
 
     def export_as_start_configs(self):
         """Export the configuration as list of ServableStartConfig"""
@@ -300,7 +332,9 @@ class ServableStartConfigGroup:
                                                version_number=config.version_number,
                                                device_type=self.device_type,
                                                num_parallel_workers=config.num_parallel_workers,
-                                               dec_key=config.dec_key, dec_mode=config.dec_mode)
+                                               dec_key=config.dec_key, dec_mode=config.dec_mode,
+                                               num_stage_processes=config.num_stage_processes,
+                                               num_cpp_stage_threads=config.num_cpp_stage_threads)
             configs.append(start_config)
         return configs
 
@@ -322,7 +356,8 @@ def _check_and_merge_config(configs):
             start_config_groups[config.servable_name] = config_group
 
         deploy_config = DeployConfig(config.version_number, config.device_ids, config.num_parallel_workers,
-                                     config.dec_key, config.dec_mode)
+                                     config.dec_key, config.dec_mode, config.num_stage_processes,
+                                     config.num_cpp_stage_threads)
         start_config_groups[config.servable_name].append_deploy(deploy_config)
 
     return start_config_groups
@@ -405,7 +440,9 @@ class ServableContextData(ServableContextDataBase):
               f"--enable_lite={enable_lite_str} " \
               f"--dec_key_pipe_file={pipe_file} " \
               f"--dec_mode={config.dec_mode} " \
-              f"--listening_master=True"
+              f"--listening_master=True " \
+              f"--num_stage_processes={config.num_stage_processes} " \
+              f"--num_cpp_stage_threads={config.num_cpp_stage_threads}"
 
         args = arg.split(" ")
 
@@ -485,7 +522,9 @@ class ServableExtraContextData(ServableContextDataBase):
               f"--master_address={self.master_address} " \
               f"--dec_key_pipe_file={pipe_file} " \
               f"--dec_mode={config.dec_mode} " \
-              f"--listening_master=True"
+              f"--listening_master=True " \
+              f"--num_stage_processes={config.num_stage_processes} " \
+              f"--num_cpp_stage_threads={config.num_cpp_stage_threads}"
         args = arg.split(" ")
 
         serving_logs_dir = "serving_logs"
@@ -16,7 +16,7 @@
 from mindspore_serving._mindspore_serving import MasterContext_
 from mindspore_serving.server.common import check_type
 
-__all__ = ["set_max_enqueued_requests"]
+__all__ = ["set_max_enqueued_requests", "set_load_balance_policy"]
 
 _context = MasterContext_.get_instance()
 
@@ -34,3 +34,30 @@ def set_max_enqueued_requests(max_enqueued_requests):
     """
     check_type.check_int("max_enqueued_requests", max_enqueued_requests, 1)
     _context.set_max_enqueued_requests(max_enqueued_requests)
+
+
+def set_load_balance_policy(load_balance_policy):
+    r"""
+    Set the policy to balance the requests between the workers of the same servable. The maximum number of requests in
+    flight of each worker is adapted by the latency measured by the master, so a slow worker gets fewer requests.
+
+    Note:
+        This interface should be called before starting the servables.
+
+    Args:
+        load_balance_policy (str): The load balance policy, default ``"least_outstanding"``. Supported values:
+
+            - ``"least_outstanding"``: The worker with the least instances in flight is preferred.
+            - ``"ewma_latency"``: The worker with the least expected completion time is preferred, which is estimated
+              by the exponentially weighted moving average of the latency of the worker and the requests in flight.
+            - ``"power_of_two"``: Pick two random workers, and the one with fewer instances in flight is preferred.
+
+    Raises:
+        RuntimeError: The type or value of the parameters are invalid, or other error happened.
+    """
+    check_type.check_str("load_balance_policy", load_balance_policy)
+    supported_policies = ("least_outstanding", "ewma_latency", "power_of_two")
+    if load_balance_policy not in supported_policies:
+        raise RuntimeError(f"Parameter 'load_balance_policy' should be one of {supported_policies}, but actually "
+                           f"'{load_balance_policy}'")
+    _context.set_load_balance_policy(load_balance_policy)
@@ -16,7 +16,7 @@
 See how to configure servable_config.py file, please refer to
 `Servable Provided Through Model Configuration <https://www.mindspore.cn/serving/docs/zh-CN/master/serving_model.html>`_."""
 
-from .model import declare_model, Model, Context, AclOptions, GpuOptions
+from .model import declare_model, Model, Context, BatchingPolicy, AclOptions, GpuOptions
 from .model import AscendDeviceInfo, CPUDeviceInfo, GPUDeviceInfo
 from .method import register_method, add_stage
 
@@ -32,6 +32,7 @@ __all__.extend([
     "CPUDeviceInfo",
     "GPUDeviceInfo",
     "Context",
+    "BatchingPolicy",
     'register_method',
     'add_stage'
 ])
@@ -17,17 +17,19 @@
 import inspect
 import ast
 from functools import wraps
+import numpy as np
 
 from mindspore_serving._mindspore_serving import ServableRegister_
 from mindspore_serving._mindspore_serving import MethodSignature_
 from mindspore_serving import log as logger
 from mindspore_serving.server.common import check_type, deprecated
 from .utils import get_func_name, get_servable_dir
-from .stage_function import register_stage_function, check_stage_function
+from .stage_function import register_stage_function, check_stage_function, load_stage_plugin
 from .model import g_declared_models, Model
 
 method_def_context_ = MethodSignature_()
 cur_stage_index_ = 0
+method_stages_ = []
 has_called_preprocess_ = False
 has_called_servable_ = False
 has_called_postprocess_ = False
@@ -46,6 +48,22 @@ class _TensorDef:
         return self.tag, self.tensor_index
 
 
+class _StageDef:
+    """Stage added by add_stage, the stages are added to the method when the method definition finishes, so that the
+    adjacent python stages can be fused"""
+
+    def __init__(self, index, inputs, outputs_count, tag, add_fun, fun=None, num_parallel=1):
+        self.index = index
+        self.inputs = inputs
+        self.outputs_count = outputs_count
+        self.tag = tag
+        # add the stage to the method with the inputs renumbered after fusion
+        self.add_fun = add_fun
+        # the python function processing one instance, only these stages can be fused
+        self.fun = fun
+        self.num_parallel = num_parallel
+
+
 def _create_tensor_def_outputs(tag, outputs_cnt):
     """Create data flow item for output"""
     result = [_TensorDef(tag, i) for i in range(outputs_cnt)]
@@ -72,6 +90,128 @@ def _wrap_fun_to_batch(fun, input_count):
     return call_func
 
 
+def _as_stage_value(item):
+    """Convert the output of one stage to the value received by the next python stage, the same as the conversion
+    when the value is passed by C++"""
+    if callable(getattr(item, "asnumpy", None)):
+        item = item.asnumpy()
+    if isinstance(item, bytes):
+        return np.frombuffer(item, dtype=np.uint8).copy()
+    if isinstance(item, str):
+        return item
+    if isinstance(item, bool):
+        return np.array(item, dtype=np.bool_)
+    if isinstance(item, int):
+        return np.array(item, dtype=np.int64)
+    if isinstance(item, float):
+        return np.array(item, dtype=np.float64)
+    value = np.asarray(item)
+    if not value.flags['C_CONTIGUOUS']:
+        value = np.ascontiguousarray(value)
+    if value.dtype.kind not in "biuf" or (value.dtype.kind == "f" and value.dtype.itemsize not in (2, 4, 8)):
+        raise RuntimeError(f"Get illegal result data with type {type(item)}")
+    return value
+
+
+def _fuse_stage_functions(fused_name, stages, inputs, outputs):
+    """Fuse adjacent python stages processing one instance into one pipeline function, the intermediate values are
+    passed between the stages in python. 'inputs' and 'outputs' are the data flow items of the fused stage"""
+
+    def call_one(values):
+        for stage in stages:
+            result = stage.fun(*[values[item] for item in stage.inputs])
+            if not isinstance(result, (tuple, list)):
+                result = (result,)
+            if len(result) != stage.outputs_count:
+                raise RuntimeError(f"The outputs number {len(result)} of one instance returned by function "
+                                   f"'{get_func_name(stage.fun)}' is not equal to the outputs number "
+                                   f"{stage.outputs_count} registered in method")
+            for i, item in enumerate(result):
+                values[(stage.index, i)] = _as_stage_value(item)
+        return tuple(values[item] for item in outputs)
+
+    def call_func(instances):
+        for instance in instances:
+            yield call_one(dict(zip(inputs, instance)))
+
+    call_func.__name__ = fused_name
+    return call_func
+
+
+def _group_stages(stages, fuse_stages):
+    """Group the stages to be fused. A python stage processing one instance joins the group of the previous python
+    stages when it consumes their outputs and has the same num_parallel, the other stages are in groups of their own"""
+    groups = []
+    for stage in stages:
+        if fuse_stages and groups and stage.fun is not None and groups[-1][-1].fun is not None:
+            group = groups[-1]
+            group_stages = {item.index for item in group}
+            if stage.num_parallel == group[0].num_parallel and any(item[0] in group_stages for item in stage.inputs):
+                group.append(stage)
+                continue
+        groups.append([stage])
+    return groups
+
+
+def _add_method_stages(method_name, stages, return_inputs, fuse_stages):
+    """Add stages to the method, the python stages grouped by _group_stages are fused into one stage, and only the
+    outputs used by the following stages or returned by the method are passed out of the fused stage.
+    Return the method outputs renumbered after fusion"""
+    groups = _group_stages(stages, fuse_stages)
+    group_of_stage = {stage.index: group_index for group_index, group in enumerate(groups) for stage in group}
+    used_outputs = set(return_inputs)
+    for group_index, group in enumerate(groups):
+        for stage in group:
+            used_outputs.update(item for item in stage.inputs
+                                if item[0] != 0 and group_of_stage[item[0]] != group_index)
+
+    renumbered = {}
+
+    def renumber(items):
+        return [item if item[0] == 0 else renumbered[item] for item in items]
+
+    for stage_index, group in enumerate(groups, 1):
+        if len(group) == 1:
+            stage = group[0]
+            stage.add_fun(renumber(stage.inputs))
+            for i in range(stage.outputs_count):
+                renumbered[(stage.index, i)] = (stage_index, i)
+            continue
+        group_stages = {stage.index for stage in group}
+        inputs = []
+        for stage in group:
+            inputs.extend(item for item in stage.inputs if item[0] not in group_stages and item not in inputs)
+        outputs = [(stage.index, i) for stage in group for i in range(stage.outputs_count)
+                   if (stage.index, i) in used_outputs]
+        if not outputs:
+            outputs = [(group[-1].index, i) for i in range(group[-1].outputs_count)]
+        # the same functions may be fused more than once in one method, the stage indexes make the name unique
+        fused_name = "+".join(get_func_name(stage.fun) for stage in group) + \
+                     f"@{method_name}#{group[0].index}-{group[-1].index}"
+        fused_fun = _fuse_stage_functions(fused_name, group, inputs, outputs)
+        register_stage_function(method_name, fused_fun, inputs_count=len(inputs), outputs_count=len(outputs),
+                                use_with_size=False)
+        tags = []
+        for stage in group:
+            if stage.tag and stage.tag not in tags:
+                tags.append(stage.tag)
+        method_def_context_.add_stage_function(get_servable_dir() + "." + fused_name, renumber(inputs), 0,
+                                               "+".join(tags), group[0].num_parallel)
+        logger.info(f"Fuse python stages {[stage.index for stage in group]} of method '{method_name}' into stage "
+                    f"{stage_index}, function {fused_name}")
+        for i, item in enumerate(outputs):
+            renumbered[item] = (stage_index, i)
+    return renumber(return_inputs)
+
+
+def _check_stacked_fun(fun, input_count):
+    """Check the inputs count of the function invoked with stacked inputs"""
+    argspec_len = len(inspect.signature(fun).parameters)
+    if argspec_len != input_count:
+        raise RuntimeError(f"function {fun.__name__} input args count {argspec_len} not match the count {input_count} "
+                           f"registered in method")
+
+
 def _get_stage_outputs_count(call_name):
     global method_def_ast_meta_
     method_name = method_def_context_.method_name
@@ -301,7 +441,7 @@ def call_servable(*args):
     return add_stage(model, *args, outputs_count=outputs_count)
 
 
-def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
+def add_stage(stage, *args, outputs_count, batch_size=None, tag=None, num_parallel=1, stacked=False):
     r"""In the `servable_config.py` file of one servable, we use `register_method` to wrap a Python function to define
     a `method` of the servable, and `add_stage` is used to define a stage of this `method`, which can be a Python
     function or a model.
@@ -310,7 +450,18 @@ def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
         The length of 'args' should be equal to the inputs number of function or model.
 
     Args:
-        stage (Union(function, Model)): User-defined python function or `Model` object return by declare_model.
+        stage (Union(function, Model, str)): User-defined python function or `Model` object return by declare_model.
+            It can also be a C++ stage function exported by a plugin shared library in the format of
+            ``"lib_path:function_name"``, such as ``"libmyops.so:resize_normalize"``. The library is loaded by dlopen,
+            and a relative `lib_path` is searched in the directory of `servable_config.py` first. The plugin should
+            export the C ABI declared in `include/stage_plugin.h` of the package. Built-in C++ stage functions
+            accept constant arguments in the format of ``"function_name(arg1,arg2,...)"``, such as
+            ``"decode_image_cpp"`` or ``"decode_image_cpp(max_pixels)"`` (images with more than `max_pixels` pixels,
+            default 8192*8192, are rejected), ``"resize_cpp(224,224)"``, ``"center_crop_cpp(224,224)"``,
+            ``"normalize_cpp(mean1,...,meanN,std1,...,stdN)"``, ``"hwc2chw_cpp"``, ``"cast_cpp(float32)"``,
+            ``"softmax_cpp"``, ``"sigmoid_cpp"``, ``"sigmoid_threshold_cpp(0.5)"``, ``"topk_cpp(5)"``,
+            ``"topk_label_cpp(5,label1,...,labelN)"``, ``"nms_cpp(iou_threshold,score_threshold,max_outputs)"`` and
+            ``"argmax_cpp(-1)"``, and the instances of one batch are processed by these functions in parallel.
         outputs_count (int): Outputs count of the user-defined python function or model.
         batch_size (int, optional): This parameter is valid only when stage is a function and the function
             can process multi instances at a time. default ``None``.
@@ -324,6 +475,19 @@ def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
         args: Stage inputs placeholders, which come from the inputs of the function wrapped by register_method or the
             outputs of add_stage. The length of 'args' should equal to the input number of the function or model.
         tag (str, optional): Customized flag of the stage, such as ``"Preprocess"``, default ``None``.
+        num_parallel (int, optional): This parameter is valid only when stage is a python function. The maximum
+            number of tasks of this stage processed concurrently by a thread pool, which is useful when the function
+            spends most of its time in calls releasing the GIL, such as NumPy or OpenCV. The function should be
+            thread-safe when it is greater than 1. The value should be in range [1,64]. default ``1``.
+        stacked (bool, optional): This parameter is valid only when stage is a python function. When it is ``True``,
+            the function is invoked once for a batch of instances, and the maximum number of the instances is
+            determined by `batch_size` as above, ``None`` is treated as ``0``. Each input of the function is one
+            numpy array stacking the values of all instances along a new first dimension. When the shapes of one
+            input differ only in the first dimension among instances, such as sequences of different lengths, the
+            input is a tuple (padded, lengths), the values are zero-padded to the longest one and `lengths` is an
+            int64 array of their first dimension. str inputs are passed as a tuple of str. Each output returned should
+            be a numpy array whose first dimension is the number of instances, which is split into instances without
+            copy, or a list/tuple with one value for each instance. default ``False``.
 
     Raises:
         RuntimeError: The type or value of the parameters are invalid, or other error happened.
@@ -344,11 +508,20 @@ def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
     """
     global method_def_context_
     global cur_stage_index_
+    global method_stages_
     method_name = method_def_context_.method_name
     if tag is not None:
         check_type.check_str("tag", tag)
     else:
         tag = ""
+    check_type.check_int("num_parallel", num_parallel, 1, 64)
+    if num_parallel != 1 and not inspect.isfunction(stage):
+        raise RuntimeError(f"Check failed in method '{method_name}', the parameter 'num_parallel' of add_stage is "
+                           f"valid only when 'stage' is a python function")
+    check_type.check_bool("stacked", stacked)
+    if stacked and not inspect.isfunction(stage):
+        raise RuntimeError(f"Check failed in method '{method_name}', the parameter 'stacked' of add_stage is "
+                           f"valid only when 'stage' is a python function")
     for item in args:
         if not isinstance(item, _TensorDef):
             raise RuntimeError(f"Each value of parameter *args is a placeholder for data and must come from the method"
@@ -356,6 +529,7 @@ def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
     func_inputs = [item.as_pair() for item in args]
 
     inputs_count = len(args)
+    fun = None
     if isinstance(stage, Model):
         if stage not in g_declared_models:
             raise RuntimeError(
@@ -365,28 +539,45 @@ def add_stage(stage, *args, outputs_count, batch_size=None, tag=None):
         model = stage
         model_key = model.model_key
         ServableRegister_.register_model_input_output_info(model_key, inputs_count, outputs_count, 0)
-        method_def_context_.add_stage_model(model_key, func_inputs, 0, tag)
+
+        def add_fun(inputs):
+            method_def_context_.add_stage_model(model_key, inputs, 0, tag)
     elif inspect.isfunction(stage):
-        if batch_size is None:
+        if stacked:
+            if batch_size is None:
+                batch_size = 0
+            check_type.check_int("batch_size", batch_size, 0)
+            _check_stacked_fun(stage, inputs_count)
+            register_stage_function(method_name, stage, inputs_count=inputs_count, outputs_count=outputs_count,
+                                    use_with_size=True, stacked=True)
+        elif batch_size is None:
             register_stage_function(method_name, _wrap_fun_to_batch(stage, inputs_count),
                                     inputs_count=inputs_count, outputs_count=outputs_count, use_with_size=False)
             batch_size = 0
+            fun = stage
         else:
             check_type.check_int("batch_size", batch_size, 0)
             register_stage_function(method_name, stage, inputs_count=inputs_count, outputs_count=outputs_count,
                                     use_with_size=True)
         func_name = get_servable_dir() + "." + get_func_name(stage)
-        method_def_context_.add_stage_function(func_name, func_inputs, batch_size, tag)
+
+        def add_fun(inputs):
+            method_def_context_.add_stage_function(func_name, inputs, batch_size, tag, num_parallel)
     else:
         if not isinstance(stage, str):
             raise RuntimeError(
                 f"Check failed in method '{method_name}', the parameter 'stage' of add_stage must be function "
                 f"or Model returned by declare_model, now is {type(stage)}")
         func_name = stage
+        if ":" in func_name:
+            load_stage_plugin(method_name, func_name)
         check_stage_function(method_name, func_name, inputs_count=inputs_count, outputs_count=outputs_count)
-        method_def_context_.add_stage_function(func_name, func_inputs, 0, tag)
+
+        def add_fun(inputs):
+            method_def_context_.add_stage_function(func_name, inputs, 0, tag, 1)
 
     cur_stage_index_ += 1  # call_xxx stage index start begin 1
+    method_stages_.append(_StageDef(cur_stage_index_, func_inputs, outputs_count, tag, add_fun, fun, num_parallel))
     return _create_tensor_def_outputs(cur_stage_index_, outputs_count)
 
 
@@ -488,7 +679,7 @@ def _get_method_def_stage_meta(method_def_func):
     return func_meta
 
 
-def register_method(output_names):
+def register_method(output_names, weight=1, fuse_stages=False):
     """Define a method of the servable when importing servable_config.py of one servable. One servable can include one
     or more methods, and eache method provides different services base on models. A client needs to specify the
     servable name and method name when accessing one service. MindSpore Serving supports a service consisting of
@@ -506,11 +697,20 @@ def register_method(output_names):
 
     The pipeline consists of one or more stages, each stage can be a python function or a model. This is, a pipline can
     include one or more python functions and one or more models. In addition, the interface also defines the data flow
-    of these stages.
+    of these stages. The stages which do not depend on each other's outputs, such as two models on the same inputs,
+    are run in parallel for each instance.
 
     Args:
         output_names (Union[str, tuple[str], list[str]]): The output names of method. The input names is
             the args names of the registered function.
+        weight (int, optional): The weight of the method when the instances of different methods compete for the same
+            python or cpp stage queue. The instances of requests with the same priority are scheduled by weighted fair
+            queuing, and one method gets a share of the stage processing proportional to its weight. Default: 1.
+        fuse_stages (bool, optional): Whether to fuse the chains of adjacent python function stages into one stage.
+            A python function stage without `batch_size` and `stacked` is fused with the previous ones when it
+            consumes their outputs and has the same `num_parallel`. The intermediate values between the fused stages
+            are passed in python, and only the values used by the following stages or returned by the method are
+            passed out of the fused stage. Default: False.
 
     Raises:
         RuntimeError: The type or value of the parameters are invalid, or other error happened.
@@ -527,6 +727,8 @@ def register_method(output_names):
         ...     return y
     """
     output_names = check_type.check_and_as_str_tuple_list('output_names', output_names)
+    check_type.check_int('weight', weight, 1)
+    check_type.check_bool('fuse_stages', fuse_stages)
 
     def register(func):
         name = get_func_name(func)
@@ -552,11 +754,13 @@ def register_method(output_names):
         method_def_context_.method_name = name
         method_def_context_.inputs = input_names
         method_def_context_.outputs = output_names
+        method_def_context_.weight = weight
 
         global method_def_ast_meta_
         method_def_ast_meta_ = _get_method_def_stage_meta(func)
-        global cur_stage_index_
+        global cur_stage_index_, method_stages_
         cur_stage_index_ = 0
+        method_stages_ = []
 
         global has_called_preprocess_, has_called_servable_, has_called_postprocess_
         has_called_preprocess_ = False
@@ -582,6 +786,7 @@ def register_method(output_names):
                 f"Method return output size {len(output_tensors)} not match registered {len(output_names)}")
 
         return_inputs = [item.as_pair() for item in output_tensors]
+        return_inputs = _add_method_stages(name, method_stages_, return_inputs, fuse_stages)
         method_def_context_.set_return(return_inputs)
         logger.info(f"Register method: method_name {method_def_context_.method_name}, "
                     f"inputs: {input_names}, outputs: {output_names}")
@@ -14,7 +14,7 @@
 # ============================================================================
 """Servable declaration interface"""
 
-from mindspore_serving._mindspore_serving import ModelMeta_, ServableRegister_, ModelContext_
+from mindspore_serving._mindspore_serving import ModelMeta_, ServableRegister_, ModelContext_, BatchingPolicy_
 
 from mindspore_serving import log as logger
 from mindspore_serving.server.common import check_type, deprecated
@@ -169,7 +169,8 @@ def append_declared_model(model_key):
 
 
 def declare_model(model_file, model_format, with_batch_dim=True, options=None, without_batch_dim_inputs=None,
-                  context=None, config_file=None):
+                  context=None, config_file=None, batching_policy=None, batch_variant_files=None,
+                  parallel_instances=1):
     r"""
     Declare one model when importing servable_config.py of one servable.
 
@@ -196,6 +197,19 @@ def declare_model(model_file, model_format, with_batch_dim=True, options=None, w
         config_file (str, optional): Config file for model to set mix precision inference. The file path can be an
             absolute path or a relative path to the directory in which servable_config.py resides.
             Default: ``None``.
+        batching_policy (BatchingPolicy, optional): Dynamic batching policy of model, used to configure how long the
+            instances can wait in queue to form a larger batch. If the value is ``None``, the instances in queue are
+            dispatched immediately. Default: ``None``.
+        batch_variant_files (Union[str, list[str], list[list[str]]], optional): Model files of the same model
+            compiled with other batch sizes, and the batch sizes of `model_file` and the variants should be
+            different from each other. Each inference is dispatched to the variant with the smallest batch size that
+            can hold all the instances, which avoids running a full large batch for a few instances. When
+            `model_file` has multiple files, each variant should be a list of files with the same length. Only valid
+            when `with_batch_dim` is ``True``. Default: ``None``.
+        parallel_instances (int, optional): The number of instances of the model loaded in one worker, each instance
+            has its own model session and is driven by its own predict thread, so that the input staging, execution
+            and output copy of different batches can overlap. Only takes effect when the inference backend supports
+            concurrent predict, such as MindSpore Lite, otherwise only one instance is loaded. Default: ``1``.
 
     Return:
         Model, identification of this model, can be used for `Model.call` or as the inputs of `add_stage`.
@@ -242,14 +256,44 @@ def declare_model(model_file, model_format, with_batch_dim=True, options=None, w
         check_type.check_str("config_file", config_file)
         meta.local_meta.config_file = config_file
 
+    check_type.check_int('parallel_instances', parallel_instances, 1)
+    meta.local_meta.parallel_instances = parallel_instances
+
+    if batch_variant_files is not None:
+        meta.local_meta.batch_variant_files = _as_batch_variant_files(batch_variant_files, len(model_file))
+
+    if batching_policy is not None:
+        if not isinstance(batching_policy, BatchingPolicy):
+            raise RuntimeError(f"Parameter 'batching_policy' should be BatchingPolicy, but gotten "
+                               f"{type(batching_policy)}")
+        meta.common_meta.batching_policy = batching_policy.batching_policy
+
     ServableRegister_.declare_model(meta)
     logger.info(f"Declare model, model_file: {model_file} , model_format: {model_format},  with_batch_dim: "
                 f"{with_batch_dim}, options: {options}, without_batch_dim_inputs: {without_batch_dim_inputs}"
-                f", context: {context}, config file: {config_file}")
+                f", context: {context}, config file: {config_file}, batching policy: {batching_policy}"
+                f", batch variant files: {batch_variant_files}, parallel instances: {parallel_instances}")
 
     return append_declared_model(meta.common_meta.model_key)
 
 
+def _as_batch_variant_files(batch_variant_files, model_files_count):
+    """Check and convert batch_variant_files of declare_model to list of file tuples"""
+    if isinstance(batch_variant_files, str):
+        batch_variant_files = [batch_variant_files]
+    if not isinstance(batch_variant_files, (tuple, list)) or not batch_variant_files:
+        raise RuntimeError(f"Parameter 'batch_variant_files' should be str or non-empty tuple/list of str, but "
+                           f"actually {batch_variant_files}")
+    variants = []
+    for item in batch_variant_files:
+        item = check_type.check_and_as_str_tuple_list('batch_variant_files', item)
+        if len(item) != model_files_count:
+            raise RuntimeError(f"The number {len(item)} of files of batch variant {item} should be equal to the number "
+                               f"{model_files_count} of model files")
+        variants.append(item)
+    return variants
+
+
 class Context:
     """
     Context is used to customize device configurations. If Context is not specified, MindSpore Serving uses the default
@@ -333,6 +377,64 @@ class Context:
         return res
 
 
+class BatchingPolicy:
+    """
+    BatchingPolicy is used to customize the dynamic batching of one model. By default, the instances in queue are
+    dispatched to the model immediately, and a partial batch is padded to the batch size of the model. With
+    `max_queue_delay_us`, the instances can wait in queue up to the specified time to form a larger batch, which
+    improves the throughput under moderate load at the cost of bounded extra latency.
+
+    Args:
+        max_batch_size (int, optional): The max number of instances of one inference, which cannot be greater than the
+            batch size of the model. If not set, the batch size of the model is used.
+        max_queue_delay_us (int, optional): The max time in microseconds that the oldest instance in queue can wait
+            for more instances before the partial batch is dispatched. If not set or set to 0, the instances in queue
+            are dispatched immediately.
+        preferred_batch_sizes (Union[int, tuple[int], list[int]], optional): Batch sizes that are dispatched
+            immediately without waiting for `max_queue_delay_us` once the number of instances in queue reaches one of
+            them.
+
+    Raises:
+        RuntimeError: type or value of input parameters are invalid.
+
+    Examples:
+            >>> from mindspore_serving.server import register
+            >>> policy = register.BatchingPolicy(max_queue_delay_us=2000, preferred_batch_sizes=[4, 8])
+            >>> model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR",
+            ...                                batching_policy=policy)
+    """
+
+    def __init__(self, **kwargs):
+        self.batching_policy = BatchingPolicy_()
+        val_set_fun = {
+            "max_batch_size": self._set_max_batch_size,
+            "max_queue_delay_us": self._set_max_queue_delay_us,
+            "preferred_batch_sizes": self._set_preferred_batch_sizes
+        }
+        for k, v in kwargs.items():
+            if k not in val_set_fun:
+                raise RuntimeError("Set batching policy failed, unsupported option " + k)
+            val_set_fun[k](v)
+
+    def _set_max_batch_size(self, val):
+        check_type.check_int("max_batch_size", val, 1)
+        self.batching_policy.max_batch_size = val
+
+    def _set_max_queue_delay_us(self, val):
+        check_type.check_int("max_queue_delay_us", val, 0)
+        self.batching_policy.max_queue_delay_us = val
+
+    def _set_preferred_batch_sizes(self, val):
+        val = check_type.check_and_as_int_tuple_list("preferred_batch_sizes", val, 1)
+        self.batching_policy.preferred_batch_sizes = val
+
+    def __str__(self):
+        res = f"max_batch_size: {self.batching_policy.max_batch_size}, max_queue_delay_us: " \
+              f"{self.batching_policy.max_queue_delay_us}, preferred_batch_sizes: " \
+              f"{self.batching_policy.preferred_batch_sizes}"
+        return res
+
+
 class DeviceInfoContext:
     def __init__(self):
         """ Initialize context"""
@@ -14,9 +14,10 @@
 # ============================================================================
 """Postprocessing registration interface"""
 
+import os
 from mindspore_serving._mindspore_serving import StageFunctionStorage_
 from mindspore_serving import log as logger
-from .utils import get_servable_dir, get_func_name
+from .utils import get_servable_dir, get_servable_config_dir, get_func_name
 
 
 def check_stage_function(method_name, function_name, inputs_count, outputs_count):
@@ -33,6 +34,20 @@ def check_stage_function(method_name, function_name, inputs_count, outputs_count
                            f"last registered count {last_output_count}, method name '{method_name}'")
 
 
+def load_stage_plugin(method_name, stage_name):
+    """Load the C++ stage function of plugin, the stage name is in the format of 'lib_path:function_name', and the
+    relative lib path is searched in the directory of servable_config.py first"""
+    lib_path, function_name = stage_name.rsplit(":", 1)
+    if not lib_path or not function_name:
+        raise RuntimeError(f"Check failed in method '{method_name}', the plugin stage function '{stage_name}' should "
+                           f"be in the format of 'lib_path:function_name'")
+    if not os.path.isabs(lib_path):
+        servable_lib_path = os.path.join(get_servable_config_dir(), lib_path)
+        if os.path.isfile(servable_lib_path):
+            lib_path = servable_lib_path
+    StageFunctionStorage_.get_instance().load_stage_plugin(stage_name, lib_path, function_name)
+
+
 def get_stage_info(function_name):
     """Get cpp and python function inputs and outputs count"""
     func_info = StageFunctionStorage_.get_instance().get_pycpp_function_info(function_name)
@@ -48,14 +63,17 @@ class StageFunctionStorage:
         self.function = {}
         self.storage = StageFunctionStorage_.get_instance()
 
-    def register(self, method_name, fun, function_name, inputs_count, outputs_count, use_with_size):
+    def register(self, method_name, fun, function_name, inputs_count, outputs_count, use_with_size, stacked=False):
         check_stage_function(method_name, function_name, inputs_count, outputs_count)
         if function_name in self.function:
             if self.function[function_name]["use_with_size"] != use_with_size:
                 raise RuntimeError(f"Failed to add stage function {function_name}: parameter 'batch_size' in "
                                    f"multiple 'add_stage' should be enabled or disabled consistently")
+            if self.function[function_name]["stacked"] != stacked:
+                raise RuntimeError(f"Failed to add stage function {function_name}: parameter 'stacked' in "
+                                   f"multiple 'add_stage' should be enabled or disabled consistently")
         self.function[function_name] = {"fun": fun, "inputs_count": inputs_count, "outputs_count": outputs_count,
-                                        "use_with_size": use_with_size}
+                                        "use_with_size": use_with_size, "stacked": stacked}
         self.storage.register(function_name, inputs_count, outputs_count)
 
     def get(self, function_name):
@@ -68,11 +86,12 @@ class StageFunctionStorage:
 stage_function_storage = StageFunctionStorage()
 
 
-def register_stage_function(method_name, func, inputs_count, outputs_count, use_with_size):
+def register_stage_function(method_name, func, inputs_count, outputs_count, use_with_size, stacked=False):
     """register stage function"""
     servable_name = get_servable_dir()
     func_name = get_func_name(func)
     name = servable_name + "." + func_name
 
-    logger.info(f"Register stage function {name} {inputs_count} {outputs_count}, use batch size: {use_with_size}")
-    stage_function_storage.register(method_name, func, name, inputs_count, outputs_count, use_with_size)
+    logger.info(f"Register stage function {name} {inputs_count} {outputs_count}, use batch size: {use_with_size}, "
+                f"stacked: {stacked}")
+    stage_function_storage.register(method_name, func, name, inputs_count, outputs_count, use_with_size, stacked)
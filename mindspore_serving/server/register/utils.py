@@ -31,6 +31,15 @@ def get_servable_dir():
     raise RuntimeError("Failed to obtain the directory of servable_config.py")
 
 
+def get_servable_config_dir():
+    """Get the absolute path of the directory where servable_config.py is located"""
+    stack = inspect.stack()
+    for item in stack:
+        if item.filename.endswith("servable_config.py"):
+            return os.path.split(os.path.realpath(item.filename))[0]
+    raise RuntimeError("Failed to obtain the directory of servable_config.py")
+
+
 def get_func_name(func):
     """Get function name for preprocess and postprocess, as the identification name"""
     return func.__name__
@@ -25,7 +25,8 @@ from mindspore_serving._mindspore_serving import Worker_
 
 
 def start_extra_worker(servable_directory, servable_name, version_number, device_type, device_ids_empty,
-                       index, master_address, dec_key, dec_mode, listening_master, enable_lite):
+                       index, master_address, dec_key, dec_mode, listening_master, enable_lite,
+                       num_stage_processes=0, num_cpp_stage_threads=0):
     """Start worker process with single core servable"""
     signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # for ccec compiler
     check_type.check_str('servable_directory', servable_directory)
@@ -38,6 +39,8 @@ def start_extra_worker(servable_directory, servable_name, version_number, device
     check_type.check_str('master_address', master_address)
     check_type.check_bool('listening_master', listening_master)
     check_type.check_bool('enable_lite', enable_lite)
+    check_type.check_int('num_stage_processes', num_stage_processes, 0)
+    check_type.check_int('num_cpp_stage_threads', num_cpp_stage_threads, 0)
 
     ExitSignalHandle_.start()  # Set flag to running and receive Ctrl+C message
 
@@ -56,7 +59,8 @@ def start_extra_worker(servable_directory, servable_name, version_number, device
                                     version_number=version_number, device_type=device_type,
                                     device_ids_empty=device_ids_empty, dec_key=dec_key, dec_mode=dec_mode,
                                     master_address=master_address, worker_address=worker_address,
-                                    enable_lite=enable_lite)
+                                    enable_lite=enable_lite, num_stage_processes=num_stage_processes,
+                                    num_cpp_stage_threads=num_cpp_stage_threads)
     except Exception as ex:
         Worker_.notify_failed(master_address,
                               f"{{servable:{servable_name}, version:{version_number}, extra:{index}, <{ex}>}}")
@@ -77,6 +81,8 @@ def parse_args_and_start():
     parser.add_argument('--dec_key_pipe_file', type=str, required=True, help="dec key pipe file")
     parser.add_argument('--dec_mode', type=str, required=True, help="dec mode")
     parser.add_argument('--listening_master', type=str, required=True, help="whether listening master")
+    parser.add_argument('--num_stage_processes', type=int, default=0, help="processes number of python stages")
+    parser.add_argument('--num_cpp_stage_threads', type=int, default=0, help="threads number of c++ stages")
     args = parser.parse_args()
 
     servable_directory = args.servable_directory
@@ -103,7 +109,8 @@ def parse_args_and_start():
     # pylint: disable=simplifiable-if-expression
     enable_lite = True if args.enable_lite.lower() == "true" else False
     start_extra_worker(servable_directory, servable_name, version_number, device_type, device_ids_empty,
-                       index, master_address, dec_key, dec_mode, listening_master, enable_lite)
+                       index, master_address, dec_key, dec_mode, listening_master, enable_lite,
+                       args.num_stage_processes, args.num_cpp_stage_threads)
 
 
 if __name__ == '__main__':
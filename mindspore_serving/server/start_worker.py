@@ -25,7 +25,8 @@ from mindspore_serving._mindspore_serving import Worker_
 
 
 def start_worker(servable_directory, servable_name, version_number,
-                 device_type, device_id, master_address, dec_key, dec_mode, listening_master, enable_lite):
+                 device_type, device_id, master_address, dec_key, dec_mode, listening_master, enable_lite,
+                 num_stage_processes=0, num_cpp_stage_threads=0):
     """Start worker process with single core servable"""
     signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # for ccec compiler
     check_type.check_str('servable_directory', servable_directory)
@@ -37,6 +38,8 @@ def start_worker(servable_directory, servable_name, version_number,
     check_type.check_str('master_address', master_address)
     check_type.check_bool('listening_master', listening_master)
     check_type.check_bool('enable_lite', enable_lite)
+    check_type.check_int('num_stage_processes', num_stage_processes, 0)
+    check_type.check_int('num_cpp_stage_threads', num_cpp_stage_threads, 0)
 
     ExitSignalHandle_.start()  # Set flag to running and receive Ctrl+C message
 
@@ -55,7 +58,9 @@ def start_worker(servable_directory, servable_name, version_number,
         worker.start_servable(servable_directory=servable_directory, servable_name=servable_name,
                               version_number=version_number, device_type=device_type, device_id=device_id,
                               master_address=master_address, worker_address=worker_address,
-                              dec_key=dec_key, dec_mode=dec_mode, enable_lite=enable_lite)
+                              dec_key=dec_key, dec_mode=dec_mode, enable_lite=enable_lite,
+                              num_stage_processes=num_stage_processes,
+                              num_cpp_stage_threads=num_cpp_stage_threads)
     except Exception as ex:
         Worker_.notify_failed(master_address,
                               f"{{servable name:{servable_name}, device id:{device_id}, <{ex}>}}")
@@ -75,6 +80,8 @@ def parse_args_and_start():
     parser.add_argument('--dec_key_pipe_file', type=str, required=True, help="dec key pipe file")
     parser.add_argument('--dec_mode', type=str, required=True, help="dec mode")
     parser.add_argument('--listening_master', type=str, required=True, help="whether listening master")
+    parser.add_argument('--num_stage_processes', type=int, default=0, help="processes number of python stages")
+    parser.add_argument('--num_cpp_stage_threads', type=int, default=0, help="threads number of c++ stages")
     args = parser.parse_args()
 
     servable_directory = args.servable_directory
@@ -99,7 +106,8 @@ def parse_args_and_start():
     # pylint: disable=simplifiable-if-expression
     enable_lite = True if args.enable_lite.lower() == "true" else False
     start_worker(servable_directory, servable_name, version_number, device_type, device_id, master_address,
-                 dec_key, dec_mode, listening_master, enable_lite)
+                 dec_key, dec_mode, listening_master, enable_lite, args.num_stage_processes,
+                 args.num_cpp_stage_threads)
 
 
 if __name__ == '__main__':
@@ -34,6 +34,11 @@ def _set_enable_lite(enable_lite):
     ServableContext_.get_instance().set_enable_lite(enable_lite)
 
 
+def _set_num_cpp_stage_threads(num_cpp_stage_threads):
+    """Set the number of threads running C++ stages, default 0, which means 3 threads"""
+    ServableContext_.get_instance().set_num_cpp_stage_threads(num_cpp_stage_threads)
+
+
 def _set_device_id(device_id):
     """Set device id, default 0"""
     ServableContext_.get_instance().set_device_id(device_id)
@@ -122,7 +127,8 @@ def _load_servable_config(servable_directory, servable_name):
 
 @stop_on_except
 def start_servable(servable_directory, servable_name, version_number,
-                   device_type, device_id, master_address, worker_address, dec_key, dec_mode, enable_lite):
+                   device_type, device_id, master_address, worker_address, dec_key, dec_mode, enable_lite,
+                   num_stage_processes=0, num_cpp_stage_threads=0):
     r"""
     Start up the servable named 'servable_name' defined in 'servable_directory', and link the worker to the master
     through gRPC master_address and worker_address.
@@ -139,7 +145,10 @@ def start_servable(servable_directory, servable_name, version_number,
         dec_key = ''
     check_type.check_str('dec_mode', dec_mode)
     check_type.check_bool('enable_lite', enable_lite)
+    check_type.check_int('num_stage_processes', num_stage_processes, 0)
+    check_type.check_int('num_cpp_stage_threads', num_cpp_stage_threads, 0)
     _set_enable_lite(enable_lite)
+    _set_num_cpp_stage_threads(num_cpp_stage_threads)
 
     _load_servable_config(servable_directory, servable_name)
     model_names = Worker_.get_declared_model_names()
@@ -157,12 +166,13 @@ def start_servable(servable_directory, servable_name, version_number,
     _set_device_id(device_id)
     Worker_.start_servable(servable_directory, servable_name, version_number, master_address, worker_address,
                            dec_key, dec_mode)
-    _start_py_task()
+    _start_py_task(servable_directory, servable_name, num_stage_processes)
 
 
 @stop_on_except
 def start_extra_servable(servable_directory, servable_name, version_number, device_type, device_ids_empty,
-                         dec_key, dec_mode, master_address, worker_address, enable_lite):
+                         dec_key, dec_mode, master_address, worker_address, enable_lite, num_stage_processes=0,
+                         num_cpp_stage_threads=0):
     r"""
     Start up the servable named 'servable_name' defined in 'servable_directory', and link the worker to the master
     through gRPC master_address and worker_address.
@@ -180,7 +190,10 @@ def start_extra_servable(servable_directory, servable_name, version_number, devi
         dec_key = ''
     check_type.check_str('dec_mode', dec_mode)
     check_type.check_bool('enable_lite', enable_lite)
+    check_type.check_int('num_stage_processes', num_stage_processes, 0)
+    check_type.check_int('num_cpp_stage_threads', num_cpp_stage_threads, 0)
     _set_enable_lite(enable_lite)
+    _set_num_cpp_stage_threads(num_cpp_stage_threads)
 
     _load_servable_config(servable_directory, servable_name)
     model_names = Worker_.get_declared_model_names()
@@ -197,4 +210,4 @@ def start_extra_servable(servable_directory, servable_name, version_number, devi
     _set_device_type(device_type)
     Worker_.start_extra_servable(servable_directory, servable_name, version_number, device_ids_empty,
                                  dec_key, dec_mode, master_address, worker_address)
-    _start_py_task()
+    _start_py_task(servable_directory, servable_name, num_stage_processes)
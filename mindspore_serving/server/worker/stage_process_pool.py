@@ -0,0 +1,397 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Run python preprocess and postprocess in a pool of processes"""
+
+import queue
+import threading
+import weakref
+import multiprocessing
+from collections import namedtuple
+import numpy as np
+from mindspore_serving import log as logger
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python 3.7
+    shared_memory = None
+
+_ALIGN_SIZE = 64
+# initial size of the inputs arena and outputs arena of one process, the pages of shared memory are allocated when
+# they are touched
+_INIT_ARENA_SIZE = 16 * 1024 * 1024
+
+# placeholder of numpy array placed in shared memory
+_ShmArray = namedtuple("_ShmArray", ["offset", "shape", "dtype"])
+
+
+def _is_shm_array(item):
+    """Whether the item can be placed in shared memory"""
+    return isinstance(item, np.ndarray) and item.dtype != np.object_ and item.nbytes > 0
+
+
+def _align(size):
+    return (size + _ALIGN_SIZE - 1) // _ALIGN_SIZE * _ALIGN_SIZE
+
+
+def _packed_size(items_list):
+    """The size of shared memory needed to place the numpy arrays of items_list"""
+    return sum(_align(item.nbytes) for items in items_list for item in items if _is_shm_array(item))
+
+
+def _pack_items(buf, items_list):
+    """Place numpy arrays of items_list in buf, return items with placeholders"""
+    offset = 0
+    packed_list = []
+    for items in items_list:
+        packed_items = []
+        for item in items:
+            if _is_shm_array(item):
+                dst = np.ndarray(item.shape, dtype=item.dtype, buffer=buf, offset=offset)
+                dst[...] = item
+                del dst
+                packed_items.append(_ShmArray(offset, item.shape, item.dtype.str))
+                offset += _align(item.nbytes)
+            else:
+                packed_items.append(item)
+        packed_list.append(tuple(packed_items))
+    return packed_list
+
+
+def _unpack_items(buf, packed_list):
+    """Replace placeholders of packed_list with numpy arrays referencing buf"""
+    items_list = []
+    for packed_items in packed_list:
+        items = []
+        for item in packed_items:
+            if isinstance(item, _ShmArray):
+                item = np.ndarray(item.shape, dtype=np.dtype(item.dtype), buffer=buf, offset=item.offset)
+            items.append(item)
+        items_list.append(tuple(items))
+    return items_list
+
+
+def _close_shm(shm):
+    """Close shared memory, the memory will be unmapped when all arrays referencing it are released"""
+    try:
+        shm.close()
+    except BufferError:
+        pass
+
+
+def _unlink_shm(shm):
+    """Close and unlink shared memory"""
+    _close_shm(shm)
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _ArenaAllocator:
+    """First fit allocator of the outputs arena, the regions are released in any order"""
+
+    def __init__(self, size):
+        self.free_blocks = [(0, size)]  # sorted by offset
+        self.used_blocks = {}
+
+    def alloc(self, size):
+        """Allocate a region, return the offset, or None if there is no free block large enough"""
+        for i, (offset, block_size) in enumerate(self.free_blocks):
+            if block_size >= size:
+                if block_size == size:
+                    del self.free_blocks[i]
+                else:
+                    self.free_blocks[i] = (offset + size, block_size - size)
+                self.used_blocks[offset] = size
+                return offset
+        return None
+
+    def free(self, offset):
+        """Release a region, and merge it with the adjacent free blocks"""
+        size = self.used_blocks.pop(offset)
+        index = 0
+        while index < len(self.free_blocks) and self.free_blocks[index][0] < offset:
+            index += 1
+        self.free_blocks.insert(index, (offset, size))
+        if index + 1 < len(self.free_blocks) and offset + size == self.free_blocks[index + 1][0]:
+            self.free_blocks[index] = (offset, size + self.free_blocks[index + 1][1])
+            del self.free_blocks[index + 1]
+        if index > 0 and self.free_blocks[index - 1][0] + self.free_blocks[index - 1][1] == offset:
+            prev_offset, prev_size = self.free_blocks[index - 1]
+            self.free_blocks[index - 1] = (prev_offset, prev_size + self.free_blocks[index][1])
+            del self.free_blocks[index]
+
+
+def _attach_shm(shm, name):
+    """Attach the shared memory created by the worker process if it has been replaced"""
+    if shm is not None and shm.name == name:
+        return shm
+    if shm is not None:
+        _close_shm(shm)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _run_stage_function(task_name, method_name, stage_index, inputs_buf, packed_instances, outputs_shm, allocator):
+    """Run stage function, the outputs of instances are placed in the outputs arena if there is enough free space.
+    Return offset and size of the outputs region, the packed outputs and the error messages"""
+    # pylint: disable=import-outside-toplevel
+    from mindspore_serving.server.worker.task import invoke_stage_function
+    instances = _unpack_items(inputs_buf, packed_instances)
+    outputs_list = []
+    error_msgs = []
+    for outputs, error_msg in invoke_stage_function(task_name, method_name, stage_index, instances):
+        outputs_list.append(tuple(outputs) if error_msg is None else ())
+        error_msgs.append(error_msg)
+    # outputs may be views of inputs, pack them before the inputs arena is reused
+    size = _packed_size(outputs_list)
+    offset = allocator.alloc(size) if size > 0 else None
+    if offset is None:
+        # no outputs arrays, or the outputs arena is full of outputs still used by the worker process, the outputs
+        # are pickled
+        return None, size, outputs_list, error_msgs
+    region = outputs_shm.buf[offset:offset + size]
+    packed_outputs = _pack_items(region, outputs_list)
+    region.release()
+    return offset, size, packed_outputs, error_msgs
+
+
+def _stage_process_main(conn, servable_directory, servable_name):
+    """Main loop of the process of pool, run the stage functions of tasks sent by the worker process"""
+    # pylint: disable=import-outside-toplevel
+    from mindspore_serving.server.worker._worker import _load_servable_config
+    _load_servable_config(servable_directory, servable_name)
+    inputs_shm = None
+    outputs_shm = None
+    allocator = None
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        task_name, method_name, stage_index, inputs_name, packed_instances, outputs_name, released = message
+        try:
+            inputs_buf = None
+            if inputs_name:
+                inputs_shm = _attach_shm(inputs_shm, inputs_name)
+                inputs_buf = inputs_shm.buf
+            if outputs_shm is None or outputs_shm.name != outputs_name:
+                # the outputs arena is replaced by a larger one, regions of the old arena are released by itself
+                outputs_shm = _attach_shm(outputs_shm, outputs_name)
+                allocator = _ArenaAllocator(outputs_shm.size)
+            else:
+                for offset in released:
+                    allocator.free(offset)
+            result = _run_stage_function(task_name, method_name, stage_index, inputs_buf, packed_instances,
+                                         outputs_shm, allocator)
+            del inputs_buf
+        except Exception as e:  # pylint: disable=broad-except
+            result = e
+        conn.send(result)
+    for shm in (inputs_shm, outputs_shm):
+        if shm is not None:
+            _close_shm(shm)
+
+
+class _StageProcess:
+    """One process of pool, with the inputs arena and outputs arena mapped for the lifetime of pool. The inputs of one
+    chunk are placed in the inputs arena, which is reused by the next chunk. The outputs region of one chunk is
+    released when the numpy arrays referencing it are all released by c++, and the release is sent to the process
+    together with the next chunk"""
+
+    def __init__(self, context, servable_directory, servable_name):
+        self.conn, child_conn = context.Pipe()
+        self.inputs_shm = None
+        self.outputs_shm = shared_memory.SharedMemory(create=True, size=_INIT_ARENA_SIZE)
+        # replaced outputs arenas whose regions may still be referenced
+        self.retired_shms = []
+        self.released = []
+        self.released_lock = threading.Lock()
+        self.broken = False
+        self.process = context.Process(target=_stage_process_main, args=(child_conn, servable_directory,
+                                                                         servable_name), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def submit(self, task_name, method_name, stage_index, instance_list):
+        """Send the instances of one chunk to the process"""
+        size = _packed_size(instance_list)
+        inputs_name = None
+        packed_instances = instance_list
+        if size > 0:
+            if self.inputs_shm is None or self.inputs_shm.size < size:
+                if self.inputs_shm is not None:
+                    _unlink_shm(self.inputs_shm)
+                self.inputs_shm = shared_memory.SharedMemory(create=True, size=max(size, _INIT_ARENA_SIZE))
+            packed_instances = _pack_items(self.inputs_shm.buf, instance_list)
+            inputs_name = self.inputs_shm.name
+        with self.released_lock:
+            released = self.released
+            self.released = []
+        self._send((task_name, method_name, stage_index, inputs_name, packed_instances, self.outputs_shm.name,
+                    released))
+
+    def result(self):
+        """Receive the outputs of the chunk, the numpy arrays of outputs reference the outputs arena"""
+        result = self._recv()
+        if isinstance(result, Exception):
+            raise result
+        offset, size, packed_outputs, error_msgs = result
+        if offset is None:
+            if size > self.outputs_shm.size // 2:
+                self._replace_outputs_arena(size)
+            return packed_outputs, error_msgs
+        # all the arrays of outputs reference the region, which is released when all of them are released
+        region = np.ndarray((size,), dtype=np.uint8, buffer=self.outputs_shm.buf, offset=offset)
+        weakref.finalize(region, self._release, self.outputs_shm.name, offset)
+        return _unpack_items(region, packed_outputs), error_msgs
+
+    def shutdown(self):
+        """Stop the process, and unlink the arenas. The mapped memory is kept until the arrays are released"""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        for shm in [self.inputs_shm, self.outputs_shm] + self.retired_shms:
+            if shm is not None:
+                _unlink_shm(shm)
+
+    def _release(self, outputs_name, offset):
+        """Invoked when the outputs of one chunk are released, maybe in any thread"""
+        with self.released_lock:
+            if outputs_name == self.outputs_shm.name:
+                self.released.append(offset)
+
+    def _replace_outputs_arena(self, size):
+        """Replace the outputs arena with a larger one, the process allocates in the new arena from the next chunk"""
+        arena_size = self.outputs_shm.size
+        while arena_size < size * 2:
+            arena_size *= 2
+        shm = shared_memory.SharedMemory(create=True, size=arena_size)
+        with self.released_lock:
+            # unlink the name only, the memory is unmapped when the arrays referencing it are released
+            try:
+                self.outputs_shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.retired_shms.append(self.outputs_shm)
+            self.outputs_shm = shm
+            self.released = []
+        logger.info(f"The outputs arena of python stage process is enlarged to {arena_size} bytes")
+
+    def _send(self, message):
+        if self.broken:
+            raise EOFError("the process has exited")
+        try:
+            self.conn.send(message)
+        except OSError as e:
+            self.broken = True
+            raise EOFError(f"send to the process failed: {e}")
+
+    def _recv(self):
+        if self.broken:
+            raise EOFError("the process has exited")
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.broken = True
+            raise EOFError(f"the process exited unexpectedly: {e}")
+
+
+class StageProcessPool:
+    """Pool of processes to run python preprocess and postprocess. Instances of one task are split into contiguous
+    chunks and run in the idle processes in parallel, the numpy arrays of inputs and outputs are transported by the
+    shared memory arenas of the processes.
+
+    Args:
+        servable_directory (str): The directory where the servable is located in.
+        servable_name (str): The servable name.
+        num_processes (int): The number of processes.
+    """
+
+    def __init__(self, servable_directory, servable_name, num_processes):
+        if shared_memory is None:
+            raise RuntimeError("Running python stages in processes requires Python 3.8 or later")
+        self.num_processes = num_processes
+        context = multiprocessing.get_context("spawn")
+        self.processes = [_StageProcess(context, servable_directory, servable_name) for _ in range(num_processes)]
+        self.idle_processes = queue.Queue()
+        for process in self.processes:
+            self.idle_processes.put(process)
+        logger.info(f"Start process pool with {num_processes} processes for python stages of servable "
+                    f"{servable_name}")
+
+    def run(self, task_name, method_name, stage_index, instance_list):
+        """Run stage function for instances, yield (outputs, None) or (None, error message) for each instance in
+        order. Raise ServingSystemException when the process pool is broken or the outputs are invalid"""
+        # pylint: disable=import-outside-toplevel
+        from mindspore_serving.server.worker.task import ServingSystemException
+        instances_size = len(instance_list)
+        if instances_size == 0:
+            return
+        processes = self._acquire_processes(instances_size)
+        chunk_count = len(processes)
+        submitted = []
+        try:
+            begin = 0
+            for i, process in enumerate(processes):
+                end = begin + instances_size // chunk_count + (1 if i < instances_size % chunk_count else 0)
+                process.submit(task_name, method_name, stage_index, instance_list[begin:end])
+                submitted.append(process)
+                begin = end
+
+            while submitted:
+                outputs_list, error_msgs = submitted[0].result()
+                submitted.pop(0)
+                for outputs, error_msg in zip(outputs_list, error_msgs):
+                    yield (list(outputs), None) if error_msg is None else (None, error_msg)
+        except EOFError as e:
+            raise ServingSystemException(f"Process pool of python stages is broken: {e}")
+        finally:
+            for process in submitted:
+                StageProcessPool._discard_result(process)
+            # the broken process is also put back, so that the tasks using it fail rather than wait forever
+            for process in processes:
+                self.idle_processes.put(process)
+
+    def shutdown(self):
+        """Shutdown the process pool"""
+        for process in self.processes:
+            process.shutdown()
+
+    def _acquire_processes(self, instances_size):
+        """Wait for one idle process, and take more idle processes without waiting, one chunk for each process"""
+        processes = [self.idle_processes.get()]
+        while len(processes) < min(instances_size, self.num_processes):
+            try:
+                processes.append(self.idle_processes.get_nowait())
+            except queue.Empty:
+                break
+        return processes
+
+    @staticmethod
+    def _discard_result(process):
+        """Receive and drop the outputs of the remaining chunk of a failed task, so that the process can be reused"""
+        if process.broken:
+            return
+        try:
+            process.result()
+        except Exception:  # pylint: disable=broad-except
+            pass
@@ -16,18 +16,30 @@
 
 import time
 import logging
+import threading
 import numpy as np
 from mindspore_serving._mindspore_serving import Worker_
 from mindspore_serving._mindspore_serving import ExitSignalHandle_
 from mindspore_serving.server.register.stage_function import stage_function_storage
+from mindspore_serving.server.worker.stage_process_pool import StageProcessPool
 from mindspore_serving import log as logger
 
 
+# max time in seconds the outputs of instances handled wait to be pushed together with outputs of following instances
+_MAX_PUSH_DELAY = 0.001
+# max count of the outputs of instances pushed together
+_MAX_PUSH_COUNT = 32
+
+# the data types of numpy arrays that can be pushed to c++ without copy
+_SUPPORTED_NUMPY_TYPES = (np.bool_, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64,
+                          np.float16, np.float32, np.float64)
+
+
 class ServingSystemException(Exception):
     """Exception notify system error of worker, and need to exit py task"""
 
     def __init__(self, msg):
-        super(ServingSystemException, self).__init__()
+        super(ServingSystemException, self).__init__(msg)
         self.msg = msg
 
     def __str__(self):
@@ -39,11 +51,322 @@ def has_worker_stopped():
     return ExitSignalHandle_.has_stopped()
 
 
+def _check_instances(task_info, task_name, stage_index, instance_list):
+    """Check the inputs number of instances"""
+    inputs_count = task_info["inputs_count"]
+    for item in instance_list:
+        if not isinstance(item, tuple) or len(item) != inputs_count:
+            raise RuntimeError(f"The inputs number {len(item)} provided is not equal to the inputs number "
+                               f"{inputs_count} required by function {task_name}, stage index {stage_index}")
+
+
+def _stack_input(values):
+    """Stack the values of one input of instances, zero-pad the values whose shapes differ in the first dimension"""
+    if not all(isinstance(item, (np.ndarray, np.generic)) for item in values):
+        return tuple(values)
+    values = [np.asarray(item) for item in values]
+    first = values[0]
+    if all(item.shape == first.shape and item.dtype == first.dtype for item in values):
+        return np.stack(values)
+    if first.ndim == 0 or any(item.ndim != first.ndim or item.shape[1:] != first.shape[1:] or
+                              item.dtype != first.dtype for item in values):
+        raise RuntimeError(f"The values of one input cannot be stacked, their shapes or data types differ in "
+                           f"dimensions other than the first one")
+    lengths = np.array([item.shape[0] for item in values], np.int64)
+    padded = np.zeros((len(values), int(lengths.max())) + first.shape[1:], first.dtype)
+    for i, item in enumerate(values):
+        padded[i, :item.shape[0]] = item
+    return padded, lengths
+
+
+def _is_supported_output_value(value):
+    """Whether the value of one instance in the output list can be pushed to c++"""
+    if isinstance(value, (str, bytes, bool, int, float)):
+        return True
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.dtype.type in _SUPPORTED_NUMPY_TYPES
+    return False
+
+
+def invoke_stacked_stage_function(task_info, task_name, method_name, instance_list):
+    """Invoke the stage function with stacked inputs, and return (outputs, None) or (None, error message), each output
+    is numpy array with the first dimension equal to the number of instances or list with one value for each instance.
+    The error message is returned when the function raises or returns outputs of unsupported data types, which fails
+    only the instances of this call. Raise ServingSystemException when the results returned by the function are
+    invalid"""
+    instances_size = len(instance_list)
+    try:
+        inputs = [_stack_input(values) for values in zip(*instance_list)]
+        outputs = task_info["fun"](*inputs)  # user-defined, may raise Exception
+    # pylint: disable=broad-except
+    except Exception as e:
+        logger.warning(f"{task_name} invoke catch exception: ")
+        logging.exception(e)
+        return None, str(e)
+    if task_info["outputs_count"] == 1 and not isinstance(outputs, tuple):
+        outputs = (outputs,)
+    if not isinstance(outputs, (tuple, list)) or len(outputs) != task_info["outputs_count"]:
+        outputs_count = len(outputs) if isinstance(outputs, (tuple, list)) else 1
+        raise ServingSystemException(f"The outputs number {outputs_count} returned by function '{task_name}' is "
+                                     f"not equal to the outputs number {task_info['outputs_count']} registered in "
+                                     f"method {method_name}")
+    stacked_outputs = []
+    for index, item in enumerate(outputs):
+        # convert MindSpore Tensor to numpy
+        if callable(getattr(item, "asnumpy", None)):
+            item = item.asnumpy()
+        if isinstance(item, np.ndarray):
+            if item.ndim == 0 or item.shape[0] != instances_size:
+                raise ServingSystemException(f"The first dimension of output shape {item.shape} returned by function "
+                                             f"'{task_name}' is not equal to the number {instances_size} of instances")
+            if item.dtype.type not in _SUPPORTED_NUMPY_TYPES:
+                return None, f"The data type {item.dtype} of output {index} returned by function '{task_name}' is " \
+                             f"not supported, return a list to reply str or bytes values"
+            if not item.flags['C_CONTIGUOUS']:
+                item = np.ascontiguousarray(item)
+        elif isinstance(item, (tuple, list)):
+            if len(item) != instances_size:
+                raise ServingSystemException(f"The length {len(item)} of output returned by function '{task_name}' "
+                                             f"is not equal to the number {instances_size} of instances")
+            item = list(item)
+            if not all(_is_supported_output_value(value) for value in item):
+                return None, f"The values of output {index} returned by function '{task_name}' should be str, " \
+                             f"bytes, bool, int, float or numpy array of bool, int or float"
+        else:
+            raise ServingSystemException(f"The output returned by function '{task_name}' should be numpy array or "
+                                         f"list, but actually {type(item)}")
+        stacked_outputs.append(item)
+    return stacked_outputs, None
+
+
+def invoke_stage_function(task_name, method_name, stage_index, instance_list):
+    """Invoke the stage function, and yield (outputs, None) or (None, error message) for each instance in order.
+    Raise ServingSystemException when the results returned by the function are invalid"""
+    task_info = stage_function_storage.get(task_name)
+    _check_instances(task_info, task_name, stage_index, instance_list)
+    if task_info["stacked"]:
+        stacked_outputs, error_msg = invoke_stacked_stage_function(task_info, task_name, method_name, instance_list)
+        for i in range(len(instance_list)):
+            if error_msg is not None:
+                yield None, error_msg
+                continue
+            # index with Ellipsis to get 0-d array rather than numpy scalar
+            yield [item[i, ...] if isinstance(item, np.ndarray) else item[i] for item in stacked_outputs], None
+        return
+
+    instances_size = len(instance_list)
+    index = 0
+    while index < instances_size:
+        get_result_time_end = time.time()
+        try:
+            result = task_info["fun"](instance_list[index:])  # user-defined, may raise Exception
+            if isinstance(result, (tuple, list)):  # convert return result to yield
+                result = iter(result)
+        # pylint: disable=broad-except
+        except Exception as e:
+            logger.warning(f"{task_name} invoke catch exception: ")
+            logging.exception(e)
+            for _ in range(index, instances_size):
+                yield None, str(e)
+            return
+
+        try:
+            start_index = index
+            for _ in range(index, instances_size):
+                output = next(result)  # user-defined, may raise Exception
+                if not isinstance(output, (tuple, list)):
+                    output = (output,)
+                # check output count
+                if len(output) != task_info["outputs_count"]:
+                    error_msg = f"The outputs number {len(output)} of one instance returned by function " \
+                                f"'{task_name}' is not equal to the outputs number {task_info['outputs_count']} " \
+                                f" registered in method {method_name}"
+                    raise ServingSystemException(error_msg)
+                instance_result = []
+                for item in output:
+                    # convert MindSpore Tensor to numpy
+                    if callable(getattr(item, "asnumpy", None)):
+                        item = item.asnumpy()
+                    if isinstance(item, np.ndarray) and (not item.flags['FORC']):
+                        item = np.ascontiguousarray(item)
+                    instance_result.append(item)
+                index += 1
+                yield instance_result, None  # outputs of one instance
+
+            get_result_time = time.time()
+            logger.info(f"method {method_name} stage {stage_index} function {task_name} get result "
+                        f"{start_index} ~ {instances_size - 1} cost time "
+                        f"{(get_result_time - get_result_time_end) * 1000} ms")
+
+        except StopIteration:  # raise by next
+            error_msg = f"The number {index} of instances returned by function '{task_name}' is " \
+                        f"not equal to the number {instances_size} of instances provided to this function."
+            raise ServingSystemException(error_msg)
+        except ServingSystemException as e:
+            logger.error(f"{task_name} handling catch exception: {e}")
+            raise
+        except Exception as e:  # pylint: disable=broad-except
+            # catch exception and try next
+            logger.warning(f"{task_name} get result catch exception: {e}")
+            logging.exception(e)
+            index += 1
+            yield None, str(e)  # push success results and a failed result
+
+
+class _PendingResults:
+    """The outputs of instances are pushed in bulk to reduce the cost of calling c++ for every instance. The pending
+    outputs are pushed when the task ends, before a failed instance, or when _MAX_PUSH_COUNT outputs are pending.
+    The flusher of the handler pushes the pending outputs when the oldest one has waited _MAX_PUSH_DELAY, so that the
+    next stage will not be delayed when the function takes a long time to get the next result"""
+
+    def __init__(self, task_id, flusher):
+        self.task_id = task_id
+        self.flusher = flusher
+        self.results = []
+        self.first_time = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def add(self, outputs):
+        """Add the outputs of one instance"""
+        with self.lock:
+            self._raise_flusher_error()
+            self.results.append(tuple(outputs))
+            if len(self.results) >= _MAX_PUSH_COUNT:
+                self._push()
+            elif self.first_time is None:
+                self.first_time = time.time()
+                self.flusher.watch(self)
+
+    def add_failed(self, error_msg):
+        """Push the pending outputs and then the failed instance, keeping the order of instances"""
+        with self.lock:
+            self._push()
+            PyTaskHandler.push_failed(self.task_id, 1, error_msg)
+
+    def flush(self):
+        """Push the pending outputs"""
+        with self.lock:
+            self._push()
+            self.flusher.unwatch(self)
+
+    def stop(self):
+        """Drop the pending outputs when the task fails"""
+        with self.lock:
+            self.results = []
+            self.first_time = None
+            self.flusher.unwatch(self)
+
+    def flush_expired(self, now):
+        """Invoked by the flusher, push the pending outputs if the oldest one has waited _MAX_PUSH_DELAY, and return
+        the time the pending outputs should be pushed, or None if there are no pending outputs"""
+        with self.lock:
+            if self.first_time is None:
+                self.flusher.unwatch(self)
+                return None
+            push_time = self.first_time + _MAX_PUSH_DELAY
+            if push_time > now:
+                return push_time
+            if self.error is None:
+                try:
+                    PyTaskHandler.push_results(self.task_id, self.results)
+                except ServingSystemException as e:
+                    # raised in the thread handling the task
+                    self.error = e
+            self.results = []
+            self.first_time = None
+            self.flusher.unwatch(self)
+            return None
+
+    def _push(self):
+        self._raise_flusher_error()
+        results = self.results
+        self.results = []
+        self.first_time = None
+        PyTaskHandler.push_results(self.task_id, results)
+
+    def _raise_flusher_error(self):
+        if self.error is not None:
+            raise self.error
+
+
+class _ResultsFlusher:
+    """One thread for all the task handling threads of PyTaskHandler, pushing the outputs that have been pending for
+    _MAX_PUSH_DELAY. The thread sleeps when there are no pending outputs"""
+
+    def __init__(self):
+        self.watched = set()
+        self.stopped = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """Start the flusher thread"""
+        self.thread.start()
+
+    def stop(self):
+        """Stop the flusher thread"""
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.thread.join()
+
+    def watch(self, pending_results):
+        """Watch the pending outputs of one task, invoked with the lock of pending_results held"""
+        with self.cond:
+            if pending_results not in self.watched:
+                self.watched.add(pending_results)
+                self.cond.notify()
+
+    def unwatch(self, pending_results):
+        """Stop watching the pending outputs of one task, invoked with the lock of pending_results held"""
+        with self.cond:
+            self.watched.discard(pending_results)
+
+    def run(self):
+        """Push the expired pending outputs, and wait until the next pending outputs expire"""
+        while True:
+            with self.cond:
+                while not self.watched and not self.stopped:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+                watched = list(self.watched)
+            # the lock of pending_results is acquired before the condition, same as watch and unwatch
+            now = time.time()
+            push_times = [pending_results.flush_expired(now) for pending_results in watched]
+            push_times = [item for item in push_times if item is not None]
+            if push_times:
+                with self.cond:
+                    if not self.stopped:
+                        self.cond.wait(max(min(push_times) - time.time(), 0))
+
+
 class PyTaskHandler:
     """Handling preprocess and postprocess"""
 
+    def __init__(self, process_pool=None):
+        self.process_pool = process_pool
+        self.flusher = _ResultsFlusher()
+
     def run(self):
-        """Run tasks of preprocess and postprocess, switch to other type of process when some instances are handled"""
+        """Run tasks of preprocess and postprocess, switch to other type of process when some instances are handled.
+        The tasks of the stages with num_parallel greater than 1 are handled by multiple threads concurrently"""
+        parallel_num = Worker_.get_py_task_parallel_num()
+        threads = [threading.Thread(target=self.run_thread) for _ in range(parallel_num - 1)]
+        self.flusher.start()
+        for thread in threads:
+            thread.start()
+        self.run_thread()
+        for thread in threads:
+            thread.join()
+        self.flusher.stop()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+        Worker_.stop_and_clear()
+
+    def run_thread(self):
+        """Pop tasks and handle them until the worker exits"""
         logger.info(f"start python task handling thread")
         while True:
             try:
@@ -58,106 +381,95 @@ class PyTaskHandler:
             except Exception as e:  # pylint: disable=broad-except
                 logger.error(f"py task catch exception and exit: {e}")
                 logging.exception(e)
+                Worker_.stop_and_clear()  # notify other threads to exit
                 break
         logger.info("end python task handling thread")
-        Worker_.stop_and_clear()
 
-    @staticmethod
-    def run_inner(task):
+    def run_inner(self, task):
         """Iterator get result, and push it to c++"""
-        task_name = task.task_name
-        task_info = stage_function_storage.get(task_name)
+        task_id = task.task_id
+        task_info = stage_function_storage.get(task.task_name)
+        if task_info["stacked"] and self.process_pool is None:
+            self.run_stacked(task, task_info)
+            return
+        if self.process_pool is not None:
+            results = self.process_pool.run(task.task_name, task.method_name, task.stage_index, task.instance_list)
+        else:
+            results = invoke_stage_function(task.task_name, task.method_name, task.stage_index, task.instance_list)
+        pending_results = _PendingResults(task_id, self.flusher)
+        try:
+            for outputs, error_msg in results:
+                if error_msg is None:
+                    pending_results.add(outputs)
+                else:
+                    pending_results.add_failed(error_msg)
+            # raise ServingSystemException when user-defined output is invalid
+            pending_results.flush()
+        except ServingSystemException as e:
+            pending_results.stop()
+            PyTaskHandler.push_system_failed(task_id, e.msg)
+            raise
+
+    @staticmethod
+    def run_stacked(task, task_info):
+        """Invoke the stage function with stacked inputs, and push the stacked outputs, which are split into
+        instances in c++"""
+        task_id = task.task_id
         instance_list = task.instance_list
-        # check input
-        inputs_count = task_info["inputs_count"]
-        for item in instance_list:
-            if not isinstance(item, tuple) or len(item) != inputs_count:
-                raise RuntimeError(f"The inputs number {len(item)} provided is not equal to the inputs number "
-                                   f"{inputs_count} required by function {task_name}, stage index {task.stage_index}")
-
-        instances_size = len(task.instance_list)
-        index = 0
-        while index < instances_size:
+        try:
+            _check_instances(task_info, task.task_name, task.stage_index, instance_list)
             get_result_time_end = time.time()
+            stacked_outputs, error_msg = invoke_stacked_stage_function(task_info, task.task_name, task.method_name,
+                                                                       instance_list)
+            if error_msg is not None:
+                PyTaskHandler.push_failed(task_id, len(instance_list), error_msg)
+                return
             try:
-                result = task_info["fun"](instance_list[index:])  # user-defined, may raise Exception
-                if isinstance(result, (tuple, list)):  # convert return result to yield
-                    result = iter(result)
-            # pylint: disable=broad-except
+                Worker_.push_pytask_stacked_result(task_id, tuple(stacked_outputs), len(instance_list))
             except Exception as e:
-                logger.warning(f"{task_name} invoke catch exception: ")
-                logging.exception(e)
-                PyTaskHandler.push_failed(instances_size - index, str(e))
-                return  # return will not terminate thread
-
-            try:
-                start_index = index
-                for _ in range(index, instances_size):
-                    output = next(result)  # user-defined, may raise Exception
-                    if not isinstance(output, (tuple, list)):
-                        output = (output,)
-                    # check output count
-                    if len(output) != task_info["outputs_count"]:
-                        error_msg = f"The outputs number {len(output)} of one instance returned by function " \
-                                    f"'{task_name}' is not equal to the outputs number {task_info['outputs_count']} " \
-                                    f" registered in method {task.method_name}"
-                        PyTaskHandler.push_system_failed(error_msg)
-                        raise ServingSystemException(error_msg)
-                    instance_result = []
-                    for item in output:
-                        # convert MindSpore Tensor to numpy
-                        if callable(getattr(item, "asnumpy", None)):
-                            item = item.asnumpy()
-                        if isinstance(item, np.ndarray) and (not item.flags['FORC']):
-                            item = np.ascontiguousarray(item)
-                        instance_result.append(item)
-                    # raise ServingSystemException when user-defined output is invalid
-                    PyTaskHandler.push_result(instance_result)  # push outputs of one instance
-                    index += 1
-
-                get_result_time = time.time()
-                logger.info(f"method {task.method_name} stage {task.stage_index} function {task_name} get result "
-                            f"{start_index} ~ {instances_size - 1} cost time "
-                            f"{(get_result_time - get_result_time_end) * 1000} ms")
-
-            except StopIteration:  # raise by next
-                error_msg = f"The number {index} of instances returned by function '{task_name}' is " \
-                            f"not equal to the number {instances_size} of instances provided to this function."
-                PyTaskHandler.push_system_failed(error_msg)
-                raise RuntimeError(error_msg)
-            except ServingSystemException as e:
-                logger.error(f"{task_name} handling catch exception: {e}")
-                PyTaskHandler.push_system_failed(e.msg)
-                raise
-            except Exception as e:  # pylint: disable=broad-except
-                # catch exception and try next
-                logger.warning(f"{task_name} get result catch exception: {e}")
-                logging.exception(e)
-                PyTaskHandler.push_failed(1, str(e))  # push success results and a failed result
-                index += 1
+                raise ServingSystemException(f"Push py task result cause exception: {e}")
+            logger.info(f"method {task.method_name} stage {task.stage_index} function {task.task_name} get result "
+                        f"0 ~ {len(instance_list) - 1} cost time {(time.time() - get_result_time_end) * 1000} ms")
+        except ServingSystemException as e:
+            logger.error(f"{task.task_name} handling catch exception: {e}")
+            PyTaskHandler.push_system_failed(task_id, e.msg)
+            raise
 
     @staticmethod
-    def push_failed(count, failed_msg):
+    def push_failed(task_id, count, failed_msg):
         """Push failed result"""
-        Worker_.push_pytask_failed(count, failed_msg)
+        Worker_.push_pytask_failed(task_id, count, failed_msg)
 
     @staticmethod
-    def push_system_failed(failed_msg):
+    def push_system_failed(task_id, failed_msg):
         """Push failed result"""
-        Worker_.push_pytask_system_failed(failed_msg)
+        Worker_.push_pytask_system_failed(task_id, failed_msg)
 
     @staticmethod
-    def push_result(instance_result):
+    def push_result(task_id, instance_result):
         """Push success result"""
         try:
-            Worker_.push_pytask_result(tuple(instance_result))
+            Worker_.push_pytask_result(task_id, tuple(instance_result))
+        except Exception as e:
+            raise ServingSystemException(f"Push py task result cause exception: {e}")
+
+    @staticmethod
+    def push_results(task_id, instances_result):
+        """Push success results of multiple instances"""
+        if not instances_result:
+            return
+        try:
+            Worker_.push_pytask_results(task_id, instances_result)
         except Exception as e:
             raise ServingSystemException(f"Push py task result cause exception: {e}")
 
 
-def _start_py_task():
+def _start_py_task(servable_directory=None, servable_name=None, num_stage_processes=0):
     """Start python thread for python task"""
     if Worker_.enable_pytask_que():
-        PyTaskHandler().run()
+        process_pool = None
+        if num_stage_processes > 0:
+            process_pool = StageProcessPool(servable_directory, servable_name, num_stage_processes)
+        PyTaskHandler(process_pool).run()
     else:
         Worker_.wait_and_clear()
@@ -109,6 +109,7 @@ package_data = {
         '*.dll',
         'lib/*.so*',
         'lib/*.a',
+        'include/*.h',
         '.commit_id',
         '_mindspore_serving',
         'proto/*.py'
@@ -0,0 +1,213 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+
+#include "tests/ut/cpp/common/test_servable_common.h"
+#include "common/tensor.h"
+#include "worker/stage_function.h"
+
+namespace mindspore {
+namespace serving {
+namespace {
+// RGB image of height 2 and width 3, the pixels are (10,20,30), (40,50,60), ..., (160,170,180)
+const uint8_t kPngImage[] = {
+  0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a, 0x00, 0x00, 0x00, 0x0d, 0x49, 0x48, 0x44, 0x52, 0x00,
+  0x00, 0x00, 0x03, 0x00, 0x00, 0x00, 0x02, 0x08, 0x02, 0x00, 0x00, 0x00, 0x12, 0x16, 0xf1, 0x4d, 0x00,
+  0x00, 0x00, 0x1c, 0x49, 0x44, 0x41, 0x54, 0x78, 0x9c, 0x63, 0xe0, 0x12, 0x91, 0xd3, 0x30, 0xb2, 0x71,
+  0x0b, 0x88, 0x62, 0x48, 0xc9, 0xab, 0x68, 0xea, 0x99, 0xb6, 0x60, 0xd5, 0x16, 0x00, 0x2e, 0x5e, 0x06,
+  0xaf, 0x57, 0x42, 0xfc, 0x93, 0x00, 0x00, 0x00, 0x00, 0x49, 0x45, 0x4e, 0x44, 0xae, 0x42, 0x60, 0x82};
+
+template <class T>
+InstancePtr CreateInstance(DataType data_type, const std::vector<int64_t> &shape, const std::vector<T> &data) {
+  auto instance = std::make_shared<Instance>();
+  instance->data.push_back(std::make_shared<Tensor>(data_type, shape, data.data(), data.size() * sizeof(T)));
+  return instance;
+}
+
+template <class T>
+std::vector<T> GetData(const TensorBasePtr &tensor) {
+  auto data = reinterpret_cast<const T *>(tensor->data());
+  return std::vector<T>(data, data + tensor->data_size() / sizeof(T));
+}
+
+std::vector<ResultInstance> CallBatch(const std::string &func_name, const std::vector<InstancePtr> &instances) {
+  auto function = CppStageFunctionStorage::Instance().GetFunction(func_name);
+  EXPECT_NE(function, nullptr);
+  std::vector<ResultInstance> results;
+  if (function != nullptr) {
+    function->CallBatch(func_name, instances, &results);
+  }
+  return results;
+}
+}  // namespace
+
+class TestImageProcessStage : public UT::Common {
+ public:
+  void SetUp() override { UT::Common::SetUp(); }
+  void TearDown() override { UT::Common::TearDown(); }
+};
+
+TEST_F(TestImageProcessStage, test_parse_function_name_success) {
+  std::string base_name;
+  std::vector<std::string> args;
+  ASSERT_TRUE(CppStageFunctionStorage::ParseFunctionName("resize_cpp( 224, 256 )", &base_name, &args));
+  ASSERT_EQ(base_name, "resize_cpp");
+  ASSERT_EQ(args, std::vector<std::string>({"224", "256"}));
+  ASSERT_TRUE(CppStageFunctionStorage::ParseFunctionName("hwc2chw_cpp()", &base_name, &args));
+  ASSERT_EQ(base_name, "hwc2chw_cpp");
+  ASSERT_TRUE(args.empty());
+  ASSERT_FALSE(CppStageFunctionStorage::ParseFunctionName("resize_cpp(224,)", &base_name, &args));
+  ASSERT_FALSE(CppStageFunctionStorage::ParseFunctionName("resize_cpp(224", &base_name, &args));
+}
+
+TEST_F(TestImageProcessStage, test_invalid_function_arguments_failed) {
+  auto function = CppStageFunctionStorage::Instance().GetFunction("resize_cpp(224)");
+  ASSERT_NE(function, nullptr);
+  ASSERT_EQ(function->GetInputsCount("resize_cpp(224)"), 0);
+  ASSERT_EQ(function->GetInputsCount("resize_cpp(224,a)"), 0);
+  ASSERT_EQ(function->GetInputsCount("resize_cpp(224,224)"), 1);
+  ASSERT_EQ(function->GetOutputsCount("resize_cpp(224,224)"), 1);
+  function = CppStageFunctionStorage::Instance().GetFunction("normalize_cpp(1,2,3)");
+  ASSERT_NE(function, nullptr);
+  ASSERT_EQ(function->GetInputsCount("normalize_cpp(1,2,3)"), 0);
+  ASSERT_EQ(function->GetInputsCount("normalize_cpp(1,0)"), 0);
+  function = CppStageFunctionStorage::Instance().GetFunction("cast_cpp(float16)");
+  ASSERT_NE(function, nullptr);
+  ASSERT_EQ(function->GetInputsCount("cast_cpp(float16)"), 0);
+  function = CppStageFunctionStorage::Instance().GetFunction("decode_image_cpp(0)");
+  ASSERT_NE(function, nullptr);
+  ASSERT_EQ(function->GetInputsCount("decode_image_cpp(0)"), 0);
+  ASSERT_EQ(function->GetInputsCount("decode_image_cpp(1,2)"), 0);
+  ASSERT_EQ(function->GetInputsCount("decode_image_cpp(1024)"), 1);
+  ASSERT_EQ(CppStageFunctionStorage::Instance().GetFunction("not_exist_cpp(1)"), nullptr);
+}
+
+TEST_F(TestImageProcessStage, test_resize_batch_success) {
+  std::vector<InstancePtr> instances;
+  for (int i = 0; i < 20; i++) {
+    instances.push_back(CreateInstance<uint8_t>(kMSI_Uint8, {2, 2, 1}, {0, 100, 100, static_cast<uint8_t>(i)}));
+  }
+  instances.push_back(CreateInstance<float>(kMSI_Float32, {2, 2}, {0, 1, 2, 3}));
+  auto results = CallBatch("resize_cpp(4,4)", instances);
+  ASSERT_EQ(results.size(), instances.size());
+  for (int i = 0; i < 20; i++) {
+    ASSERT_TRUE(results[i].error_msg == SUCCESS);
+    ASSERT_EQ(results[i].data[0]->shape(), std::vector<int64_t>({4, 4, 1}));
+    auto data = GetData<uint8_t>(results[i].data[0]);
+    ASSERT_EQ(data[0], 0);
+    ASSERT_EQ(data[3], 100);
+    ASSERT_EQ(data[15], i);
+  }
+  ASSERT_TRUE(results[20].error_msg == SUCCESS);
+  ASSERT_EQ(results[20].data[0]->shape(), std::vector<int64_t>({4, 4}));
+  auto data = GetData<float>(results[20].data[0]);
+  // half pixel centers: the second column is 0.25 of the distance between the first and second source pixels
+  ASSERT_FLOAT_EQ(data[1], 0.25);
+  ASSERT_FLOAT_EQ(data[15], 3);
+}
+
+TEST_F(TestImageProcessStage, test_crop_normalize_hwc2chw_success) {
+  std::vector<uint8_t> image;
+  for (uint8_t i = 0; i < 4 * 4 * 2; i++) {
+    image.push_back(i);
+  }
+  auto results = CallBatch("center_crop_cpp(2,2)", {CreateInstance<uint8_t>(kMSI_Uint8, {4, 4, 2}, image)});
+  ASSERT_EQ(results.size(), 1);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2, 2, 2}));
+  ASSERT_EQ(GetData<uint8_t>(results[0].data[0]), std::vector<uint8_t>({10, 11, 12, 13, 18, 19, 20, 21}));
+
+  auto instance = std::make_shared<Instance>();
+  instance->data = results[0].data;
+  results = CallBatch("normalize_cpp(10, 11, 2, 4)", {instance});
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->data_type(), kMSI_Float32);
+  ASSERT_EQ(GetData<float>(results[0].data[0]), std::vector<float>({0, 0, 1, 0.5, 4, 2, 5, 2.5}));
+
+  instance->data = results[0].data;
+  results = CallBatch("hwc2chw_cpp", {instance});
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2, 2, 2}));
+  ASSERT_EQ(GetData<float>(results[0].data[0]), std::vector<float>({0, 1, 4, 5, 0, 0.5, 2, 2.5}));
+
+  results = CallBatch("crop_cpp(3,3,2,2)", {CreateInstance<uint8_t>(kMSI_Uint8, {4, 4, 2}, image)});
+  ASSERT_FALSE(results[0].error_msg == SUCCESS);
+  ExpectContainMsg(results[0].error_msg.StatusMessage(), "crop region is out of the image");
+}
+
+TEST_F(TestImageProcessStage, test_cast_success) {
+  auto results = CallBatch("cast_cpp(int32)", {CreateInstance<float>(kMSI_Float32, {3}, {1.5, -2.5, 3}),
+                                               CreateInstance<uint8_t>(kMSI_Uint8, {2}, {255, 1})});
+  ASSERT_EQ(results.size(), 2);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->data_type(), kMSI_Int32);
+  ASSERT_EQ(GetData<int32_t>(results[0].data[0]), std::vector<int32_t>({1, -2, 3}));
+  ASSERT_TRUE(results[1].error_msg == SUCCESS);
+  ASSERT_EQ(GetData<int32_t>(results[1].data[0]), std::vector<int32_t>({255, 1}));
+}
+
+TEST_F(TestImageProcessStage, test_decode_png_success) {
+  auto instance = std::make_shared<Instance>();
+  auto tensor = std::make_shared<Tensor>();
+  tensor->set_data_type(kMSI_Bytes);
+  tensor->add_bytes_data(kPngImage, sizeof(kPngImage));
+  instance->data.push_back(tensor);
+  auto results = CallBatch("decode_image_cpp", {instance});
+  ASSERT_EQ(results.size(), 1);
+  if (results[0].error_msg.StatusMessage().find("dlopen") != std::string::npos) {
+    return;  // libpng16 is not installed
+  }
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->data_type(), kMSI_Uint8);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2, 3, 3}));
+  auto data = GetData<uint8_t>(results[0].data[0]);
+  for (size_t i = 0; i < data.size(); i++) {
+    ASSERT_EQ(data[i], (i + 1) * 10);
+  }
+}
+
+TEST_F(TestImageProcessStage, test_decode_image_over_max_pixels_failed) {
+  auto instance = std::make_shared<Instance>();
+  auto tensor = std::make_shared<Tensor>();
+  tensor->set_data_type(kMSI_Bytes);
+  tensor->add_bytes_data(kPngImage, sizeof(kPngImage));
+  instance->data.push_back(tensor);
+  auto results = CallBatch("decode_image_cpp(5)", {instance});
+  ASSERT_EQ(results.size(), 1);
+  if (results[0].error_msg.StatusMessage().find("dlopen") != std::string::npos) {
+    return;  // libpng16 is not installed
+  }
+  ASSERT_FALSE(results[0].error_msg == SUCCESS);
+  ExpectContainMsg(results[0].error_msg.StatusMessage(), "has more pixels than the limit 5");
+  results = CallBatch("decode_image_cpp(6)", {instance});
+  ASSERT_EQ(results.size(), 1);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2, 3, 3}));
+}
+
+TEST_F(TestImageProcessStage, test_decode_invalid_image_failed) {
+  auto instance = std::make_shared<Instance>();
+  auto tensor = std::make_shared<Tensor>();
+  tensor->set_data_type(kMSI_Bytes);
+  tensor->add_bytes_data(reinterpret_cast<const uint8_t *>("GIF89a"), 6);
+  instance->data.push_back(tensor);
+  auto results = CallBatch("decode_image_cpp", {instance});
+  ASSERT_EQ(results.size(), 1);
+  ASSERT_FALSE(results[0].error_msg == SUCCESS);
+  ExpectContainMsg(results[0].error_msg.StatusMessage(), "Unsupported image format");
+}
+}  // namespace serving
+}  // namespace mindspore
@@ -0,0 +1,205 @@
+/**
+ * Copyright 2023 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include <map>
+#include <memory>
+#include "common/common_test.h"
+#include "master/load_balance.h"
+
+namespace mindspore {
+namespace serving {
+class TestLoadBalance : public UT::Common {
+ public:
+  TestLoadBalance() = default;
+
+  // send count requests of one instance, which are not finished
+  static void SendRequests(WorkerLoadInfo *info, uint64_t count) {
+    for (uint64_t i = 0; i < count; i++) {
+      info->OnSend(1);
+    }
+  }
+
+  // send and finish count requests of one instance with the latency
+  static void FinishRequests(WorkerLoadInfo *info, uint64_t count, uint64_t latency_us) {
+    for (uint64_t i = 0; i < count; i++) {
+      info->OnSend(1);
+      info->OnFinish(1, latency_us);
+    }
+  }
+};
+
+TEST_F(TestLoadBalance, test_worker_load_init_window_success) {
+  WorkerLoadInfo info(3);
+  EXPECT_EQ(info.Window(), 3);
+  SendRequests(&info, 2);
+  EXPECT_TRUE(info.HasFreeSlot());
+  SendRequests(&info, 1);
+  EXPECT_FALSE(info.HasFreeSlot());
+  EXPECT_EQ(info.OutstandingRequests(), 3);
+  EXPECT_EQ(info.OutstandingInstances(), 3);
+
+  WorkerLoadInfo info_zero(0);
+  EXPECT_EQ(info_zero.Window(), 1);
+  EXPECT_TRUE(info_zero.HasFreeSlot());
+}
+
+TEST_F(TestLoadBalance, test_worker_load_finish_success) {
+  WorkerLoadInfo info(3);
+  info.OnSend(4);
+  info.OnSend(2);
+  info.OnFinish(4, 100);
+  EXPECT_EQ(info.OutstandingRequests(), 1);
+  EXPECT_EQ(info.OutstandingInstances(), 2);
+  EXPECT_EQ(info.EwmaLatencyUs(), 100);
+  // the first latency sample does not change the window
+  EXPECT_EQ(info.Window(), 3);
+  // no underflow when the worker has been reset
+  info.OnFinish(4, 100);
+  info.OnFinish(4, 100);
+  EXPECT_EQ(info.OutstandingRequests(), 0);
+  EXPECT_EQ(info.OutstandingInstances(), 0);
+}
+
+TEST_F(TestLoadBalance, test_worker_load_window_grow_success) {
+  WorkerLoadInfo info(3);
+  FinishRequests(&info, 1, 100);
+  // the latency stays at the min latency, one more request in flight is probed every time
+  FinishRequests(&info, 1, 100);
+  EXPECT_EQ(info.Window(), 4);
+  FinishRequests(&info, 2, 100);
+  EXPECT_EQ(info.Window(), 6);
+  // the window is limited to 4 times the initial window
+  FinishRequests(&info, 100, 100);
+  EXPECT_EQ(info.Window(), 12);
+  SendRequests(&info, 11);
+  EXPECT_TRUE(info.HasFreeSlot());
+  SendRequests(&info, 1);
+  EXPECT_FALSE(info.HasFreeSlot());
+}
+
+TEST_F(TestLoadBalance, test_worker_load_window_shrink_success) {
+  WorkerLoadInfo info(3);
+  FinishRequests(&info, 1, 100);
+  // requests queue up in the worker and the latency grows 10 times
+  FinishRequests(&info, 1, 1000);
+  EXPECT_GT(info.EwmaLatencyUs(), 100);
+  EXPECT_LT(info.Window(), 3);
+  FinishRequests(&info, 100, 1000);
+  // the gradient is limited to 0.5, window = window * 0.5 + 1 converges to 2
+  EXPECT_NEAR(info.Window(), 2, 0.01);
+  EXPECT_GE(info.Window(), 1);
+  SendRequests(&info, 1);
+  EXPECT_TRUE(info.HasFreeSlot());
+  SendRequests(&info, 1);
+  EXPECT_FALSE(info.HasFreeSlot());
+}
+
+TEST_F(TestLoadBalance, test_least_outstanding_policy_success) {
+  std::map<uint64_t, WorkerLoadInfo> workers;
+  workers.emplace(1, WorkerLoadInfo(3));
+  workers.emplace(2, WorkerLoadInfo(3));
+  workers.emplace(3, WorkerLoadInfo(3));
+  workers.at(1).OnSend(4);
+  workers.at(2).OnSend(1);
+  workers.at(3).OnSend(2);
+  LeastOutstandingPolicy policy;
+  EXPECT_EQ(policy.SelectWorker(workers), 2);
+  // the worker without free slot is skipped
+  SendRequests(&workers.at(2), 2);
+  EXPECT_EQ(policy.SelectWorker(workers), 3);
+}
+
+TEST_F(TestLoadBalance, test_least_outstanding_policy_tie_round_robin_success) {
+  std::map<uint64_t, WorkerLoadInfo> workers;
+  workers.emplace(1, WorkerLoadInfo(3));
+  workers.emplace(2, WorkerLoadInfo(3));
+  workers.emplace(3, WorkerLoadInfo(3));
+  LeastOutstandingPolicy policy;
+  // the workers after the last selected worker are preferred in ties
+  EXPECT_EQ(policy.SelectWorker(workers), 1);
+  EXPECT_EQ(policy.SelectWorker(workers), 2);
+  EXPECT_EQ(policy.SelectWorker(workers), 3);
+  EXPECT_EQ(policy.SelectWorker(workers), 1);
+}
+
+TEST_F(TestLoadBalance, test_load_balance_policy_no_free_slot_success) {
+  std::map<uint64_t, WorkerLoadInfo> workers;
+  workers.emplace(1, WorkerLoadInfo(1));
+  workers.emplace(2, WorkerLoadInfo(1));
+  SendRequests(&workers.at(1), 1);
+  SendRequests(&workers.at(2), 1);
+  LeastOutstandingPolicy least_outstanding;
+  EwmaLatencyPolicy ewma_latency;
+  PowerOfTwoPolicy power_of_two;
+  EXPECT_EQ(least_outstanding.SelectWorker(workers), 0);
+  EXPECT_EQ(ewma_latency.SelectWorker(workers), 0);
+  EXPECT_EQ(power_of_two.SelectWorker(workers), 0);
+  std::map<uint64_t, WorkerLoadInfo> empty_workers;
+  EXPECT_EQ(least_outstanding.SelectWorker(empty_workers), 0);
+  EXPECT_EQ(ewma_latency.SelectWorker(empty_workers), 0);
+  EXPECT_EQ(power_of_two.SelectWorker(empty_workers), 0);
+}
+
+TEST_F(TestLoadBalance, test_ewma_latency_policy_success) {
+  std::map<uint64_t, WorkerLoadInfo> workers;
+  workers.emplace(1, WorkerLoadInfo(8));
+  workers.emplace(2, WorkerLoadInfo(8));
+  workers.emplace(3, WorkerLoadInfo(8));
+  FinishRequests(&workers.at(1), 1, 100);
+  FinishRequests(&workers.at(2), 1, 300);
+  EwmaLatencyPolicy policy;
+  // the worker without latency sample is measured first
+  EXPECT_EQ(policy.SelectWorker(workers), 3);
+  FinishRequests(&workers.at(3), 1, 500);
+  // cost: 100 * 1, 300 * 1, 500 * 1
+  EXPECT_EQ(policy.SelectWorker(workers), 1);
+  // cost: 100 * 4, 300 * 1, 500 * 1
+  SendRequests(&workers.at(1), 3);
+  EXPECT_EQ(policy.SelectWorker(workers), 2);
+}
+
+TEST_F(TestLoadBalance, test_power_of_two_policy_success) {
+  std::map<uint64_t, WorkerLoadInfo> workers;
+  workers.emplace(1, WorkerLoadInfo(3));
+  PowerOfTwoPolicy policy;
+  EXPECT_EQ(policy.SelectWorker(workers), 1);
+  // the two workers are always compared, and the less loaded one is selected
+  workers.emplace(2, WorkerLoadInfo(3));
+  workers.at(1).OnSend(2);
+  for (int i = 0; i < 10; i++) {
+    EXPECT_EQ(policy.SelectWorker(workers), 2);
+  }
+  // the worker without free slot is not a candidate
+  workers.emplace(3, WorkerLoadInfo(1));
+  SendRequests(&workers.at(3), 1);
+  workers.at(2).OnSend(4);
+  for (int i = 0; i < 10; i++) {
+    EXPECT_EQ(policy.SelectWorker(workers), 1);
+  }
+}
+
+TEST_F(TestLoadBalance, test_create_load_balance_policy_success) {
+  auto policy = CreateLoadBalancePolicy(kLoadBalanceLeastOutstanding);
+  EXPECT_NE(std::dynamic_pointer_cast<LeastOutstandingPolicy>(policy), nullptr);
+  policy = CreateLoadBalancePolicy(kLoadBalanceEwmaLatency);
+  EXPECT_NE(std::dynamic_pointer_cast<EwmaLatencyPolicy>(policy), nullptr);
+  policy = CreateLoadBalancePolicy(kLoadBalancePowerOfTwo);
+  EXPECT_NE(std::dynamic_pointer_cast<PowerOfTwoPolicy>(policy), nullptr);
+  // unsupported policy falls back to least outstanding
+  policy = CreateLoadBalancePolicy("invalid_policy");
+  EXPECT_NE(std::dynamic_pointer_cast<LeastOutstandingPolicy>(policy), nullptr);
+}
+}  // namespace serving
+}  // namespace mindspore
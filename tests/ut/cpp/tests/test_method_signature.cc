@@ -0,0 +1,70 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+
+#include "tests/ut/cpp/common/test_servable_common.h"
+#include "common/servable.h"
+
+namespace mindspore {
+namespace serving {
+class TestMethodSignature : public UT::Common {
+ public:
+  void SetUp() override { UT::Common::SetUp(); }
+  void TearDown() override { UT::Common::TearDown(); }
+};
+
+TEST_F(TestMethodSignature, test_linear_stages_success) {
+  MethodSignature method;
+  method.method_name = "predict";
+  method.AddStageModel("model1", {{0, 0}, {0, 1}});
+  method.AddStageModel("model2", {{1, 0}, {0, 1}});
+  method.AddStageModel("model3", {{2, 0}, {1, 0}});
+  method.SetReturn({{3, 0}});
+  ASSERT_FALSE(method.parallel_stages);
+  ASSERT_EQ(method.start_stages, std::vector<uint64_t>({1}));
+  ASSERT_EQ(method.stage_map[1].next_stages, std::vector<uint64_t>({2, 3}));
+  ASSERT_EQ(method.stage_map[3].depend_stages, std::vector<uint64_t>({1, 2}));
+  ASSERT_EQ(method.stage_map[4].depend_stages, std::vector<uint64_t>({3}));
+}
+
+TEST_F(TestMethodSignature, test_independent_stages_success) {
+  MethodSignature method;
+  method.method_name = "predict";
+  method.AddStageModel("model1", {{0, 0}, {0, 1}});
+  method.AddStageModel("model2", {{0, 0}, {0, 1}});
+  method.AddStageModel("model3", {{1, 0}, {2, 0}});
+  method.AddStageModel("model4", {{0, 0}});
+  method.SetReturn({{3, 0}, {1, 0}});
+  ASSERT_TRUE(method.parallel_stages);
+  ASSERT_EQ(method.start_stages, std::vector<uint64_t>({1, 2, 4}));
+  ASSERT_EQ(method.stage_map[1].next_stages, std::vector<uint64_t>({3, 5}));
+  ASSERT_EQ(method.stage_map[2].next_stages, std::vector<uint64_t>({3}));
+  // the outputs of stage 4 are not used, the return stage waits for it
+  ASSERT_EQ(method.stage_map[4].next_stages, std::vector<uint64_t>({5}));
+  ASSERT_EQ(method.stage_map[5].depend_stages, std::vector<uint64_t>({1, 3, 4}));
+  ASSERT_EQ(method.GetStageMax(), 5);
+}
+
+TEST_F(TestMethodSignature, test_return_method_inputs_success) {
+  MethodSignature method;
+  method.method_name = "predict";
+  method.SetReturn({{0, 0}});
+  ASSERT_FALSE(method.parallel_stages);
+  ASSERT_TRUE(method.start_stages.empty());
+  ASSERT_TRUE(method.stage_map[1].depend_stages.empty());
+}
+}  // namespace serving
+}  // namespace mindspore
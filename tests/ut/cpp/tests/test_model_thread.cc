@@ -42,18 +42,25 @@ class MS_API TestNotify : public BaseNotifyWorker {
                        const PredictOnFinish &on_finish) override;
 
   proto::PredictReply reply_;
+  uint64_t deadline_us_ = 0;
+  uint64_t timeout_us_ = 0;
 };
 
 Status TestNotify::DispatchAsync(const proto::PredictRequest &request, proto::PredictReply *reply,
                                  const PredictOnFinish &on_finish) {
+  deadline_us_ = request.deadline_us();
+  timeout_us_ = request.timeout_us();
   *reply = reply_;
   on_finish();
   return SUCCESS;
 }
 
-std::shared_ptr<WorkerContext> InitWorkerContext(proto::PredictReply *reply = nullptr) {
+std::shared_ptr<WorkerContext> InitWorkerContext(proto::PredictReply *reply = nullptr,
+                                                 std::shared_ptr<TestNotify> notify = nullptr) {
   std::shared_ptr<WorkerContext> worker_context = std::make_shared<WorkerContext>();
-  std::shared_ptr<BaseNotifyWorker> notify = std::make_shared<TestNotify>(reply);
+  if (notify == nullptr) {
+    notify = std::make_shared<TestNotify>(reply);
+  }
   WorkerRegSpec spec;
   spec.worker_pid = 1;
   spec.servable_spec.servable_name = "test_servable";
@@ -169,5 +176,40 @@ TEST_F(TestModelThead, Commit) {
   status = thread.DelWorker(pid);
   ASSERT_EQ(status.StatusCode(), SUCCESS);
 }
+
+TEST_F(TestModelThead, DispatchRemainingTimeOfDeadline) {
+  ServableMethodInfo method_info;
+  method_info.name = "add_cast";
+  ModelThread thread("test_servable", "add_cast", 0, 1, method_info);
+  uint64_t pid = 1;
+  proto::PredictReply worker_reply;
+  worker_reply.add_instances();
+  auto notify = std::make_shared<TestNotify>(&worker_reply);
+  std::shared_ptr<WorkerContext> worker_context = InitWorkerContext(nullptr, notify);
+  Status status = thread.AddWorker(pid, worker_context);
+  ASSERT_EQ(status.StatusCode(), SUCCESS);
+  proto::PredictRequest request;
+  request.mutable_servable_spec()->set_name("test_servable");
+  request.mutable_servable_spec()->set_version_number(0);
+  request.mutable_servable_spec()->set_method_name("add_cast");
+  request.add_instances();
+  constexpr uint64_t timeout_us = 10000000;
+  request.set_deadline_us(common::GetCurrentTimeUs() + timeout_us);
+  proto::PredictReply reply;
+  PredictOnFinish callback = []() {};
+  status = thread.DispatchAsync(request, &reply, callback);
+  ASSERT_EQ(status.StatusCode(), SUCCESS);
+  // the worker gets the remaining time rather than the deadline in the clock of master
+  ASSERT_EQ(notify->deadline_us_, 0);
+  ASSERT_GT(notify->timeout_us_, 0);
+  ASSERT_LE(notify->timeout_us_, timeout_us);
+  // no deadline
+  request.set_deadline_us(0);
+  status = thread.DispatchAsync(request, &reply, callback);
+  ASSERT_EQ(status.StatusCode(), SUCCESS);
+  ASSERT_EQ(notify->timeout_us_, 0);
+  status = thread.DelWorker(pid);
+  ASSERT_EQ(status.StatusCode(), SUCCESS);
+}
 }  // namespace serving
 }  // namespace mindspore
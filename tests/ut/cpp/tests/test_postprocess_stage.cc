@@ -0,0 +1,251 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+
+#include "tests/ut/cpp/common/test_servable_common.h"
+#include "common/tensor.h"
+#include "worker/stage_function.h"
+#include "worker/register/stage_function_utils.h"
+
+namespace mindspore {
+namespace serving {
+namespace {
+template <class T>
+TensorBasePtr CreateTensor(DataType data_type, const std::vector<int64_t> &shape, const std::vector<T> &data) {
+  return std::make_shared<Tensor>(data_type, shape, data.data(), data.size() * sizeof(T));
+}
+
+template <class T>
+std::vector<T> GetData(const TensorBasePtr &tensor) {
+  auto data = reinterpret_cast<const T *>(tensor->data());
+  return std::vector<T>(data, data + tensor->data_size() / sizeof(T));
+}
+
+// throw exception when the first value of input is negative
+Status CallThrowIfNegative(const InstanceData &input, InstanceData *output) {
+  if (reinterpret_cast<const int32_t *>(input[0]->data())[0] < 0) {
+    throw std::runtime_error("negative input");
+  }
+  output->push_back(input[0]);
+  return SUCCESS;
+}
+
+class ThrowStageFunc : public CppStageFunctionBase {
+ public:
+  Status Call(const std::string &, const InstanceData &input, InstanceData *output) override {
+    return CallThrowIfNegative(input, output);
+  }
+  size_t GetInputsCount(const std::string &) const override { return 1; }
+  size_t GetOutputsCount(const std::string &) const override { return 1; }
+};
+
+class ParallelThrowStageFunc : public ParallelStageFunctionBase {
+ public:
+  ParallelThrowStageFunc() : ParallelStageFunctionBase(1, 1) {}
+
+ protected:
+  Status Prepare(const std::string &, const std::vector<std::string> &, InstanceFunc *func) const override {
+    *func = CallThrowIfNegative;
+    return SUCCESS;
+  }
+};
+
+std::vector<ResultInstance> CallBatch(const std::string &func_name, const std::vector<InstanceData> &inputs) {
+  auto function = CppStageFunctionStorage::Instance().GetFunction(func_name);
+  EXPECT_NE(function, nullptr);
+  std::vector<InstancePtr> instances;
+  for (auto &input : inputs) {
+    auto instance = std::make_shared<Instance>();
+    instance->data = input;
+    instances.push_back(instance);
+  }
+  std::vector<ResultInstance> results;
+  if (function != nullptr) {
+    function->CallBatch(func_name, instances, &results);
+  }
+  return results;
+}
+}  // namespace
+
+class TestPostprocessStage : public UT::Common {
+ public:
+  void SetUp() override { UT::Common::SetUp(); }
+  void TearDown() override { UT::Common::TearDown(); }
+};
+
+TEST_F(TestPostprocessStage, test_invalid_function_arguments_failed) {
+  auto check_invalid = [](const std::string &func_name) {
+    auto function = CppStageFunctionStorage::Instance().GetFunction(func_name);
+    ASSERT_NE(function, nullptr);
+    ASSERT_EQ(function->GetInputsCount(func_name), 0);
+  };
+  check_invalid("softmax_cpp(1)");
+  check_invalid("sigmoid_threshold_cpp(1.5)");
+  check_invalid("topk_cpp(0)");
+  check_invalid("topk_label_cpp(3,cat,dog)");
+  check_invalid("nms_cpp(0.5,0.1)");
+  check_invalid("nms_cpp(0.5,0.1,0)");
+  check_invalid("argmax_cpp(0)");
+  auto function = CppStageFunctionStorage::Instance().GetFunction("nms_cpp(0.5,0.1,10)");
+  ASSERT_EQ(function->GetInputsCount("nms_cpp(0.5,0.1,10)"), 2);
+  ASSERT_EQ(function->GetOutputsCount("nms_cpp(0.5,0.1,10)"), 3);
+}
+
+TEST_F(TestPostprocessStage, test_softmax_sigmoid_success) {
+  auto results = CallBatch("softmax_cpp", {{CreateTensor<float>(kMSI_Float32, {2, 2}, {0, 0, 1000, 1000})},
+                                           {CreateTensor<int32_t>(kMSI_Int32, {3}, {1, 1, 1})}});
+  ASSERT_EQ(results.size(), 2);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(GetData<float>(results[0].data[0]), std::vector<float>({0.5, 0.5, 0.5, 0.5}));
+  ASSERT_TRUE(results[1].error_msg == SUCCESS);
+  for (auto value : GetData<float>(results[1].data[0])) {
+    ASSERT_FLOAT_EQ(value, 1.0 / 3);
+  }
+
+  results = CallBatch("sigmoid_threshold_cpp(0.6)", {{CreateTensor<float>(kMSI_Float32, {3}, {0, 100, -100})}});
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data.size(), 2);
+  auto probs = GetData<float>(results[0].data[0]);
+  ASSERT_FLOAT_EQ(probs[0], 0.5);
+  ASSERT_FLOAT_EQ(probs[1], 1);
+  ASSERT_FLOAT_EQ(probs[2], 0);
+  ASSERT_EQ(GetData<bool>(results[0].data[1]), std::vector<bool>({false, true, false}));
+}
+
+TEST_F(TestPostprocessStage, test_topk_batch_success) {
+  std::vector<InstanceData> inputs;
+  for (int i = 0; i < 20; i++) {
+    inputs.push_back({CreateTensor<float>(kMSI_Float32, {2, 4}, {1, 3, 3, 2, 5, 4, 6, static_cast<float>(i)})});
+  }
+  auto results = CallBatch("topk_cpp(2)", inputs);
+  ASSERT_EQ(results.size(), 20);
+  for (int i = 0; i < 20; i++) {
+    ASSERT_TRUE(results[i].error_msg == SUCCESS);
+    ASSERT_EQ(results[i].data[0]->shape(), std::vector<int64_t>({2, 2}));
+    auto indices = GetData<int64_t>(results[i].data[1]);
+    // the smaller index is the first in ties
+    ASSERT_EQ(indices[0], 1);
+    ASSERT_EQ(indices[1], 2);
+    ASSERT_EQ(indices[2], i > 6 ? 3 : 2);
+    ASSERT_EQ(GetData<float>(results[i].data[0])[2], i > 6 ? i : 6);
+  }
+  results = CallBatch("topk_cpp(5)", {inputs[0]});
+  ASSERT_FALSE(results[0].error_msg == SUCCESS);
+  ExpectContainMsg(results[0].error_msg.StatusMessage(), "is larger than the last dim");
+}
+
+TEST_F(TestPostprocessStage, test_topk_label_success) {
+  auto results = CallBatch("topk_label_cpp(2, cat, dog, bird)",
+                           {{CreateTensor<float>(kMSI_Float32, {1, 3}, {0.2, 0.1, 0.7})},
+                            {CreateTensor<float>(kMSI_Float32, {2}, {0.2, 0.8})}});
+  ASSERT_EQ(results.size(), 2);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  auto &labels = results[0].data[0];
+  ASSERT_EQ(labels->data_type(), kMSI_String);
+  ASSERT_EQ(labels->bytes_data_size(), 2);
+  const uint8_t *data = nullptr;
+  size_t data_size = 0;
+  labels->get_bytes_data(0, &data, &data_size);
+  ASSERT_EQ(std::string(reinterpret_cast<const char *>(data), data_size), "bird");
+  labels->get_bytes_data(1, &data, &data_size);
+  ASSERT_EQ(std::string(reinterpret_cast<const char *>(data), data_size), "cat");
+  ASSERT_EQ(GetData<float>(results[0].data[1]), std::vector<float>({0.7f, 0.2f}));
+  ASSERT_FALSE(results[1].error_msg == SUCCESS);
+  ExpectContainMsg(results[1].error_msg.StatusMessage(), "input should be the scores of 3 labels");
+}
+
+TEST_F(TestPostprocessStage, test_nms_success) {
+  std::vector<float> boxes = {0, 0, 10, 10, 1, 1, 11, 11, 20, 20, 30, 30, 30, 30, 20, 20, 50, 50, 60, 60};
+  std::vector<float> scores = {0.8, 0.9, 0.7, 0.6, 0.05};
+  auto results = CallBatch("nms_cpp(0.5, 0.1, 10)", {{CreateTensor<float>(kMSI_Float32, {5, 4}, boxes),
+                                                      CreateTensor<float>(kMSI_Float32, {5}, scores)}});
+  ASSERT_EQ(results.size(), 1);
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data.size(), 3);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2, 4}));
+  ASSERT_EQ(GetData<float>(results[0].data[0]), std::vector<float>({1, 1, 11, 11, 20, 20, 30, 30}));
+  ASSERT_EQ(GetData<float>(results[0].data[1]), std::vector<float>({0.9f, 0.7f}));
+  ASSERT_EQ(GetData<int64_t>(results[0].data[2]), std::vector<int64_t>({1, 2}));
+
+  results = CallBatch("nms_cpp(0.5, 0.1, 1)", {{CreateTensor<float>(kMSI_Float32, {5, 4}, boxes),
+                                                CreateTensor<float>(kMSI_Float32, {4}, {0, 0, 0, 0})}});
+  ASSERT_FALSE(results[0].error_msg == SUCCESS);
+  ExpectContainMsg(results[0].error_msg.StatusMessage(), "inputs should be boxes in shape [N, 4]");
+}
+
+TEST_F(TestPostprocessStage, test_argmax_last_axis_success) {
+  auto results = CallBatch("argmax_cpp(-1)", {{CreateTensor<int32_t>(kMSI_Int32, {2, 3}, {1, 5, 2, 7, 0, 7})}});
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_EQ(results[0].data[0]->shape(), std::vector<int64_t>({2}));
+  ASSERT_EQ(GetData<int64_t>(results[0].data[0]), std::vector<int64_t>({1, 0}));
+  results = CallBatch("argmax_cpp", {{CreateTensor<int32_t>(kMSI_Int32, {2, 3}, {1, 5, 2, 7, 0, 7})}});
+  ASSERT_TRUE(results[0].error_msg == SUCCESS);
+  ASSERT_TRUE(results[0].data[0]->shape().empty());
+  ASSERT_EQ(GetData<int64_t>(results[0].data[0]), std::vector<int64_t>({3}));
+}
+
+TEST_F(TestPostprocessStage, test_argmax_batch_mixed_instances_success) {
+  auto string_tensor = std::make_shared<Tensor>();
+  string_tensor->set_data_type(kMSI_String);
+  std::string text = "text";
+  string_tensor->add_bytes_data(reinterpret_cast<const uint8_t *>(text.data()), text.size());
+  auto float_tensor = CreateTensor<float>(kMSI_Float32, {3}, {1, 3, 2});
+  auto results = CallBatch("argmax_cpp", {{float_tensor},
+                                          {CreateTensor<int32_t>(kMSI_Int32, {2}, {4, 1})},
+                                          {string_tensor},
+                                          {CreateTensor<float>(kMSI_Float32, {2}, {0, 5})},
+                                          {float_tensor, float_tensor},
+                                          {CreateTensor<uint8_t>(kMSI_Uint8, {3}, {0, 0, 9})}});
+  ASSERT_EQ(results.size(), 6);
+  std::vector<int64_t> expects = {1, 0, -1, 1, -1, 2};
+  for (size_t i = 0; i < results.size(); i++) {
+    if (expects[i] < 0) {
+      ASSERT_FALSE(results[i].error_msg == SUCCESS);
+      continue;
+    }
+    ASSERT_TRUE(results[i].error_msg == SUCCESS);
+    ASSERT_EQ(GetData<int64_t>(results[i].data[0]), std::vector<int64_t>({expects[i]}));
+  }
+  ExpectContainMsg(results[2].error_msg.StatusMessage(), "Argmax not support data type");
+  ExpectContainMsg(results[4].error_msg.StatusMessage(), "Argmax requires 1 input");
+}
+
+TEST_F(TestPostprocessStage, test_stage_function_throw_fail_only_instance_success) {
+  CppStageFunctionStorage::Instance().Register("test_throw_cpp", std::make_shared<ThrowStageFunc>());
+  CppStageFunctionStorage::Instance().Register("test_parallel_throw_cpp", std::make_shared<ParallelThrowStageFunc>());
+  std::vector<InstanceData> inputs;
+  for (int32_t i = 0; i < 20; i++) {
+    inputs.push_back({CreateTensor<int32_t>(kMSI_Int32, {1}, {i % 7 == 3 ? -i : i})});
+  }
+  for (auto &func_name : {"test_throw_cpp", "test_parallel_throw_cpp"}) {
+    auto results = CallBatch(func_name, inputs);
+    ASSERT_EQ(results.size(), 20);
+    for (int32_t i = 0; i < 20; i++) {
+      if (i % 7 == 3) {
+        ASSERT_FALSE(results[i].error_msg == SUCCESS);
+        ASSERT_TRUE(results[i].data.empty());
+        ExpectContainMsg(results[i].error_msg.StatusMessage(), "negative input");
+      } else {
+        ASSERT_TRUE(results[i].error_msg == SUCCESS);
+        ASSERT_EQ(GetData<int32_t>(results[i].data[0]), std::vector<int32_t>({i}));
+      }
+    }
+  }
+  CppStageFunctionStorage::Instance().Unregister("test_throw_cpp");
+  CppStageFunctionStorage::Instance().Unregister("test_parallel_throw_cpp");
+}
+}  // namespace serving
+}  // namespace mindspore
@@ -15,6 +15,8 @@
  */
 
 #include "tests/ut/cpp/common/test_servable_common.h"
+#include <atomic>
+#include <thread>
 #include "common/shared_memory.h"
 
 #define private public
@@ -295,5 +297,97 @@ TEST_F(TestSharedMemory, test_alloc_attach_invalid_shared_memory_failed) {
   ASSERT_TRUE(status == SUCCESS);
 }
 
+TEST_F(TestSharedMemory, test_try_release_shared_memory_not_allocated_failed) {
+  SharedMemoryAllocator allocator;
+  std::string memory_key_prefix = "test_memory_key";
+  uint64_t item_size = 64;
+  auto status = allocator.NewMemoryBuffer(memory_key_prefix, item_size, 3);
+  ASSERT_TRUE(status == SUCCESS);
+  SharedMemoryItem shm_item;
+  status = allocator.AllocMemoryItem(memory_key_prefix, &shm_item);
+  ASSERT_TRUE(status == SUCCESS);
+  // invalid offset
+  SharedMemoryItem invalid_item = shm_item;
+  invalid_item.offset = shm_item.offset + 1;
+  ASSERT_FALSE(allocator.TryReleaseMemoryItem(invalid_item));
+  invalid_item.offset = shm_item.bytes_size;
+  ASSERT_FALSE(allocator.TryReleaseMemoryItem(invalid_item));
+  // invalid memory key
+  invalid_item = shm_item;
+  invalid_item.memory_key = "invalid memory key";
+  ASSERT_FALSE(allocator.TryReleaseMemoryItem(invalid_item));
+
+  ASSERT_TRUE(allocator.TryReleaseMemoryItem(shm_item));
+  ASSERT_FALSE(allocator.TryReleaseMemoryItem(shm_item));
+}
+
+TEST_F(TestSharedMemory, test_alloc_release_shared_memory_multi_thread_success) {
+  SharedMemoryAllocator allocator;
+  std::vector<std::string> memory_key_prefixes = {"test_memory_key0", "test_memory_key1"};
+  uint64_t item_size = 64;
+  for (auto &memory_key_prefix : memory_key_prefixes) {
+    auto status = allocator.NewMemoryBuffer(memory_key_prefix, item_size, 2);
+    ASSERT_TRUE(status == SUCCESS);
+  }
+  constexpr int thread_num = 8;
+  constexpr int alloc_times = 200;
+  std::atomic<int> failed_count{0};
+  std::vector<std::thread> threads;
+  for (int i = 0; i < thread_num; i++) {
+    threads.emplace_back([&allocator, &memory_key_prefixes, &failed_count, i]() {
+      auto &memory_key_prefix = memory_key_prefixes[i % memory_key_prefixes.size()];
+      std::vector<SharedMemoryItem> items;
+      for (int k = 0; k < alloc_times; k++) {
+        SharedMemoryItem shm_item;
+        if (allocator.AllocMemoryItem(memory_key_prefix, &shm_item) != SUCCESS) {
+          failed_count++;
+          continue;
+        }
+        // the item is owned by this thread only
+        shm_item.offset_address[0] = static_cast<uint8_t>(i);
+        items.push_back(shm_item);
+        if (items.size() > 3) {
+          if (items.front().offset_address[0] != static_cast<uint8_t>(i)) {
+            failed_count++;
+          }
+          allocator.ReleaseMemoryItem(items.front());
+          items.erase(items.begin());
+        }
+      }
+      for (auto &item : items) {
+        allocator.ReleaseMemoryItem(item);
+      }
+    });
+  }
+  for (auto &thread : threads) {
+    thread.join();
+  }
+  ASSERT_EQ(failed_count.load(), 0);
+}
+
+TEST_F(TestSharedMemory, test_shared_memory_pool_size_class_success) {
+  SharedMemoryPool pool("test_memory_pool");
+  SharedMemoryItem small_item;
+  auto status = pool.Alloc(10, &small_item);
+  ASSERT_TRUE(status == SUCCESS);
+  ASSERT_EQ(small_item.size, kShmTransportMinDataSize);
+  SharedMemoryItem large_item;
+  status = pool.Alloc(kShmTransportMinDataSize * 3, &large_item);
+  ASSERT_TRUE(status == SUCCESS);
+  ASSERT_EQ(large_item.size, kShmTransportMinDataSize * 4);
+  ASSERT_NE(small_item.memory_key, large_item.memory_key);
+  // release by memory key and offset from peer process
+  ASSERT_FALSE(pool.Release("invalid memory key", large_item.offset));
+  ASSERT_TRUE(pool.Release(large_item.memory_key, large_item.offset));
+  ASSERT_FALSE(pool.Release(large_item.memory_key, large_item.offset));
+  SharedMemoryItem reused_item;
+  status = pool.Alloc(kShmTransportMinDataSize * 4, &reused_item);
+  ASSERT_TRUE(status == SUCCESS);
+  ASSERT_EQ(reused_item.memory_key, large_item.memory_key);
+  ASSERT_EQ(reused_item.offset, large_item.offset);
+  pool.Release(reused_item);
+  pool.Release(small_item);
+}
+
 }  // namespace serving
 }  // namespace mindspore
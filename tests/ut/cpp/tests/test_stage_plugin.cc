@@ -0,0 +1,168 @@
+/**
+ * Copyright 2020 Huawei Technologies Co., Ltd
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+
+#include "tests/ut/cpp/common/test_servable_common.h"
+#include <cstdio>
+#include <cstring>
+#include "common/tensor.h"
+#include "worker/stage_plugin_loader.h"
+
+namespace mindspore {
+namespace serving {
+namespace {
+// y = x * scale, text + "_reply"
+int32_t PluginScale(const MSServingTensor *inputs, size_t inputs_count, MSServingAllocOutput alloc_output,
+                    void *context, char *error_msg, size_t error_msg_size) {
+  auto &x = inputs[0];
+  auto &scale = inputs[1];
+  auto &text = inputs[2];
+  if (x.data_type != MS_SERVING_DT_FLOAT32 || scale.data_type != MS_SERVING_DT_FLOAT32) {
+    (void)snprintf(error_msg, error_msg_size, "unsupported data type %d", x.data_type);
+    return 1;
+  }
+  auto y = static_cast<float *>(alloc_output(context, 0, MS_SERVING_DT_FLOAT32, x.shape, x.shape_size, x.data_size));
+  if (y == nullptr) {
+    return 1;
+  }
+  auto x_data = static_cast<const float *>(x.data);
+  auto scale_data = static_cast<const float *>(scale.data)[0];
+  for (size_t i = 0; i < x.data_size / sizeof(float); i++) {
+    y[i] = x_data[i] * scale_data;
+  }
+  std::string reply = std::string(static_cast<const char *>(text.data), text.data_size) + "_reply";
+  auto reply_data = alloc_output(context, 1, MS_SERVING_DT_STRING, nullptr, 0, reply.size());
+  if (reply_data == nullptr) {
+    return 1;
+  }
+  (void)memcpy(reply_data, reply.data(), reply.size());
+  return 0;
+}
+
+// the outputs count is 2, but only one output is allocated
+int32_t PluginMissOutput(const MSServingTensor *inputs, size_t, MSServingAllocOutput alloc_output, void *context,
+                         char *, size_t) {
+  return alloc_output(context, 0, inputs[0].data_type, inputs[0].shape, inputs[0].shape_size, inputs[0].data_size) ==
+             nullptr
+           ? 1
+           : 0;
+}
+
+const MSServingStageFunction kPluginFunctions[] = {
+  {"plugin_scale", 3, 2, PluginScale},
+  {"plugin_miss_output", 1, 2, PluginMissOutput},
+};
+
+int32_t GetStageFunctions(uint32_t abi_version, const MSServingStageFunction **functions, size_t *functions_count) {
+  if (abi_version != MS_SERVING_STAGE_PLUGIN_ABI_VERSION) {
+    return 1;
+  }
+  *functions = kPluginFunctions;
+  *functions_count = sizeof(kPluginFunctions) / sizeof(kPluginFunctions[0]);
+  return 0;
+}
+
+InstanceData CreateScaleInputs(const std::vector<float> &x, float scale, const std::string &text) {
+  auto x_tensor = std::make_shared<Tensor>(kMSI_Float32, std::vector<int64_t>{static_cast<int64_t>(x.size())},
+                                           x.data(), x.size() * sizeof(float));
+  auto scale_tensor = std::make_shared<Tensor>(kMSI_Float32, std::vector<int64_t>{}, &scale, sizeof(float));
+  auto text_tensor = std::make_shared<Tensor>();
+  text_tensor->set_data_type(kMSI_String);
+  text_tensor->add_bytes_data(reinterpret_cast<const uint8_t *>(text.data()), text.size());
+  return {x_tensor, scale_tensor, text_tensor};
+}
+}  // namespace
+
+class TestStagePlugin : public UT::Common {
+ public:
+  void SetUp() override { UT::Common::SetUp(); }
+  void TearDown() override {
+    CppStageFunctionStorage::Instance().Unregister("test_plugin.so:plugin_scale");
+    CppStageFunctionStorage::Instance().Unregister("test_plugin.so:plugin_miss_output");
+    UT::Common::TearDown();
+  }
+};
+
+TEST_F(TestStagePlugin, test_plugin_stage_function_call_success) {
+  auto status = StagePluginLoader::Instance().RegisterStageFunction("test_plugin.so:plugin_scale", GetStageFunctions,
+                                                                    "plugin_scale");
+  ASSERT_TRUE(status.IsSuccess());
+  auto function = CppStageFunctionStorage::Instance().GetFunction("test_plugin.so:plugin_scale");
+  ASSERT_NE(function, nullptr);
+  ASSERT_EQ(function->GetInputsCount("test_plugin.so:plugin_scale"), 3);
+  ASSERT_EQ(function->GetOutputsCount("test_plugin.so:plugin_scale"), 2);
+
+  InstanceData outputs;
+  status = function->Call("test_plugin.so:plugin_scale", CreateScaleInputs({1, 2, 3}, 2, "text"), &outputs);
+  ASSERT_TRUE(status.IsSuccess());
+  ASSERT_EQ(outputs.size(), 2);
+  ASSERT_EQ(outputs[0]->data_type(), kMSI_Float32);
+  ASSERT_EQ(outputs[0]->shape(), std::vector<int64_t>({3}));
+  auto y = reinterpret_cast<const float *>(outputs[0]->data());
+  ASSERT_EQ(y[0], 2);
+  ASSERT_EQ(y[1], 4);
+  ASSERT_EQ(y[2], 6);
+  ASSERT_EQ(outputs[1]->data_type(), kMSI_String);
+  ASSERT_EQ(outputs[1]->bytes_data_size(), 1);
+  const uint8_t *text = nullptr;
+  size_t text_len = 0;
+  outputs[1]->get_bytes_data(0, &text, &text_len);
+  ASSERT_EQ(std::string(reinterpret_cast<const char *>(text), text_len), "text_reply");
+}
+
+TEST_F(TestStagePlugin, test_plugin_stage_function_return_failed) {
+  auto status = StagePluginLoader::Instance().RegisterStageFunction("test_plugin.so:plugin_scale", GetStageFunctions,
+                                                                    "plugin_scale");
+  ASSERT_TRUE(status.IsSuccess());
+  auto function = CppStageFunctionStorage::Instance().GetFunction("test_plugin.so:plugin_scale");
+  ASSERT_NE(function, nullptr);
+  auto inputs = CreateScaleInputs({1, 2, 3}, 2, "text");
+  inputs[0]->set_data_type(kMSI_Int32);
+  InstanceData outputs;
+  status = function->Call("test_plugin.so:plugin_scale", inputs, &outputs);
+  EXPECT_FALSE(status.IsSuccess());
+  ExpectContainMsg(status.StatusMessage(), "unsupported data type 4");
+}
+
+TEST_F(TestStagePlugin, test_plugin_stage_function_output_not_allocated_failed) {
+  auto status = StagePluginLoader::Instance().RegisterStageFunction("test_plugin.so:plugin_miss_output",
+                                                                    GetStageFunctions, "plugin_miss_output");
+  ASSERT_TRUE(status.IsSuccess());
+  auto function = CppStageFunctionStorage::Instance().GetFunction("test_plugin.so:plugin_miss_output");
+  ASSERT_NE(function, nullptr);
+  std::vector<float> x = {1, 2};
+  InstanceData inputs = {std::make_shared<Tensor>(kMSI_Float32, std::vector<int64_t>{2}, x.data(), 8)};
+  InstanceData outputs;
+  status = function->Call("test_plugin.so:plugin_miss_output", inputs, &outputs);
+  EXPECT_FALSE(status.IsSuccess());
+  ExpectContainMsg(status.StatusMessage(), "output 1 is not allocated");
+}
+
+TEST_F(TestStagePlugin, test_plugin_stage_function_not_found_failed) {
+  auto status = StagePluginLoader::Instance().RegisterStageFunction("test_plugin.so:plugin_not_exist",
+                                                                    GetStageFunctions, "plugin_not_exist");
+  EXPECT_FALSE(status.IsSuccess());
+  ASSERT_EQ(CppStageFunctionStorage::Instance().GetFunction("test_plugin.so:plugin_not_exist"), nullptr);
+}
+
+TEST_F(TestStagePlugin, test_plugin_stage_function_lib_not_exist_failed) {
+  auto status = StagePluginLoader::Instance().LoadStageFunction("not_exist_plugin.so:plugin_scale",
+                                                                "not_exist_plugin.so", "plugin_scale");
+  EXPECT_FALSE(status.IsSuccess());
+  ExpectContainMsg(status.StatusMessage(), "dlopen stage function plugin failed");
+}
+}  // namespace serving
+}  // namespace mindspore
@@ -143,6 +143,7 @@ def serving_test(func):
         finally:
             logger.info("Serving test begin to clear")
             server.master.context.set_max_enqueued_requests(10000)
+            server.master.context.set_load_balance_policy("least_outstanding")
             server.stop()
             global client_create_list
             for client in client_create_list:
@@ -338,7 +339,8 @@ def float_plus_1(float_val):
 
 
 def start_serving_server(servable_content, model_file="tensor_add.mindir", version_number=1, start_version_number=None,
-                         device_ids=0, num_parallel_workers=0, device_type=None):
+                         device_ids=0, num_parallel_workers=0, device_type=None, num_stage_processes=0,
+                         num_cpp_stage_threads=0):
     base = ServingTestBase()
     base.init_servable_with_servable_config(version_number, servable_content, model_file=model_file)
     if start_version_number is None:
@@ -346,6 +348,8 @@ def start_serving_server(servable_content, model_file="tensor_add.mindir", versi
     server.start_servables(server.ServableStartConfig(base.servable_dir, base.servable_name, device_ids=device_ids,
                                                       version_number=start_version_number,
                                                       num_parallel_workers=num_parallel_workers,
-                                                      device_type=device_type))
+                                                      device_type=device_type,
+                                                      num_stage_processes=num_stage_processes,
+                                                      num_cpp_stage_threads=num_cpp_stage_threads))
     server.start_grpc_server("0.0.0.0:5500")
     return base
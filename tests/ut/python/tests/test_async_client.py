@@ -0,0 +1,116 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test asyncio client"""
+
+import asyncio
+import numpy as np
+from common import serving_test, start_serving_server
+from mindspore_serving.client import AsyncClient
+
+
+@serving_test
+def test_async_client_concurrent_infer_success():
+    """
+    Feature: Asyncio client
+    Description: Many concurrent requests are awaited in one event loop, and the requests in flight are bounded by
+        max_concurrency
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+
+    async def run():
+        async with AsyncClient("localhost:5500", base.servable_name, "predict", max_concurrency=8) as client:
+            instances = []
+            for i in range(64):
+                x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * (i + 1)
+                x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * (i + 1)
+                instances.append({"x1": x1, "x2": x2})
+            results = await asyncio.gather(*[client.infer(instance) for instance in instances])
+            return instances, results
+
+    instances, results = asyncio.run(run())
+    assert len(results) == 64
+    for instance, result in zip(instances, results):
+        assert (result[0]["y"] == instance["x1"] + instance["x2"]).all()
+
+
+@serving_test
+def test_async_client_cancel_infer_success():
+    """
+    Feature: Asyncio client
+    Description: The coroutine awaiting a slow request is cancelled, and the following request is not affected
+    Expectation: The cancelled coroutine raises CancelledError, and the next request succeeds.
+    """
+    servable_content = r"""
+import time
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def slow_preprocess(x1, delay):
+    time.sleep(delay)
+    return x1
+
+@register.register_method(output_names="y")
+def predict(x1, x2, delay):
+    x1 = register.add_stage(slow_preprocess, x1, delay, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32)
+    x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32)
+
+    async def run():
+        async with AsyncClient("localhost:5500", base.servable_name, "predict", max_concurrency=1) as client:
+            task = asyncio.ensure_future(client.infer({"x1": x1, "x2": x2, "delay": 2.0}))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            cancelled = False
+            try:
+                await task
+            except asyncio.CancelledError:
+                cancelled = True
+            # the slot of the cancelled request is released
+            result = await asyncio.wait_for(client.infer({"x1": x1, "x2": x2, "delay": 0.0}), 10)
+            return cancelled, result
+
+    cancelled, result = asyncio.run(run())
+    assert cancelled
+    assert (result[0]["y"] == x1 + x2).all()
+
+
+@serving_test
+def test_async_client_invalid_max_concurrency_failed():
+    """
+    Feature: Asyncio client
+    Description: The max_concurrency of AsyncClient is invalid
+    Expectation: Raise RuntimeError.
+    """
+    try:
+        AsyncClient("localhost:5500", "add", "add_common", max_concurrency=0)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'max_concurrency' should be >= 1" in str(e)
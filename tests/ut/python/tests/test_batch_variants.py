@@ -0,0 +1,151 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test declare model with batch variant files"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+
+@serving_test
+def test_batch_variants_smallest_variant_success():
+    """
+    Feature: Model batch variants
+    Description: The model has batch size 2, and the variant tensor_sub_batch1.mindir with batch size 1 computes
+        x1-x2 so that the chosen variant can be told from the result
+    Expectation: One instance is run by the variant with batch size 1, and two instances by the model with batch
+        size 2.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR",
+                               batch_variant_files="tensor_sub_batch1.mindir")
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content, model_file=["tensor_add.mindir", "tensor_sub_batch1.mindir"])
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    x1 = np.array([1.1, 2.2], np.float32)
+    x2 = np.array([5.5, 6.6], np.float32)
+    result = client.infer({"x1": x1, "x2": x2})
+    assert (result[0]["y"] == x1 - x2).all()
+
+    result = client.infer([{"x1": x1, "x2": x2}, {"x1": x1 * 2, "x2": x2 * 2}])
+    assert (result[0]["y"] == x1 + x2).all()
+    assert (result[1]["y"] == x1 * 2 + x2 * 2).all()
+
+
+@serving_test
+def test_batch_variants_files_count_not_match_failed():
+    """
+    Feature: Model batch variants
+    Description: The files count of batch variant is not equal to the model files count
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file=["tensor_add.mindir", "tensor_sub.mindir"], model_format="MindIR",
+                               batch_variant_files=["tensor_add_bs1.mindir"])
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content, model_file=["tensor_add.mindir", "tensor_sub.mindir",
+                                                           "tensor_add_bs1.mindir"])
+        assert False
+    except RuntimeError as e:
+        assert "of files of batch variant ('tensor_add_bs1.mindir',) should be equal to the number 2" in str(e)
+
+
+@serving_test
+def test_batch_variants_without_batch_dim_failed():
+    """
+    Feature: Model batch variants
+    Description: Declare batch variant files when with_batch_dim is False
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False,
+                               batch_variant_files="tensor_add_bs1.mindir")
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content, model_file=["tensor_add.mindir", "tensor_add_bs1.mindir"])
+        assert False
+    except RuntimeError as e:
+        assert "batch_variant_files can only be set when with_batch_dim is true" in str(e)
+
+
+@serving_test
+def test_batch_variants_file_repeated_failed():
+    """
+    Feature: Model batch variants
+    Description: The batch variant file has been used as model file
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR",
+                               batch_variant_files="tensor_add.mindir")
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content)
+        assert False
+    except RuntimeError as e:
+        assert "batch variant file 'tensor_add.mindir' has already been used" in str(e)
+
+
+@serving_test
+def test_batch_variants_batch_size_repeated_failed():
+    """
+    Feature: Model batch variants
+    Description: The batch size of batch variant is equal to the batch size of model
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR",
+                               batch_variant_files="tensor_add_bs1.mindir")
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content, model_file=["tensor_add.mindir", "tensor_add_bs1.mindir"])
+        assert False
+    except RuntimeError as e:
+        assert "The batch size 2 of model variants is invalid or repeated" in str(e)
@@ -0,0 +1,153 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test client merging concurrent calls into one request"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from common import serving_test, start_serving_server
+from mindspore_serving.client import BatchingClient
+
+servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def check_input(x1):
+    if x1[0][0] < 0:
+        raise RuntimeError("negative input")
+    return x1
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    x1 = register.add_stage(check_input, x1, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+"""
+
+
+def create_instance(index):
+    x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * index
+    x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * index
+    return {"x1": x1, "x2": x2}, x1 + x2
+
+
+@serving_test
+def test_batching_client_concurrent_infer_success():
+    """
+    Feature: Client micro-batching
+    Description: Concurrent calls with one or more instances from different threads are merged into requests
+    Expectation: Every call gets the results of its own instances in order.
+    """
+    base = start_serving_server(servable_content)
+    client = BatchingClient("localhost:5500", base.servable_name, "predict", max_batch_size=8, max_delay_ms=5)
+
+    def call(index):
+        if index % 3 == 0:
+            instance0, y0 = create_instance(index + 1)
+            instance1, y1 = create_instance(index + 2)
+            return client.infer([instance0, instance1]), [y0, y1]
+        instance, y = create_instance(index + 1)
+        return client.infer(instance), [y]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(call, range(100)))
+    client.close()
+    for result, ys in results:
+        assert len(result) == len(ys)
+        for result_item, y in zip(result, ys):
+            assert (result_item["y"] == y).all()
+
+
+@serving_test
+def test_batching_client_instance_error_isolated_success():
+    """
+    Feature: Client micro-batching
+    Description: The instance of one call fails in the python stage, and the calls merged with it are not affected
+    Expectation: The failed call gets the error and the other calls get their results.
+    """
+    base = start_serving_server(servable_content)
+    client = BatchingClient("localhost:5500", base.servable_name, "predict", max_batch_size=8, max_delay_ms=50)
+    instance, y = create_instance(1)
+    bad_instance, _ = create_instance(-1)
+    futures = [client.infer_async(instance), client.infer_async(bad_instance), client.infer_async(instance)]
+    results = [future.result() for future in futures]
+    client.close()
+    assert (results[0][0]["y"] == y).all()
+    assert "negative input" in results[1][0]["error"]
+    assert (results[2][0]["y"] == y).all()
+
+
+@serving_test
+def test_batching_client_closed_failed():
+    """
+    Feature: Client micro-batching
+    Description: Call infer after the client is closed
+    Expectation: Raise RuntimeError.
+    """
+    client = BatchingClient("localhost:5500", "add", "add_common")
+    client.close()
+    instance, _ = create_instance(1)
+    try:
+        client.infer(instance)
+        assert False
+    except RuntimeError as e:
+        assert "The BatchingClient has been closed" in str(e)
+
+
+@serving_test
+def test_batching_client_invalid_instance_failed():
+    """
+    Feature: Client micro-batching
+    Description: One call has an invalid instance, and the calls pending in the same batch are not affected
+    Expectation: The invalid call raises RuntimeError and the other calls get their results.
+    """
+    base = start_serving_server(servable_content)
+    client = BatchingClient("localhost:5500", base.servable_name, "predict", max_batch_size=8, max_delay_ms=50)
+    instance, y = create_instance(1)
+    future0 = client.infer_async(instance)
+    try:
+        client.infer_async([instance, "invalid instance"])
+        assert False
+    except RuntimeError as e:
+        assert "instance should be a map" in str(e)
+    future1 = client.infer_async(instance)
+    results = [future0.result(), future1.result()]
+    client.close()
+    for result in results:
+        assert len(result) == 1
+        assert (result[0]["y"] == y).all()
+
+
+@serving_test
+def test_batching_client_close_wait_inflight_success():
+    """
+    Feature: Client micro-batching
+    Description: Close the client when the calls are pending or sent but not finished
+    Expectation: The calls get their results, and the client cannot be used after closed.
+    """
+    base = start_serving_server(servable_content)
+    client = BatchingClient("localhost:5500", base.servable_name, "predict", max_batch_size=8, max_delay_ms=50)
+    instance, y = create_instance(1)
+    futures = [client.infer_async(instance) for _ in range(10)]
+    client.close()
+    for future in futures:
+        assert future.done()
+        result = future.result()
+        assert (result[0]["y"] == y).all()
+    try:
+        client.infer(instance)
+        assert False
+    except RuntimeError as e:
+        assert "The BatchingClient has been closed" in str(e)
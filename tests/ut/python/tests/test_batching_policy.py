@@ -0,0 +1,131 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test Model BatchingPolicy"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving.server.register import BatchingPolicy
+
+
+@serving_test
+def test_batching_policy_set_get_success():
+    """
+    Feature: Model batching policy
+    Description: Test set and get batching policy
+    Expectation: the values gotten are equal to the values set.
+    """
+    policy = BatchingPolicy(max_batch_size=2, max_queue_delay_us=1000, preferred_batch_sizes=[1, 2])
+    batching_policy = policy.batching_policy
+    assert batching_policy.max_batch_size == 2
+    assert batching_policy.max_queue_delay_us == 1000
+    assert list(batching_policy.preferred_batch_sizes) == [1, 2]
+
+    policy = BatchingPolicy()
+    batching_policy = policy.batching_policy
+    assert batching_policy.max_batch_size == 0
+    assert batching_policy.max_queue_delay_us == 0
+    assert not batching_policy.preferred_batch_sizes
+
+
+@serving_test
+def test_batching_policy_invalid_option_failed():
+    """
+    Feature: Model batching policy
+    Description: Test set invalid batching policy option
+    Expectation: raise RuntimeError.
+    """
+    try:
+        BatchingPolicy(max_queue_delay=1000)
+        assert False
+    except RuntimeError as e:
+        assert "Set batching policy failed, unsupported option max_queue_delay" in str(e)
+
+    try:
+        BatchingPolicy(max_batch_size=0)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'max_batch_size' should be >= 1" in str(e)
+
+    try:
+        BatchingPolicy(max_queue_delay_us=-1)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'max_queue_delay_us' should be >= 0" in str(e)
+
+
+@serving_test
+def test_batching_policy_serving_server_success():
+    """
+    Feature: Model batching policy
+    Description: Test model declared with max_queue_delay_us, the instances wait in queue to form a batch
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+from mindspore_serving.server.register import BatchingPolicy
+
+policy = BatchingPolicy(max_queue_delay_us=2000, preferred_batch_sizes=2)
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True,
+                               batching_policy=policy)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    # Client
+    instances = []
+    ys = []
+    for i in range(3):
+        x1 = np.array([[3.3, 4.4]], np.float32) * (i + 1)
+        x2 = np.array([[7.7, 8.8]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(x1 + x2)
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    print("result", result)
+    for i in range(3):
+        assert (result[i]["y"] == ys[i]).all()
+
+
+@serving_test
+def test_batching_policy_max_batch_size_invalid_failed():
+    """
+    Feature: Model batching policy
+    Description: Test max_batch_size of batching policy greater than the batch size of model
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+from mindspore_serving.server.register import BatchingPolicy
+
+policy = BatchingPolicy(max_batch_size=3)
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True,
+                               batching_policy=policy)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content)
+        assert False
+    except RuntimeError as e:
+        assert "The max_batch_size 3 of batching policy cannot be greater than the batch size 2 of model" in str(e)
@@ -0,0 +1,123 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test request deadline"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+
+def create_instances(count):
+    instances = []
+    ys = []
+    for i in range(count):
+        x1 = np.array([[1.1, 2.2]], np.float32) * (i + 1)
+        x2 = np.array([[3.3, 4.4]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(x1 + x2)
+    return instances, ys
+
+
+@serving_test
+def test_deadline_expired_instances_dropped():
+    """
+    Feature: Request deadline
+    Description: Every instance takes 0.6s in the python stage against the timeout 1.5s of request, the first two
+        instances reach the model stage before the deadline and the last one after it
+    Expectation: The first two instances succeed and the last instance is dropped with deadline exceeded error.
+    """
+    servable_content = r"""
+import time
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+def slow_preprocess(x1):
+    time.sleep(0.6)
+    return x1
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    x1 = register.add_stage(slow_preprocess, x1, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    instances, ys = create_instances(3)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances, timeout=1.5)
+    print("result", result)
+    assert len(result) == 3
+    assert (result[0]["y"] == ys[0]).all()
+    assert (result[1]["y"] == ys[1]).all()
+    assert "Request deadline exceeded" in result[2]["error"]
+
+
+@serving_test
+def test_deadline_not_expired_success():
+    """
+    Feature: Request deadline
+    Description: The request is processed before its deadline
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    instances, ys = create_instances(3)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer_async(instances, timeout=10).result()
+    print("result", result)
+    for i in range(3):
+        assert (result[i]["y"] == ys[i]).all()
+
+
+@serving_test
+def test_deadline_timeout_invalid_failed():
+    """
+    Feature: Request deadline
+    Description: The timeout of request is not positive or not a number
+    Expectation: raise RuntimeError.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    instances, _ = create_instances(1)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    try:
+        client.infer(instances, timeout=0)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'timeout' should be > 0" in str(e)
+
+    try:
+        client.infer(instances, timeout="1")
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'timeout' should be int or float" in str(e)
@@ -603,6 +603,22 @@ def test_grpc_request_np_float64_2d_array_input_output_success():
     common_test_grpc_request_np_float_type_2d_array_input_output_success(np.float64)
 
 
+@serving_test
+def test_grpc_request_np_non_contiguous_array_input_read_only_output_success():
+    base = start_bool_int_float_grpc_server()
+    # Client, the transposed and sliced arrays are not C-contiguous
+    val = np.arange(24, dtype=np.float32).reshape((4, 6))
+    inputs = [val.T, val[:, ::2]]
+    instances = [{"float_val": item} for item in inputs]
+
+    client = create_client("localhost:5500", base.servable_name, "float_plus_1")
+    result = client.infer(instances)
+    for result_item, item in zip(result, inputs):
+        assert result_item["value"].tolist() == (item + 1).tolist()
+        # the outputs share the bytes of reply without copy
+        assert not result_item["value"].flags.writeable
+
+
 @serving_test
 def test_grpc_request_unix_domain_socket_success():
     base = init_str_servable()
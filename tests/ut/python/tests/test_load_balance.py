@@ -0,0 +1,92 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test master load balance policy"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving import server
+
+servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+"""
+
+
+def check_load_balance_policy(load_balance_policy):
+    server.master.context.set_load_balance_policy(load_balance_policy)
+    base = start_serving_server(servable_content, device_ids=(0, 1))
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    for _ in range(4):
+        instances = []
+        ys = []
+        for i in range(5):
+            x1 = np.array([[1.1, 2.2]], np.float32) * (i + 1)
+            x2 = np.array([[3.3, 4.4]], np.float32) * (i + 1)
+            instances.append({"x1": x1, "x2": x2})
+            ys.append(x1 + x2)
+        result = client.infer(instances)
+        print("result", result)
+        for i in range(5):
+            assert (result[i]["y"] == ys[i]).all()
+
+
+@serving_test
+def test_load_balance_least_outstanding_success():
+    """
+    Feature: Master load balance policy
+    Description: Two workers balanced by least_outstanding policy
+    Expectation: Serving server work well.
+    """
+    check_load_balance_policy("least_outstanding")
+
+
+@serving_test
+def test_load_balance_ewma_latency_success():
+    """
+    Feature: Master load balance policy
+    Description: Two workers balanced by ewma_latency policy
+    Expectation: Serving server work well.
+    """
+    check_load_balance_policy("ewma_latency")
+
+
+@serving_test
+def test_load_balance_power_of_two_success():
+    """
+    Feature: Master load balance policy
+    Description: Two workers balanced by power_of_two policy
+    Expectation: Serving server work well.
+    """
+    check_load_balance_policy("power_of_two")
+
+
+@serving_test
+def test_load_balance_invalid_policy_failed():
+    """
+    Feature: Master load balance policy
+    Description: Set unsupported load balance policy
+    Expectation: raise RuntimeError.
+    """
+    try:
+        server.master.context.set_load_balance_policy("round_robin")
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'load_balance_policy' should be one of" in str(e)
@@ -0,0 +1,78 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test declare model with parallel instances"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+
+@serving_test
+def test_parallel_instances_serving_server_success():
+    """
+    Feature: Model parallel instances
+    Description: Test model declared with parallel_instances=2, predicts run on different model instances
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True,
+                               parallel_instances=2)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    # Client
+    instances = []
+    ys = []
+    for i in range(5):
+        x1 = np.array([[3.3, 4.4]], np.float32) * (i + 1)
+        x2 = np.array([[7.7, 8.8]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(x1 + x2)
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    print("result", result)
+    for i in range(5):
+        assert (result[i]["y"] == ys[i]).all()
+
+
+@serving_test
+def test_parallel_instances_invalid_failed():
+    """
+    Feature: Model parallel instances
+    Description: Test model declared with parallel_instances=0
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True,
+                               parallel_instances=0)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'parallel_instances' should be >= 1" in str(e)
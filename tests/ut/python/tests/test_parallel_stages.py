@@ -0,0 +1,98 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test independent stages of one method run in parallel"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+
+@serving_test
+def test_parallel_stages_two_models_same_inputs_success():
+    """
+    Feature: Parallel stages
+    Description: Two models use the same method inputs, and their outputs are used by the following python stage
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+tensor_add = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+tensor_sub = register.declare_model(model_file="tensor_sub.mindir", model_format="MindIR", with_batch_dim=False)
+
+def mul(y1, y2):
+    return y1 * y2
+
+@register.register_method(output_names=["y", "y1", "y2"])
+def predict(x1, x2):
+    y1 = register.add_stage(tensor_add, x1, x2, outputs_count=1)
+    y2 = register.add_stage(tensor_sub, x1, x2, outputs_count=1)
+    y = register.add_stage(mul, y1, y2, outputs_count=1)
+    return y, y1, y2
+    """
+    base = start_serving_server(servable_content, model_file=["tensor_add.mindir", "tensor_sub.mindir"])
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    for i in range(5):
+        x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * (i + 1)
+        x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+    # the requests are sent repeatedly so that the stages of different requests interleave
+    for _ in range(3):
+        result = client.infer(instances)
+        assert len(result) == 5
+        for i, instance in enumerate(instances):
+            y1 = instance["x1"] + instance["x2"]
+            y2 = instance["x1"] - instance["x2"]
+            assert np.allclose(result[i]["y1"], y1)
+            assert np.allclose(result[i]["y2"], y2)
+            assert np.allclose(result[i]["y"], y1 * y2)
+
+
+@serving_test
+def test_parallel_stages_unused_stage_failed():
+    """
+    Feature: Parallel stages
+    Description: The stage whose outputs are not used raises exception for one instance, and it is run in parallel
+        with the model stage
+    Expectation: Only the instance failed, and the other instances success.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+tensor_add = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def check(x1):
+    if x1[0][0] > 10:
+        raise RuntimeError("x1 is too large")
+    return x1
+
+@register.register_method(output_names=["y"])
+def predict(x1, x2):
+    _ = register.add_stage(check, x1, outputs_count=1)
+    y = register.add_stage(tensor_add, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    for value in (1, 20, 3):
+        x1 = np.ones([2, 2], np.float32) * value
+        x2 = np.ones([2, 2], np.float32)
+        instances.append({"x1": x1, "x2": x2})
+    result = client.infer(instances)
+    assert len(result) == 3
+    assert np.allclose(result[0]["y"], instances[0]["x1"] + 1)
+    assert "x1 is too large" in result[1]["error"]
+    assert np.allclose(result[2]["y"], instances[2]["x1"] + 1)
@@ -0,0 +1,116 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test gRPC Predict API replying the finished instances of one request in partial replies"""
+
+import asyncio
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving.client import AsyncClient
+
+servable_content = r"""
+import time
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def delay_preprocess(x1, delay):
+    if delay < 0:
+        raise RuntimeError("invalid delay")
+    time.sleep(delay)
+    return x1
+
+@register.register_method(output_names="y")
+def predict(x1, x2, delay):
+    x1 = register.add_stage(delay_preprocess, x1, delay, outputs_count=1, num_parallel=2)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+"""
+
+
+def create_instance(index, delay=0.0):
+    x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * (index + 1)
+    x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * (index + 1)
+    return {"x1": x1, "x2": x2, "delay": delay}, x1 + x2
+
+
+@serving_test
+def test_predict_partial_success():
+    """
+    Feature: Partial replies of Predict API
+    Description: The first instance of the request is slow, the results of the other instances are returned before it
+    Expectation: The result of every instance is returned with its index, and the slow instance is the last one.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = [create_instance(0, delay=2.0)[0]] + [create_instance(i)[0] for i in range(1, 4)]
+    ys = [create_instance(i)[1] for i in range(4)]
+    results = list(client.infer_partial(instances))
+    assert sorted(index for index, _ in results) == [0, 1, 2, 3]
+    assert results[-1][0] == 0
+    for index, result in results:
+        assert (result["y"] == ys[index]).all()
+
+
+@serving_test
+def test_predict_partial_instance_error_success():
+    """
+    Feature: Partial replies of Predict API
+    Description: One instance of the request fails in the python stage
+    Expectation: The error is returned for the failed instance, and the results are returned for the others.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = [create_instance(i, delay=-1.0 if i == 1 else 0.0)[0] for i in range(3)]
+    results = dict(client.infer_partial(instances))
+    assert sorted(results.keys()) == [0, 1, 2]
+    assert "invalid delay" in results[1]["error"]
+    assert (results[2]["y"] == create_instance(2)[1]).all()
+
+
+@serving_test
+def test_predict_partial_request_error_failed():
+    """
+    Feature: Partial replies of Predict API
+    Description: The method of the request does not exist
+    Expectation: The error of the request is returned for every instance.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict_not_exist")
+    instances = [create_instance(i)[0] for i in range(3)]
+    results = list(client.infer_partial(instances))
+    assert [index for index, _ in results] == [0, 1, 2]
+    for _, result in results:
+        assert "method is not available" in result["error"]
+
+
+@serving_test
+def test_predict_partial_async_client_success():
+    """
+    Feature: Partial replies of Predict API
+    Description: The results of the instances are iterated by AsyncClient
+    Expectation: Serving server work well.
+    """
+    base = start_serving_server(servable_content)
+    instances = [create_instance(i)[0] for i in range(10)]
+    ys = [create_instance(i)[1] for i in range(10)]
+
+    async def run():
+        async with AsyncClient("localhost:5500", base.servable_name, "predict") as client:
+            return [item async for item in client.infer_partial(instances)]
+
+    results = asyncio.run(run())
+    assert sorted(index for index, _ in results) == list(range(10))
+    for index, result in results:
+        assert (result["y"] == ys[index]).all()
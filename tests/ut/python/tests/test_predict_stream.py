@@ -0,0 +1,154 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test streaming gRPC Predict API"""
+
+import asyncio
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving.client import AsyncClient
+
+servable_content = r"""
+import time
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def delay_preprocess(x1, delay):
+    time.sleep(delay)
+    return x1
+
+@register.register_method(output_names="y")
+def predict(x1, x2, delay):
+    x1 = register.add_stage(delay_preprocess, x1, delay, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+"""
+
+
+def create_instance(index, delay=0.0):
+    x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * (index + 1)
+    x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * (index + 1)
+    return {"x1": x1, "x2": x2, "delay": delay}, x1 + x2
+
+
+@serving_test
+def test_predict_stream_success():
+    """
+    Feature: Streaming Predict API
+    Description: Requests with one or more instances are sent on one stream
+    Expectation: The result of every request is returned with the index of the request.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    requests = []
+    ys = []
+    for i in range(20):
+        instance, y = create_instance(i)
+        if i % 2 == 0:
+            requests.append(instance)
+            ys.append([y])
+        else:
+            instance2, y2 = create_instance(i + 100)
+            requests.append([instance, instance2])
+            ys.append([y, y2])
+    indexes = []
+    for index, result in client.infer_stream(iter(requests)):
+        indexes.append(index)
+        assert len(result) == len(ys[index])
+        for result_item, y in zip(result, ys[index]):
+            assert (result_item["y"] == y).all()
+    assert sorted(indexes) == list(range(20))
+
+
+@serving_test
+def test_predict_stream_result_not_blocked_by_slow_request_success():
+    """
+    Feature: Streaming Predict API
+    Description: The first request on the stream is slow, the results of the following requests are returned before it
+    Expectation: The result of the slow request is the last one.
+    """
+    # the slow instance does not block the python stage of the following instances
+    parallel_servable_content = servable_content.replace("x1, delay, outputs_count=1)",
+                                                         "x1, delay, outputs_count=1, num_parallel=2)")
+    base = start_serving_server(parallel_servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    requests = [create_instance(0, delay=2.0)[0]] + [create_instance(i)[0] for i in range(1, 4)]
+    indexes = [index for index, _ in client.infer_stream(requests)]
+    assert sorted(indexes) == [0, 1, 2, 3]
+    assert indexes[-1] == 0
+
+
+@serving_test
+def test_predict_stream_more_requests_than_inflight_limit_success():
+    """
+    Feature: Streaming Predict API
+    Description: More requests than the limit of inflight requests of one stream are sent, the master stops reading
+        the stream until the replies are written
+    Expectation: The results of all the requests are returned.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    requests = []
+    ys = []
+    for i in range(300):
+        instance, y = create_instance(i)
+        requests.append(instance)
+        ys.append(y)
+    indexes = []
+    for index, result in client.infer_stream(iter(requests)):
+        indexes.append(index)
+        assert (result[0]["y"] == ys[index]).all()
+    assert sorted(indexes) == list(range(300))
+
+
+@serving_test
+def test_predict_stream_async_client_success():
+    """
+    Feature: Streaming Predict API
+    Description: The requests are taken from an async iterable and the results are iterated by AsyncClient
+    Expectation: Serving server work well.
+    """
+    base = start_serving_server(servable_content)
+    ys = [create_instance(i)[1] for i in range(10)]
+
+    async def requests():
+        for i in range(10):
+            await asyncio.sleep(0.01)
+            yield create_instance(i)[0]
+
+    async def run():
+        async with AsyncClient("localhost:5500", base.servable_name, "predict") as client:
+            return [item async for item in client.infer_stream(requests())]
+
+    results = asyncio.run(run())
+    assert sorted(index for index, _ in results) == list(range(10))
+    for index, result in results:
+        assert (result[0]["y"] == ys[index]).all()
+
+
+@serving_test
+def test_predict_stream_invalid_request_failed():
+    """
+    Feature: Streaming Predict API
+    Description: One request taken from the iterable is not a dict
+    Expectation: Raise RuntimeError.
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    try:
+        list(client.infer_stream([create_instance(0)[0], "invalid"]))
+        assert False
+    except RuntimeError as e:
+        assert "instance should be a map" in str(e)
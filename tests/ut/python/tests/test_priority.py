@@ -0,0 +1,221 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test request priority and method weight"""
+
+import os
+import time
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+# The python stage records the tag of every instance it processes, one instance at a time. The stage is blocked by
+# the instance of predict_block, so that the instances of the following requests are scheduled by the stage queue of
+# worker when the block ends.
+order_servable_content = r"""
+import os
+import time
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+record_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "record.txt")
+
+def record_tag(instances):
+    results = []
+    for x1, tag, delay in instances:
+        time.sleep(float(delay))
+        with open(record_file, "a") as fp:
+            fp.write(tag + "\n")
+        results.append([x1])
+    return results
+
+@register.register_method(output_names="y")
+def predict_block(x1, x2, tag, delay):
+    x1 = register.add_stage(record_tag, x1, tag, delay, outputs_count=1, batch_size=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+
+@register.register_method(output_names="y", weight=4)
+def predict_a(x1, x2, tag, delay):
+    x1 = register.add_stage(record_tag, x1, tag, delay, outputs_count=1, batch_size=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+
+@register.register_method(output_names="y", weight=1)
+def predict_b(x1, x2, tag, delay):
+    x1 = register.add_stage(record_tag, x1, tag, delay, outputs_count=1, batch_size=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+"""
+
+
+def create_tag_instance(tag, delay=0.0):
+    x1 = np.array([[1.1, 2.2]], np.float32)
+    x2 = np.array([[3.3, 4.4]], np.float32)
+    return {"x1": x1, "x2": x2, "tag": tag, "delay": delay}
+
+
+def start_block(base):
+    """Block the python stage for 1s, and return the result future of the blocking request"""
+    client = create_client("localhost:5500", base.servable_name, "predict_block")
+    result_future = client.infer_async(create_tag_instance("block", delay=1.0))
+    time.sleep(0.3)
+    return result_future
+
+
+def read_record(base):
+    with open(os.path.join(base.servable_name_path, "record.txt")) as fp:
+        return fp.read().split()
+
+
+def create_instances(count):
+    instances = []
+    ys = []
+    for i in range(count):
+        x1 = np.array([[1.1, 2.2]], np.float32) * (i + 1)
+        x2 = np.array([[3.3, 4.4]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(x1 + x2)
+    return instances, ys
+
+
+@serving_test
+def test_priority_method_weight_success():
+    """
+    Feature: Request priority and weighted fair scheduling
+    Description: Two methods with different weights share the python stage queue, and requests with priority
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+def add_one(x1):
+    return x1 + 1
+
+@register.register_method(output_names="y", weight=4)
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+
+@register.register_method(output_names="y", weight=1)
+def predict_add_one(x1, x2):
+    x1 = register.add_stage(add_one, x1, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    instances, ys = create_instances(3)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances, priority=2)
+    print("result", result)
+    for i in range(3):
+        assert (result[i]["y"] == ys[i]).all()
+
+    client = create_client("localhost:5500", base.servable_name, "predict_add_one")
+    result_future = client.infer_async(instances, priority=1)
+    result = result_future.result()
+    for i in range(3):
+        assert (result[i]["y"] == ys[i] + 1).all()
+
+
+@serving_test
+def test_priority_method_weight_invalid_failed():
+    """
+    Feature: Request priority and weighted fair scheduling
+    Description: The weight of method is 0
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+@register.register_method(output_names="y", weight=0)
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    try:
+        start_serving_server(servable_content)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'weight' should be >= 1" in str(e)
+
+
+@serving_test
+def test_priority_client_priority_invalid_failed():
+    """
+    Feature: Request priority and weighted fair scheduling
+    Description: The priority of request is negative
+    Expectation: raise RuntimeError.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=True)
+
+@register.register_method(output_names="y")
+def predict(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    instances, _ = create_instances(1)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    try:
+        client.infer(instances, priority=-1)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'priority' should be in range [0,4294967295]" in str(e)
+
+
+@serving_test
+def test_priority_higher_priority_dispatched_first_success():
+    """
+    Feature: Request priority and weighted fair scheduling
+    Description: When the python stage is busy, a request with priority 0 is sent before a request with priority 5
+    Expectation: The instance of the request with priority 5 is processed first.
+    """
+    base = start_serving_server(order_servable_content)
+    block_future = start_block(base)
+    client = create_client("localhost:5500", base.servable_name, "predict_a")
+    low_future = client.infer_async(create_tag_instance("low"), priority=0)
+    time.sleep(0.1)
+    high_future = client.infer_async(create_tag_instance("high"), priority=5)
+    for result_future in (block_future, low_future, high_future):
+        assert "error" not in result_future.result()[0]
+    assert read_record(base) == ["block", "high", "low"]
+
+
+@serving_test
+def test_priority_higher_weight_dispatched_more_success():
+    """
+    Feature: Request priority and weighted fair scheduling
+    Description: When the python stage is busy, 6 instances of predict_a with weight 4 and 6 instances of predict_b
+        with weight 1 are queued with the same priority
+    Expectation: predict_a gets 4 times the share of predict_b, at least 5 of the first 6 instances processed are of
+        predict_a, while the equal weight gives 3.
+    """
+    base = start_serving_server(order_servable_content)
+    block_future = start_block(base)
+    client_a = create_client("localhost:5500", base.servable_name, "predict_a")
+    client_b = create_client("localhost:5500", base.servable_name, "predict_b")
+    b_future = client_b.infer_async([create_tag_instance("b") for _ in range(6)])
+    a_future = client_a.infer_async([create_tag_instance("a") for _ in range(6)])
+    for result_future in (block_future, a_future, b_future):
+        assert all("error" not in item for item in result_future.result())
+    record = read_record(base)
+    assert record[0] == "block"
+    assert record[1:7].count("a") >= 5
@@ -0,0 +1,58 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test tensors transported by shared memory between master and workers"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+
+
+@serving_test
+def test_shared_memory_transport_large_tensor_success():
+    """
+    Feature: Shared memory transport
+    Description: The inputs larger than the inline limit are transported by shared memory, and the small tensors and
+        bytes tensors are transported inline in the same request
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def add_scale(x1, x2, scale, text):
+    return x1 + x2 * scale, text + "_reply"
+
+@register.register_method(output_names=["y", "text"])
+def predict(x1, x2, scale, text):
+    y, text = register.add_stage(add_scale, x1, x2, scale, text, outputs_count=2)
+    return y, text
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    ys = []
+    for i in range(4):
+        x1 = np.random.rand(256, 256).astype(np.float32)
+        x2 = np.random.rand(256, 256).astype(np.float32)
+        scale = np.float32(i + 1)
+        instances.append({"x1": x1, "x2": x2, "scale": scale, "text": f"text{i}"})
+        ys.append(x1 + x2 * scale)
+    # the shared memory of inputs is reused by the following requests
+    for _ in range(3):
+        result = client.infer(instances)
+        assert len(result) == 4
+        for i in range(4):
+            assert (result[i]["y"] == ys[i]).all()
+            assert result[i]["text"] == f"text{i}_reply"
@@ -1393,3 +1393,262 @@ def add_common(x1, x2):
     print(result)
     assert len(result) == 1
     assert "y" in result[0]
+
+
+@serving_test
+def test_stage_function_num_parallel_success():
+    """
+    Feature: test servable_config.py stage
+    Description: The tasks of function stage with num_parallel greater than 1 are handled concurrently
+    Expectation: Serving server work well, and the function is invoked concurrently.
+    """
+    servable_content = r"""
+import time
+import threading
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+running_lock = threading.Lock()
+running_count = 0
+
+def func_sleep(x1, x2):
+    global running_count
+    with running_lock:
+        running_count += 1
+        cur_running = running_count
+    time.sleep(0.2)  # release GIL
+    with running_lock:
+        running_count -= 1
+    return x1 + x2, np.int32(cur_running)
+
+@register.register_method(output_names=["y", "running"])
+def add_common(x1, x2):
+    y, running = register.add_stage(func_sleep, x1, x2, outputs_count=2, num_parallel=4)
+    return y, running
+"""
+    base = start_serving_server(servable_content)
+    instances = []
+    ys = []
+    for i in range(8):
+        x1 = np.asarray([[1.1, 2.2], [3.3, 4.4]]).astype(np.float32) * (i + 1)
+        x2 = np.asarray([[5.5, 6.6], [7.7, 8.8]]).astype(np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(x1 + x2)
+
+    client = create_client("localhost:5500", base.servable_name, "add_common")
+    result = client.infer(instances)
+    assert len(result) == 8
+    for i in range(8):
+        assert is_float_equal(result[i]["y"], ys[i])
+    assert max(item["running"] for item in result) > 1
+
+
+@serving_test
+def test_stage_function_num_parallel_model_failed():
+    """
+    Feature: test servable_config.py stage
+    Description: Set num_parallel for model stage
+    Expectation: Serving server start failed.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+@register.register_method(output_names=["y"])
+def add_common(x1, x2):
+    y = register.add_stage(model, x1, x2, outputs_count=1, num_parallel=2)
+    return y
+"""
+    try:
+        start_serving_server(servable_content)
+        assert False
+    except RuntimeError as e:
+        assert "the parameter 'num_parallel' of add_stage is valid only when 'stage' is a python function" in str(e)
+
+
+@serving_test
+def test_stage_function_stacked_success():
+    """
+    Feature: test servable_config.py stage
+    Description: The function of stage with stacked inputs and outputs, and the ragged inputs are padded
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def func_stacked(x1, seq, text):
+    padded, lengths = seq
+    seq_sum = padded.sum(axis=1)  # zero padded
+    return x1 * 2, seq_sum, lengths.astype(np.int32), [item + "_reply" for item in text]
+
+@register.register_method(output_names=["y", "seq_sum", "length", "text"])
+def predict(x1, seq, text):
+    y, seq_sum, length, text = register.add_stage(func_stacked, x1, seq, text, outputs_count=4, batch_size=4,
+                                                  stacked=True)
+    return y, seq_sum, length, text
+"""
+    base = start_serving_server(servable_content)
+    instances = []
+    for i in range(6):
+        x1 = np.asarray([[1.1, 2.2], [3.3, 4.4]]).astype(np.float32) * (i + 1)
+        seq = np.ones([i + 1, 3], np.float32) * (i + 1)
+        instances.append({"x1": x1, "seq": seq, "text": f"text{i}"})
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    assert len(result) == 6
+    for i in range(6):
+        assert is_float_equal(result[i]["y"], instances[i]["x1"] * 2)
+        assert is_float_equal(result[i]["seq_sum"], instances[i]["seq"].sum(axis=0))
+        assert result[i]["length"] == i + 1
+        assert result[i]["text"] == f"text{i}_reply"
+
+
+@serving_test
+def test_stage_function_stacked_output_shape_invalid_failed():
+    """
+    Feature: test servable_config.py stage
+    Description: The first dimension of output returned by the stacked function is not the number of instances
+    Expectation: Serving server report error.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def func_stacked(x1):
+    return x1[:1]
+
+@register.register_method(output_names=["y"])
+def predict(x1):
+    y = register.add_stage(func_stacked, x1, outputs_count=1, batch_size=4, stacked=True)
+    return y
+"""
+    base = start_serving_server(servable_content)
+    instances = []
+    for i in range(3):
+        x1 = np.asarray([[1.1, 2.2], [3.3, 4.4]]).astype(np.float32) * (i + 1)
+        instances.append({"x1": x1})
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    if isinstance(result, dict):
+        assert "servable is not available" in result["error"] \
+               or f"Call Function '{base.servable_name}.func_stacked' Failed" in result["error"]
+    else:
+        assert "servable is not available" in result[0]["error"] \
+               or f"Call Function '{base.servable_name}.func_stacked' Failed" in result[0]["error"]
+
+
+@serving_test
+def test_stage_function_stacked_output_dtype_invalid_failed():
+    """
+    Feature: test servable_config.py stage
+    Description: The stacked function returns numpy array of str, which cannot be replied
+    Expectation: Only the request of the invalid output fails, and the following requests work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def func_stacked(x1):
+    if x1[0][0][0] < 0:
+        return x1.astype(str)
+    return x1 * 2
+
+@register.register_method(output_names=["y"])
+def predict(x1):
+    y = register.add_stage(func_stacked, x1, outputs_count=1, batch_size=4, stacked=True)
+    return y
+"""
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    x1 = np.asarray([[1.1, 2.2], [3.3, 4.4]]).astype(np.float32)
+    result = client.infer([{"x1": -x1}])
+    assert "The data type <U" in result[0]["error"]
+    assert "is not supported" in result[0]["error"]
+
+    result = client.infer([{"x1": x1}])
+    assert is_float_equal(result[0]["y"], x1 * 2)
+
+
+@serving_test
+def test_stage_function_batch_results_with_failed_instances_success():
+    """
+    Feature: test servable_config.py stage
+    Description: The results of batch function are pushed in bulk, and the failed instances are interleaved
+    Expectation: Serving server work well, and the results are returned in order.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def func_test_batch(instances):
+    for x1, x2 in instances:
+        if int(x1[0][0]) % 5 == 3:
+            raise RuntimeError("invalid instance")
+        yield x1 + x2
+
+@register.register_method(output_names=["y"])
+def predict(x1, x2):
+    y = register.add_stage(func_test_batch, x1, x2, outputs_count=1, batch_size=32)
+    return y
+"""
+    base = start_serving_server(servable_content)
+    instances = []
+    for i in range(20):
+        x1 = np.ones([2, 2], np.float32) * i
+        x2 = np.ones([2, 2], np.float32) * 0.5
+        instances.append({"x1": x1, "x2": x2})
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    assert len(result) == 20
+    for i in range(20):
+        if i % 5 == 3:
+            assert "invalid instance" in result[i]["error"]
+        else:
+            assert is_float_equal(result[i]["y"], instances[i]["x1"] + instances[i]["x2"])
+
+
+@serving_test
+def test_stage_function_cpp_argmax_batch_success():
+    """
+    Feature: test servable_config.py stage
+    Description: Test C++ stage argmax_cpp processing the instances of one task in batch by configured threads
+    Expectation: Serving server work ok.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+tensor_add = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+@register.register_method(output_names=["y"])
+def predict(x1):
+    y = register.add_stage("argmax_cpp", x1, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content, num_cpp_stage_threads=2)
+    # Client
+    instances = []
+    ys = []
+    for i in range(8):
+        x1 = np.random.rand(2, 3).astype(np.float32)
+        instances.append({"x1": x1})
+        ys.append(np.argmax(x1))
+    # NaN is ignored
+    instances[3]["x1"][1][0] = np.nan
+    ys[3] = np.argmax(np.nan_to_num(instances[3]["x1"], nan=-1))
+
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    result = client.infer(instances)
+    print("result", result)
+    assert len(result) == 8
+    for i in range(8):
+        assert result[i]["y"] == ys[i]
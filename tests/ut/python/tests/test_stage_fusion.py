@@ -0,0 +1,199 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test adjacent python stages fused into one stage"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving.server.register.method import _StageDef, _group_stages
+
+
+@serving_test
+def test_stage_fusion_intermediate_outputs_success():
+    """
+    Feature: Stage fusion
+    Description: Adjacent python stages are fused, and the intermediate outputs are used by the following model
+        stage, the following fused python stages and the method outputs
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def scale(x1, x2):
+    return x1 * 2, x2, "unused"
+
+def shift(x1, x2):
+    return x1 + 1, x2 + 1
+
+def sub(y, x1):
+    return y - x1
+
+def add_count(y, text):
+    return y + len(text), text + "_reply"
+
+@register.register_method(output_names=["x1", "y", "text"], fuse_stages=True)
+def predict(x1, x2, text):
+    x1, x2, _ = register.add_stage(scale, x1, x2, outputs_count=3)
+    x1, x2 = register.add_stage(shift, x1, x2, outputs_count=2)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    y = register.add_stage(sub, y, x1, outputs_count=1)
+    y, text = register.add_stage(add_count, y, text, outputs_count=2)
+    return x1, y, text
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    for i in range(4):
+        x1 = np.random.rand(2, 2).astype(np.float32)
+        x2 = np.random.rand(2, 2).astype(np.float32)
+        instances.append({"x1": x1, "x2": x2, "text": "a" * (i + 1)})
+    result = client.infer(instances)
+    assert len(result) == 4
+    for i, instance in enumerate(instances):
+        x1 = instance["x1"] * 2 + 1
+        assert np.allclose(result[i]["x1"], x1)
+        assert np.allclose(result[i]["y"], instance["x2"] + 1 + i + 1)
+        assert result[i]["text"] == "a" * (i + 1) + "_reply"
+
+
+@serving_test
+def test_stage_fusion_python_values_success():
+    """
+    Feature: Stage fusion
+    Description: The values passed between the fused python stages are converted as they are passed by C++, bytes
+        as uint8 array, and int, float and bool as numpy array
+    Expectation: Serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+
+def produce(x):
+    return b"abc", 3, 1.5, True, x.tolist()
+
+def consume(data, count, value, flag, x):
+    assert isinstance(data, np.ndarray) and data.dtype == np.uint8
+    assert count.dtype == np.int64 and value.dtype == np.float64 and flag.dtype == np.bool_
+    assert isinstance(x, np.ndarray)
+    return data.astype(np.float32).sum() + count + value + flag + x.sum()
+
+@register.register_method(output_names=["y"], fuse_stages=True)
+def predict(x):
+    data, count, value, flag, x = register.add_stage(produce, x, outputs_count=5)
+    y = register.add_stage(consume, data, count, value, flag, x, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    x = np.array([1.0, 2.0], np.float32)
+    result = client.infer([{"x": x}])
+    assert result[0]["y"] == 97 + 98 + 99 + 3 + 1.5 + 1 + 3
+
+
+@serving_test
+def test_stage_fusion_instance_raise_exception_failed():
+    """
+    Feature: Stage fusion
+    Description: The second fused python stage raises exception for one instance
+    Expectation: Only the instance failed, and the other instances success.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+
+def add_one(x):
+    return x + 1
+
+def check(x):
+    if x[0] > 10:
+        raise RuntimeError("value too large")
+    return x * 2
+
+@register.register_method(output_names=["y"], fuse_stages=True)
+def predict(x):
+    x = register.add_stage(add_one, x, outputs_count=1)
+    y = register.add_stage(check, x, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = [{"x": np.array([value], np.float32)} for value in (1, 20, 3)]
+    result = client.infer(instances)
+    assert len(result) == 3
+    assert result[0]["y"] == 4
+    assert "value too large" in result[1]["error"]
+    assert result[2]["y"] == 8
+
+
+@serving_test
+def test_stage_fusion_same_functions_fused_twice_success():
+    """
+    Feature: Stage fusion
+    Description: The same python functions are fused twice in one method with different data flows
+    Expectation: The fused stages do not collide, and serving server work well.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def add_one(x):
+    return x + 1
+
+def double(x):
+    return x * 2
+
+@register.register_method(output_names=["y"], fuse_stages=True)
+def predict(x1, x2):
+    x1 = register.add_stage(add_one, x1, outputs_count=1)
+    x1 = register.add_stage(double, x1, outputs_count=1)
+    y = register.add_stage(model, x1, x2, outputs_count=1)
+    y = register.add_stage(add_one, y, outputs_count=1)
+    y = register.add_stage(double, y, outputs_count=1)
+    return y
+    """
+    base = start_serving_server(servable_content)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    x1 = np.random.rand(2, 2).astype(np.float32)
+    x2 = np.random.rand(2, 2).astype(np.float32)
+    result = client.infer([{"x1": x1, "x2": x2}])
+    assert np.allclose(result[0]["y"], (((x1 + 1) * 2 + x2) + 1) * 2)
+
+
+@serving_test
+def test_stage_fusion_group_stages_success():
+    """
+    Feature: Stage fusion
+    Description: Only the chains of python stages consuming the outputs of the previous ones with the same
+        num_parallel are fused, and stages are not fused unless fusion is enabled
+    Expectation: The stages are grouped as expected.
+    """
+
+    def fun(x):
+        return x
+
+    def create_stage(index, inputs, num_parallel=1, is_python=True):
+        return _StageDef(index, inputs, 1, "", None, fun if is_python else None, num_parallel)
+
+    # stage 2 is independent of stage 1, stage 3 consumes both of them, stage 4 has different num_parallel,
+    # stage 5 is not python function, stage 6 and 7 form a chain
+    stages = [create_stage(1, [(0, 0)]), create_stage(2, [(0, 1)]), create_stage(3, [(1, 0), (2, 0)]),
+              create_stage(4, [(3, 0)], num_parallel=2), create_stage(5, [(4, 0)], is_python=False),
+              create_stage(6, [(5, 0)]), create_stage(7, [(6, 0)])]
+    groups = _group_stages(stages, True)
+    assert [[stage.index for stage in group] for group in groups] == [[1], [2, 3], [4], [5], [6, 7]]
+    groups = _group_stages(stages, False)
+    assert [[stage.index for stage in group] for group in groups] == [[1], [2], [3], [4], [5], [6], [7]]
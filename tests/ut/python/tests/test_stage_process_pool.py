@@ -0,0 +1,117 @@
+# Copyright 2023 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Test python stages run in the process pool of worker"""
+
+import numpy as np
+from common import serving_test, start_serving_server, create_client
+from mindspore_serving import server
+
+
+@serving_test
+def test_stage_process_pool_success():
+    """
+    Feature: Python stage process pool
+    Description: The instances of python stages are split and run in multiple processes, and the failed instance
+        does not affect other instances
+    Expectation: Serving server work well, and results are returned in order.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def add_scale(instances):
+    for x1, x2, scale, text in instances:
+        if text == "error":
+            raise RuntimeError("invalid text")
+        yield x1 + x2 * scale, text + "_reply"
+
+@register.register_method(output_names=["y", "text"])
+def predict(x1, x2, scale, text):
+    y, text = register.add_stage(add_scale, x1, x2, scale, text, outputs_count=2, batch_size=8)
+    return y, text
+    """
+    base = start_serving_server(servable_content, num_stage_processes=3)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    ys = []
+    for i in range(8):
+        x1 = np.random.rand(64, 64).astype(np.float32)
+        x2 = np.random.rand(64, 64).astype(np.float32)
+        scale = np.float32(i + 1)
+        text = "error" if i == 5 else f"text{i}"
+        instances.append({"x1": x1, "x2": x2, "scale": scale, "text": text})
+        ys.append(x1 + x2 * scale)
+    for _ in range(3):
+        result = client.infer(instances)
+        assert len(result) == 8
+        for i in range(8):
+            if i == 5:
+                assert "invalid text" in result[i]["error"]
+                continue
+            assert (result[i]["y"] == ys[i]).all()
+            assert result[i]["text"] == f"text{i}_reply"
+
+
+@serving_test
+def test_stage_process_pool_invalid_num_failed():
+    """
+    Feature: Python stage process pool
+    Description: The number of stage processes is out of range
+    Expectation: Start config raise RuntimeError.
+    """
+    try:
+        server.ServableStartConfig("servable_dir", "servable_name", num_stage_processes=65)
+        assert False
+    except RuntimeError as e:
+        assert "Parameter 'num_stage_processes' should be in range [0,64]" in str(e)
+
+
+@serving_test
+def test_stage_process_pool_large_outputs_success():
+    """
+    Feature: Python stage process pool
+    Description: The outputs of python stages are larger than the shared memory arena of processes, and the outputs
+        of previous requests are held when the next requests are handled
+    Expectation: Serving server work well, and results are returned in order.
+    """
+    servable_content = r"""
+import numpy as np
+from mindspore_serving.server import register
+model = register.declare_model(model_file="tensor_add.mindir", model_format="MindIR", with_batch_dim=False)
+
+def expand(instances):
+    for x1, x2 in instances:
+        yield np.tile(x1 + x2, (1024, 1024))
+
+@register.register_method(output_names=["y"])
+def predict(x1, x2):
+    y = register.add_stage(expand, x1, x2, outputs_count=1, batch_size=4)
+    return y
+    """
+    base = start_serving_server(servable_content, num_stage_processes=2)
+    client = create_client("localhost:5500", base.servable_name, "predict")
+    instances = []
+    ys = []
+    for i in range(4):
+        x1 = np.array([[1.1, 2.2], [3.3, 4.4]], np.float32) * (i + 1)
+        x2 = np.array([[5.5, 6.6], [7.7, 8.8]], np.float32) * (i + 1)
+        instances.append({"x1": x1, "x2": x2})
+        ys.append(np.tile(x1 + x2, (1024, 1024)))
+    for _ in range(3):
+        result = client.infer(instances)
+        assert len(result) == 4
+        for i in range(4):
+            assert (result[i]["y"] == ys[i]).all()
@@ -107,7 +107,14 @@ Status GraphImplStubAdd::Load(uint32_t device_id) {
     return kCoreFailed;
   }
   MS_LOG_INFO << "input count: " << input_count << ", output count: " << output_count;
-  Init({2, 2});
+  // tensor_add_batch1.mindir: model with batch size 1, batch size 2 by default
+  int64_t batch_size = 2;
+  auto file_name = graph_->graph_data_->GetFuncGraph()->file_name_;
+  auto batch_beg = file_name.find("_batch");
+  if (batch_beg != std::string::npos) {
+    batch_size = std::stoi(file_name.substr(batch_beg + std::string("_batch").size()));
+  }
+  Init({batch_size, 2});
   return kSuccess;
 }
 
@@ -90,4 +90,13 @@ bool InferenceLoader::SupportReuseDevice() {
   return mindspore_infer->SupportReuseDevice();
 }
 
+bool InferenceLoader::SupportMultiThreads() {
+  auto mindspore_infer = CreateMindSporeInfer();
+  if (mindspore_infer == nullptr) {
+    MSI_LOG_ERROR << "Create MindSpore infer failed";
+    return false;
+  }
+  return mindspore_infer->SupportMultiThreads();
+}
+
 }  // namespace mindspore::serving